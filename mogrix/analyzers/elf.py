@@ -8,14 +8,26 @@ structures — causing SIGSEGV at PC=0x00000000 at runtime.
 Also detects:
 - TEXTREL (text segment relocations — always bad for shared libs on IRIX)
 - 3 PT_LOAD segments (-z separate-code — crashes rld)
+
+Binaries are read in-process with mogrix.mipself. The readelf-based
+helpers remain as the reference implementation (check_binary_readelf)
+and as the fallback for ELF files mipself does not parse (64-bit).
 """
 
 import os
 import re
 import subprocess
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+from mogrix.mipself import ELF_MAGIC, R_MIPS_REL32, read_elf
+from mogrix.rpm_payload import iter_payload, select_magic
+
+if TYPE_CHECKING:
+    from mogrix.elf_facts import ElfFacts, ElfFactsCache
 
 
 @dataclass
@@ -78,7 +90,7 @@ def _is_mips_elf(path: Path) -> tuple[bool, str]:
     try:
         with open(path, "rb") as f:
             magic = f.read(4)
-        if magic != b"\x7fELF":
+        if magic != ELF_MAGIC:
             return False, ""
     except (OSError, PermissionError):
         return False, ""
@@ -238,8 +250,93 @@ _SYMBOL_HINTS = {
 }
 
 
-def check_binary(binary_path: Path) -> ElfCheckResult:
-    """Check a single MIPS ELF binary for IRIX relocation issues."""
+def symbols_and_relocs(elf) -> tuple[list[ElfSymbol], list[ElfRelocation]]:
+    """Symbols and R_MIPS_REL32 relocations, as the readelf parsers return them."""
+    symbols = []
+    seen = set()
+    for sym in elf.symbols:
+        key = (sym.name, sym.value)
+        if key in seen:
+            continue
+        seen.add(key)
+        symbols.append(
+            ElfSymbol(
+                address=sym.value,
+                size=sym.size,
+                sym_type=sym.sym_type,
+                binding=sym.binding,
+                section=sym.section,
+                name=sym.name,
+            )
+        )
+    relocs = [
+        ElfRelocation(offset=r.offset, sym_name=r.sym_name, sym_value=r.sym_value)
+        for r in elf.relocations
+        if r.rtype == R_MIPS_REL32 and r.sym_name
+    ]
+    return symbols, relocs
+
+
+def check_binary(
+    binary_path: Path,
+    data: bytes | None = None,
+    cache: "ElfFactsCache | None" = None,
+) -> ElfCheckResult:
+    """Check a single MIPS ELF binary for IRIX relocation issues.
+
+    `data` may hold the file contents when the binary is not on disk.
+    With a facts cache, binaries seen before are not parsed again.
+    """
+    if cache is not None:
+        facts = cache.lookup(binary_path) if data is None else cache.lookup_data(binary_path, data)
+        if facts is not None:
+            return _result_from_facts(binary_path, facts)
+
+    elf = read_elf(binary_path, data)
+    if elf is None:
+        if data is None:
+            return check_binary_readelf(binary_path)
+        return _check_data_readelf(binary_path, data)
+
+    with elf:
+        result = ElfCheckResult(binary_path=binary_path)
+        if not elf.is_mips:
+            return result
+        result.is_mips_elf = True
+        result.elf_type = elf.elf_type
+        symbols, relocs = symbols_and_relocs(elf)
+        _analyze(result, symbols, relocs, elf.has_textrel(), len(elf.load_segments))
+    return result
+
+
+def _result_from_facts(binary_path: Path, facts: "ElfFacts") -> ElfCheckResult:
+    """Rebuild a check result from cached ELF facts."""
+    result = ElfCheckResult(binary_path=binary_path)
+    if not facts.is_mips:
+        return result
+    result.is_mips_elf = True
+    result.elf_type = facts.elf_type
+    result.rel32_total = facts.rel32_total
+    result.rel32_undef = facts.rel32_undef
+    result.class_rec_findings = [
+        ClassRecFinding(
+            name=name,
+            address=address,
+            size=size,
+            binding=binding,
+            at_risk_relocs=[
+                ElfRelocation(offset=offset, sym_name=sym_name, sym_value=0)
+                for offset, sym_name in relocs
+            ],
+        )
+        for name, address, size, binding, relocs in facts.class_recs
+    ]
+    _add_warnings(result, facts.has_textrel, facts.load_segment_count)
+    return result
+
+
+def check_binary_readelf(binary_path: Path) -> ElfCheckResult:
+    """check_binary via readelf subprocesses (reference implementation)."""
     result = ElfCheckResult(binary_path=binary_path)
 
     is_mips, elf_type = _is_mips_elf(binary_path)
@@ -252,12 +349,41 @@ def check_binary(binary_path: Path) -> ElfCheckResult:
     # Parse symbols and relocations
     symbols = _parse_symbols(binary_path)
     relocs = _parse_relocations(binary_path)
+    has_textrel, load_count = _check_dynamic(binary_path)
+    _analyze(result, symbols, relocs, has_textrel, load_count)
+    return result
 
+
+def _check_data_readelf(binary_path: Path, data: bytes) -> ElfCheckResult:
+    """check_binary_readelf for contents not on disk (e.g. an RPM member)."""
+    with tempfile.TemporaryDirectory(prefix="mogrix-elf-") as tmp:
+        tmp_path = Path(tmp) / binary_path.name
+        tmp_path.write_bytes(data)
+        result = check_binary_readelf(tmp_path)
+    result.binary_path = binary_path
+    return result
+
+
+def _analyze(
+    result: ElfCheckResult,
+    symbols: list[ElfSymbol],
+    relocs: list[ElfRelocation],
+    has_textrel: bool,
+    load_count: int,
+) -> None:
+    """Fill in findings and warnings from the parsed ELF facts."""
     result.rel32_total = len(relocs)
     undef_relocs = [r for r in relocs if r.sym_value == 0]
     result.rel32_undef = len(undef_relocs)
+    result.class_rec_findings = find_class_recs(symbols, undef_relocs)
+    _add_warnings(result, has_textrel, load_count)
+
 
-    # Find ClassRec symbols
+def find_class_recs(
+    symbols: list[ElfSymbol], undef_relocs: list[ElfRelocation]
+) -> list[ClassRecFinding]:
+    """ClassRec symbols with UNDEF R_MIPS_REL32 relocations inside them."""
+    findings = []
     class_recs = [s for s in symbols if _is_class_rec(s)]
 
     # Cross-reference: for each ClassRec, find R_MIPS_REL32 relocs within it
@@ -268,7 +394,7 @@ def check_binary(binary_path: Path) -> ElfCheckResult:
             if crec.address <= r.offset < crec.address + crec.size
         ]
         if at_risk:
-            result.class_rec_findings.append(
+            findings.append(
                 ClassRecFinding(
                     name=crec.name,
                     address=crec.address,
@@ -277,9 +403,11 @@ def check_binary(binary_path: Path) -> ElfCheckResult:
                     at_risk_relocs=at_risk,
                 )
             )
+    return findings
 
-    # Check TEXTREL and LOAD segments
-    has_textrel, load_count = _check_dynamic(binary_path)
+
+def _add_warnings(result: ElfCheckResult, has_textrel: bool, load_count: int) -> None:
+    elf_type = result.elf_type
     result.has_textrel = has_textrel
     result.load_segment_count = load_count
 
@@ -296,66 +424,159 @@ def check_binary(binary_path: Path) -> ElfCheckResult:
             f"but no *ClassRec symbols found — check for non-standard naming"
         )
 
-    return result
+
+def check_rpm(rpm_path: Path, cache: "ElfFactsCache | None" = None) -> list[ElfCheckResult]:
+    """Check all ELF binaries in an RPM, read straight from its payload."""
+    results = []
+    for member in iter_payload(rpm_path, select_magic(ELF_MAGIC)):
+        if member.data is None or not member.is_file:
+            continue
+        # Report the RPM-relative install path
+        r = check_binary(Path(member.path), data=member.data, cache=cache)
+        if r.is_mips_elf:
+            results.append(r)
+    return results
 
 
-def check_rpm(rpm_path: Path) -> list[ElfCheckResult]:
-    """Extract an RPM and check all ELF binaries inside."""
+# Loose binaries are checked in batches so pool overhead stays small
+_FILES_PER_TASK = 16
+
+
+def _is_elf_file(fpath: Path) -> bool:
+    if not fpath.is_file() or fpath.is_symlink():
+        return False
+    try:
+        with open(fpath, "rb") as f:
+            return f.read(4) == ELF_MAGIC
+    except (OSError, PermissionError):
+        return False
+
+
+def _check_files(files: list[Path], cache: "ElfFactsCache | None" = None) -> list[ElfCheckResult]:
     results = []
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Extract RPM
-        subprocess.run(
-            f"cd {tmpdir} && rpm2cpio {rpm_path.absolute()} | cpio -idm 2>/dev/null",
-            shell=True,
-            capture_output=True,
-        )
-        # Walk for ELF files
-        for root, _dirs, files in os.walk(tmpdir):
-            for fname in files:
-                fpath = Path(root) / fname
-                if not fpath.is_file() or fpath.is_symlink():
-                    continue
-                try:
-                    with open(fpath, "rb") as f:
-                        if f.read(4) != b"\x7fELF":
-                            continue
-                except (OSError, PermissionError):
-                    continue
-                r = check_binary(fpath)
-                if r.is_mips_elf:
-                    # Store the original RPM-relative path for display
-                    rel = fpath.relative_to(tmpdir)
-                    r.binary_path = Path("/") / rel
-                    results.append(r)
+    for fpath in files:
+        r = check_binary(fpath, cache=cache)
+        if r.is_mips_elf:
+            results.append(r)
     return results
 
 
-def check_path(path: Path) -> list[ElfCheckResult]:
+def _work_units(path: Path) -> list[tuple[str, object]]:
+    """Split one check-elf argument into pool tasks."""
+    if path.suffix == ".rpm":
+        return [("rpm", path)]
+    if not path.is_dir():
+        return [("files", [path])]
+    files = [
+        Path(root) / fname
+        for root, _dirs, names in os.walk(path)
+        for fname in sorted(names)
+    ]
+    files = [f for f in files if _is_elf_file(f)]
+    return [
+        ("files", files[i:i + _FILES_PER_TASK])
+        for i in range(0, len(files), _FILES_PER_TASK)
+    ]
+
+
+def _run_unit(
+    unit: tuple[str, object], cache: "ElfFactsCache | None" = None
+) -> list[ElfCheckResult]:
+    kind, arg = unit
+    if kind == "rpm":
+        return check_rpm(arg, cache)
+    return _check_files(arg, cache)
+
+
+# Per-process facts cache of a check-elf pool worker
+_worker_cache: "ElfFactsCache | None" = None
+
+
+def _init_check_worker(cache_path: Path | None) -> None:
+    global _worker_cache
+    if cache_path is not None:
+        from mogrix.elf_facts import ElfFactsCache
+
+        _worker_cache = ElfFactsCache(cache_path)
+
+
+def _run_worker_unit(unit: tuple[str, object]) -> list[ElfCheckResult]:
+    return _run_unit(unit, _worker_cache)
+
+
+def check_path(path: Path, cache: "ElfFactsCache | None" = None) -> list[ElfCheckResult]:
     """Check a path — RPM file, directory, or individual binary."""
     if path.suffix == ".rpm":
-        return check_rpm(path)
+        return check_rpm(path, cache)
     elif path.is_dir():
         results = []
-        for root, _dirs, files in os.walk(path):
-            for fname in files:
-                fpath = Path(root) / fname
-                if not fpath.is_file() or fpath.is_symlink():
-                    continue
-                try:
-                    with open(fpath, "rb") as f:
-                        if f.read(4) != b"\x7fELF":
-                            continue
-                except (OSError, PermissionError):
-                    continue
-                r = check_binary(fpath)
-                if r.is_mips_elf:
-                    results.append(r)
+        for unit in _work_units(path):
+            results.extend(_run_unit(unit, cache))
         return results
     else:
-        r = check_binary(path)
+        r = check_binary(path, cache=cache)
         return [r] if r.is_mips_elf else []
 
 
+def iter_check_paths(
+    paths: list[Path], jobs: int = 1, cache: "ElfFactsCache | None" = None
+) -> Iterator[tuple[Path, list[ElfCheckResult], str]]:
+    """Check paths in a process pool, yielding (path, results, error) per
+    task as it completes.
+
+    A directory is split into several tasks, so the same path may be
+    yielded more than once. `error` is non-empty when an RPM could not be
+    read. With jobs=1 everything runs in-process, in order. Workers open
+    their own connection to `cache`.
+    """
+    units = [(path, unit) for path in paths for unit in _work_units(path)]
+
+    def _outcome(path, fn, *args):
+        try:
+            return path, fn(*args), ""
+        except RuntimeError as e:
+            return path, [], str(e)
+
+    if jobs <= 1 or len(units) <= 1:
+        for path, unit in units:
+            yield _outcome(path, _run_unit, unit, cache)
+        return
+
+    cache_path = cache.db_path if cache is not None else None
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_check_worker, initargs=(cache_path,)
+    ) as pool:
+        futures = {pool.submit(_run_worker_unit, unit): path for path, unit in units}
+        for future in as_completed(futures):
+            yield _outcome(futures[future], future.result)
+
+
+def result_to_dict(r: ElfCheckResult) -> dict:
+    """JSON-serialisable form of a check result (check-elf --json-output)."""
+    return {
+        "binary": str(r.binary_path),
+        "type": r.elf_type,
+        "rel32_total": r.rel32_total,
+        "rel32_undef": r.rel32_undef,
+        "class_recs": [
+            {
+                "name": f.name,
+                "address": f"0x{f.address:08x}",
+                "size": f.size,
+                "at_risk_relocs": [
+                    {
+                        "offset": f"+0x{rel.offset - f.address:03x}",
+                        "symbol": rel.sym_name,
+                    }
+                    for rel in f.at_risk_relocs
+                ],
+            }
+            for f in r.class_rec_findings
+        ],
+        "warnings": r.warnings,
+    }
+
+
 def format_results(results: list[ElfCheckResult]) -> str:
     """Format check results for console output."""
     lines = []
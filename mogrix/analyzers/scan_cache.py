@@ -0,0 +1,111 @@
+"""Persistent on-disk cache of source-scan matches.
+
+`mogrix analyze`, `mogrix convert` and batch candidate generation scan the
+same upstream tarballs over and over. What a scan finds only depends on the
+tarball content and the patterns, so raw matches are cached per tarball
+under its sha256, with one entry per pattern keyed by (pattern, glob):
+
+- A repeated scan of an unchanged tarball reads no tarball data beyond
+  hashing it.
+- Adding a check to source_checks.yaml or catalog.yaml only runs the new
+  pattern against cached tarballs; editing a pattern re-runs just that one.
+- Messages, severities and handled_by are not part of the key. Findings
+  are rebuilt from the current checks, and handled flags are recomputed
+  from the package rules on every call.
+
+Used by SourceAnalyzer when given a cache (convert, analyze, batch-build).
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Default cache location (next to the other mogrix caches)
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "mogrix" / "source-scan"
+
+# Bump when matching semantics change so stale entries are ignored.
+CACHE_VERSION = 1
+
+
+def pattern_key(pattern: str, glob: str) -> str:
+    """Cache key for one pattern's matches."""
+    return hashlib.sha256(f"{pattern}\0{glob}".encode()).hexdigest()[:16]
+
+
+class ScanCache:
+    """Per-tarball pattern matches, stored as JSON under the tarball sha256
+    (blobstore.file_digest).
+
+    An entry is {"files_scanned": int, "matches": {pattern_key: [[file,
+    line, text], ...]}}; files_scanned is the largest count seen while
+    building it.
+    """
+
+    def __init__(self, cache_dir: Path | None = None):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+
+    def _entry_path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest[2:]}.json"
+
+    def load(self, digest: str) -> dict | None:
+        path = self._entry_path(digest)
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION:
+            return None
+        return entry
+
+    def gc(self, keep: set[str], dry_run: bool = False) -> tuple[int, int]:
+        """Drop matches of patterns whose key is not in keep.
+
+        Patterns that were edited or removed otherwise stay in every entry
+        forever. Entries left without matches, and entries from another
+        CACHE_VERSION, are deleted. Returns (entries changed, bytes freed).
+        """
+        changed = 0
+        freed = 0
+        if not self.cache_dir.exists():
+            return changed, freed
+        for path in sorted(self.cache_dir.glob("*/*.json")):
+            try:
+                size = path.stat().st_size
+                entry = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if entry.get("version") == CACHE_VERSION:
+                matches = {k: v for k, v in entry["matches"].items() if k in keep}
+                if len(matches) == len(entry["matches"]):
+                    continue
+            else:
+                matches = {}
+            changed += 1
+            if not matches:
+                freed += size
+                if not dry_run:
+                    path.unlink()
+                continue
+            entry["matches"] = matches
+            text = json.dumps(entry)
+            freed += size - len(text.encode())
+            if not dry_run:
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_text(text)
+                tmp.replace(path)
+        return changed, freed
+
+    def store(self, digest: str, files_scanned: int, matches: dict[str, list]) -> None:
+        path = self._entry_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "version": CACHE_VERSION,
+            "files_scanned": files_scanned,
+            "matches": matches,
+        }
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry))
+        tmp.replace(path)
@@ -1,18 +1,51 @@
 """Source-level static analysis for IRIX compatibility.
 
-Scans extracted source trees for known IRIX-incompatible patterns.
+Scans source trees and tarballs for known IRIX-incompatible patterns.
 Patterns are defined in rules/source_checks.yaml and compat/catalog.yaml,
 not in this code. Adding a new check = adding a YAML entry.
 
-Uses ripgrep (rg) for fast regex searching across source trees.
+All patterns are evaluated together in one pass over the tree: files are
+filtered once against the union of check globs, and each file is read once
+and searched for every applicable pattern (see MultiPatternScanner). Scan
+time therefore grows with tree size, not with the number of checks.
+Tarballs are streamed with the tarfile module rather than extracted: only
+members some check applies to are decompressed, into memory.
+Patterns Python's re module cannot compile fall back to ripgrep (rg).
 """
 
+import fnmatch
+import os
+import re
 import subprocess
+import tarfile
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import yaml
 
+from mogrix.analyzers.scan_cache import ScanCache, pattern_key
+from mogrix.blobstore import file_digest
+
+if TYPE_CHECKING:
+    from mogrix.analyzers.source_index import SourceIndex
+
+# Source archive suffixes found in extracted SRPMs
+TARBALL_EXTS = (".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz", ".tar")
+
+# Member bytes handed to a scan worker at a time (scan_tarball with jobs > 1)
+_BATCH_BYTES = 4 * 1024 * 1024
+
+
+def find_tarballs(directory: Path) -> list[Path]:
+    """Source tarballs in an extracted SRPM directory, sorted by name."""
+    return sorted(
+        f for f in directory.iterdir()
+        if f.is_file() and f.name.lower().endswith(TARBALL_EXTS)
+    )
+
 
 @dataclass
 class SourceFinding:
@@ -36,6 +69,8 @@ class SourceAnalysisResult:
     findings: list[SourceFinding] = field(default_factory=list)
     checks_run: int = 0
     files_scanned: int = 0
+    # Matches of scan_tarballs' extra_patterns, (file, line, text) per pattern
+    extra_matches: list[list[tuple[str, int, str]]] = field(default_factory=list)
 
     @property
     def errors(self) -> list[SourceFinding]:
@@ -82,18 +117,423 @@ class CatalogPattern:
     glob: str = "*.c,*.h"
 
 
+@dataclass
+class ScanPattern:
+    """One regex to evaluate, with the file globs it applies to."""
+
+    pattern: str
+    glob: str = "*.c,*.h"
+
+
+class MultiPatternScanner:
+    """Evaluates many line-oriented regexes over files in a single pass.
+
+    Matching follows ripgrep's defaults: patterns match within a single
+    line, globs without a slash match the file's base name, hidden files
+    and directories are skipped, and files containing NUL bytes are
+    treated as binary and skipped. Only the first matching line per
+    (pattern, file) is reported, which is all scan_directory keeps after
+    deduplication.
+
+    Patterns that Python's re cannot compile are listed in `unsupported`
+    (by index) and never matched here.
+    """
+
+    def __init__(self, patterns: list[ScanPattern]):
+        self.patterns = patterns
+        self.unsupported: list[int] = []
+        # Patterns grouped by their glob list, so globs are matched once
+        # per file rather than once per pattern
+        self._groups: dict[tuple[str, ...], list[tuple]] = {}
+        for i, sp in enumerate(patterns):
+            try:
+                regex = re.compile(sp.pattern, re.MULTILINE)
+            except re.error:
+                self.unsupported.append(i)
+                continue
+            pattern_globs = tuple(g.strip() for g in sp.glob.split(",") if g.strip())
+            literals = _required_literals(sp.pattern)
+            self._groups.setdefault(pattern_globs, []).append((i, regex, literals))
+        self.globs = sorted({g for group in self._groups for g in group})
+        self._glob_res = {
+            g: re.compile(fnmatch.translate(g.lstrip("/"))) for g in self.globs
+        }
+        self._by_path = any("/" in g for g in self.globs)
+        self._glob_cache: dict[str, tuple] = {}
+
+    def _applicable(self, rel_path: str) -> tuple:
+        """Compiled patterns whose globs match rel_path (memoized by name)."""
+        name = rel_path.rsplit("/", 1)[-1]
+        key = rel_path if self._by_path else name
+        cached = self._glob_cache.get(key)
+        if cached is None:
+            matched = {
+                g for g, rx in self._glob_res.items()
+                if rx.match(rel_path if "/" in g else name)
+            }
+            cached = tuple(
+                entry
+                for group, entries in self._groups.items()
+                if matched.intersection(group)
+                for entry in entries
+            )
+            cached = tuple(sorted(cached, key=lambda e: e[0]))
+            if len(self._glob_cache) < 4096:
+                self._glob_cache[key] = cached
+        return cached
+
+    def wants(self, rel_path: str) -> bool:
+        """True if any pattern applies to rel_path."""
+        return bool(self._applicable(rel_path))
+
+    def scan_text(self, rel_path: str, data: bytes) -> list[tuple[int, int, str]]:
+        """Search one file's content for every applicable pattern.
+
+        Returns (pattern index, line number, stripped line text) for the
+        first matching line of each pattern that matches.
+        """
+        applicable = self._applicable(rel_path)
+        if not applicable or b"\0" in data:
+            return []
+
+        hits = []
+        tokens = None
+        text = None
+        for i, regex, literals in applicable:
+            present = None
+            if literals:
+                # Prefilter: skip the regex unless a required literal occurs.
+                # Whole-identifier literals are answered for every pattern
+                # at once by the file's token set; others by substring search.
+                present = []
+                for literal, encoded, whole_word in literals:
+                    if whole_word:
+                        if tokens is None:
+                            tokens = set(data.translate(_NON_WORD_BYTES).split())
+                        if encoded not in tokens:
+                            continue
+                    elif encoded not in data:
+                        continue
+                    present.append(literal)
+                if not present:
+                    continue
+            if text is None:
+                text = data.decode("utf-8", errors="replace")
+            start = _first_matching_line(text, regex, present)
+            if start is None:
+                continue
+            end = text.find("\n", start)
+            line_text = text[start:] if end < 0 else text[start:end]
+            hits.append((i, text.count("\n", 0, start) + 1, line_text.strip()))
+        return hits
+
+    def scan_directory(self, root: Path):
+        """Yield (relative path, pattern index, line, text) for a source tree.
+
+        `files_scanned` holds the number of files read once exhausted.
+        """
+        self.files_scanned = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            rel_dir = os.path.relpath(dirpath, root)
+            for filename in sorted(filenames):
+                if filename.startswith("."):
+                    continue
+                rel_path = filename if rel_dir == "." else f"{rel_dir}/{filename}"
+                if not self.wants(rel_path):
+                    continue
+                try:
+                    with open(os.path.join(dirpath, filename), "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+                self.files_scanned += 1
+                for i, line_num, line_text in self.scan_text(rel_path, data):
+                    yield rel_path, i, line_num, line_text
+
+    def scan_tarball(self, tarball: Path, jobs: int = 1) -> list[tuple[str, int, int, str]]:
+        """Scan the files inside a tarball without extracting it.
+
+        Members are streamed in archive order and only those some pattern
+        applies to are read, into memory. Paths are relative to the
+        tarball's top-level directory when every member shares one, as
+        scanning the single directory `tar -x` would produce. With jobs > 1,
+        member contents are searched by worker processes while the archive
+        is still being decompressed.
+
+        Returns (relative path, pattern index, line, text) tuples and sets
+        `files_scanned`. Raises tarfile.TarError for unreadable archives.
+        """
+        self.files_scanned = 0
+        reader = TarballReader(tarball)
+        hits: list[tuple[str | None, str, int, int, str]] = []
+        pool = None
+        pending = []
+        batch: list[tuple[str | None, str, bytes]] = []
+        batch_bytes = 0
+        if jobs > 1:
+            pool = ProcessPoolExecutor(
+                jobs, initializer=_init_scan_worker, initargs=(self.patterns,)
+            )
+        try:
+            for top, rel_path, data in reader.members(self.wants):
+                self.files_scanned += 1
+                if pool is None:
+                    for i, line_num, line_text in self.scan_text(rel_path, data):
+                        hits.append((top, rel_path, i, line_num, line_text))
+                    continue
+                batch.append((top, rel_path, data))
+                batch_bytes += len(data)
+                if batch_bytes >= _BATCH_BYTES:
+                    pending.append(pool.submit(_scan_members, batch))
+                    batch, batch_bytes = [], 0
+                    # Bound the decompressed data waiting in the queue
+                    if len(pending) > 2 * jobs:
+                        hits.extend(pending.pop(0).result())
+            if batch:
+                pending.append(pool.submit(_scan_members, batch))
+            for future in pending:
+                hits.extend(future.result())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        return [
+            (reader.path(top, rel_path), i, line_num, line_text)
+            for top, rel_path, i, line_num, line_text in hits
+        ]
+
+
+class TarballReader:
+    """Streams the regular files of a tarball in archive order.
+
+    Member paths are split into the top-level directory and the path below
+    it, which is what globs and hidden-file checks apply to. Once members()
+    is exhausted, path() gives the reported path: relative to the top-level
+    directory when every member shares one, as scanning the single
+    directory `tar -x` would produce.
+    """
+
+    def __init__(self, tarball: Path):
+        self.tarball = tarball
+        self.tops: set[str | None] = set()
+
+    def members(self, wants):
+        """Yield (top, relative path, content) for non-hidden files wants() accepts.
+
+        Raises tarfile.TarError for unreadable archives.
+        """
+        with tarfile.open(self.tarball, "r|*") as tf:
+            for member in tf:
+                parts = [p for p in member.name.split("/") if p not in ("", ".")]
+                if not parts:
+                    continue
+                if len(parts) == 1 and not member.isdir():
+                    top = None  # a file at the top level: nothing to strip
+                else:
+                    top, parts = parts[0], parts[1:]
+                self.tops.add(top)
+                if not member.isfile() or any(p.startswith(".") for p in parts):
+                    continue
+                rel_path = "/".join(parts)
+                if not wants(rel_path):
+                    continue
+                f = tf.extractfile(member)
+                if f is not None:
+                    yield top, rel_path, f.read()
+
+    @property
+    def single_top(self) -> str | None:
+        """The top-level directory every member shares, if there is one."""
+        if len(self.tops) == 1:
+            return next(iter(self.tops))
+        return None
+
+    def path(self, top: str | None, rel_path: str) -> str:
+        if top is None or self.single_top is not None:
+            return rel_path
+        return f"{top}/{rel_path}"
+
+
+# Per-process scanner for scan_tarball's worker pool
+_worker_scanner: MultiPatternScanner | None = None
+
+
+def _init_scan_worker(patterns: list[ScanPattern]) -> None:
+    global _worker_scanner
+    _worker_scanner = MultiPatternScanner(patterns)
+
+
+def _scan_members(members: list[tuple[str | None, str, bytes]]) -> list[tuple]:
+    return [
+        (top, rel_path, i, line_num, line_text)
+        for top, rel_path, data in members
+        for i, line_num, line_text in _worker_scanner.scan_text(rel_path, data)
+    ]
+
+
+def _first_matching_line(
+    text: str, regex: re.Pattern, literals: list[str] | None
+) -> int | None:
+    """Offset of the first line of text that regex matches, or None.
+
+    Candidate lines come from the earliest occurrence of any required
+    literal (plain substring search, much faster than re for patterns
+    starting with \\b), or else from a whole-text regex search. Each
+    candidate is then confirmed with a search bounded to its line.
+    """
+    pos = 0
+    length = len(text)
+    while pos <= length:
+        if literals:
+            found = [p for p in (text.find(lit, pos) for lit in literals) if p >= 0]
+            if not found:
+                return None
+            candidate = min(found)
+        else:
+            m = regex.search(text, pos)
+            if m is None:
+                return None
+            candidate = m.start()
+        start = text.rfind("\n", 0, candidate) + 1
+        end = text.find("\n", candidate)
+        if end < 0:
+            end = length
+        if regex.search(text, start, end):
+            return start
+        pos = end + 1
+    return None
+
+
+def _required_literals(pattern: str) -> tuple[tuple[str, bytes, bool], ...] | None:
+    """Substrings at least one of which appears in every match of pattern.
+
+    Handles the shapes used in source_checks.yaml / catalog.yaml: literal
+    runs, escapes, character classes, quantifiers and top-level `|`.
+    Returns one (literal, utf-8 literal, whole_word) triple per
+    alternative; whole_word is True when the literal is an identifier
+    bounded on both sides (e.g. `\\bstrdup\\s*\\(`), so it must appear as a
+    complete token. Returns None if any alternative has no literal of two
+    or more characters (or the pattern uses groups).
+    """
+    if re.search(r"(?<!\\)[()]", pattern.replace("\\\\", "")):
+        return None
+    literals = []
+    for alternative in re.split(r"(?<!\\)\|", pattern):
+        # Each run: [text, follows \b, index where it ended, ended by quantifier]
+        runs = [["", False, 0, False]]
+        i = 0
+        while i < len(alternative):
+            c = alternative[i]
+            if c == "\\" and i + 1 < len(alternative):
+                n = alternative[i + 1]
+                if n.isalnum() or n == "_":
+                    runs[-1][2] = i
+                    runs.append(["", n == "b", 0, False])  # \b, \s, \w ... end a run
+                else:
+                    runs[-1][0] += n
+                i += 2
+                continue
+            if c == "[":
+                runs[-1][2] = i
+                j = i + 1
+                if j < len(alternative) and alternative[j] == "^":
+                    j += 1
+                if j < len(alternative) and alternative[j] == "]":
+                    j += 1
+                while j < len(alternative) and alternative[j] != "]":
+                    j += 2 if alternative[j] == "\\" else 1
+                i = j + 1
+                runs.append(["", False, 0, False])
+                continue
+            if c in "*?{+":
+                if c != "+":
+                    # The preceding character may be absent
+                    runs[-1][0] = runs[-1][0][:-1]
+                runs[-1][3] = True
+                if c == "{":
+                    i = alternative.find("}", i)
+                    if i < 0:
+                        return None
+                i += 1
+                if i < len(alternative) and alternative[i] in "?+":
+                    i += 1
+                runs.append(["", False, 0, False])
+                continue
+            if c in ".^$":
+                runs[-1][2] = i
+                runs.append(["", False, 0, False])
+            else:
+                runs[-1][0] += c
+            i += 1
+        runs[-1][2] = len(alternative)
+
+        text, after_boundary, end, by_quantifier = max(runs, key=lambda r: len(r[0]))
+        if len(text) < 2:
+            return None
+        whole_word = (
+            after_boundary
+            and not by_quantifier
+            and re.fullmatch(r"[A-Za-z0-9_]+", text) is not None
+            and _nonword_follows(alternative, end)
+        )
+        literals.append((text, text.encode(), whole_word))
+    return tuple(literals)
+
+
+def _nonword_follows(alternative: str, i: int) -> bool:
+    """True if whatever pattern text starts at i can only match a non-word
+    character, a word boundary or the end of a line."""
+    while i < len(alternative):
+        c = alternative[i]
+        if c == "\\" and i + 1 < len(alternative):
+            n = alternative[i + 1]
+            if n == "b":
+                return True
+            if n in "sW":
+                q = alternative[i + 2:i + 3]
+                if q in ("*", "?"):
+                    # Optional whitespace: look at what follows it
+                    i += 3
+                    if alternative[i:i + 1] == "?":
+                        i += 1
+                    continue
+                return q != "{"
+            return not (n.isalnum() or n == "_")
+        if c == "$":
+            return True
+        if c in "[(.^|*+?{":
+            return False
+        return not (c.isalnum() or c == "_")
+    return False
+
+
+# Maps every byte except ASCII letters, digits and '_' to a space, so
+# bytes.split() yields identifier tokens
+_NON_WORD_BYTES = bytes(
+    c if (chr(c).isascii() and (chr(c).isalnum() or c == ord("_"))) else ord(" ")
+    for c in range(256)
+)
+
+
 class SourceAnalyzer:
     """Scans extracted source for known IRIX-incompatible patterns.
 
     Loads patterns from two sources:
     1. rules/source_checks.yaml — issue-level patterns (need patches/overrides)
     2. compat/catalog.yaml — function-level patterns (need compat injection)
+
+    With a ScanCache, tarball scans reuse cached matches (see scan_cache);
+    with a SourceIndex, patterns missing from the cache are answered from
+    the index when the tarball is indexed (see source_index).
     """
 
     def __init__(
         self,
         source_checks_path: Path | None = None,
         catalog_path: Path | None = None,
+        cache: ScanCache | None = None,
+        index: "SourceIndex | None" = None,
     ):
         project_root = Path(__file__).parent.parent.parent
         if source_checks_path is None:
@@ -103,6 +543,8 @@ class SourceAnalyzer:
 
         self.checks = self._load_checks(source_checks_path)
         self.catalog_patterns = self._load_catalog_patterns(catalog_path)
+        self.cache = cache
+        self.index = index
 
     def _load_checks(self, path: Path) -> list[SourceCheck]:
         """Load checks from source_checks.yaml."""
@@ -167,15 +609,42 @@ class SourceAnalyzer:
             SourceAnalysisResult with all findings.
         """
         result = SourceAnalysisResult()
-        handled_compat = set(handled_compat_functions or [])
-        handled_rules = handled_rules or {}
+        scan_patterns = self.scan_patterns()
+        scanner = MultiPatternScanner(scan_patterns)
+
+        # One pass over the tree evaluates every pattern
+        matches: list[list[tuple[str, int, str]]] = [[] for _ in scan_patterns]
+        for file_path, index, line_num, match_text in scanner.scan_directory(source_dir):
+            matches[index].append((file_path, line_num, match_text))
+        result.files_scanned = scanner.files_scanned
+
+        for index in scanner.unsupported:
+            sp = scan_patterns[index]
+            matches[index] = self._run_rg(source_dir, sp.pattern, sp.glob)
+
+        result.checks_run = len(scan_patterns)
+        result.findings = self._build_findings(matches)
+        self._mark_handled(result.findings, handled_compat_functions, handled_rules)
 
-        # Run source_checks.yaml patterns
-        for check in self.checks:
-            result.checks_run += 1
-            findings = self._run_rg(source_dir, check.pattern, check.glob)
-            for file_path, line_num, match_text in findings:
-                finding = SourceFinding(
+        # Deduplicate: keep one finding per (check_id, file) pair
+        result.findings = self._deduplicate(result.findings)
+
+        return result
+
+    def scan_patterns(self) -> list[ScanPattern]:
+        """All patterns, source_checks.yaml first, then catalog.yaml."""
+        return [ScanPattern(c.pattern, c.glob) for c in self.checks] + [
+            ScanPattern(cp.pattern, cp.glob) for cp in self.catalog_patterns
+        ]
+
+    def _build_findings(
+        self, matches: list[list[tuple[str, int, str]]]
+    ) -> list[SourceFinding]:
+        """Turn per-pattern matches (indexed like scan_patterns) into findings."""
+        findings = []
+        for check, check_matches in zip(self.checks, matches):
+            for file_path, line_num, match_text in check_matches:
+                findings.append(SourceFinding(
                     check_id=check.id,
                     severity=check.severity,
                     message=check.message,
@@ -183,22 +652,10 @@ class SourceAnalyzer:
                     file=file_path,
                     line=line_num,
                     match_text=match_text,
-                )
-                # Check if this finding is handled by existing rules
-                if check.handled_by:
-                    for handler in check.handled_by:
-                        if self._is_handled(handler, handled_compat, handled_rules):
-                            finding.handled = True
-                            finding.handled_by = handler
-                            break
-                result.findings.append(finding)
-
-        # Run catalog.yaml source_patterns
-        for cp in self.catalog_patterns:
-            result.checks_run += 1
-            findings = self._run_rg(source_dir, cp.pattern, cp.glob)
-            for file_path, line_num, match_text in findings:
-                finding = SourceFinding(
+                ))
+        for cp, cp_matches in zip(self.catalog_patterns, matches[len(self.checks):]):
+            for file_path, line_num, match_text in cp_matches:
+                findings.append(SourceFinding(
                     check_id=f"compat:{cp.function_name}",
                     severity="info",
                     message=cp.note,
@@ -206,76 +663,205 @@ class SourceAnalyzer:
                     file=file_path,
                     line=line_num,
                     match_text=match_text,
-                )
+                ))
+        return findings
+
+    def _mark_handled(
+        self,
+        findings: list[SourceFinding],
+        handled_compat_functions: list[str] | None,
+        handled_rules: dict | None,
+    ) -> None:
+        """Set handled/handled_by on findings from the package's rules."""
+        handled_compat = set(handled_compat_functions or [])
+        handled_rules = handled_rules or {}
+        checks = {c.id: c for c in self.checks}
+        for finding in findings:
+            finding.handled = False
+            finding.handled_by = ""
+            if finding.check_id.startswith("compat:"):
                 # Mark as handled if the function is already injected
-                if cp.function_name in handled_compat:
+                func_name = finding.check_id[len("compat:"):]
+                if func_name in handled_compat:
                     finding.handled = True
-                    finding.handled_by = f"compat_functions:{cp.function_name}"
-                result.findings.append(finding)
-
-        # Deduplicate: keep one finding per (check_id, file) pair
-        result.findings = self._deduplicate(result.findings)
-
-        return result
+                    finding.handled_by = f"compat_functions:{func_name}"
+                continue
+            # Check if this finding is handled by existing rules
+            check = checks.get(finding.check_id)
+            for handler in check.handled_by if check else []:
+                if self._is_handled(handler, handled_compat, handled_rules):
+                    finding.handled = True
+                    finding.handled_by = handler
+                    break
 
     def scan_tarball(
         self,
         tarball: Path,
-        workdir: Path,
         handled_compat_functions: list[str] | None = None,
         handled_rules: dict | None = None,
+        jobs: int = 1,
     ) -> SourceAnalysisResult:
-        """Extract a tarball and scan its contents.
+        """Scan a tarball's contents without extracting it.
 
         Args:
             tarball: Path to .tar.gz, .tar.bz2, .tar.xz, etc.
-            workdir: Directory to extract into (created if needed).
             handled_compat_functions: See scan_directory.
             handled_rules: See scan_directory.
+            jobs: Worker processes searching decompressed members.
 
         Returns:
-            SourceAnalysisResult with findings.
+            SourceAnalysisResult with findings (empty if the tarball
+            cannot be read).
         """
-        workdir.mkdir(parents=True, exist_ok=True)
-
-        # Detect compression and extract
-        name = tarball.name.lower()
-        if name.endswith((".tar.gz", ".tgz")):
-            tar_flag = "z"
-        elif name.endswith((".tar.bz2", ".tbz2")):
-            tar_flag = "j"
-        elif name.endswith((".tar.xz", ".txz")):
-            tar_flag = "J"
-        elif name.endswith(".tar"):
-            tar_flag = ""
-        else:
-            # Try generic tar
-            tar_flag = ""
-
-        cmd = ["tar", f"-x{tar_flag}f", str(tarball), "-C", str(workdir)]
-        proc = subprocess.run(cmd, capture_output=True, text=True)
-        if proc.returncode != 0:
-            # Return empty result if extraction fails
-            return SourceAnalysisResult()
-
-        # Find the top-level directory (tarballs usually have one)
-        contents = list(workdir.iterdir())
-        if len(contents) == 1 and contents[0].is_dir():
-            source_dir = contents[0]
-        else:
-            source_dir = workdir
-
-        return self.scan_directory(
-            source_dir,
+        return self.scan_tarballs(
+            [tarball],
             handled_compat_functions=handled_compat_functions,
             handled_rules=handled_rules,
+            jobs=jobs,
         )
 
+    def scan_tarballs(
+        self,
+        tarballs: list[Path],
+        handled_compat_functions: list[str] | None = None,
+        handled_rules: dict | None = None,
+        jobs: int = 1,
+        extra_patterns: list[ScanPattern] | None = None,
+    ) -> SourceAnalysisResult:
+        """Scan every source tarball of a package in one result.
+
+        Findings are deduplicated per tarball, so a file path present in
+        two tarballs is reported for each. Unreadable tarballs are skipped.
+        extra_patterns are evaluated in the same pass (and cached like the
+        checks); their matches are returned in result.extra_matches.
+        """
+        result = SourceAnalysisResult()
+        scan_patterns = self.scan_patterns()
+        extra_patterns = extra_patterns or []
+        result.checks_run = len(scan_patterns)
+        result.extra_matches = [[] for _ in extra_patterns]
+
+        for tarball in tarballs:
+            scanned = self._tarball_matches(tarball, scan_patterns + extra_patterns, jobs)
+            if scanned is None:
+                continue
+            matches, files_scanned = scanned
+            result.files_scanned += files_scanned
+            checks_matches = matches[:len(scan_patterns)]
+            result.findings.extend(self._deduplicate(self._build_findings(checks_matches)))
+            for extra, extra_matches in zip(result.extra_matches, matches[len(scan_patterns):]):
+                extra.extend(extra_matches)
+
+        self._mark_handled(result.findings, handled_compat_functions, handled_rules)
+        return result
+
+    def _tarball_matches(
+        self, tarball: Path, scan_patterns: list[ScanPattern], jobs: int
+    ) -> tuple[list[list[tuple[str, int, str]]], int] | None:
+        """Per-pattern matches and files scanned for one tarball.
+
+        Only patterns missing from the cache entry are scanned. Returns
+        None if the tarball cannot be read.
+        """
+        keys = [pattern_key(sp.pattern, sp.glob) for sp in scan_patterns]
+        cached: dict[str, list] = {}
+        files_scanned = 0
+        digest = None
+        if self.cache is not None or self.index is not None:
+            try:
+                digest = file_digest(tarball)
+            except OSError:
+                return None
+        if self.cache is not None:
+            entry = self.cache.load(digest)
+            if entry:
+                cached = entry["matches"]
+                files_scanned = entry["files_scanned"]
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            # Patterns on indexed file types come from the index when the
+            # tarball is indexed; the rest are streamed from the archive
+            streamed = missing
+            if self.index is not None:
+                covered = [i for i in missing if self.index.covers([scan_patterns[i]])]
+                indexed = self.index.scan_tarball(
+                    digest, [scan_patterns[i] for i in covered]
+                ) if covered else None
+                if indexed is not None:
+                    hits, scanned_count = indexed
+                    for i in covered:
+                        cached[keys[i]] = []
+                    for file_path, j, line_num, match_text in hits:
+                        cached[keys[covered[j]]].append((file_path, line_num, match_text))
+                    files_scanned = max(files_scanned, scanned_count)
+                    streamed = [i for i in missing if i not in covered]
+
+            if streamed:
+                scanned = self._stream_matches(
+                    tarball, [scan_patterns[i] for i in streamed], jobs
+                )
+                if scanned is None:
+                    return None
+                matches, scanned_count = scanned
+                for i, pattern_matches in zip(streamed, matches):
+                    cached[keys[i]] = pattern_matches
+                files_scanned = max(files_scanned, scanned_count)
+
+            if self.cache is not None:
+                self.cache.store(digest, files_scanned, cached)
+
+        return [cached[key] for key in keys], files_scanned
+
+    def _stream_matches(
+        self, tarball: Path, scan_patterns: list[ScanPattern], jobs: int
+    ) -> tuple[list[list[tuple[str, int, str]]], int] | None:
+        """Scan a tarball's stream for scan_patterns. None if unreadable."""
+        scanner = MultiPatternScanner(scan_patterns)
+        matches: list[list[tuple[str, int, str]]] = [[] for _ in scan_patterns]
+        try:
+            hits = scanner.scan_tarball(tarball, jobs=jobs)
+        except (tarfile.TarError, OSError):
+            return None
+        for file_path, index, line_num, match_text in hits:
+            matches[index].append((file_path, line_num, match_text))
+        if scanner.unsupported:
+            self._scan_unsupported(tarball, scan_patterns, scanner.unsupported, matches)
+        return matches, scanner.files_scanned
+
+    def _scan_unsupported(
+        self,
+        tarball: Path,
+        scan_patterns: list[ScanPattern],
+        unsupported: list[int],
+        matches: list[list[tuple[str, int, str]]],
+    ) -> None:
+        """Run the rg fallback patterns, which need the tarball on disk."""
+        with tempfile.TemporaryDirectory(prefix="mogrix-scan-") as tmpdir:
+            workdir = Path(tmpdir)
+            proc = subprocess.run(
+                ["tar", "-xf", str(tarball), "-C", str(workdir)],
+                capture_output=True,
+            )
+            if proc.returncode != 0:
+                return
+            # Find the top-level directory (tarballs usually have one)
+            contents = list(workdir.iterdir())
+            if len(contents) == 1 and contents[0].is_dir():
+                source_dir = contents[0]
+            else:
+                source_dir = workdir
+            for index in unsupported:
+                sp = scan_patterns[index]
+                matches[index] = self._run_rg(source_dir, sp.pattern, sp.glob)
+
     def _run_rg(
         self, search_dir: Path, pattern: str, glob_str: str
     ) -> list[tuple[str, int, str]]:
         """Run ripgrep and return matches as (file, line, text) tuples.
 
+        Only used for patterns Python's re cannot compile.
+
         Args:
             search_dir: Directory to search.
             pattern: Regex pattern.
@@ -303,9 +889,8 @@ class SourceAnalyzer:
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=30,
             )
-        except (subprocess.TimeoutExpired, FileNotFoundError):
+        except FileNotFoundError:
             return []
 
         # rg returns 1 for no matches, 2+ for errors
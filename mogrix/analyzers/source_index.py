@@ -0,0 +1,404 @@
+"""Cross-package trigram index of C/C++ sources.
+
+When a check is added to source_checks.yaml, the question is which of the
+SRPMs in ~/mogrix_inputs/SRPMS it affects. Rather than running `mogrix
+analyze` on each of them, the C/C++ files of every source tarball are
+indexed once in SQLite (FTS5, trigram tokenizer) and patterns are answered
+from the index:
+
+- The required literals of a pattern (see _required_literals) select
+  candidate files through the trigram index; patterns without a usable
+  literal fall back to every indexed file.
+- Candidates are confirmed with MultiPatternScanner, so results follow the
+  same rg-style semantics as a tarball scan.
+
+Tarballs are stored once under their sha256, even when several SRPMs ship
+the same one. `update()` is incremental: only SRPMs that are new or whose
+size/mtime changed are extracted, and tarballs no SRPM references any more
+are dropped. A tarball that cannot be read is recorded as unreadable (so it
+is not retried) and its scans are left to the streamed path.
+
+Used by `mogrix index-sources`, `mogrix search-sources`, and SourceAnalyzer
+(scans of indexed tarballs are answered from the index).
+"""
+
+import fnmatch
+import re
+import sqlite3
+import tarfile
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from mogrix.analyzers.source import (
+    MultiPatternScanner,
+    ScanPattern,
+    TarballReader,
+    _required_literals,
+    find_tarballs,
+)
+from mogrix.blobstore import file_digest
+from mogrix.repometa import extract_srpm_name
+
+# Default index location (next to the other mogrix caches)
+DEFAULT_INDEX_PATH = Path.home() / ".cache" / "mogrix" / "source-index.db"
+
+# Bump when the schema changes; older indexes are rebuilt
+INDEX_VERSION = 2
+
+# Files indexed from each tarball. Patterns whose globs are all in this set
+# can be answered from the index.
+INDEX_GLOBS = ("*.c", "*.h", "*.cc", "*.cpp", "*.cxx", "*.hh", "*.hpp", "*.hxx")
+
+_INDEX_NAME_RE = re.compile("|".join(fnmatch.translate(g) for g in INDEX_GLOBS))
+
+
+@dataclass
+class IndexMatch:
+    """A pattern match found through the index."""
+
+    package: str
+    tarball: str
+    file: str  # Relative path within the tarball's source tree
+    line: int
+    match_text: str
+
+
+class SourceIndex:
+    """SQLite trigram index over the C/C++ sources of many SRPMs."""
+
+    def __init__(self, db_path: Path | None = None, create: bool = True):
+        self.db_path = db_path or DEFAULT_INDEX_PATH
+        if create:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if create:
+            self._create_tables()
+
+    @classmethod
+    def open_existing(cls, db_path: Path | None = None) -> "SourceIndex | None":
+        """Open the index for queries if it has been built, else None.
+
+        The schema is not touched; an index from an older version counts
+        as not built.
+        """
+        path = db_path or DEFAULT_INDEX_PATH
+        if not path.exists():
+            return None
+        index = cls(path, create=False)
+        if index.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            index.close()
+            return None
+        return index
+
+    def close(self):
+        self.conn.close()
+
+    def _create_tables(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            self.conn.executescript(f"""
+                DROP TABLE IF EXISTS srpms;
+                DROP TABLE IF EXISTS tarballs;
+                DROP TABLE IF EXISTS srpm_tarballs;
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS file_text;
+                PRAGMA user_version = {INDEX_VERSION};
+            """)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS srpms (
+                file TEXT PRIMARY KEY,
+                package TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tarballs (
+                id INTEGER PRIMARY KEY,
+                sha256 TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL,
+                files INTEGER  -- NULL: the tarball could not be read
+            );
+            CREATE TABLE IF NOT EXISTS srpm_tarballs (
+                srpm TEXT NOT NULL,
+                tarball_id INTEGER NOT NULL,
+                PRIMARY KEY (srpm, tarball_id)
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                tarball_id INTEGER NOT NULL,
+                path TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_tarball ON files(tarball_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS file_text USING fts5(
+                body, tokenize='trigram case_sensitive 1', detail=none
+            );
+        """)
+
+    # -- Building ----------------------------------------------------------
+
+    def update(self, srpms_dir: Path, progress=None) -> dict[str, int]:
+        """Bring the index in line with the SRPMs in srpms_dir.
+
+        Args:
+            srpms_dir: Directory of .src.rpm files.
+            progress: Optional callback(srpm_path) called before indexing
+                each new or changed SRPM.
+
+        Returns:
+            Counts of "added", "updated", "removed" and "unchanged" SRPMs.
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        current = {p.name: p for p in srpms_dir.glob("*.src.rpm")}
+        known = {
+            file: (size, mtime_ns)
+            for file, size, mtime_ns in self.conn.execute(
+                "SELECT file, size, mtime_ns FROM srpms"
+            )
+        }
+
+        for file in sorted(set(known) - set(current)):
+            with self.conn:
+                self._drop_srpm(file)
+            counts["removed"] += 1
+
+        for file, path in sorted(current.items()):
+            st = path.stat()
+            if known.get(file) == (st.st_size, st.st_mtime_ns):
+                counts["unchanged"] += 1
+                continue
+            if progress:
+                progress(path)
+            self.index_srpm(path)
+            counts["updated" if file in known else "added"] += 1
+
+        with self.conn:
+            self._drop_orphan_tarballs()
+        return counts
+
+    def index_srpm(self, srpm_path: Path) -> None:
+        """(Re)index one SRPM's source tarballs."""
+        from mogrix.parser.srpm import SRPMExtractor
+
+        st = srpm_path.stat()
+        with tempfile.TemporaryDirectory(prefix="mogrix-index-") as tmpdir:
+            extracted = SRPMExtractor(srpm_path).extract(Path(tmpdir))
+            tarballs = find_tarballs(extracted)
+            with self.conn:
+                self._drop_srpm(srpm_path.name)
+                for tarball in tarballs:
+                    tarball_id = self._index_tarball(tarball)
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO srpm_tarballs (srpm, tarball_id) VALUES (?, ?)",
+                        (srpm_path.name, tarball_id),
+                    )
+                self.conn.execute(
+                    "INSERT INTO srpms (file, package, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                    (srpm_path.name, extract_srpm_name(srpm_path.name),
+                     st.st_size, st.st_mtime_ns),
+                )
+
+    def index_tarball(self, tarball: Path) -> int:
+        """Index a tarball outside any SRPM (kept until the next update())."""
+        with self.conn:
+            return self._index_tarball(tarball)
+
+    def _index_tarball(self, tarball: Path) -> int:
+        """Store a tarball's C/C++ files unless its content is already indexed."""
+        digest = file_digest(tarball)
+        row = self.conn.execute(
+            "SELECT id FROM tarballs WHERE sha256 = ?", (digest,)
+        ).fetchone()
+        if row:
+            return row[0]
+
+        cur = self.conn.execute(
+            "INSERT INTO tarballs (sha256, name) VALUES (?, ?)", (digest, tarball.name)
+        )
+        tarball_id = cur.lastrowid
+        reader = TarballReader(tarball)
+        count = 0
+        try:
+            for top, rel_path, data in reader.members(_indexed_name):
+                if b"\0" in data:
+                    continue  # binary, never matched by the scanner either
+                cur = self.conn.execute(
+                    "INSERT INTO files (tarball_id, path) VALUES (?, ?)",
+                    (tarball_id, rel_path if top is None else f"{top}/{rel_path}"),
+                )
+                self.conn.execute(
+                    "INSERT INTO file_text (rowid, body) VALUES (?, ?)",
+                    (cur.lastrowid, data.decode("utf-8", errors="replace")),
+                )
+                count += 1
+        except (OSError, tarfile.TarError):
+            # Unreadable: keep the entry, marked, so it is not retried
+            self._drop_files(tarball_id)
+            count = None
+        else:
+            top = reader.single_top
+            if count and top is not None:
+                # Every member shares one top-level directory: strip it
+                self.conn.execute(
+                    "UPDATE files SET path = substr(path, ?) WHERE tarball_id = ?",
+                    (len(top) + 2, tarball_id),
+                )
+        self.conn.execute("UPDATE tarballs SET files = ? WHERE id = ?", (count, tarball_id))
+        return tarball_id
+
+    def _drop_srpm(self, file: str) -> None:
+        self.conn.execute("DELETE FROM srpm_tarballs WHERE srpm = ?", (file,))
+        self.conn.execute("DELETE FROM srpms WHERE file = ?", (file,))
+
+    def _drop_files(self, tarball_id: int) -> None:
+        self.conn.execute(
+            "DELETE FROM file_text WHERE rowid IN (SELECT id FROM files WHERE tarball_id = ?)",
+            (tarball_id,),
+        )
+        self.conn.execute("DELETE FROM files WHERE tarball_id = ?", (tarball_id,))
+
+    def _drop_orphan_tarballs(self) -> None:
+        orphans = [
+            row[0] for row in self.conn.execute(
+                "SELECT id FROM tarballs"
+                " WHERE id NOT IN (SELECT tarball_id FROM srpm_tarballs)"
+            )
+        ]
+        for tarball_id in orphans:
+            self._drop_files(tarball_id)
+            self.conn.execute("DELETE FROM tarballs WHERE id = ?", (tarball_id,))
+
+    # -- Queries -----------------------------------------------------------
+
+    def stats(self) -> dict[str, int]:
+        """Numbers of indexed SRPMs, tarballs and files."""
+        return {
+            "srpms": self.conn.execute("SELECT COUNT(*) FROM srpms").fetchone()[0],
+            "tarballs": self.conn.execute("SELECT COUNT(*) FROM tarballs").fetchone()[0],
+            "files": self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+        }
+
+    @staticmethod
+    def covers(patterns: list[ScanPattern]) -> bool:
+        """True if every pattern only applies to indexed file types."""
+        for sp in patterns:
+            globs = [g.strip() for g in sp.glob.split(",") if g.strip()]
+            if not globs or any(g not in INDEX_GLOBS for g in globs):
+                return False
+            try:
+                re.compile(sp.pattern)
+            except re.error:
+                return False
+        return True
+
+    def search(self, pattern: str, glob: str = "*.c,*.h") -> list[IndexMatch]:
+        """Every indexed package with a file matching pattern.
+
+        A tarball shipped by several SRPMs is reported for each of them.
+        """
+        sp = ScanPattern(pattern, glob)
+        if not self.covers([sp]):
+            raise ValueError(
+                f"glob {glob!r} is not indexed (indexed: {', '.join(INDEX_GLOBS)})"
+            )
+        packages: dict[int, list[str]] = {}
+        for tarball_id, package in self.conn.execute(
+            "SELECT st.tarball_id, s.package FROM srpm_tarballs st"
+            " JOIN srpms s ON s.file = st.srpm ORDER BY s.package"
+        ):
+            packages.setdefault(tarball_id, []).append(package)
+        names = dict(self.conn.execute("SELECT id, name FROM tarballs"))
+
+        matches = []
+        for tarball_id, path, _, line_num, text in self._scan([sp]):
+            for package in packages.get(tarball_id, []):
+                matches.append(IndexMatch(
+                    package=package,
+                    tarball=names[tarball_id],
+                    file=path,
+                    line=line_num,
+                    match_text=text,
+                ))
+        matches.sort(key=lambda m: (m.package, m.tarball, m.file))
+        return matches
+
+    def scan_tarball(
+        self, digest: str, patterns: list[ScanPattern]
+    ) -> tuple[list[tuple[str, int, int, str]], int] | None:
+        """Answer MultiPatternScanner.scan_tarball from the index.
+
+        Returns (hits, files scanned) like a streamed scan, or None if the
+        tarball is not indexed, could not be read when it was indexed, or a
+        pattern applies to unindexed files.
+        """
+        if not self.covers(patterns):
+            return None
+        row = self.conn.execute(
+            "SELECT id, files FROM tarballs WHERE sha256 = ?", (digest,)
+        ).fetchone()
+        if row is None or row[1] is None:
+            return None
+        scanner = MultiPatternScanner(patterns)
+        files_scanned = sum(
+            1 for (path,) in self.conn.execute(
+                "SELECT path FROM files WHERE tarball_id = ?", (row[0],)
+            )
+            if scanner.wants(path)
+        )
+        hits = [
+            (path, i, line_num, text)
+            for _, path, i, line_num, text in self._scan(patterns, row[0])
+        ]
+        return hits, files_scanned
+
+    def _scan(self, patterns: list[ScanPattern], tarball_id: int | None = None):
+        """Yield (tarball id, path, pattern index, line, text) for indexed files."""
+        scanner = MultiPatternScanner(patterns)
+        candidates: set[int] | None = set()
+        for sp in patterns:
+            ids = self._candidates(sp.pattern)
+            if ids is None:
+                candidates = None
+                break
+            candidates |= ids
+
+        sql = "SELECT id, tarball_id, path FROM files"
+        params: tuple = ()
+        if tarball_id is not None:
+            sql += " WHERE tarball_id = ?"
+            params = (tarball_id,)
+        rows = self.conn.execute(sql + " ORDER BY id", params).fetchall()
+        for file_id, file_tarball, path in rows:
+            if candidates is not None and file_id not in candidates:
+                continue
+            if not scanner.wants(path):
+                continue
+            (body,) = self.conn.execute(
+                "SELECT body FROM file_text WHERE rowid = ?", (file_id,)
+            ).fetchone()
+            for i, line_num, text in scanner.scan_text(path, body.encode()):
+                yield file_tarball, path, i, line_num, text
+
+    def _candidates(self, pattern: str) -> set[int] | None:
+        """Ids of files containing a required literal of pattern.
+
+        None when the pattern has no literal the trigram index can use
+        (an alternative without one of at least three characters).
+        """
+        literals = _required_literals(pattern)
+        if not literals or any(len(literal) < 3 for literal, _, _ in literals):
+            return None
+        ids: set[int] = set()
+        for literal, _, _ in literals:
+            glob = "*" + re.sub(r"([*?\[])", r"[\1]", literal) + "*"
+            ids.update(
+                row[0] for row in self.conn.execute(
+                    "SELECT rowid FROM file_text WHERE body GLOB ?", (glob,)
+                )
+            )
+        return ids
+
+
+def _indexed_name(rel_path: str) -> bool:
+    return _INDEX_NAME_RE.match(rel_path.rsplit("/", 1)[-1]) is not None
@@ -3,6 +3,7 @@
 import shutil
 from pathlib import Path
 
+from mogrix.blobstore import BlobStore, copy_replace
 from mogrix.compat.injector import CompatInjector
 from mogrix.emitter.spec import SpecWriter
 from mogrix.emitter.srpm import SRPMEmitter
@@ -28,6 +29,7 @@ class BatchConverter:
         rules_dir: Path | None = None,
         headers_dir: Path | None = None,
         compat_dir: Path | None = None,
+        blob_store: BlobStore | None = None,
     ):
         """Initialize batch converter.
 
@@ -36,11 +38,14 @@ class BatchConverter:
             rules_dir: Path to rules directory
             headers_dir: Path to headers directory
             compat_dir: Path to compat sources directory
+            blob_store: Content-addressed store that SRPM sources are
+                        hardlinked from (default: ~/.cache/mogrix/blobs)
         """
         self.srpms_dir = srpms_dir
         self.rules_dir = rules_dir or RULES_DIR
         self.headers_dir = headers_dir or HEADERS_DIR
         self.compat_dir = compat_dir or COMPAT_DIR
+        self.blob_store = blob_store or BlobStore()
 
         # Initialize components
         self.parser = SpecParser()
@@ -122,11 +127,15 @@ class BatchConverter:
                     transform.compat_functions
                 )
 
-            # Copy all files from extracted SRPM to output directory
+            # Link sources from extracted SRPM into the output directory via
+            # the blob store; the spec is copied since it is rewritten below
             for src_file in extracted_dir.iterdir():
                 if src_file.is_file():
                     dest_file = pkg_output_dir / src_file.name
-                    shutil.copy2(src_file, dest_file)
+                    if src_file.suffix == ".spec":
+                        copy_replace(src_file, dest_file)
+                    else:
+                        self.blob_store.link_into(src_file, dest_file)
 
             # Copy compat source files if needed
             if transform.compat_functions:
@@ -134,7 +143,7 @@ class BatchConverter:
                 extra_files = self.injector.get_extra_files(transform.compat_functions)
                 for compat_file in compat_files + extra_files:
                     dest_file = pkg_output_dir / compat_file.name
-                    shutil.copy2(compat_file, dest_file)
+                    copy_replace(compat_file, dest_file)
 
             # Copy patch files from mogrix patches directory
             patch_files = []
@@ -144,7 +153,7 @@ class BatchConverter:
                     patch_path = patches_pkg_dir / patch_name
                     if patch_path.exists():
                         dest_file = pkg_output_dir / patch_name
-                        shutil.copy2(patch_path, dest_file)
+                        copy_replace(patch_path, dest_file)
                         patch_files.append(patch_name)
 
             # Copy extra source files
@@ -155,7 +164,7 @@ class BatchConverter:
                     source_path = patches_pkg_dir / source_name
                     if source_path.exists():
                         dest_file = pkg_output_dir / source_name
-                        shutil.copy2(source_path, dest_file)
+                        copy_replace(source_path, dest_file)
                         source_files.append(source_name)
 
             # Generate patch/source entries for spec
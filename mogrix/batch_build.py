@@ -17,7 +17,10 @@ from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 
+from mogrix.analyzers.scan_cache import ScanCache
+from mogrix.analyzers.source_index import SourceIndex
 from mogrix.batch import BatchConverter
+from mogrix.deps.fedora import DEFAULT_CACHE_DIR, FedoraRepo
 from mogrix.deps.resolver import DependencyResolver
 from mogrix.rule_generator import RuleGenerator
 from mogrix.rules.loader import RuleLoader
@@ -118,6 +121,7 @@ class BatchOptions:
     skip_fetch: bool = False
     skip_built: bool = True
     build_timeout: int = 600  # seconds
+    fetch_jobs: int = 4  # concurrent SRPM downloads
     release: str = "40"
     base_url: str | None = None
 
@@ -291,6 +295,8 @@ class BatchBuilder:
         headers_dir: Path,
         inputs_dir: Path,
         outputs_dir: Path,
+        scan_cache: ScanCache | None = None,
+        source_index: SourceIndex | None = None,
     ):
         self.rules_dir = rules_dir
         self.compat_dir = compat_dir
@@ -299,9 +305,14 @@ class BatchBuilder:
         self.outputs_dir = outputs_dir
 
         self.rule_loader = RuleLoader(rules_dir)
-        self.rule_generator = RuleGenerator(rules_dir, compat_dir)
+        self.rule_generator = RuleGenerator(
+            rules_dir, compat_dir, cache=scan_cache, index=source_index
+        )
         self.dep_resolver = DependencyResolver(rules_dir)
 
+        # FedoraRepo per (release, base_url), so listings are fetched once
+        self._fedora_repos: dict[tuple[str, str | None], FedoraRepo] = {}
+
     def resolve_tasks_from_list(
         self, list_path: Path, options: BatchOptions
     ) -> list[BuildTask]:
@@ -446,6 +457,9 @@ class BatchBuilder:
 
         report.start_time = datetime.now().isoformat(timespec="seconds")
 
+        if not options.skip_fetch:
+            self._prefetch_srpms(tasks, options)
+
         total = len(tasks)
         for i, task in enumerate(tasks):
             progress = f"[{i + 1}/{total}]"
@@ -597,32 +611,101 @@ class BatchBuilder:
         report.end_time = datetime.now().isoformat(timespec="seconds")
         return report
 
+    def close(self):
+        """Close the connections kept alive by this batch's Fedora repos."""
+        for repo in self._fedora_repos.values():
+            repo.close()
+
+    def _get_fedora_repo(self, options: BatchOptions) -> FedoraRepo:
+        """Shared FedoraRepo for this batch (keeps package listings in memory)."""
+        key = (options.release, options.base_url)
+        if key not in self._fedora_repos:
+            self._fedora_repos[key] = FedoraRepo(
+                release=options.release,
+                base_url=options.base_url,
+                cache_dir=DEFAULT_CACHE_DIR,
+            )
+        return self._fedora_repos[key]
+
     def _fetch_srpm(self, package: str, options: BatchOptions) -> Path | None:
         """Fetch an SRPM from Fedora archives."""
-        from mogrix.deps.fedora import FedoraRepo
-
         srpms_dir = self.inputs_dir / "SRPMS"
         srpms_dir.mkdir(parents=True, exist_ok=True)
 
         try:
-            repo = FedoraRepo(release=options.release, base_url=options.base_url)
-            matches = repo.search_packages(package)
-
-            # Find exact match
-            exact = [m for m in matches if m.name == package]
-            if exact:
-                selected = exact[0]
-            elif matches:
-                selected = matches[0]  # Take first fuzzy match
-            else:
+            repo = self._get_fedora_repo(options)
+            selected = repo.get_srpm_info(package)
+            if selected is None:
                 return None
 
-            downloaded = repo.download_srpm(selected.url, srpms_dir)
+            downloaded = repo.download_srpm(
+                selected.url, srpms_dir, selected.checksum, selected.checksum_type
+            )
             return downloaded
 
         except Exception:
             return None
 
+    def _prefetch_srpms(self, tasks: list[BuildTask], options: BatchOptions):
+        """Download every missing SRPM up front, options.fetch_jobs at a time.
+
+        Sets srpm_path on tasks whose download succeeded. Failed or
+        unresolvable packages are left alone; the build loop retries them
+        through _fetch_srpm and reports the failure in order.
+        """
+        pending = [
+            t for t in tasks
+            if t.srpm_path is None and not (options.skip_built and t.has_rpms)
+        ]
+        if not pending:
+            return
+
+        srpms_dir = self.inputs_dir / "SRPMS"
+        srpms_dir.mkdir(parents=True, exist_ok=True)
+
+        repo = self._get_fedora_repo(options)
+        selected = []
+        for task in pending:
+            try:
+                info = repo.get_srpm_info(task.package)
+            except Exception:
+                info = None
+            if info is not None:
+                selected.append((task, info))
+        if not selected:
+            return
+
+        console.print(
+            f"  Fetching {len(selected)} SRPMs "
+            f"({options.fetch_jobs} concurrent downloads)..."
+        )
+        packages = {info.url: task.package for task, info in selected}
+        done = 0
+
+        def report(result):
+            nonlocal done
+            done += 1
+            progress = f"[{done}/{len(selected)}]"
+            if result.path is not None:
+                console.print(
+                    f"    {progress} [green]✓[/green] {result.path.name}"
+                )
+            else:
+                console.print(
+                    f"    {progress} [red]✗[/red] {packages[result.url]}: "
+                    f"{result.error}"
+                )
+
+        results = repo.download_srpms(
+            [info for _, info in selected],
+            srpms_dir,
+            jobs=options.fetch_jobs,
+            on_done=report,
+        )
+        for (task, _), result in zip(selected, results):
+            if result.path is not None:
+                task.srpm_path = result.path
+
     def _generate_candidate_rules(
         self, package: str, srpm_path: Path
     ) -> Path | None:
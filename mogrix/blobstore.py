@@ -0,0 +1,151 @@
+"""Content-addressed store for SRPM source files.
+
+The same upstream tarball ends up in several places: the input SRPM, each
+converted package directory in ~/mogrix_outputs/SRPMS/<pkg>/, and
+~/rpmbuild/SOURCES. Rather than copying it each time, sources are stored
+once under their sha256 and hardlinked into place, so convert and emit are
+metadata operations for unchanged sources.
+
+Linked files share an inode with the blob, so they must be replaced
+(unlink + create), never modified in place; place() always does that.
+When a hardlink is impossible (different filesystem) a reflink is tried,
+then a plain copy.
+
+`mogrix gc` removes blobs that are no longer linked from anywhere.
+"""
+
+import errno
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# Default store location (next to the other mogrix caches)
+DEFAULT_STORE_DIR = Path.home() / ".cache" / "mogrix" / "blobs"
+
+# Linux FICLONE ioctl: share extents between two files (btrfs, xfs)
+FICLONE = 0x40049409
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def place(src: Path, dest: Path) -> str:
+    """Make dest a hardlink (else reflink, else copy) of src.
+
+    Any existing dest is unlinked first, so a file that was linked from the
+    store is never overwritten in place. Returns "link", "reflink" or "copy".
+    """
+    if dest.exists():
+        if os.path.samefile(src, dest):
+            return "link"
+        dest.unlink()
+    try:
+        os.link(src, dest)
+        return "link"
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+            raise
+    if _reflink(src, dest):
+        return "reflink"
+    shutil.copy2(src, dest)
+    return "copy"
+
+
+def copy_replace(src: Path, dest: Path) -> None:
+    """Copy src to dest as a new file, never writing through an existing link."""
+    dest.unlink(missing_ok=True)
+    shutil.copy2(src, dest)
+
+
+def _reflink(src: Path, dest: Path) -> bool:
+    try:
+        with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except OSError:
+        dest.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dest)
+    return True
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BlobStore:
+    """sha256-addressed blobs under root/objects/ab/cdef...
+
+    Digests are memoized by (device, inode, size, mtime), so a file that is
+    already a link to a blob is not re-read.
+    """
+
+    def __init__(self, root: Path | None = None):
+        self.root = root or DEFAULT_STORE_DIR
+        self.objects = self.root / "objects"
+        self._digests: dict[tuple[int, int, int, int], str] = {}
+
+    def blob_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest[2:]
+
+    def digest(self, path: Path) -> str:
+        st = path.stat()
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = file_digest(path)
+            self._digests[key] = digest
+        return digest
+
+    def add(self, path: Path) -> Path:
+        """Store path's content and return the blob path.
+
+        The blob is created by hardlinking path when possible, so adding a
+        freshly extracted file costs no data copy.
+        """
+        blob = self.blob_path(self.digest(path))
+        if blob.exists():
+            return blob
+
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=blob.parent, prefix=".tmp-")
+        os.close(fd)
+        tmp = Path(tmp_name)
+        try:
+            place(path, tmp)
+            tmp.replace(blob)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return blob
+
+    def link_into(self, src: Path, dest: Path) -> Path:
+        """Store src and make dest a link to its blob. Returns dest."""
+        place(self.add(src), dest)
+        return dest
+
+    def gc(self, dry_run: bool = False) -> tuple[int, int]:
+        """Remove blobs no longer hardlinked from anywhere.
+
+        A blob whose link count is 1 is referenced only by the store.
+        Reflinked or copied placements are independent files and do not
+        keep a blob alive. Returns (blobs removed, bytes freed).
+        """
+        removed = 0
+        freed = 0
+        if not self.objects.exists():
+            return removed, freed
+        for blob in self.objects.glob("*/*"):
+            st = blob.stat()
+            if blob.name.startswith(".tmp-") or st.st_nlink > 1:
+                continue
+            removed += 1
+            freed += st.st_size
+            if not dry_run:
+                blob.unlink()
+        return removed, freed
@@ -22,6 +22,12 @@ Installation model (like Flatpak exports/bin):
     User setup (once):  PATH=/opt/mogrix-apps/bin:$PATH; export PATH
     Per bundle:         cd /opt/mogrix-apps/nano-7.2-6-irix-bundle && ./install
 
+    Bundles built with shared_libs also use a content-addressed store:
+
+      .mogrix-store/ab/abcdef...        # one copy of each _lib32 file,
+                                        #   hardlinked into every bundle
+      .mogrix-store/.bundle-refs        # "<key>=<bundle>" references
+
 Bundle optimization:
     - _lib32/ pruned to only sonames transitively NEEDED by bundle binaries
     - share/doc/, share/man/, share/info/, share/licenses/ stripped
@@ -34,7 +40,6 @@ import os
 import re
 import shutil
 import subprocess
-import tempfile
 from datetime import datetime
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -42,6 +47,22 @@ from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 
+from mogrix.blobstore import file_digest, place
+from mogrix.bundle_archive import DEFAULT_LEVEL, write_bundle_tar_gz
+from mogrix.bundle_delta import (
+    MANIFEST_NAME,
+    BundleDelta,
+    diff_manifests,
+    load_base_manifest,
+    write_manifest,
+)
+from mogrix.depgraph import DepGraph
+from mogrix.elf_facts import ElfFactsCache
+from mogrix.extract_cache import ExtractCache
+from mogrix.mipself import ELF_MAGIC, read_elf
+from mogrix.rpm_catalog import RpmCatalog, RpmElfDeps, RpmInfo
+from mogrix.rpm_payload import PayloadMember
+
 console = Console()
 
 STAGING_LIB_DIR = Path("/opt/sgug-staging/usr/sgug/lib32")
@@ -155,6 +176,44 @@ echo "  PATH=$dest/bin:\\$PATH; export PATH"
 exit 0
 """
 
+# Delta installer: updates an installed bundle (BASE) in place to BUNDLE.
+# The old trampolines are removed with the old uninstall script, the
+# directory is renamed, deleted and replaced files are removed (the list is
+# a here-document), the payload of added/changed files is unpacked on top
+# and the new install script recreates the trampolines.
+DELTA_EXTRACTING_TEMPLATE = """\
+#!/bin/sh
+# Mogrix delta update: {display_name}
+# Updates an installed {base_name} to {bundle_dir_name}
+# Run:  sh {filename} [install_dir]
+# install_dir is where the bundle is installed (default: current directory)
+BUNDLE="{bundle_dir_name}"
+BASE="{base_name}"
+SKIP={payload_line}
+self="$0"
+case "$self" in /*) ;; *) self="`/bin/pwd`/$self" ;; esac
+dest="$1"
+if [ -z "$dest" ]; then dest=`/bin/pwd`; fi
+case "$dest" in /*) ;; *) dest="`/bin/pwd`/$dest" ;; esac
+if [ ! -f "$dest/$BASE/{manifest_name}" ]; then
+    echo "Error: $BASE is not installed in $dest" >&2; exit 1
+fi
+echo "Updating $BASE to $BUNDLE in $dest ..."
+if [ -x "$dest/$BASE/uninstall" ]; then (cd "$dest/$BASE" && ./uninstall >/dev/null); fi
+if [ "$BASE" != "$BUNDLE" ]; then /bin/mv "$dest/$BASE" "$dest/$BUNDLE" || exit 1; fi
+cd "$dest/$BUNDLE" || exit 1
+while read f; do
+    if [ -d "$f" ] && [ ! -h "$f" ]; then rmdir "$f" 2>/dev/null; else rm -f "$f"; fi
+done <<'MOGRIX_REMOVE'
+{remove_list}
+MOGRIX_REMOVE
+cd "$dest" && /bin/tail +$SKIP "$self" | /usr/sbin/gzcat | /sbin/tar xf -
+if [ $? -ne 0 ]; then echo "Error: extraction failed" >&2; exit 1; fi
+cd "$dest/$BUNDLE"
+./install
+exit 0
+"""
+
 # Install script: creates trampoline scripts in ../bin/ (Bourne shell compatible).
 # Trampolines resolve their own location at runtime via dirname "$0" and use a
 # relative path (../<bundle-name>/<cmd>) to reach the real wrapper. This works
@@ -175,7 +234,7 @@ mkdir -p "$bindir"
 touch "$registry"
 echo "Installing {package} commands into $bindir"
 {trampoline_commands}
-echo ""
+{shared_libs_block}echo ""
 echo "Done. Make sure $bindir is in your PATH:"
 echo "  PATH=$bindir:\\$PATH; export PATH"
 echo ""
@@ -203,11 +262,56 @@ if [ -f "$registry" ]; then
     grep -v "=$bundle\$" "$registry" > "$tmp" 2>/dev/null
     mv "$tmp" "$registry"
 fi
-echo ""
+{shared_libs_block}echo ""
 echo "To remove the bundle directory, run:"
 echo "  rm -rf $dir"
 """
 
+# Shared library store (shared_libs bundles). Each _lib32 file is listed as
+# "<key> <path> <symlink>": key is ab/<sha256> under ../.mogrix-store, path
+# is relative to the bundle and symlink is the relative fallback target if
+# hardlinking fails. Install moves the first copy of each key into the
+# store and hardlinks later ones to it; .bundle-refs records which bundles
+# use which keys, and uninstall deletes keys no other bundle references.
+SHARED_LIBS_INSTALL_BLOCK = """\
+store=`/bin/dirname "$dir"`/.mogrix-store
+refs="$store/.bundle-refs"
+mkdir -p "$store"
+touch "$refs"
+grep -v "=$bundle\\$" "$refs" > "$refs.tmp" 2>/dev/null; mv "$refs.tmp" "$refs"
+shared=0
+while read key path link; do
+    if [ -f "$store/$key" ]; then
+        rm -f "$dir/$path"
+        ln "$store/$key" "$dir/$path" 2>/dev/null || ln -s "$link" "$dir/$path"
+        shared=`expr $shared + 1`
+    elif [ -f "$dir/$path" ]; then
+        mkdir -p `/bin/dirname "$store/$key"`
+        ln "$dir/$path" "$store/$key" 2>/dev/null || cp "$dir/$path" "$store/$key"
+    else
+        echo "  Warning: $path is missing" >&2
+        continue
+    fi
+    echo "$key=$bundle" >> "$refs"
+done <<'MOGRIX_SHARED'
+{shared_list}
+MOGRIX_SHARED
+echo "Shared libraries: $shared of {count} already in $store"
+"""
+
+SHARED_LIBS_UNINSTALL_BLOCK = """\
+store=`/bin/dirname "$dir"`/.mogrix-store
+refs="$store/.bundle-refs"
+if [ -f "$refs" ]; then
+    grep -v "=$bundle\\$" "$refs" > "$refs.tmp" 2>/dev/null; mv "$refs.tmp" "$refs"
+    while read key path link; do
+        grep "^$key=" "$refs" >/dev/null 2>&1 || rm -f "$store/$key"
+    done <<'MOGRIX_SHARED'
+{shared_list}
+MOGRIX_SHARED
+fi
+"""
+
 
 @dataclass
 class BundleManifest:
@@ -225,6 +329,10 @@ class BundleManifest:
     bundle_dir: Path | None = None
     tarball_path: Path | None = None
     run_path: Path | None = None
+    content_digest: str = ""  # sha256 of the packaged content (bundle_archive)
+    delta_path: Path | None = None
+    # (store key, bundle path, size) per _lib32 file when built with shared_libs
+    shared_libs: list[tuple[str, str, int]] = field(default_factory=list)
     suite_name: str | None = None
     suite_packages: list[str] = field(default_factory=list)
 
@@ -236,11 +344,21 @@ class BundleBuilder:
         self,
         rpms_dir: Path,
         irix_sysroot: Path = Path("/opt/irix-sysroot"),
+        elf_facts: ElfFactsCache | None = None,
+        rpm_catalog: RpmCatalog | None = None,
+        extract_cache: ExtractCache | None = None,
     ):
         self.rpms_dir = rpms_dir
         self.irix_sysroot = irix_sysroot
+        # NEEDED/SONAME of unchanged libraries come from the facts cache
+        self.elf_facts = elf_facts or ElfFactsCache()
+        # Name/version/file list of unchanged RPMs come from the catalog
+        self.rpm_catalog = rpm_catalog or RpmCatalog()
+        # Each RPM is extracted once; bundles are hardlinked from the cache
+        self.extract_cache = extract_cache or ExtractCache()
 
         # Maps built during initialization
+        self._rpm_info: dict[Path, RpmInfo] = {}
         self._soname_to_rpm: dict[str, Path] = {}
         self._name_to_rpms: dict[str, list[Path]] = {}
         self._source_to_rpms: dict[str, list[Path]] = {}
@@ -257,26 +375,38 @@ class BundleBuilder:
 
         console.print(f"[dim]Scanning {len(rpm_files)} RPMs...[/dim]")
 
-        for rpm_path in rpm_files:
-            # Get package name
-            name = self._rpm_query(rpm_path, "%{NAME}")
-            if not name:
-                continue
-            self._name_to_rpms.setdefault(name, []).append(rpm_path)
-
-            # Get SOURCERPM for sibling grouping
-            source_rpm = self._rpm_query(rpm_path, "%{SOURCERPM}")
-            if source_rpm:
-                self._source_to_rpms.setdefault(source_rpm, []).append(rpm_path)
-
-            # Get file list for soname mapping
-            filelist = self._rpm_filelist(rpm_path)
-            for filepath in filelist:
-                if "/lib32/" in filepath and ".so" in filepath:
-                    soname = os.path.basename(filepath)
-                    # First RPM wins (prefer non-devel)
-                    if soname not in self._soname_to_rpm:
-                        self._soname_to_rpm[soname] = rpm_path
+        # Only new or changed RPMs are queried; the rest is one SELECT
+        counts = self.rpm_catalog.update(self.rpms_dir)
+        if counts["added"] or counts["updated"]:
+            console.print(
+                f"[dim]  catalogued {counts['added'] + counts['updated']} "
+                f"new/changed RPMs[/dim]"
+            )
+        if counts["failed"] == len(rpm_files):
+            console.print(
+                f"[red]rpm could not read any of the {len(rpm_files)} RPMs in "
+                f"{self.rpms_dir} (is rpm installed?)[/red]"
+            )
+            raise SystemExit(1)
+        if counts["failed"]:
+            console.print(
+                f"[yellow]Warning: rpm could not read {counts['failed']} RPMs; "
+                f"they are left out[/yellow]"
+            )
+
+        for info in self.rpm_catalog.load(self.rpms_dir):
+            rpm_path = info.path
+            self._rpm_info[rpm_path] = info
+            self._name_to_rpms.setdefault(info.name, []).append(rpm_path)
+
+            # SOURCERPM for sibling grouping
+            if info.sourcerpm:
+                self._source_to_rpms.setdefault(info.sourcerpm, []).append(rpm_path)
+
+            for soname in info.sonames:
+                # First RPM wins (prefer non-devel)
+                if soname not in self._soname_to_rpm:
+                    self._soname_to_rpm[soname] = rpm_path
 
         # Scan IRIX sysroot for native sonames
         for sysroot_dir in [
@@ -294,8 +424,21 @@ class BundleBuilder:
             f"{len(self._irix_sonames)} IRIX native libs[/dim]"
         )
 
+    def has_package(self, name: str) -> bool:
+        """Whether an RPM named `name` is in the RPMs directory."""
+        return name in self._name_to_rpms
+
     def _rpm_query(self, rpm_path: Path, fmt: str) -> str:
-        """Query RPM metadata field."""
+        """Query RPM metadata field.
+
+        Formats using only catalogued tags (NAME, VERSION, RELEASE,
+        SOURCERPM) are answered without running rpm.
+        """
+        info = self._rpm_info.get(rpm_path)
+        if info is not None:
+            tags = info.tags()
+            if all(tag in tags for tag in re.findall(r"%\{(\w+)\}", fmt)):
+                return re.sub(r"%\{(\w+)\}", lambda m: tags[m.group(1)], fmt).strip()
         result = subprocess.run(
             ["rpm", "-qp", "--queryformat", fmt, str(rpm_path)],
             capture_output=True,
@@ -305,6 +448,9 @@ class BundleBuilder:
 
     def _rpm_filelist(self, rpm_path: Path) -> list[str]:
         """Get file list from RPM."""
+        info = self._rpm_info.get(rpm_path)
+        if info is not None:
+            return list(info.files)
         result = subprocess.run(
             ["rpm", "-qpl", str(rpm_path)],
             capture_output=True,
@@ -323,23 +469,15 @@ class BundleBuilder:
         except (OSError, PermissionError):
             return False
 
-    def _readelf_needed(self, elf_path: Path) -> list[str]:
-        """Get NEEDED sonames from an ELF binary using readelf."""
-        result = subprocess.run(
-            ["readelf", "-d", str(elf_path)],
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode != 0:
-            return []
+    def _elf_needed(self, elf_path: Path) -> list[str]:
+        """Get NEEDED sonames from an ELF binary."""
+        facts = self.elf_facts.lookup(elf_path)
+        return facts.needed if facts else []
 
-        needed = []
-        for line in result.stdout.splitlines():
-            # Match: 0x00000001 (NEEDED)  Shared library: [libfoo.so]
-            match = re.search(r"\(NEEDED\)\s+Shared library:\s+\[(.+?)\]", line)
-            if match:
-                needed.append(match.group(1))
-        return needed
+    def _elf_soname(self, elf_path: Path) -> str | None:
+        """Get the DT_SONAME of an ELF shared library."""
+        facts = self.elf_facts.lookup(elf_path)
+        return facts.soname if facts else None
 
     def _get_sibling_rpms(self, rpm_path: Path) -> list[Path]:
         """Find RPMs built from the same source, excluding -devel/-debuginfo."""
@@ -361,28 +499,78 @@ class BundleBuilder:
             siblings.append(sibling)
         return siblings
 
-    def _extract_rpm(self, rpm_path: Path, dest_dir: Path) -> bool:
-        """Extract an RPM to a destination directory."""
-        result = subprocess.run(
-            f"cd {dest_dir} && rpm2cpio {rpm_path.absolute()} | cpio -idm 2>/dev/null",
-            shell=True,
-            capture_output=True,
-            text=True,
-        )
-        return result.returncode == 0
+    def _rpm_sha256(self, rpm_path: Path) -> str:
+        info = self._rpm_info.get(rpm_path)
+        if info is None:
+            info = self._rpm_info[rpm_path] = RpmInfo(
+                path=rpm_path, name="", version="", release="", sourcerpm="",
+                sha256=file_digest(rpm_path),
+            )
+        return info.sha256
+
+    def _extract_cached(self, rpm_path: Path) -> Path | None:
+        """Extracted tree of an RPM, extracting it on first use.
 
-    def _scan_elf_needed(self, extract_dir: Path) -> set[str]:
-        """Find all NEEDED sonames from ELF files in an extracted RPM."""
-        needed = set()
-        for root, _dirs, files in os.walk(extract_dir):
+        The payload is decompressed at most once: the NEEDED/SONAME sets
+        of its ELF files are collected from the in-memory members while
+        they are written, and stored in the catalog. None if the payload
+        cannot be read.
+        """
+        sha256 = self._rpm_sha256(rpm_path)
+        tree = self.extract_cache.get(sha256)
+        if tree is not None:
+            if self.rpm_catalog.get_elf_deps(sha256) is None:
+                self.rpm_catalog.put_elf_deps(sha256, self._scan_tree_deps(tree))
+            return tree
+
+        deps = RpmElfDeps()
+
+        def collect(member: PayloadMember) -> None:
+            if not member.is_file or not (member.data or b"").startswith(ELF_MAGIC):
+                return
+            elf = read_elf(Path(member.path), member.data)
+            if elf is None:
+                return
+            with elf:
+                deps.needed.update(elf.needed_sonames())
+                soname = elf.soname()
+                if soname:
+                    deps.sonames.add(soname)
+
+        try:
+            tree = self.extract_cache.extract(rpm_path, sha256, on_member=collect)
+        except RuntimeError:
+            return None
+        self.rpm_catalog.put_elf_deps(sha256, deps)
+        return tree
+
+    def _scan_tree_deps(self, tree: Path) -> RpmElfDeps:
+        """NEEDED/SONAME sets of the ELF files in an extracted tree."""
+        deps = RpmElfDeps()
+        for root, _dirs, files in os.walk(tree):
             for filename in files:
                 filepath = Path(root) / filename
-                if filepath.is_symlink():
+                if filepath.is_symlink() or not self._is_elf(filepath):
                     continue
-                if self._is_elf(filepath):
-                    for soname in self._readelf_needed(filepath):
-                        needed.add(soname)
-        return needed
+                deps.needed.update(self._elf_needed(filepath))
+                soname = self._elf_soname(filepath)
+                if soname:
+                    deps.sonames.add(soname)
+        return deps
+
+    def _rpm_elf_deps(self, rpm_path: Path) -> RpmElfDeps | None:
+        """NEEDED/SONAME sets of the ELF files in an RPM's payload.
+
+        Kept in the catalog under the RPM's sha256; an RPM not seen
+        before is extracted into the extraction cache, which reads its
+        ELF members in memory on the way. None if the payload cannot be
+        read.
+        """
+        sha256 = self._rpm_sha256(rpm_path)
+        deps = self.rpm_catalog.get_elf_deps(sha256)
+        if deps is None and self._extract_cached(rpm_path) is not None:
+            deps = self.rpm_catalog.get_elf_deps(sha256)
+        return deps
 
     def _create_soname_symlinks(self, bundle_dir: Path) -> None:
         """Create missing soname symlinks in _lib32/.
@@ -406,7 +594,7 @@ class BundleBuilder:
             for f in d.iterdir():
                 target = f.resolve() if f.is_symlink() else f
                 if target.exists() and self._is_elf(target):
-                    needed_sonames.update(self._readelf_needed(target))
+                    needed_sonames.update(self._elf_needed(target))
 
         # For each needed soname missing from _lib32/, try to find a
         # versioned file that provides it (via ELF SONAME header).
@@ -423,17 +611,10 @@ class BundleBuilder:
                 if not target.exists() or not self._is_elf(target):
                     continue
                 # Check if its SONAME matches what we need
-                result = subprocess.run(
-                    ["readelf", "-d", str(target)],
-                    capture_output=True, text=True,
-                )
-                for line in result.stdout.splitlines():
-                    if "(SONAME)" in line and f"[{soname}]" in line:
-                        # Create symlink to the candidate
-                        soname_path.symlink_to(candidate.name)
-                        created.append(f"{soname} -> {candidate.name}")
-                        break
-                if soname_path.exists():
+                if self._elf_soname(target) == soname:
+                    # Create symlink to the candidate
+                    soname_path.symlink_to(candidate.name)
+                    created.append(f"{soname} -> {candidate.name}")
                     break
 
         if created:
@@ -463,7 +644,7 @@ class BundleBuilder:
                 continue
             for f in d.iterdir():
                 if self._is_elf(f) or (f.is_symlink() and self._is_elf(f.resolve())):
-                    needed.update(self._readelf_needed(f))
+                    needed.update(self._elf_needed(f))
 
         # Also scan libexec/ recursively — packages like WebKitGTK put
         # their main binaries there (MiniBrowser, WebKitWebProcess, etc.)
@@ -471,33 +652,19 @@ class BundleBuilder:
         if libexec_dir.is_dir():
             for f in libexec_dir.rglob("*"):
                 if f.is_file() and (self._is_elf(f) or (f.is_symlink() and self._is_elf(f.resolve()))):
-                    needed.update(self._readelf_needed(f))
-
-        # Also check libs themselves — they may depend on other libs
-        # (transitive closure).  Walk symlink chains step-by-step so
-        # intermediate links (e.g. libz.so → libz.so.1 → libz.so.1.3.0.zlib-ng)
-        # are all added to the kept set.
-        checked = set()
-        queue = list(needed)
-        while queue:
-            soname = queue.pop()
-            if soname in checked:
-                continue
-            checked.add(soname)
-            lib_file = lib_dir / soname
-            # Walk symlink chain one hop at a time, adding each name
-            while lib_file.is_symlink():
-                link_target = os.readlink(str(lib_file))
-                checked.add(link_target)
-                lib_file = lib_dir / link_target
-            # Now lib_file is the real file — scan its NEEDEDs
-            if lib_file.exists() and self._is_elf(lib_file):
-                checked.add(lib_file.name)
-                for dep in self._readelf_needed(lib_file):
-                    if dep not in checked:
-                        queue.append(dep)
-
-        needed = checked
+                    needed.update(self._elf_needed(f))
+
+        # Also keep what those libs depend on (transitive closure). A
+        # symlink is an edge to its target, so intermediate links (e.g.
+        # libz.so → libz.so.1 → libz.so.1.3.0.zlib-ng) are all kept; a real
+        # library's edges are its NEEDED entries.
+        edges = {}
+        for f in lib_dir.iterdir():
+            if f.is_symlink():
+                edges[f.name] = [os.readlink(str(f))]
+            elif self._is_elf(f):
+                edges[f.name] = self._elf_needed(f)
+        needed = DepGraph(edges).reachable_from(needed)
 
         # Remove .so files not in the needed set
         removed = []
@@ -606,7 +773,7 @@ class BundleBuilder:
                 pos += entry_size
 
             if modified:
-                f.write_bytes(data)
+                _write_replacing(f, bytes(data))
                 stripped_count += 1
 
         if stripped_count:
@@ -686,7 +853,7 @@ class BundleBuilder:
                 '<!-- Font directory list -->\n\n\t'
                 '<dir prefix="relative">../../share/fonts</dir>',
             )
-            fonts_conf.write_text(conf_text)
+            _write_replacing(fonts_conf, conf_text.encode())
 
         # Add cachedir relative to bundle (so fc-cache doesn't need /usr/sgug)
         if "../../var/cache/fontconfig" not in conf_text:
@@ -696,7 +863,7 @@ class BundleBuilder:
                 '<!-- Font cache directory list -->\n\n\t'
                 '<cachedir prefix="relative">../../var/cache/fontconfig</cachedir>',
             )
-            fonts_conf.write_text(conf_text)
+            _write_replacing(fonts_conf, conf_text.encode())
 
         # Create conf.d/50-monospace.conf mapping 'monospace' to bundled font.
         # Detect font family name from filename pattern.
@@ -792,55 +959,50 @@ class BundleBuilder:
         visited_rpms: set[Path] = set()
         all_needed_sonames: set[str] = set()
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-
-            while queue:
-                rpm_path = queue.pop(0)
-                if rpm_path in visited_rpms:
-                    continue
-                visited_rpms.add(rpm_path)
+        while queue:
+            rpm_path = queue.pop(0)
+            if rpm_path in visited_rpms:
+                continue
+            visited_rpms.add(rpm_path)
 
-                rpm_name = self._rpm_query(rpm_path, "%{NAME}")
-                console.print(f"  [dim]Scanning:[/dim] {rpm_name} ({rpm_path.name})")
+            rpm_name = self._rpm_query(rpm_path, "%{NAME}")
+            console.print(f"  [dim]Scanning:[/dim] {rpm_name} ({rpm_path.name})")
 
-                # Extract and scan
-                extract_dir = tmppath / rpm_path.stem
-                extract_dir.mkdir(parents=True, exist_ok=True)
-                if not self._extract_rpm(rpm_path, extract_dir):
-                    console.print(
-                        f"  [yellow]Warning: failed to extract {rpm_path.name}[/yellow]"
-                    )
-                    continue
+            deps = self._rpm_elf_deps(rpm_path)
+            if deps is None:
+                console.print(
+                    f"  [yellow]Warning: failed to read {rpm_path.name}[/yellow]"
+                )
+                continue
 
-                needed = self._scan_elf_needed(extract_dir)
-                all_needed_sonames.update(needed)
+            needed = deps.needed
+            all_needed_sonames.update(needed)
 
-                # Resolve each needed soname
-                for soname in needed:
-                    if soname in manifest.irix_sonames:
-                        continue
-                    # Mogrix-built RPMs take priority over IRIX sysroot.
-                    # IRIX may have ancient ABI-incompatible versions of
-                    # libraries we've rebuilt (e.g. libz.so / zlib-ng).
-                    if soname in self._soname_to_rpm:
-                        dep_rpm = self._soname_to_rpm[soname]
-                        if dep_rpm not in visited_rpms:
-                            # Add this RPM and its siblings
-                            for sibling in self._get_sibling_rpms(dep_rpm):
-                                if sibling not in visited_rpms:
-                                    queue.append(sibling)
-                        continue
-                    if soname in self._irix_sonames:
-                        manifest.irix_sonames.add(soname)
+            # Resolve each needed soname
+            for soname in needed:
+                if soname in manifest.irix_sonames:
+                    continue
+                # Mogrix-built RPMs take priority over IRIX sysroot.
+                # IRIX may have ancient ABI-incompatible versions of
+                # libraries we've rebuilt (e.g. libz.so / zlib-ng).
+                if soname in self._soname_to_rpm:
+                    dep_rpm = self._soname_to_rpm[soname]
+                    if dep_rpm not in visited_rpms:
+                        # Add this RPM and its siblings
+                        for sibling in self._get_sibling_rpms(dep_rpm):
+                            if sibling not in visited_rpms:
+                                queue.append(sibling)
+                    continue
+                if soname in self._irix_sonames:
+                    manifest.irix_sonames.add(soname)
+                    continue
+                # Staging fallback
+                if STAGING_LIB_DIR.is_dir():
+                    staging_matches = list(STAGING_LIB_DIR.glob(soname))
+                    if staging_matches:
+                        manifest.staging_sonames.add(soname)
                         continue
-                    # Staging fallback
-                    if STAGING_LIB_DIR.is_dir():
-                        staging_matches = list(STAGING_LIB_DIR.glob(soname))
-                        if staging_matches:
-                            manifest.staging_sonames.add(soname)
-                            continue
-                    manifest.unresolved_sonames.add(soname)
+                manifest.unresolved_sonames.add(soname)
 
         manifest.included_rpms = sorted(visited_rpms)
         manifest.target_rpms = target_rpm_set & visited_rpms
@@ -854,15 +1016,33 @@ class BundleBuilder:
         output_format: str = "run",
         suite_name: str | None = None,
         trampoline_exclude: set[str] | None = None,
+        compress_level: int = DEFAULT_LEVEL,
+        compress_jobs: int | None = None,
+        delta_from: Path | None = None,
+        shared_libs: bool = False,
     ) -> BundleManifest:
         """Create a self-contained app bundle.
 
         output_format: "run" (self-extracting, default), "tarball" (.tar.gz),
                        or "directory" (no packaging).
 
+        compress_level/compress_jobs: gzip level and compression threads
+        (default: all CPUs) for the packaged payload.
+
+        delta_from: an earlier build (.run, bundle directory or its file
+        manifest). A delta .run that updates that install to this build
+        is written next to the full one.
+
+        shared_libs: _lib32 files go into a content-addressed store next to
+        the installed bundles and are hardlinked from there, so bundles
+        installed side by side keep one copy of each identical library.
+
         If suite_name is provided, creates a suite bundle combining multiple
         packages under a single name (e.g., "mogrix-smallweb").
         """
+        # Read the base first: cleaning up old bundles may remove it
+        base = load_base_manifest(delta_from) if delta_from else None
+
         if suite_name:
             all_pkgs = [target_package] + list(extra_packages or [])
             console.print(
@@ -902,19 +1082,17 @@ class BundleBuilder:
             )
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Clean up old bundles for this package (letter-suffix or date-serial)
+        # Clean up old bundles for this package (date-serial or unsuffixed).
+        # Match the exact prefix: bundle farm workers share output_dir, and
+        # foo-1.2 must not touch foo-1.2.1's bundle.
         bundle_prefix = f"{base_name}-irix-bundle"
         for existing in sorted(output_dir.iterdir()):
             name = existing.name
-            if existing.is_dir() and name.startswith(base_name) and (
-                name.endswith("-irix-bundle")
-                or "-irix-bundle." in name
-            ):
+            if name != bundle_prefix and not name.startswith(bundle_prefix + "."):
+                continue
+            if existing.is_dir():
                 shutil.rmtree(existing)
-            elif existing.is_file() and name.startswith(base_name) and (
-                name.endswith("-irix-bundle.tar.gz")
-                or "-irix-bundle." in name and name.endswith(".tar.gz")
-            ):
+            elif existing.is_file() and name.endswith(".tar.gz"):
                 existing.unlink()
 
         # Date-serial suffix: MMDDYYHHmm
@@ -926,31 +1104,28 @@ class BundleBuilder:
 
         console.print(f"\n[bold]Creating bundle: {bundle_name}[/bold]\n")
 
-        # Extract all RPMs into a temp dir, then reorganize into bundle layout
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir) / "extract"
-            tmppath.mkdir()
-
-            for rpm_path in manifest.included_rpms:
-                rpm_name = self._rpm_query(rpm_path, "%{NAME}")
-                console.print(f"  [dim]Extracting:[/dim] {rpm_name}")
-                self._extract_rpm(rpm_path, tmppath)
+        # Link each RPM's cached tree into the bundle layout. RPMs are
+        # extracted (at most once) while resolving dependencies.
+        for rpm_path in manifest.included_rpms:
+            rpm_name = self._rpm_query(rpm_path, "%{NAME}")
+            console.print(f"  [dim]Linking:[/dim] {rpm_name}")
+            tree = self._extract_cached(rpm_path)
+            if tree is None:
+                console.print(
+                    f"  [yellow]Warning: failed to extract {rpm_path.name}[/yellow]"
+                )
+                continue
 
-            # Move usr/sgug/* to bundle root with internal prefixes
-            sgug_dir = tmppath / "usr" / "sgug"
+            # Map usr/sgug/* to bundle root with internal prefixes
+            sgug_dir = tree / "usr" / "sgug"
             if sgug_dir.is_dir():
-                for item in sgug_dir.iterdir():
+                for item in sorted(sgug_dir.iterdir()):
                     # Rename bin/ -> _bin/, sbin/ -> _sbin/, lib32/ -> _lib32/
                     if item.name in ("bin", "sbin", "lib32"):
                         dest_name = f"_{item.name}"
                     else:
                         dest_name = item.name
-                    dest = bundle_dir / dest_name
-                    if dest.exists():
-                        if item.is_dir() and dest.is_dir():
-                            _merge_dirs(item, dest)
-                    else:
-                        shutil.move(str(item), str(dest))
+                    _link_tree(item, bundle_dir / dest_name)
 
         # Copy staging fallback sonames (symlink to avoid duplicating large files)
         if manifest.staging_sonames:
@@ -1228,9 +1403,13 @@ class BundleBuilder:
             console.print(f"[dim]  Trampoline exclusions: {', '.join(skipped)}[/dim]")
 
         # Generate install/uninstall scripts (trampolines only for target binaries)
+        if shared_libs:
+            manifest.shared_libs = self._collect_shared_libs(bundle_dir)
+
         install_label = manifest.suite_name or manifest.target_package
         self._generate_install_scripts(
-            install_label, bundle_name, trampoline_cmds, bundle_dir
+            install_label, bundle_name, trampoline_cmds, bundle_dir,
+            manifest.shared_libs,
         )
 
         # Generate README
@@ -1263,41 +1442,47 @@ class BundleBuilder:
                 # Add read for all; add execute for all if owner has execute
                 p.chmod(mode | 0o444 | (0o111 if mode & 0o100 else 0))
 
+        # File manifest (path, size, sha256) for delta updates
+        files = write_manifest(bundle_dir)
+
         # Package the bundle
-        if output_format in ("run", "tarball"):
+        display = (
+            manifest.suite_name
+            or f"{manifest.target_package} {manifest.target_version}"
+        )
+        if output_format == "run":
+            run_name = f"{bundle_name}.run"
+            run_path = output_dir / run_name
+            console.print(f"\n[dim]Creating installer: {run_name}[/dim]")
+            manifest.content_digest = self._create_self_extracting(
+                run_path, bundle_dir, bundle_name, display,
+                compress_level, compress_jobs,
+            )
+            manifest.run_path = run_path
+        elif output_format == "tarball":
             tarball_name = f"{bundle_name}.tar.gz"
             tarball_path = output_dir / tarball_name
             console.print(f"\n[dim]Creating tarball: {tarball_name}[/dim]")
-            subprocess.run(
-                [
-                    "tar",
-                    "--format=ustar",
-                    "--owner=0",
-                    "--group=0",
-                    "-czf",
-                    str(tarball_path),
-                    "-C",
-                    str(output_dir),
-                    bundle_name,
-                ],
-                check=True,
-            )
-
-            if output_format == "run":
-                display = (
-                    manifest.suite_name
-                    or f"{manifest.target_package} {manifest.target_version}"
+            with open(tarball_path, "wb") as f:
+                manifest.content_digest = write_bundle_tar_gz(
+                    bundle_dir, bundle_name, f, compress_level, compress_jobs
                 )
-                run_name = f"{bundle_name}.run"
-                run_path = output_dir / run_name
-                console.print(f"[dim]Creating installer: {run_name}[/dim]")
-                self._create_self_extracting(
-                    run_path, tarball_path, bundle_name, display
-                )
-                tarball_path.unlink()  # Remove intermediate tarball
-                manifest.run_path = run_path
-            else:
-                manifest.tarball_path = tarball_path
+            manifest.tarball_path = tarball_path
+
+        if base is not None:
+            base_name, base_files = base
+            delta = diff_manifests(base_files, files)
+            delta_name = f"{bundle_name}.delta.run"
+            delta_path = output_dir / delta_name
+            console.print(
+                f"[dim]Creating delta from {base_name}: {delta_name} "
+                f"({len(delta.changed)} changed, {len(delta.deleted)} deleted)[/dim]"
+            )
+            self._create_delta(
+                delta_path, bundle_dir, bundle_name, base_name, delta, display,
+                compress_level, compress_jobs,
+            )
+            manifest.delta_path = delta_path
 
         # Print summary
         self._print_summary(manifest)
@@ -1310,12 +1495,17 @@ class BundleBuilder:
         bundle_name: str,
         commands: list[str],
         bundle_dir: Path,
+        shared_libs: list[tuple[str, str, int]] | None = None,
     ) -> None:
         """Generate install and uninstall scripts.
 
         Install creates 2-line trampoline scripts in ../bin/ that exec the
         real wrappers. This avoids the symlink dirname problem (dirname of a
         symlink resolves to the symlink's directory, not the target's).
+
+        With shared_libs (see _collect_shared_libs), install also links
+        those files through the shared store and uninstall drops the
+        bundle's references to it.
         """
         # Each trampoline resolves its own location at runtime and uses a
         # relative path (../<bundle>/<cmd>) to reach the wrapper. This avoids
@@ -1374,11 +1564,27 @@ class BundleBuilder:
             )
             unlink_lines.append("fi")
 
+        shared_install = shared_uninstall = ""
+        if shared_libs:
+            # The fallback symlink climbs from the file's directory to the
+            # directory holding the bundle and the store
+            shared_list = "\n".join(
+                f"{key} {path} {'../' * len(Path(path).parts)}.mogrix-store/{key}"
+                for key, path, _size in shared_libs
+            )
+            shared_install = SHARED_LIBS_INSTALL_BLOCK.format(
+                shared_list=shared_list, count=len(shared_libs)
+            )
+            shared_uninstall = SHARED_LIBS_UNINSTALL_BLOCK.format(
+                shared_list=shared_list
+            )
+
         install_path = bundle_dir / "install"
         install_path.write_text(
             INSTALL_TEMPLATE.format(
                 package=package,
                 trampoline_commands="\n".join(trampoline_lines),
+                shared_libs_block=shared_install,
             )
         )
         install_path.chmod(0o755)
@@ -1388,10 +1594,39 @@ class BundleBuilder:
             UNINSTALL_TEMPLATE.format(
                 package=package,
                 unlink_commands="\n".join(unlink_lines),
+                shared_libs_block=shared_uninstall,
             )
         )
         uninstall_path.chmod(0o755)
 
+    def _collect_shared_libs(self, bundle_dir: Path) -> list[tuple[str, str, int]]:
+        """(store key, bundle path, size) for each regular file in _lib32/.
+
+        The key is ab/<sha256> of the content. Symlinks stay in the bundle;
+        they point at files that are shared.
+        """
+        shared = []
+        lib_dir = bundle_dir / "_lib32"
+        if not lib_dir.is_dir():
+            return shared
+        for root, dirs, files in os.walk(lib_dir):
+            dirs.sort()
+            for name in sorted(files):
+                p = Path(root) / name
+                rel = p.relative_to(bundle_dir).as_posix()
+                # The install script reads the list with `read`
+                if p.is_symlink() or " " in rel:
+                    continue
+                sha = file_digest(p)
+                shared.append((f"{sha[:2]}/{sha}", rel, p.stat().st_size))
+        if shared:
+            unique = {key: size for key, _path, size in shared}
+            console.print(
+                f"  [dim]Shared store: {len(shared)} libs in _lib32/ "
+                f"({sum(unique.values()) / 1024 / 1024:.1f} MB)[/dim]"
+            )
+        return shared
+
     def _generate_readme(self, manifest: BundleManifest, bundle_dir: Path) -> None:
         """Generate README with bundle contents and instructions."""
         bundle_name = bundle_dir.name
@@ -1500,14 +1735,18 @@ class BundleBuilder:
     def _create_self_extracting(
         self,
         run_path: Path,
-        tarball_path: Path,
+        bundle_dir: Path,
         bundle_name: str,
         display_name: str,
-    ) -> None:
-        """Create a self-extracting .run file from a tar.gz payload.
-
-        Concatenates a Bourne shell header with the tar.gz binary data.
-        The header uses tail +N to skip itself, piping through gzcat | tar.
+        compress_level: int = DEFAULT_LEVEL,
+        compress_jobs: int | None = None,
+    ) -> str:
+        """Create a self-extracting .run file from a bundle directory.
+
+        Writes a Bourne shell header, then streams the bundle as tar.gz
+        directly after it (see bundle_archive). The header uses tail +N
+        to skip itself, piping through gzcat | tar. Returns the content
+        digest of the payload.
         """
         # Format template with a placeholder for SKIP line number
         script = SELF_EXTRACTING_TEMPLATE.format(
@@ -1521,18 +1760,52 @@ class BundleBuilder:
         # tail +N starts output at line N, so payload starts at line_count + 1
         script = script.replace("__PLACEHOLDER__", str(line_count + 1))
 
-        # Write script header (text) then append binary payload
+        # Write script header (text) then the compressed payload
         with open(run_path, "wb") as f:
             f.write(script.encode("ascii"))
-            with open(tarball_path, "rb") as payload:
-                while True:
-                    chunk = payload.read(65536)
-                    if not chunk:
-                        break
-                    f.write(chunk)
+            digest = write_bundle_tar_gz(
+                bundle_dir, bundle_name, f, compress_level, compress_jobs
+            )
 
         # Make executable
         run_path.chmod(0o755)
+        return digest
+
+    def _create_delta(
+        self,
+        delta_path: Path,
+        bundle_dir: Path,
+        bundle_name: str,
+        base_name: str,
+        delta: BundleDelta,
+        display_name: str,
+        compress_level: int = DEFAULT_LEVEL,
+        compress_jobs: int | None = None,
+    ) -> None:
+        """Create a delta .run that updates an installed base_name bundle.
+
+        The payload holds only added and changed entries (plus the new
+        file manifest); removals are listed in the shell header.
+        """
+        script = DELTA_EXTRACTING_TEMPLATE.format(
+            display_name=display_name,
+            base_name=base_name,
+            filename=delta_path.name,
+            bundle_dir_name=bundle_name,
+            manifest_name=MANIFEST_NAME,
+            remove_list="\n".join(delta.remove),
+            payload_line="__PLACEHOLDER__",
+        )
+        line_count = script.count("\n")
+        script = script.replace("__PLACEHOLDER__", str(line_count + 1))
+
+        with open(delta_path, "wb") as f:
+            f.write(script.encode())
+            write_bundle_tar_gz(
+                bundle_dir, bundle_name, f, compress_level, compress_jobs,
+                include=set(delta.changed) | {MANIFEST_NAME},
+            )
+        delta_path.chmod(0o755)
 
     def _print_summary(self, manifest: BundleManifest) -> None:
         """Print a Rich summary table."""
@@ -1599,6 +1872,25 @@ class BundleBuilder:
                 f"{manifest.tarball_path.name} ({tarball_size / 1024 / 1024:.1f} MB)",
             )
 
+        if manifest.delta_path and manifest.delta_path.exists():
+            delta_size = manifest.delta_path.stat().st_size
+            table.add_row(
+                "Delta",
+                f"{manifest.delta_path.name} ({delta_size / 1024 / 1024:.1f} MB)",
+            )
+
+        if manifest.shared_libs:
+            total = sum(size for _key, _path, size in manifest.shared_libs)
+            unique = sum({key: size for key, _path, size in manifest.shared_libs}.values())
+            table.add_row(
+                "Shared libs",
+                f"{len(manifest.shared_libs)} files, {unique / 1024 / 1024:.1f} MB in store"
+                + (f" ({(total - unique) / 1024 / 1024:.1f} MB deduplicated)" if total > unique else ""),
+            )
+
+        if manifest.content_digest:
+            table.add_row("Content digest", manifest.content_digest[:16])
+
         console.print(table)
 
         if manifest.unresolved_sonames:
@@ -1626,15 +1918,38 @@ class BundleBuilder:
             console.print("\n[bold green]Bundle is fully self-contained.[/bold green]")
 
 
-def _merge_dirs(src: Path, dest: Path) -> None:
-    """Recursively merge src directory into dest."""
-    for item in src.iterdir():
-        dest_item = dest / item.name
-        if item.is_dir():
-            if dest_item.is_dir():
-                _merge_dirs(item, dest_item)
-            elif not dest_item.exists():
-                shutil.move(str(item), str(dest_item))
-        else:
-            if not dest_item.exists():
-                shutil.move(str(item), str(dest_item))
+def _link_tree(src: Path, dest: Path) -> None:
+    """Recreate src at dest with files hardlinked (see blobstore.place).
+
+    Directories are merged; a file or symlink replaces one already at
+    dest, so the last RPM linked wins, as when RPMs were extracted on top
+    of each other.
+    """
+    if src.is_dir() and not src.is_symlink():
+        if not os.path.lexists(dest):
+            dest.mkdir()
+            shutil.copymode(src, dest)
+        if dest.is_dir() and not dest.is_symlink():
+            for item in src.iterdir():
+                _link_tree(item, dest / item.name)
+        return
+    if os.path.lexists(dest):
+        if dest.is_dir() and not dest.is_symlink():
+            return
+        dest.unlink()
+    if src.is_symlink():
+        os.symlink(os.readlink(src), dest)
+    else:
+        place(src, dest)
+
+
+def _write_replacing(path: Path, data: bytes) -> None:
+    """Write data to path as a new file, keeping its mode.
+
+    Bundle files may be hardlinks into the extraction cache, so they are
+    replaced rather than written through.
+    """
+    mode = path.stat().st_mode
+    path.unlink()
+    path.write_bytes(data)
+    path.chmod(mode)
@@ -0,0 +1,174 @@
+"""In-process bundle packaging: deterministic ustar + parallel gzip.
+
+Bundles used to be packed with `tar -czf` (one core, default level) and
+the tarball then copied into the .run installer after its shell header.
+Here the tar stream is generated in-process and compressed straight into
+its destination (the .run file, after the header, or a .tar.gz):
+
+- The input is cut into fixed-size blocks and each block becomes an
+  independent gzip member, compressed on a thread pool (zlib releases the
+  GIL). Concatenated members form a valid gzip stream; IRIX gzcat and GNU
+  tar read them like any other. Block boundaries do not depend on the
+  number of threads, so the output does not either.
+- The archive keeps what the IRIX installer relies on: ustar format,
+  owner and group 0. Entries are sorted and every mtime is fixed
+  (SOURCE_DATE_EPOCH if set, else 0), and gzip headers carry no
+  timestamp, so packing the same tree twice gives identical bytes.
+
+write_bundle_tar also returns a digest of the archived content (paths,
+types, modes, link targets and file data) that ignores the bundle's
+top-level directory name, which carries a date serial, so unchanged
+bundles can be recognized across builds.
+"""
+
+import collections
+import gzip
+import hashlib
+import os
+import stat
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO
+
+DEFAULT_LEVEL = 6
+BLOCK_SIZE = 1024 * 1024
+
+
+def archive_mtime() -> int:
+    """Timestamp stored for every archive entry."""
+    return int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+
+
+class ParallelGzipWriter:
+    """Write-only file object producing concatenated gzip members.
+
+    Data is compressed in BLOCK_SIZE blocks on `jobs` threads (default:
+    all CPUs) and written to `fileobj` in order. close() flushes but does
+    not close `fileobj`.
+    """
+
+    def __init__(self, fileobj: BinaryIO, level: int = DEFAULT_LEVEL, jobs: int | None = None):
+        if not 1 <= level <= 9:
+            raise ValueError(f"gzip level must be 1-9, not {level}")
+        self.fileobj = fileobj
+        self.level = level
+        self.jobs = jobs or os.cpu_count() or 1
+        self._buffer = bytearray()
+        self._pending: collections.deque = collections.deque()
+        self._pool = ThreadPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        self._members = 0
+        self.closed = False
+
+    def _compress(self, block: bytes) -> bytes:
+        return gzip.compress(block, compresslevel=self.level, mtime=0)
+
+    def _submit(self, block: bytes) -> None:
+        self._members += 1
+        if self._pool is None:
+            self.fileobj.write(self._compress(block))
+            return
+        self._pending.append(self._pool.submit(self._compress, block))
+        # Bound memory: at most two blocks per thread in flight
+        while len(self._pending) > 2 * self.jobs:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:BLOCK_SIZE]))
+            del self._buffer[:BLOCK_SIZE]
+        return len(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._buffer or not self._members:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _iter_tree(root: Path):
+    """root and everything under it in sorted order (symlinks not followed)."""
+    yield root
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(dirnames + filenames):
+            yield Path(dirpath) / name
+
+
+def write_bundle_tar(
+    bundle_dir: Path,
+    arcname: str,
+    fileobj: BinaryIO,
+    include: set[str] | None = None,
+) -> str:
+    """Stream bundle_dir into fileobj as a ustar archive under arcname.
+
+    With `include`, only those paths (relative to bundle_dir) and the top
+    directory are archived, as for a delta bundle. Returns the sha256
+    content digest (see the module docstring).
+    """
+    mtime = archive_mtime()
+    digest = hashlib.sha256()
+    with tarfile.open(fileobj=fileobj, mode="w|", format=tarfile.USTAR_FORMAT) as tar:
+        for path in _iter_tree(bundle_dir):
+            rel = path.relative_to(bundle_dir).as_posix()
+            if include is not None and rel != "." and rel not in include:
+                continue
+            name = arcname if rel == "." else f"{arcname}/{rel}"
+            info = tar.gettarinfo(str(path), arcname=name)
+            info.uid = info.gid = 0
+            info.uname = info.gname = "root"
+            info.mtime = mtime
+            digest.update(
+                f"{rel}\0{info.type.decode()}\0{stat.S_IMODE(info.mode):o}\0"
+                f"{info.linkname}\0".encode()
+            )
+            if info.isreg():
+                with open(path, "rb") as f:
+                    data_digest = hashlib.sha256()
+                    tar.addfile(info, _HashingReader(f, data_digest))
+                digest.update(data_digest.digest())
+            else:
+                tar.addfile(info)
+    return digest.hexdigest()
+
+
+class _HashingReader:
+    """File wrapper that hashes what tarfile reads through it."""
+
+    def __init__(self, f: BinaryIO, digest):
+        self._f = f
+        self._digest = digest
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self._digest.update(data)
+        return data
+
+
+def write_bundle_tar_gz(
+    bundle_dir: Path,
+    arcname: str,
+    fileobj: BinaryIO,
+    level: int = DEFAULT_LEVEL,
+    jobs: int | None = None,
+    include: set[str] | None = None,
+) -> str:
+    """write_bundle_tar, gzip-compressed in parallel. Returns the content digest."""
+    with ParallelGzipWriter(fileobj, level=level, jobs=jobs) as gz:
+        return write_bundle_tar(bundle_dir, arcname, gz, include)
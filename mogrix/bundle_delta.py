@@ -0,0 +1,167 @@
+"""Bundle file manifests and delta updates.
+
+Every bundle carries MANIFEST_NAME at its root: one line per entry with
+type, mode, size, sha256 (or symlink target) and path. Comparing the
+manifest of an installed bundle with a new build tells exactly which
+files to ship, which makes a delta .run (see BundleBuilder._create_delta)
+an order of magnitude smaller than the full installer for a typical
+rebuild.
+
+Manifest lines are tab-separated:
+
+    f   0755  123456  <sha256>   _bin/nano
+    l   0777  0       libz.so.1.3  _lib32/libz.so.1
+    d   0755  0       -          _lib32
+
+The manifest does not mention the bundle's (date-serial) directory name,
+so unchanged content gives an unchanged manifest.
+"""
+
+import gzip
+import os
+import stat
+import tarfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from mogrix.blobstore import file_digest
+
+MANIFEST_NAME = ".mogrix-files"
+MANIFEST_HEADER = "# mogrix bundle files v1"
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    """One manifest line."""
+
+    path: str  # relative to the bundle root
+    kind: str  # "f" file, "l" symlink, "d" directory
+    mode: int
+    size: int
+    digest: str  # sha256 for files, target for symlinks, "-" for directories
+
+    def format(self) -> str:
+        return f"{self.kind}\t{self.mode:04o}\t{self.size}\t{self.digest}\t{self.path}"
+
+
+def scan_tree(bundle_dir: Path) -> dict[str, FileEntry]:
+    """Manifest entries for everything under bundle_dir (the manifest excluded)."""
+    entries = {}
+    for dirpath, dirnames, filenames in os.walk(bundle_dir):
+        dirnames.sort()
+        for name in sorted(dirnames + filenames):
+            path = Path(dirpath) / name
+            rel = path.relative_to(bundle_dir).as_posix()
+            if rel == MANIFEST_NAME:
+                continue
+            st = path.lstat()
+            mode = stat.S_IMODE(st.st_mode)
+            if stat.S_ISLNK(st.st_mode):
+                entry = FileEntry(rel, "l", mode, 0, os.readlink(path))
+            elif stat.S_ISDIR(st.st_mode):
+                entry = FileEntry(rel, "d", mode, 0, "-")
+            else:
+                entry = FileEntry(rel, "f", mode, st.st_size, file_digest(path))
+            entries[rel] = entry
+    return entries
+
+
+def format_manifest(entries: dict[str, FileEntry]) -> str:
+    lines = [MANIFEST_HEADER]
+    lines.extend(entries[path].format() for path in sorted(entries))
+    return "\n".join(lines) + "\n"
+
+
+def parse_manifest(text: str) -> dict[str, FileEntry]:
+    """Inverse of format_manifest. Raises ValueError on anything else."""
+    lines = text.splitlines()
+    if not lines or lines[0] != MANIFEST_HEADER:
+        raise ValueError("not a mogrix bundle manifest")
+    entries = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        kind, mode, size, digest, path = line.split("\t", 4)
+        entries[path] = FileEntry(path, kind, int(mode, 8), int(size), digest)
+    return entries
+
+
+def write_manifest(bundle_dir: Path) -> dict[str, FileEntry]:
+    """Scan bundle_dir and write its manifest. Returns the entries."""
+    entries = scan_tree(bundle_dir)
+    manifest_path = bundle_dir / MANIFEST_NAME
+    manifest_path.write_text(format_manifest(entries))
+    manifest_path.chmod(0o644)
+    return entries
+
+
+def _run_payload_offset(run_path: Path) -> tuple[str, int]:
+    """Bundle name and payload byte offset of a self-extracting .run."""
+    bundle_name = None
+    skip = None
+    with open(run_path, "rb") as f:
+        offset = 0
+        line_no = 0
+        for raw in f:
+            line_no += 1
+            line = raw.decode("ascii", errors="replace")
+            if line.startswith("BUNDLE=") and bundle_name is None:
+                bundle_name = line.strip()[len("BUNDLE="):].strip('"')
+            elif line.startswith("SKIP=") and skip is None:
+                skip = int(line.strip()[len("SKIP="):])
+            if skip is not None and line_no == skip - 1:
+                return bundle_name or "", offset + len(raw)
+            offset += len(raw)
+    raise ValueError(f"{run_path.name} is not a mogrix .run installer")
+
+
+def load_base_manifest(path: Path) -> tuple[str, dict[str, FileEntry]]:
+    """Bundle name and manifest of an earlier build to compute a delta from.
+
+    path is a .run installer, a bundle directory or the manifest file
+    inside one. Raises ValueError if no manifest can be found.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return path.name, parse_manifest((path / MANIFEST_NAME).read_text())
+    if path.name == MANIFEST_NAME:
+        return path.resolve().parent.name, parse_manifest(path.read_text())
+
+    bundle_name, offset = _run_payload_offset(path)
+    wanted = f"{bundle_name}/{MANIFEST_NAME}"
+    with open(path, "rb") as f:
+        f.seek(offset)
+        # GzipFile reads concatenated members (see bundle_archive)
+        with gzip.GzipFile(fileobj=f) as gz, tarfile.open(fileobj=gz, mode="r|") as tar:
+            for member in tar:
+                if member.name == wanted:
+                    return bundle_name, parse_manifest(
+                        tar.extractfile(member).read().decode()
+                    )
+    raise ValueError(f"{path.name} has no file manifest (built before manifests existed)")
+
+
+@dataclass
+class BundleDelta:
+    """What turns an installed bundle into a new build."""
+
+    changed: list[str]  # added or changed paths, shipped in the delta
+    deleted: list[str]  # paths that no longer exist
+    # Removed before unpacking: deleted paths and replaced non-directories,
+    # files and symlinks first, then directories deepest first
+    remove: list[str]
+
+
+def diff_manifests(old: dict[str, FileEntry], new: dict[str, FileEntry]) -> BundleDelta:
+    changed = sorted(path for path, entry in new.items() if old.get(path) != entry)
+    remove = [
+        path for path, entry in old.items()
+        if path not in new
+        or (new[path] != entry and not (entry.kind == new[path].kind == "d"))
+    ]
+    return BundleDelta(
+        changed=changed,
+        deleted=sorted(path for path in old if path not in new),
+        remove=sorted(p for p in remove if old[p].kind != "d")
+        + sorted((p for p in remove if old[p].kind == "d"), reverse=True),
+    )
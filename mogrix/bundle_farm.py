@@ -0,0 +1,383 @@
+"""Batch bundling: build many app bundles in one run.
+
+After toolchain or compat changes every app bundle has to be rebuilt.
+Instead of one `mogrix bundle` per app (each rebuilding the RPM maps),
+the farm builds a single BundleBuilder, hands it to a process pool and
+builds one bundle per task. Workers share the RPM maps, the RPM catalog,
+the ELF facts cache and the extraction cache.
+
+Best-effort: a failing bundle is recorded and the rest carry on. Each
+bundle's console output goes to its own log file, and the run ends with
+a consolidated JSON report (bundle paths, sizes, unresolved sonames and
+timings). With shared_libs the report also says how many _lib32 bytes the
+shared library store saves when the bundles are installed side by side.
+"""
+
+import json
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+import mogrix.bundle
+from mogrix.bundle import BundleBuilder
+from mogrix.bundle_archive import DEFAULT_LEVEL
+
+console = Console()
+
+
+@dataclass
+class BundleTask:
+    """One app bundle to build."""
+
+    package: str
+    trampoline_exclude: set[str] = field(default_factory=set)
+
+
+@dataclass
+class BundleFarmResult:
+    """Outcome of building one bundle."""
+
+    package: str
+    status: str  # "success", "failed" or "skipped"
+    bundle_name: str = ""
+    output_path: str = ""
+    size_bytes: int = 0
+    included_rpms: int = 0
+    content_digest: str = ""
+    shared_libs: dict[str, int] = field(default_factory=dict)  # store key -> size
+    unresolved_sonames: list[str] = field(default_factory=list)
+    duration_seconds: float = 0
+    cpu_seconds: float = 0  # this process and its reaped children (rpm2cpio, ...)
+    error: str = ""
+    log_path: str = ""
+
+    def to_dict(self) -> dict:
+        """Convert to JSON-serializable dict."""
+        d = {
+            "name": self.package,
+            "status": self.status,
+            "duration_seconds": round(self.duration_seconds, 1),
+            "cpu_seconds": round(self.cpu_seconds, 1),
+        }
+        if self.bundle_name:
+            d["bundle"] = self.bundle_name
+            d["output"] = self.output_path
+            d["size_bytes"] = self.size_bytes
+            d["included_rpms"] = self.included_rpms
+        if self.content_digest:
+            d["content_digest"] = self.content_digest
+        if self.shared_libs:
+            d["shared_lib_bytes"] = sum(self.shared_libs.values())
+        if self.unresolved_sonames:
+            d["unresolved_sonames"] = self.unresolved_sonames
+        if self.error:
+            d["error"] = self.error
+        if self.log_path:
+            d["log"] = self.log_path
+        return d
+
+
+@dataclass
+class BundleFarmReport:
+    """Report from a batch bundling run."""
+
+    jobs: int
+    results: list[BundleFarmResult] = field(default_factory=list)
+    start_time: str = ""
+    wall_seconds: float = 0
+
+    @property
+    def summary(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for r in self.results:
+            counts[r.status] = counts.get(r.status, 0) + 1
+        return counts
+
+    @property
+    def shared_store(self) -> dict[str, int]:
+        """Shared library store totals across the bundles built.
+
+        bytes is what the store holds once every bundle is installed;
+        deduplicated_bytes is what per-bundle copies would have added.
+        """
+        store: dict[str, int] = {}
+        total = 0
+        for r in self.results:
+            store.update(r.shared_libs)
+            total += sum(r.shared_libs.values())
+        return {
+            "libraries": len(store),
+            "bytes": sum(store.values()),
+            "deduplicated_bytes": total - sum(store.values()),
+        }
+
+    def to_dict(self) -> dict:
+        d = {
+            "timestamp": self.start_time,
+            "jobs": self.jobs,
+            "wall_seconds": round(self.wall_seconds, 1),
+            "cpu_seconds": round(sum(r.cpu_seconds for r in self.results), 1),
+            "packages": [r.to_dict() for r in self.results],
+            "summary": self.summary,
+        }
+        if any(r.shared_libs for r in self.results):
+            d["shared_store"] = self.shared_store
+        return d
+
+
+def load_trampoline_exclude(rules_dir: Path, packages: list[str]) -> set[str]:
+    """bundle_trampoline_exclude entries from the packages' rule files."""
+    exclude: set[str] = set()
+    for pkg in packages:
+        rule_path = rules_dir / "packages" / f"{pkg}.yaml"
+        if rule_path.exists():
+            with open(rule_path) as f:
+                rule_data = yaml.safe_load(f) or {}
+            exclude.update(rule_data.get("bundle_trampoline_exclude", []))
+    return exclude
+
+
+def discover_bundle_packages(rules_dir: Path) -> list[str]:
+    """Packages whose rules carry bundle config (bundle_*) or smoke tests."""
+    packages = []
+    for yaml_file in sorted((rules_dir / "packages").glob("*.yaml")):
+        try:
+            with open(yaml_file) as f:
+                data = yaml.safe_load(f)
+        except yaml.YAMLError:
+            continue
+        if not isinstance(data, dict):
+            continue
+        if "smoke_test" in data or any(key.startswith("bundle_") for key in data):
+            packages.append(data.get("package", yaml_file.stem))
+    return packages
+
+
+def read_package_list(list_path: Path) -> list[str]:
+    """One package name per line, # comments, blank lines ignored."""
+    packages = []
+    with open(list_path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                packages.append(line)
+    return packages
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process (all threads) and its reaped children."""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def build_one(
+    builder: BundleBuilder,
+    task: BundleTask,
+    output_dir: Path,
+    output_format: str,
+    log_dir: Path,
+    compress_level: int = DEFAULT_LEVEL,
+    compress_jobs: int | None = None,
+    shared_libs: bool = False,
+) -> BundleFarmResult:
+    """Build one bundle, logging to log_dir/<package>.log. Never raises."""
+    result = BundleFarmResult(package=task.package, status="failed")
+    log_path = log_dir / f"{task.package}.log"
+    result.log_path = str(log_path)
+    start = time.monotonic()
+    cpu_start = _cpu_seconds()
+
+    bundle_console = mogrix.bundle.console
+    saved_file = bundle_console.file
+    with open(log_path, "w") as log:
+        bundle_console.file = log
+        try:
+            manifest = builder.create_bundle(
+                target_package=task.package,
+                output_dir=output_dir,
+                output_format=output_format,
+                trampoline_exclude=task.trampoline_exclude or None,
+                compress_level=compress_level,
+                compress_jobs=compress_jobs,
+                shared_libs=shared_libs,
+            )
+        except SystemExit:
+            # create_bundle has printed the reason to the log
+            result.error = f"bundle failed (see {log_path.name})"
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        else:
+            output = manifest.run_path or manifest.tarball_path or manifest.bundle_dir
+            result.status = "success"
+            result.bundle_name = manifest.bundle_name
+            result.output_path = str(output)
+            if output is not None and output.is_file():
+                result.size_bytes = output.stat().st_size
+            elif output is not None:
+                result.size_bytes = sum(
+                    p.lstat().st_size for p in output.rglob("*") if not p.is_dir()
+                )
+            result.included_rpms = len(manifest.included_rpms)
+            result.content_digest = manifest.content_digest
+            result.shared_libs = {key: size for key, _path, size in manifest.shared_libs}
+            result.unresolved_sonames = sorted(manifest.unresolved_sonames)
+        finally:
+            bundle_console.file = saved_file
+
+    result.duration_seconds = time.monotonic() - start
+    result.cpu_seconds = _cpu_seconds() - cpu_start
+    return result
+
+
+_worker_builder: BundleBuilder | None = None
+
+
+def _init_farm_worker(builder: BundleBuilder) -> None:
+    global _worker_builder
+    _worker_builder = builder
+
+
+def _run_farm_task(
+    task: BundleTask, output_dir: Path, output_format: str, log_dir: Path,
+    compress_level: int, compress_jobs: int, shared_libs: bool,
+) -> BundleFarmResult:
+    return build_one(
+        _worker_builder, task, output_dir, output_format, log_dir, compress_level,
+        compress_jobs, shared_libs,
+    )
+
+
+def run_bundle_farm(
+    builder: BundleBuilder,
+    tasks: list[BundleTask],
+    output_dir: Path,
+    output_format: str = "run",
+    jobs: int = 1,
+    compress_level: int = DEFAULT_LEVEL,
+    shared_libs: bool = False,
+    compress_jobs: int | None = None,
+) -> BundleFarmReport:
+    """Build a bundle per task on `jobs` worker processes.
+
+    compress_jobs defaults to all CPUs when bundles are built one at a
+    time and to 1 with several workers (bundles are then the unit of
+    parallelism). Packages without RPMs are skipped. Results are in task
+    order.
+    """
+    report = BundleFarmReport(jobs=jobs, start_time=datetime.now().isoformat())
+    start = time.monotonic()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    log_dir = output_dir / "logs"
+    log_dir.mkdir(exist_ok=True)
+
+    results: dict[str, BundleFarmResult] = {}
+    runnable = []
+    for task in tasks:
+        if builder.has_package(task.package):
+            runnable.append(task)
+        else:
+            results[task.package] = BundleFarmResult(
+                package=task.package, status="skipped", error="no RPMs found"
+            )
+
+    def record(result: BundleFarmResult) -> None:
+        results[result.package] = result
+        if result.status == "success":
+            status = "[green]ok[/green]"
+        else:
+            status = f"[red]{result.status}[/red]"
+        console.print(
+            f"  [{len(results)}/{len(tasks)}] {result.package}: {status} "
+            f"[dim]({result.duration_seconds:.1f}s)[/dim]"
+        )
+
+    if jobs <= 1 or len(runnable) <= 1:
+        for task in runnable:
+            record(build_one(
+                builder, task, output_dir, output_format, log_dir, compress_level,
+                compress_jobs, shared_libs,
+            ))
+    else:
+        # Workers open their own database connections
+        builder.rpm_catalog.close()
+        builder.elf_facts.close()
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_farm_worker, initargs=(builder,)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _run_farm_task, task, output_dir, output_format, log_dir,
+                    compress_level, compress_jobs or 1, shared_libs,
+                )
+                for task in runnable
+            ]
+            for future in as_completed(futures):
+                record(future.result())
+
+    report.results = [results[task.package] for task in tasks]
+    report.wall_seconds = time.monotonic() - start
+    return report
+
+
+def print_farm_report(report: BundleFarmReport) -> None:
+    """Print a Rich table summary of the batch bundling run."""
+    table = Table(title="Bundle Farm Results")
+    table.add_column("Package", style="bold")
+    table.add_column("Status")
+    table.add_column("Notes")
+    table.add_column("Size", justify="right")
+    table.add_column("Time", justify="right")
+
+    for r in report.results:
+        if r.status == "success":
+            status = "[green]SUCCESS[/green]"
+        elif r.status == "skipped":
+            status = "[dim]SKIPPED[/dim]"
+        else:
+            status = "[red]FAILED[/red]"
+
+        if r.error:
+            notes = r.error[:60]
+        elif r.unresolved_sonames:
+            notes = f"[yellow]{len(r.unresolved_sonames)} unresolved[/yellow]"
+        else:
+            notes = f"{r.included_rpms} RPMs"
+        size = f"{r.size_bytes / 1024 / 1024:.1f} MB" if r.size_bytes else ""
+        duration = f"{r.duration_seconds:.0f}s" if r.duration_seconds > 0 else ""
+        table.add_row(r.package, status, notes, size, duration)
+
+    console.print(table)
+
+    s = report.summary
+    parts = [f"{sum(s.values())} bundles"]
+    if s.get("success"):
+        parts.append(f"[green]{s['success']} success[/green]")
+    if s.get("skipped"):
+        parts.append(f"[dim]{s['skipped']} skipped[/dim]")
+    if s.get("failed"):
+        parts.append(f"[red]{s['failed']} failed[/red]")
+    parts.append(f"{report.wall_seconds:.0f}s wall, {report.jobs} jobs")
+    console.print(f"\n[bold]Summary:[/bold] {' | '.join(parts)}")
+
+    if any(r.shared_libs for r in report.results):
+        store = report.shared_store
+        console.print(
+            f"[bold]Shared store:[/bold] {store['libraries']} libraries, "
+            f"{store['bytes'] / 1024 / 1024:.1f} MB "
+            f"({store['deduplicated_bytes'] / 1024 / 1024:.1f} MB deduplicated)"
+        )
+
+
+def write_farm_report(report: BundleFarmReport, output_path: Path) -> None:
+    """Write the batch bundling report as JSON."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report.to_dict(), f, indent=2)
+    console.print(f"\n[bold]Report written:[/bold] {output_path}")
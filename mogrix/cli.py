@@ -283,8 +283,9 @@ def _convert_srpm_full(
     strict: bool = False,
     source_scan: bool = True,
 ):
-    """Extract SRPM, convert spec, copy sources, and repackage."""
+    """Extract SRPM, convert spec, link sources, and repackage."""
     import shutil
+    from mogrix.blobstore import BlobStore, copy_replace
     from mogrix.parser.srpm import SRPMExtractor
     from mogrix.emitter.srpm import SRPMEmitter
 
@@ -319,11 +320,16 @@ def _convert_srpm_full(
             spec, result, headers_path, compat_path
         )
 
-        # Copy all files from extracted SRPM to output directory
+        # Link sources from extracted SRPM into the output directory via
+        # the blob store; the spec is copied since it is rewritten below
+        blob_store = BlobStore()
         for src_file in extracted_dir.iterdir():
             if src_file.is_file():
                 dest_file = out_path / src_file.name
-                shutil.copy2(src_file, dest_file)
+                if src_file.suffix == ".spec":
+                    copy_replace(src_file, dest_file)
+                else:
+                    blob_store.link_into(src_file, dest_file)
 
         # Copy compat source files if needed
         if result.compat_functions:
@@ -333,7 +339,7 @@ def _convert_srpm_full(
             all_compat = list(compat_files) + extra_files
             for compat_file in all_compat:
                 dest_file = out_path / compat_file.name
-                shutil.copy2(compat_file, dest_file)
+                copy_replace(compat_file, dest_file)
             console.print(f"[bold]Compat sources:[/bold] {len(all_compat)} files ({', '.join(f.name for f in all_compat)})")
 
         # Copy patch files from mogrix patches directory if add_patch is specified
@@ -346,7 +352,7 @@ def _convert_srpm_full(
                     patch_path = PATCHES_DIR / "shared" / patch_name
                 if patch_path.exists():
                     dest_file = out_path / patch_name
-                    shutil.copy2(patch_path, dest_file)
+                    copy_replace(patch_path, dest_file)
                     patch_files.append(patch_name)
                 else:
                     console.print(f"[yellow]Warning:[/yellow] Patch not found: {patch_name} (checked packages/{spec.name}/ and shared/)")
@@ -364,7 +370,7 @@ def _convert_srpm_full(
                     source_path = PATCHES_DIR / "shared" / source_name
                 if source_path.exists():
                     dest_file = out_path / source_name
-                    shutil.copy2(source_path, dest_file)
+                    copy_replace(source_path, dest_file)
                     source_files.append(source_name)
                 else:
                     console.print(f"[yellow]Warning:[/yellow] Source not found: {source_name} (checked packages/{spec.name}/ and shared/)")
@@ -568,41 +574,20 @@ def _run_source_analysis(
         handled_rules: Full package rules dict for cross-referencing.
         show_handled: If True, show handled findings (analyze mode).
     """
-    import shutil
-    import tempfile
-
-    from mogrix.analyzers.source import SourceAnalyzer
-
-    # Check for ripgrep
-    if shutil.which("rg") is None:
-        console.print("[dim]Skipping source scan: ripgrep (rg) not found[/dim]")
-        return
-
-    # Find source tarballs
-    tarball_exts = (".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz", ".tar")
-    tarballs = [
-        f for f in extracted_dir.iterdir()
-        if f.is_file() and any(f.name.lower().endswith(ext) for ext in tarball_exts)
-    ]
+    from mogrix.analyzers.scan_cache import ScanCache
+    from mogrix.analyzers.source import SourceAnalyzer, find_tarballs
+    from mogrix.analyzers.source_index import SourceIndex
 
+    tarballs = find_tarballs(extracted_dir)
     if not tarballs:
         return
 
-    analyzer = SourceAnalyzer()
-    all_findings = []
-
-    for tarball in tarballs:
-        scan_dir = Path(tempfile.mkdtemp(prefix="mogrix-scan-"))
-        try:
-            result = analyzer.scan_tarball(
-                tarball,
-                scan_dir,
-                handled_compat_functions=handled_compat_functions,
-                handled_rules=handled_rules,
-            )
-            all_findings.extend(result.findings)
-        finally:
-            shutil.rmtree(scan_dir, ignore_errors=True)
+    analyzer = SourceAnalyzer(cache=ScanCache(), index=SourceIndex.open_existing())
+    all_findings = analyzer.scan_tarballs(
+        tarballs,
+        handled_compat_functions=handled_compat_functions,
+        handled_rules=handled_rules,
+    ).findings
 
     if not all_findings:
         console.print("\n[bold green]Source scan:[/bold green] No IRIX compatibility issues found")
@@ -1144,16 +1129,18 @@ def _fetch_and_convert_deps(packages: list[str], output_dir: Path):
         packages: List of package names to fetch
         output_dir: Directory to save fetched/converted packages
     """
-    from mogrix.deps.fedora import FedoraRepo
+    from mogrix.deps.fedora import DEFAULT_CACHE_DIR, FedoraRepo
 
     deps_dir = output_dir / "deps"
     deps_dir.mkdir(parents=True, exist_ok=True)
 
-    repo = FedoraRepo()
+    repo = FedoraRepo(cache_dir=DEFAULT_CACHE_DIR)
     fetched = []
 
     console.print(f"\n[bold]Fetching dependencies to:[/bold] {deps_dir}\n")
 
+    # Resolve every package first (may prompt), then download concurrently
+    selections = []
     for pkg in packages:
         console.print(f"[bold]Fetching:[/bold] {pkg}")
         try:
@@ -1172,14 +1159,27 @@ def _fetch_and_convert_deps(packages: list[str], output_dir: Path):
                 console.print(f"  [red]✗ Not found in Fedora archives[/red]")
                 continue
 
-            console.print(f"  Downloading {selected.filename}...")
-            downloaded = repo.download_srpm(selected.url, deps_dir)
-            console.print(f"  [green]✓ Downloaded:[/green] {downloaded.name}")
-            fetched.append(downloaded)
+            selections.append(selected)
 
         except Exception as e:
             console.print(f"  [red]✗ Failed:[/red] {e}")
 
+    if selections:
+        console.print(f"\nDownloading {len(selections)} SRPMs...")
+    filenames = {s.url: s.filename for s in selections}
+
+    def report(result):
+        if result.path is not None:
+            console.print(f"  [green]✓ Downloaded:[/green] {result.path.name}")
+        else:
+            console.print(f"  [red]✗ Failed:[/red] {filenames[result.url]}: {result.error}")
+
+    with repo:
+        results = repo.download_srpms(selections, deps_dir, on_done=report)
+    for result in results:
+        if result.path is not None:
+            fetched.append(result.path)
+
     if fetched:
         console.print(f"\n[bold]Downloaded {len(fetched)} SRPMs to {deps_dir}[/bold]")
         console.print("\n[bold]Next steps:[/bold]")
@@ -1322,25 +1322,72 @@ def validate_rules(rules_dir: str | None, compat_dir: str | None):
     is_flag=True,
     help="Machine-readable JSON output",
 )
-def check_elf(paths: tuple[str, ...], generate_fix: bool, json_output: bool):
+@click.option(
+    "--json-lines",
+    is_flag=True,
+    help="Stream one JSON object per binary as results arrive (exit 1 on findings)",
+)
+@click.option("--jobs", "-j", type=int, default=1, help="Parallel workers (default: 1)")
+@click.option("--no-cache", is_flag=True, help="Parse every binary (skip the ELF facts cache)")
+def check_elf(
+    paths: tuple[str, ...],
+    generate_fix: bool,
+    json_output: bool,
+    json_lines: bool,
+    jobs: int,
+    no_cache: bool,
+):
     """Check MIPS ELF binaries for IRIX relocation issues.
 
     Detects R_MIPS_REL32 relocations in widget ClassRec structures that
     IRIX rld may silently fail to resolve, leaving function pointers NULL.
 
     PATHS can be RPM files, directories, or individual ELF binaries.
+    RPMs are read from their payload stream; nothing is extracted.
+    Binaries seen before are answered from the ELF facts cache.
     """
-    from mogrix.analyzers.elf import check_path, format_results, generate_fix_scaffold
+    import json
+
+    from mogrix.analyzers.elf import (
+        format_results,
+        generate_fix_scaffold,
+        iter_check_paths,
+        result_to_dict,
+    )
+    from mogrix.elf_facts import ElfFactsCache
+
+    inputs = [Path(p) for p in paths]
+    if not json_lines:
+        for path in inputs:
+            console.print(f"[bold]Checking:[/bold] {path.name}")
 
+    order = {path: i for i, path in enumerate(inputs)}
     all_results = []
-    for p in paths:
-        path = Path(p)
-        console.print(f"[bold]Checking:[/bold] {path.name}")
-        results = check_path(path)
-        all_results.extend(results)
+    errors = []
+    cache = None if no_cache else ElfFactsCache()
+    for path, results, error in iter_check_paths(inputs, jobs=jobs, cache=cache):
+        if error:
+            errors.append(error)
+        if json_lines:
+            if error:
+                print(json.dumps({"path": str(path), "error": error}), flush=True)
+            for r in results:
+                print(json.dumps(result_to_dict(r)), flush=True)
+        all_results.extend((order[path], str(r.binary_path), r) for r in results)
+    all_results = [r for *_key, r in sorted(all_results, key=lambda t: t[:2])]
+
+    if json_lines:
+        if errors or any(r.class_rec_findings for r in all_results):
+            raise SystemExit(1)
+        return
+
+    for error in errors:
+        console.print(f"[red]Error:[/red] {error}")
 
     if not all_results:
         console.print("No MIPS ELF binaries found.")
+        if errors:
+            raise SystemExit(1)
         return
 
     if generate_fix:
@@ -1348,34 +1395,7 @@ def check_elf(paths: tuple[str, ...], generate_fix: bool, json_output: bool):
         return
 
     if json_output:
-        import json
-
-        data = []
-        for r in all_results:
-            entry = {
-                "binary": str(r.binary_path),
-                "type": r.elf_type,
-                "rel32_total": r.rel32_total,
-                "rel32_undef": r.rel32_undef,
-                "class_recs": [
-                    {
-                        "name": f.name,
-                        "address": f"0x{f.address:08x}",
-                        "size": f.size,
-                        "at_risk_relocs": [
-                            {
-                                "offset": f"+0x{rel.offset - f.address:03x}",
-                                "symbol": rel.sym_name,
-                            }
-                            for rel in f.at_risk_relocs
-                        ],
-                    }
-                    for f in r.class_rec_findings
-                ],
-                "warnings": r.warnings,
-            }
-            data.append(entry)
-        print(json.dumps(data, indent=2))
+        print(json.dumps([result_to_dict(r) for r in all_results], indent=2))
         return
 
     console.print(format_results(all_results))
@@ -1402,6 +1422,8 @@ def check_elf(paths: tuple[str, ...], generate_fix: bool, json_output: bool):
         console.print(f"[yellow]{total_warnings} warning(s)[/yellow]")
     else:
         console.print("[bold green]✓ No IRIX relocation issues found[/bold green]")
+    if errors:
+        raise SystemExit(1)
 
 
 @main.command("audit-rules")
@@ -1533,12 +1555,20 @@ def audit_rules(rules_dir: str | None, verbose: bool):
     is_flag=True,
     help="Auto-confirm single matches without prompting",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=4,
+    help="Concurrent downloads (default: 4)",
+)
 def fetch(
     packages: tuple[str, ...],
     output_dir: str,
     release: str,
     base_url: str | None,
     yes: bool,
+    jobs: int,
 ):
     """Fetch SRPMs from Fedora repositories.
 
@@ -1546,13 +1576,15 @@ def fetch(
 
     Searches the Fedora archives for matching SRPMs. If multiple matches
     are found, prompts for selection. Use -y to auto-confirm single matches.
+    Selected SRPMs are then downloaded concurrently, resuming interrupted
+    downloads and verifying checksums when repo metadata is available.
     """
-    from mogrix.deps.fedora import FedoraRepo
+    from mogrix.deps.fedora import DEFAULT_CACHE_DIR, FedoraRepo
 
     output_path = Path(output_dir) if output_dir else MOGRIX_INPUTS / "SRPMS"
     output_path.mkdir(parents=True, exist_ok=True)
 
-    repo = FedoraRepo(release=release, base_url=base_url)
+    repo = FedoraRepo(release=release, base_url=base_url, cache_dir=DEFAULT_CACHE_DIR)
 
     # Show what repo we're using with full URL
     archive_url = f"{repo.ARCHIVE_BASE}/{release}/Everything/source/tree/Packages/"
@@ -1568,6 +1600,7 @@ def fetch(
     success = []
     failed = []
     skipped = []
+    selections = []
 
     for pkg in packages:
         console.print(f"[bold]Searching for:[/bold] {pkg}")
@@ -1627,16 +1660,31 @@ def fetch(
                 console.print()
                 continue
 
-        # Download the selected SRPM
-        try:
-            console.print(f"  Downloading {selected.filename}...")
-            downloaded = repo.download_srpm(selected.url, output_path)
-            console.print(f"  [green]✓ Downloaded:[/green] {downloaded}")
-            success.append((pkg, downloaded))
-        except Exception as e:
-            console.print(f"  [red]✗ Download failed:[/red] {e}")
-            failed.append((pkg, str(e)))
+        selections.append((pkg, selected))
+        console.print()
+
+    # Download all selected SRPMs concurrently
+    if selections:
+        console.print(f"[bold]Downloading {len(selections)} SRPMs...[/bold]")
+        filenames = {s.url: s.filename for _, s in selections}
 
+        def report(result):
+            if result.path is not None:
+                console.print(f"  [green]✓ Downloaded:[/green] {result.path}")
+            else:
+                console.print(
+                    f"  [red]✗ Download failed:[/red] {filenames[result.url]}: {result.error}"
+                )
+
+        with repo:
+            results = repo.download_srpms(
+                [s for _, s in selections], output_path, jobs=jobs, on_done=report
+            )
+        for (pkg, _), result in zip(selections, results):
+            if result.path is not None:
+                success.append((pkg, result.path))
+            else:
+                failed.append((pkg, result.error))
         console.print()
 
     # Summary
@@ -2184,6 +2232,229 @@ def sync_headers(staging_dir: str):
     console.print("[bold green]Headers synced successfully![/bold green]")
 
 
+@main.command()
+@click.option(
+    "--store-dir",
+    type=click.Path(),
+    default=None,
+    help="Blob store directory (default: ~/.cache/mogrix/blobs)",
+)
+@click.option(
+    "--extract-dir",
+    type=click.Path(),
+    default=None,
+    help="RPM extraction cache (default: ~/.cache/mogrix/extract)",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Report what would be removed without deleting",
+)
+def gc(store_dir: str | None, extract_dir: str | None, dry_run: bool):
+    """Remove unreferenced source blobs and stale cache entries.
+
+    Converted packages and ~/rpmbuild/SOURCES hardlink their sources from a
+    content-addressed blob store. Blobs no longer linked from anywhere
+    (e.g. after deleting an output directory) are removed.
+
+    Bundles are assembled from extracted RPM payloads, one tree per RPM
+    checksum. Trees of RPMs no longer in the RPM catalog (rebuilt or
+    deleted since), and extractions abandoned half-way, are removed.
+
+    ELF facts of files that were deleted or rebuilt are dropped, and so are
+    cached source-scan matches of patterns no longer in the rules.
+
+    Example:
+        mogrix gc --dry-run
+    """
+    from mogrix import elf_facts
+    from mogrix.analyzers.scan_cache import ScanCache, pattern_key
+    from mogrix.analyzers.source import SourceAnalyzer
+    from mogrix.blobstore import BlobStore
+    from mogrix.extract_cache import ExtractCache
+    from mogrix.rpm_catalog import DEFAULT_CATALOG_PATH, RpmCatalog
+    from mogrix.rule_generator import DETECTOR_PATTERNS
+
+    store = BlobStore(Path(store_dir) if store_dir else None)
+    removed, freed = store.gc(dry_run=dry_run)
+
+    verb = "Would remove" if dry_run else "Removed"
+    console.print(
+        f"[bold]{verb} {removed} unreferenced blobs[/bold] "
+        f"({freed / (1024 * 1024):.1f} MB) from {store.objects}"
+    )
+
+    cache = ExtractCache(Path(extract_dir) if extract_dir else None)
+    if not DEFAULT_CATALOG_PATH.exists():
+        # Without the catalog every tree would look unreferenced
+        console.print(f"[dim]No RPM catalog; leaving {cache.root} alone[/dim]")
+    else:
+        catalog = RpmCatalog()
+        removed, freed = cache.gc(catalog.known_sha256s(), dry_run=dry_run)
+        catalog.close()
+        console.print(
+            f"[bold]{verb} {removed} stale RPM extractions[/bold] "
+            f"({freed / (1024 * 1024):.1f} MB) from {cache.root}"
+        )
+
+    if elf_facts.DEFAULT_DB_PATH.exists():
+        facts_cache = elf_facts.ElfFactsCache()
+        files, facts = facts_cache.prune(dry_run=dry_run)
+        facts_cache.close()
+        console.print(
+            f"[bold]{verb} {files} stale file entries and {facts} ELF facts[/bold] "
+            f"from {facts_cache.db_path}"
+        )
+
+    # Every pattern a scan can ask for: the checks, the compat catalog and
+    # the candidate-rule detectors
+    analyzer = SourceAnalyzer(RULES_DIR / "source_checks.yaml", COMPAT_DIR / "catalog.yaml")
+    live = {
+        pattern_key(sp.pattern, sp.glob)
+        for sp in analyzer.scan_patterns() + DETECTOR_PATTERNS
+    }
+    scan_cache = ScanCache()
+    changed, freed = scan_cache.gc(live, dry_run=dry_run)
+    console.print(
+        f"[bold]{verb} stale matches from {changed} source-scan entries[/bold] "
+        f"({freed / (1024 * 1024):.1f} MB) from {scan_cache.cache_dir}"
+    )
+
+
+@main.command("index-sources")
+@click.option(
+    "--srpms-dir",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    help="SRPM directory to index (default: ~/mogrix_inputs/SRPMS/)",
+)
+@click.option(
+    "--db",
+    type=click.Path(),
+    default=None,
+    help="Index database (default: ~/.cache/mogrix/source-index.db)",
+)
+def index_sources(srpms_dir: str | None, db: str | None):
+    """Index the C/C++ sources of all fetched SRPMs.
+
+    Builds (or incrementally updates) a trigram index over the source
+    tarballs of every SRPM, so `mogrix search-sources` can tell which
+    packages a pattern affects without unpacking them. Only new or changed
+    SRPMs are extracted; removed ones are dropped from the index.
+
+    Example:
+        mogrix index-sources
+    """
+    from mogrix.analyzers.source_index import SourceIndex
+
+    srpms_path = Path(srpms_dir) if srpms_dir else MOGRIX_INPUTS / "SRPMS"
+    index = SourceIndex(Path(db) if db else None)
+
+    def progress(srpm: Path):
+        console.print(f"  [dim]indexing {srpm.name}[/dim]")
+
+    console.print(f"[bold]Indexing sources in {srpms_path}[/bold]")
+    try:
+        counts = index.update(srpms_path, progress=progress)
+    except RuntimeError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise SystemExit(1)
+
+    stats = index.stats()
+    index.close()
+    console.print(
+        f"[green]✓[/green] {counts['added']} added, {counts['updated']} updated, "
+        f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+    )
+    console.print(
+        f"  {stats['srpms']} SRPMs, {stats['tarballs']} tarballs, "
+        f"{stats['files']:,} files indexed"
+    )
+
+
+@main.command("search-sources")
+@click.argument("pattern", required=False)
+@click.option(
+    "--check",
+    "check_id",
+    default=None,
+    help="Use the pattern of a source check (or compat:<function> catalog pattern)",
+)
+@click.option("--glob", "glob_str", default=None, help='File globs (default: "*.c,*.h")')
+@click.option("--files", "show_files", is_flag=True, help="List every matching file")
+@click.option(
+    "--db",
+    type=click.Path(),
+    default=None,
+    help="Index database (default: ~/.cache/mogrix/source-index.db)",
+)
+def search_sources(
+    pattern: str | None,
+    check_id: str | None,
+    glob_str: str | None,
+    show_files: bool,
+    db: str | None,
+):
+    """Find indexed packages whose sources match a pattern.
+
+    PATTERN is a regex matched per line, like the patterns in
+    rules/source_checks.yaml. Requires `mogrix index-sources`.
+
+    Examples:
+        mogrix search-sources '\\bsignalfd\\s*\\('
+        mogrix search-sources --check printf-zu --files
+    """
+    from rich.markup import escape
+
+    from mogrix.analyzers.source import SourceAnalyzer
+    from mogrix.analyzers.source_index import SourceIndex
+
+    if check_id:
+        analyzer = SourceAnalyzer()
+        candidates = {c.id: (c.pattern, c.glob) for c in analyzer.checks}
+        candidates.update(
+            (f"compat:{cp.function_name}", (cp.pattern, cp.glob))
+            for cp in analyzer.catalog_patterns
+        )
+        if check_id not in candidates:
+            console.print(f"[red]Error: unknown check {check_id}[/red]")
+            raise SystemExit(1)
+        pattern, check_glob = candidates[check_id]
+        glob_str = glob_str or check_glob
+    elif not pattern:
+        console.print("[red]Error: give a PATTERN or --check[/red]")
+        raise SystemExit(1)
+
+    index = SourceIndex.open_existing(Path(db) if db else None)
+    if index is None:
+        console.print("[red]Error: no source index — run `mogrix index-sources` first[/red]")
+        raise SystemExit(1)
+
+    try:
+        matches = index.search(pattern, glob_str or "*.c,*.h")
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise SystemExit(1)
+    finally:
+        index.close()
+
+    by_package: dict[str, list] = {}
+    for m in matches:
+        by_package.setdefault(m.package, []).append(m)
+
+    console.print(
+        f"[bold]{len(by_package)} package(s), {len(matches)} file(s) match[/bold] "
+        f"{escape(pattern)}"
+    )
+    for package, package_matches in by_package.items():
+        console.print(f"  [cyan]{package}[/cyan] ({len(package_matches)} files)")
+        shown = package_matches if show_files else package_matches[:3]
+        for m in shown:
+            console.print(f"    {m.file}:{m.line}  [dim]{escape(m.match_text[:80])}[/dim]")
+        if len(package_matches) > len(shown):
+            console.print(f"    [dim]...and {len(package_matches) - len(shown)} more[/dim]")
+
+
 @main.command()
 @click.argument("package_name")
 @click.option("--refresh", is_flag=True, help="Re-download repo metadata and rebuild index")
@@ -2200,6 +2471,17 @@ def sync_headers(staging_dir: str):
 @click.option("--stop-at-rules", is_flag=True, help="Stop recursion at packages with existing rules")
 @click.option("--show-satisfied", is_flag=True, help="Include built packages in build order")
 @click.option("--list-drops", is_flag=True, help="Show all auto-dropped deps with reasons")
+@click.option(
+    "--preload",
+    is_flag=True,
+    help="Load the provides index into memory before resolving (faster for large targets)",
+)
+@click.option("--no-cache", is_flag=True, help="Ignore and don't update the roadmap result cache")
+@click.option(
+    "--reverse",
+    is_flag=True,
+    help="Show which unbuilt packages building PACKAGE_NAME unblocks",
+)
 @click.option("--release", default="40", help="Fedora release (default: 40)")
 @click.option("--base-url", default=None, help="Override base URL for repo metadata")
 def roadmap(
@@ -2212,6 +2494,9 @@ def roadmap(
     stop_at_rules: bool,
     show_satisfied: bool,
     list_drops: bool,
+    preload: bool,
+    no_cache: bool,
+    reverse: bool,
     release: str,
     base_url: str | None,
 ):
@@ -2228,15 +2513,20 @@ def roadmap(
       mogrix roadmap popt            # Should show fully built
       mogrix roadmap gdb --json      # Machine-readable output
       mogrix roadmap gdb --tree      # Visual dependency tree
+      mogrix roadmap qt5-qtbase --preload  # In-memory index for big graphs
+      mogrix roadmap --reverse libpng      # What does building libpng unblock?
     """
     from mogrix.repometa import RepoMetaCache
     from mogrix.roadmap import (
         RoadmapResolver,
         format_diff,
         format_json,
+        format_reverse_json,
+        format_reverse_text,
         format_text,
         format_tree,
     )
+    from mogrix.roadmap_cache import RoadmapCache
 
     # Build or load the repo metadata index
     cache = RepoMetaCache(release=release, base_url=base_url)
@@ -2272,17 +2562,38 @@ def roadmap(
             raise SystemExit(1)
 
     # Resolve the graph
-    rule_loader = RuleLoader(RULES_DIR)
-    resolver = RoadmapResolver(
-        db=db,
-        rule_loader=rule_loader,
-        rules_dir=RULES_DIR,
-        rpms_dir=MOGRIX_OUTPUTS / "RPMS",
-        stop_at_rules=stop_at_rules,
-        max_depth=depth,
-    )
+    def make_resolver() -> RoadmapResolver:
+        return RoadmapResolver(
+            db=db,
+            rule_loader=RuleLoader(RULES_DIR),
+            rules_dir=RULES_DIR,
+            rpms_dir=MOGRIX_OUTPUTS / "RPMS",
+            stop_at_rules=stop_at_rules,
+            max_depth=depth,
+            preload=preload,
+        )
 
-    result = resolver.resolve(package_name)
+    if reverse:
+        reverse_result = make_resolver().resolve_reverse(package_name)
+        if output_json:
+            print(format_reverse_json(reverse_result))
+        else:
+            console.print(format_reverse_text(reverse_result))
+        return
+
+    if no_cache:
+        result = make_resolver().resolve(package_name)
+    else:
+        roadmap_cache = RoadmapCache(
+            db=db,
+            rules_dir=RULES_DIR,
+            rpms_dir=MOGRIX_OUTPUTS / "RPMS",
+            stop_at_rules=stop_at_rules,
+            max_depth=depth,
+        )
+        result = roadmap_cache.resolve(package_name, make_resolver)
+        if not output_json:
+            console.print(f"[dim]Roadmap cache: {roadmap_cache.last_status}[/dim]")
 
     # Output
     if diff_file:
@@ -2311,6 +2622,16 @@ def roadmap(
     type=int,
     help="Minimum frequency for suggestions (default: 3)",
 )
+@click.option(
+    "--whole-graph",
+    is_flag=True,
+    help="With --all: resolve the union graph once and derive each roadmap from it",
+)
+@click.option(
+    "--preload",
+    is_flag=True,
+    help="Load the provides index into memory before resolving",
+)
 @click.option("--refresh", is_flag=True, help="Re-download repo metadata")
 @click.option("--release", default="40", help="Fedora release (default: 40)")
 def roadmap_check(
@@ -2319,6 +2640,8 @@ def roadmap_check(
     output_json: bool,
     suggest: bool,
     min_freq: int,
+    whole_graph: bool,
+    preload: bool,
     refresh: bool,
     release: str,
 ):
@@ -2333,6 +2656,7 @@ def roadmap_check(
       mogrix roadmap-check --all            # Check all 63 built packages
       mogrix roadmap-check --all --suggest  # Generate config suggestions
       mogrix roadmap-check --all --json     # Machine-readable output
+      mogrix roadmap-check --all --whole-graph --preload  # Fast (CI)
     """
     from mogrix.repometa import RepoMetaCache
     from mogrix.roadmap_check import RoadmapChecker
@@ -2350,11 +2674,12 @@ def roadmap_check(
         rule_loader=rule_loader,
         rules_dir=RULES_DIR,
         rpms_dir=MOGRIX_OUTPUTS / "RPMS",
+        preload=preload,
     )
 
     if check_all:
         with console.status("[bold cyan]Running roadmap checks..."):
-            results = checker.check_all_built()
+            results = checker.check_all_built(whole_graph=whole_graph)
         aggregated = checker.aggregate_false_positives(results)
 
         if output_json:
@@ -2442,6 +2767,12 @@ def roadmap_check(
     default=600,
     help="Kill build after N seconds (default: 600)",
 )
+@click.option(
+    "--fetch-jobs",
+    type=int,
+    default=4,
+    help="Concurrent SRPM downloads (default: 4)",
+)
 @click.option("--release", default="40", help="Fedora release (default: 40)")
 @click.option("--base-url", default=None, help="Override base URL for SRPM fetching")
 def batch_build(
@@ -2454,6 +2785,7 @@ def batch_build(
     skip_fetch: bool,
     no_skip_built: bool,
     build_timeout: int,
+    fetch_jobs: int,
     release: str,
     base_url: str | None,
 ):
@@ -2486,6 +2818,8 @@ def batch_build(
       # Review rules/candidates/*.yaml, promote to rules/packages/
       mogrix batch-build --from-list tier1.txt   # rebuilds only what's new
     """
+    from mogrix.analyzers.scan_cache import ScanCache
+    from mogrix.analyzers.source_index import SourceIndex
     from mogrix.batch_build import (
         BatchBuilder,
         BatchOptions,
@@ -2509,6 +2843,7 @@ def batch_build(
         skip_fetch=skip_fetch,
         skip_built=not no_skip_built,
         build_timeout=build_timeout,
+        fetch_jobs=fetch_jobs,
         release=release,
         base_url=base_url,
     )
@@ -2519,6 +2854,8 @@ def batch_build(
         headers_dir=HEADERS_DIR,
         inputs_dir=MOGRIX_INPUTS,
         outputs_dir=MOGRIX_OUTPUTS,
+        scan_cache=ScanCache(),
+        source_index=SourceIndex.open_existing(),
     )
 
     # Resolve tasks based on mode
@@ -2565,7 +2902,10 @@ def batch_build(
 
     # Run the batch
     report = BatchReport(mode=mode, input_source=input_source)
-    builder.run(tasks, options, report)
+    try:
+        builder.run(tasks, options, report)
+    finally:
+        builder.close()
 
     # Display results
     console.print()
@@ -2576,6 +2916,124 @@ def batch_build(
         write_json_report(report, Path(output_report))
 
 
+@main.command("generate-rules")
+@click.argument("srpms", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--all",
+    "all_srpms",
+    is_flag=True,
+    help="Every SRPM in --srpms-dir whose package has no rules",
+)
+@click.option(
+    "--srpms-dir",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    help="SRPM directory for --all (default: ~/mogrix_inputs/SRPMS/)",
+)
+@click.option("--jobs", "-j", type=int, default=4, help="Parallel packages (default: 4)")
+@click.option(
+    "--output-dir",
+    type=click.Path(),
+    default=None,
+    help="Where candidates are written (default: rules/candidates/)",
+)
+def generate_rules(
+    srpms: tuple[str, ...],
+    all_srpms: bool,
+    srpms_dir: str | None,
+    jobs: int,
+    output_dir: str | None,
+):
+    """Generate candidate rules for SRPMs, in parallel.
+
+    Each SRPM's sources are scanned in one pass that feeds every detector
+    (source checks, compat functions, NLS, MIPS assembly). Candidates are
+    written for human review, as batch-build does for packages without
+    rules.
+
+    \b
+    Examples:
+      mogrix generate-rules ~/mogrix_inputs/SRPMS/popt-*.src.rpm
+      mogrix generate-rules --all -j 8
+    """
+    import time
+
+    from mogrix.analyzers import source_index
+    from mogrix.analyzers.scan_cache import ScanCache
+    from mogrix.repometa import extract_srpm_name
+    from mogrix.rule_generator import generate_candidates
+    from mogrix.rules.loader import RuleLoader
+
+    selected: dict[str, Path] = {}
+    for srpm in srpms:
+        path = Path(srpm)
+        selected[extract_srpm_name(path.name)] = path
+    if all_srpms:
+        loader = RuleLoader(RULES_DIR)
+        srpms_path = Path(srpms_dir) if srpms_dir else MOGRIX_INPUTS / "SRPMS"
+        for path in sorted(srpms_path.glob("*.src.rpm")):
+            package = extract_srpm_name(path.name)
+            if loader.load_package(package) is None:
+                selected[package] = path
+    if not selected:
+        console.print("[red]Error: give SRPM paths or --all[/red]")
+        raise SystemExit(1)
+
+    out_dir = Path(output_dir) if output_dir else RULES_DIR / "candidates"
+    console.print(
+        f"[bold]Generating candidate rules for {len(selected)} package(s)[/bold] "
+        f"[dim](-j {jobs})[/dim]"
+    )
+
+    started = time.monotonic()
+    results = []
+    for result in generate_candidates(
+        RULES_DIR,
+        sorted(selected.items()),
+        out_dir,
+        compat_dir=COMPAT_DIR,
+        jobs=jobs,
+        cache=ScanCache(),
+        index_path=source_index.DEFAULT_INDEX_PATH,
+    ):
+        results.append(result)
+        if result.error:
+            console.print(f"  [red]✗[/red] {result.package}: {result.error}")
+        else:
+            console.print(f"  [green]✓[/green] {result.package} [dim]({result.seconds:.1f}s)[/dim]")
+    elapsed = time.monotonic() - started
+
+    table = Table(title="Candidate Rules")
+    table.add_column("Package", style="cyan")
+    table.add_column("Rules", style="green")
+    table.add_column("TODOs", justify="right")
+    table.add_column("Files", justify="right", style="dim")
+    table.add_column("Time", justify="right", style="dim")
+    for result in sorted(results, key=lambda r: r.package):
+        candidate = result.candidate
+        if candidate is None:
+            table.add_row(result.package, "[red]failed[/red]", "", "", f"{result.seconds:.1f}s")
+            continue
+        keys = sorted({r.yaml_key for r in candidate.rules if not r.yaml_key.startswith("_")})
+        table.add_row(
+            result.package,
+            ", ".join(keys + [f"class:{c}" for c in candidate.classes]) or "[dim]-[/dim]",
+            str(len(candidate.todos)),
+            str(candidate.files_scanned),
+            f"{result.seconds:.1f}s",
+        )
+    console.print(table)
+
+    failed = sum(1 for r in results if r.error)
+    with_rules = sum(1 for r in results if r.candidate and r.candidate.has_rules)
+    console.print(
+        f"\n[bold]Summary:[/bold] {len(results) - failed} candidates written to {out_dir} "
+        f"({with_rules} with rules), {failed} failed, {elapsed:.1f}s"
+    )
+    if failed:
+        raise SystemExit(1)
+
+
 @main.command("create-srpm")
 @click.argument("packages", nargs=-1, required=True)
 @click.option(
@@ -2667,7 +3125,7 @@ def create_srpm(packages: tuple[str, ...], output_dir: str | None):
 
 
 @main.command()
-@click.argument("packages", nargs=-1, required=True)
+@click.argument("packages", nargs=-1)
 @click.option(
     "--output",
     "-o",
@@ -2702,6 +3160,56 @@ def create_srpm(packages: tuple[str, ...], output_dir: str | None):
     default="/opt/irix-sysroot",
     help="IRIX sysroot path for native lib detection",
 )
+@click.option(
+    "--all",
+    "all_packages",
+    is_flag=True,
+    help="Bundle every package with bundle config or smoke tests in rules/packages",
+)
+@click.option(
+    "--from-list",
+    "list_file",
+    type=click.Path(exists=True),
+    default=None,
+    help="Bundle each package in this file (one per line)",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    default=1,
+    help="Bundles built in parallel with --all/--from-list (default: 1)",
+)
+@click.option(
+    "--report",
+    "report_path",
+    type=click.Path(),
+    default=None,
+    help="JSON report for --all/--from-list (default: <output>/bundle-farm.json)",
+)
+@click.option(
+    "--compress-level",
+    type=click.IntRange(1, 9),
+    default=6,
+    help="gzip level for the packaged bundle (default: 6)",
+)
+@click.option(
+    "--compress-jobs",
+    type=int,
+    default=None,
+    help="Compression threads (default: all CPUs; 1 per bundle with -j)",
+)
+@click.option(
+    "--delta-from",
+    type=click.Path(exists=True),
+    default=None,
+    help="Also write a delta .run updating this earlier build (.run or bundle dir)",
+)
+@click.option(
+    "--shared-libs",
+    is_flag=True,
+    help="Install _lib32 files through a shared store, one copy per library",
+)
 def bundle(
     packages: tuple[str, ...],
     output: str | None,
@@ -2710,6 +3218,14 @@ def bundle(
     include: tuple[str, ...],
     name: str | None,
     sysroot: str,
+    all_packages: bool,
+    list_file: str | None,
+    jobs: int,
+    report_path: str | None,
+    compress_level: int,
+    compress_jobs: int | None,
+    delta_from: str | None,
+    shared_libs: bool,
 ):
     """Create a self-contained app bundle for IRIX.
 
@@ -2732,8 +3248,32 @@ def bundle(
     \b
     Extra packages (siblings not auto-detected):
         mogrix bundle openssh --include openssh-clients
+
+    \b
+    One bundle per app, 8 at a time (failures don't stop the rest):
+        mogrix bundle --all -j 8
+        mogrix bundle --from-list apps.txt -j 8
+
+    \b
+    Share identical libraries between bundles installed side by side:
+        mogrix bundle --all -j 8 --shared-libs
+
+    \b
+    Update an installed bundle with only the files that changed:
+        mogrix bundle nano --delta-from nano-8.0-irix-bundle.0101261200.run
     """
     from mogrix.bundle import BundleBuilder
+    from mogrix.bundle_farm import load_trampoline_exclude
+
+    batch = all_packages or list_file is not None
+    if batch and (packages or include or name or delta_from):
+        console.print(
+            "[red]--all/--from-list take no PACKAGES, --include, --name or --delta-from[/red]"
+        )
+        raise SystemExit(1)
+    if not batch and not packages:
+        console.print("[red]Give PACKAGES, --all or --from-list[/red]")
+        raise SystemExit(1)
 
     rpms_dir = MOGRIX_OUTPUTS / "RPMS"
     if not rpms_dir.is_dir():
@@ -2742,6 +3282,47 @@ def bundle(
 
     output_dir = Path(output) if output else MOGRIX_OUTPUTS / "bundles"
 
+    # Determine output format
+    if no_package:
+        output_format = "directory"
+    elif tarball:
+        output_format = "tarball"
+    else:
+        output_format = "run"
+
+    if batch:
+        from mogrix.bundle_farm import (
+            BundleTask,
+            discover_bundle_packages,
+            print_farm_report,
+            read_package_list,
+            run_bundle_farm,
+            write_farm_report,
+        )
+
+        if list_file:
+            names = read_package_list(Path(list_file))
+        else:
+            names = discover_bundle_packages(RULES_DIR)
+        tasks = [
+            BundleTask(pkg, load_trampoline_exclude(RULES_DIR, [pkg]))
+            for pkg in dict.fromkeys(names)
+        ]
+        console.print(f"[bold]Bundling {len(tasks)} packages ({jobs} jobs)[/bold]")
+        builder = BundleBuilder(rpms_dir=rpms_dir, irix_sysroot=Path(sysroot))
+        report = run_bundle_farm(
+            builder, tasks, output_dir, output_format,
+            jobs=jobs, compress_level=compress_level, shared_libs=shared_libs,
+            compress_jobs=compress_jobs,
+        )
+        print_farm_report(report)
+        write_farm_report(
+            report, Path(report_path) if report_path else output_dir / "bundle-farm.json"
+        )
+        if report.summary.get("failed"):
+            raise SystemExit(1)
+        return
+
     # First package is the "target", rest are extra root packages
     target_package = packages[0]
     extra = list(packages[1:]) + list(include)
@@ -2751,25 +3332,17 @@ def bundle(
     if len(packages) > 1 and not suite_name:
         suite_name = f"{target_package}-suite"
 
-    # Determine output format
-    if no_package:
-        output_format = "directory"
-    elif tarball:
-        output_format = "tarball"
-    else:
-        output_format = "run"
-
     # Load package-level trampoline exclusions from rules
-    trampoline_exclude: set[str] = set()
-    for pkg in packages:
-        rule_path = RULES_DIR / "packages" / f"{pkg}.yaml"
-        if rule_path.exists():
-            import yaml
+    trampoline_exclude = load_trampoline_exclude(RULES_DIR, list(packages))
+
+    if delta_from:
+        from mogrix.bundle_delta import load_base_manifest
 
-            with open(rule_path) as f:
-                rule_data = yaml.safe_load(f) or {}
-            pkg_exclude = rule_data.get("bundle_trampoline_exclude", [])
-            trampoline_exclude.update(pkg_exclude)
+        try:
+            load_base_manifest(Path(delta_from))
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Cannot compute a delta from {delta_from}: {e}[/red]")
+            raise SystemExit(1)
 
     builder = BundleBuilder(rpms_dir=rpms_dir, irix_sysroot=Path(sysroot))
     builder.create_bundle(
@@ -2779,6 +3352,10 @@ def bundle(
         output_format=output_format,
         suite_name=suite_name,
         trampoline_exclude=trampoline_exclude if trampoline_exclude else None,
+        compress_level=compress_level,
+        compress_jobs=compress_jobs,
+        delta_from=Path(delta_from) if delta_from else None,
+        shared_libs=shared_libs,
     )
 
 
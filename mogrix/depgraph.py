@@ -0,0 +1,194 @@
+"""Dependency graph engine for shared-library load chains.
+
+Used by `rld-harness analyze` (depth, closure sizes and GOT pressure per
+library) and BundleBuilder._prune_unused_libs (which libraries a bundle's
+binaries can reach).
+
+The graph is condensed into strongly connected components once (iterative
+Tarjan, so deep chains cannot hit the recursion limit). Tarjan emits
+components in reverse topological order, which is exactly the order in
+which transitive closures can be built bottom-up: each component's
+closure is the OR of its members and its successors' closures, kept as an
+int bitset over node indices. Depth is the longest path from a root in
+the condensed DAG, so every library in a cycle shares one depth.
+"""
+
+from typing import Iterable, Mapping
+
+
+def soname_aliases(name: str) -> list[str]:
+    """Shorter names a versioned library also answers to, longest first.
+
+    libfoo.so.1.2.3 -> [libfoo.so.1.2, libfoo.so.1, libfoo.so]. Only
+    prefixes that still contain ".so" count.
+    """
+    first = name.find(".so")
+    if first < 0:
+        return []
+    aliases = []
+    pos = name.rfind(".")
+    while pos >= first + 3:
+        aliases.append(name[:pos])
+        pos = name.rfind(".", 0, pos)
+    return aliases
+
+
+def _iter_bits(bits: int):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class DepGraph:
+    """Directed graph of name -> dependency names.
+
+    Every name that appears, as a key or as a dependency, is a node.
+    Everything is computed up front; queries are lookups.
+    """
+
+    def __init__(self, edges: Mapping[str, Iterable[str]]):
+        self.nodes: list[str] = []
+        self.index: dict[str, int] = {}
+        for name, deps in edges.items():
+            self._add(name)
+            for dep in deps:
+                self._add(dep)
+        self.succ: list[list[int]] = [[] for _ in self.nodes]
+        for name, deps in edges.items():
+            i = self.index[name]
+            seen = set()
+            for dep in deps:
+                j = self.index[dep]
+                if j not in seen:
+                    seen.add(j)
+                    self.succ[i].append(j)
+
+        self.sccs: list[list[int]] = []  # reverse topological order
+        self.scc_of: list[int] = [0] * len(self.nodes)
+        self._tarjan()
+        self._closures: list[int] = []
+        self._depths: list[int] = []
+        self._condense()
+
+    def _add(self, name: str) -> None:
+        if name not in self.index:
+            self.index[name] = len(self.nodes)
+            self.nodes.append(name)
+
+    def _tarjan(self) -> None:
+        n = len(self.nodes)
+        order = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack: list[int] = []
+        counter = 0
+
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            # Explicit DFS stack of (node, next successor position)
+            work = [(root, 0)]
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                v, pos = work[-1]
+                succ = self.succ[v]
+                if pos < len(succ):
+                    work[-1] = (v, pos + 1)
+                    w = succ[pos]
+                    if order[w] == -1:
+                        order[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, 0))
+                    elif on_stack[w]:
+                        low[v] = min(low[v], order[w])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == order[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        self.scc_of[w] = len(self.sccs)
+                        component.append(w)
+                        if w == v:
+                            break
+                    self.sccs.append(component)
+
+    def _condense(self) -> None:
+        closures = []
+        for c, members in enumerate(self.sccs):
+            bits = 0
+            for v in members:
+                bits |= 1 << v
+                for w in self.succ[v]:
+                    if self.scc_of[w] != c:
+                        # Successor components were emitted (and closed) earlier
+                        bits |= closures[self.scc_of[w]]
+            closures.append(bits)
+        self._closures = closures
+
+        # Longest path from a root, walking the DAG sources first
+        depths = [0] * len(self.sccs)
+        for c in range(len(self.sccs) - 1, -1, -1):
+            for v in self.sccs[c]:
+                for w in self.succ[v]:
+                    s = self.scc_of[w]
+                    if s != c and depths[s] < depths[c] + 1:
+                        depths[s] = depths[c] + 1
+        self._depths = depths
+
+    # -- Queries -----------------------------------------------------------
+
+    def closure(self, name: str) -> set[str]:
+        """Nodes reachable from `name`, including itself."""
+        return {self.nodes[i] for i in _iter_bits(self._closures[self.scc_of[self.index[name]]])}
+
+    def transitive_count(self, name: str) -> int:
+        """Number of nodes reachable from `name`, not counting itself."""
+        return self._closures[self.scc_of[self.index[name]]].bit_count() - 1
+
+    def depth(self, name: str) -> int:
+        """Longest dependency path from a root (a node nothing depends on)."""
+        return self._depths[self.scc_of[self.index[name]]]
+
+    @property
+    def max_depth(self) -> int:
+        return max(self._depths, default=0)
+
+    def cycles(self) -> list[list[str]]:
+        """Components with more than one node (circular dependencies)."""
+        return [
+            sorted(self.nodes[v] for v in members)
+            for members in self.sccs
+            if len(members) > 1
+        ]
+
+    def reachable_from(self, names: Iterable[str]) -> set[str]:
+        """Union of the closures of `names` (names not in the graph are kept as-is)."""
+        bits = 0
+        extra = set()
+        for name in names:
+            if name in self.index:
+                bits |= self._closures[self.scc_of[self.index[name]]]
+            else:
+                extra.add(name)
+        return {self.nodes[i] for i in _iter_bits(bits)} | extra
+
+    def closure_totals(self, weights: Mapping[str, int]) -> dict[str, int]:
+        """Per node, the sum of `weights` over its closure (itself included).
+
+        With global GOT counts as weights this is the GOT pressure of the
+        load chain a library pulls in.
+        """
+        values = [weights.get(name, 0) for name in self.nodes]
+        per_scc = [sum(values[i] for i in _iter_bits(bits)) for bits in self._closures]
+        return {name: per_scc[self.scc_of[i]] for i, name in enumerate(self.nodes)}
@@ -1,10 +1,26 @@
 """Fedora repository access for fetching SRPMs."""
 
+import bisect
+import hashlib
 import re
+import sqlite3
+import time
 import urllib.request
+from collections import defaultdict
+from collections.abc import Callable
 from pathlib import Path
 from dataclasses import dataclass
 
+from mogrix.deps.download import DownloadRequest, DownloadResult, SRPMDownloader
+
+# Default location of the mogrix cache (listings, repometa databases)
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "mogrix"
+
+# How long a downloaded directory listing is trusted, in seconds
+LISTING_TTL = 24 * 60 * 60
+
+SRPM_HREF_RE = re.compile(r'href="([^"]+\.src\.rpm)"')
+
 
 @dataclass
 class SRPMInfo:
@@ -14,6 +30,8 @@ class SRPMInfo:
     release: str
     filename: str
     url: str
+    checksum: str = ""
+    checksum_type: str = ""
 
     @classmethod
     def from_filename(cls, filename: str, base_url: str) -> "SRPMInfo":
@@ -50,8 +68,72 @@ class SRPMInfo:
         )
 
 
+class PackageListing:
+    """In-memory name index over the SRPM filenames of one repo directory.
+
+    Prefix lookups bisect a sorted list of lowercased filenames; substring
+    (fuzzy) lookups go through a trigram index built on first use.
+    Listings loaded from repometa also carry each file's checksum.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        filenames: list[str],
+        checksums: dict[str, tuple[str, str]] | None = None,
+    ):
+        self.url = url
+        self.checksums = checksums or {}
+        entries = sorted({(f.lower(), f) for f in filenames})
+        self._lower = [low for low, _ in entries]
+        self._filenames = [f for _, f in entries]
+        self._trigrams: dict[str, set[int]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._filenames)
+
+    def prefix(self, term: str) -> list[str]:
+        """Filenames of packages named `term` or `term-...`/`term_...`."""
+        term = term.lower()
+        found: list[int] = []
+        for sep in ("-", "_"):
+            key = term + sep
+            i = bisect.bisect_left(self._lower, key)
+            while i < len(self._lower) and self._lower[i].startswith(key):
+                found.append(i)
+                i += 1
+        return [self._filenames[i] for i in sorted(found)]
+
+    def contains(self, term: str) -> list[str]:
+        """Filenames containing `term` anywhere (case-insensitive)."""
+        term = term.lower()
+        if len(term) < 3:
+            candidates = range(len(self._lower))
+        else:
+            trigrams = self._trigram_index()
+            sets = [trigrams.get(term[i:i + 3], set()) for i in range(len(term) - 2)]
+            candidates = sorted(set.intersection(*sets)) if sets else []
+        return [self._filenames[i] for i in candidates if term in self._lower[i]]
+
+    def _trigram_index(self) -> dict[str, set[int]]:
+        if self._trigrams is None:
+            index: dict[str, set[int]] = defaultdict(set)
+            for i, low in enumerate(self._lower):
+                for j in range(len(low) - 2):
+                    index[low[j:j + 3]].add(i)
+            self._trigrams = dict(index)
+        return self._trigrams
+
+
 class FedoraRepo:
-    """Access Fedora and other SRPM repositories."""
+    """Access Fedora and other SRPM repositories.
+
+    Package listings are fetched once per directory and kept in memory for
+    the lifetime of the repo object. With a cache_dir, listings are also
+    read from the repometa source primary database when `mogrix roadmap`
+    has downloaded it, or else cached on disk for LISTING_TTL seconds, so
+    repeated fetches make at most one listing request per refresh window.
+    """
 
     # Fedora archive base URL - this is the canonical source for SRPMs
     ARCHIVE_BASE = "https://archives.fedoraproject.org/pub/archive/fedora/linux/releases"
@@ -69,7 +151,13 @@ class FedoraRepo:
         "photon3": "https://packages.vmware.com/photon/3.0/photon_srpms_3.0_x86_64/",
     }
 
-    def __init__(self, release: str = "40", base_url: str | None = None):
+    def __init__(
+        self,
+        release: str = "40",
+        base_url: str | None = None,
+        cache_dir: Path | None = None,
+        listing_ttl: int = LISTING_TTL,
+    ):
         """Initialize with Fedora release version or custom URL.
 
         Args:
@@ -77,10 +165,18 @@ class FedoraRepo:
             base_url: Custom base URL or preset name (e.g., "photon5").
                       If URL ends with /, treated as flat directory.
                       Otherwise, uses Fedora-style structure.
+            cache_dir: mogrix cache directory (e.g. DEFAULT_CACHE_DIR) for
+                       persistent listings. None keeps listings in memory only.
+            listing_ttl: Seconds a cached listing page stays fresh.
         """
         self.release = release
         self._base_url = base_url
         self._is_flat = False
+        self.cache_dir = cache_dir
+        self.listing_ttl = listing_ttl
+        self._listings: dict[str, PackageListing] = {}
+        self._repometa_loaded = False
+        self._downloader: SRPMDownloader | None = None
 
         # Check for preset names
         if base_url and base_url.lower() in self.PRESETS:
@@ -119,52 +215,147 @@ class FedoraRepo:
             List of matching SRPMInfo objects
         """
         first_letter = search_term[0].lower()
-        url = self._get_package_list_url(first_letter)
-
-        try:
-            with urllib.request.urlopen(url, timeout=15) as response:
-                html = response.read().decode("utf-8")
-        except Exception as e:
-            raise RuntimeError(f"Failed to fetch package list: {e}")
-
-        # Find all SRPM files
-        pattern = r'href="([^"]+\.src\.rpm)"'
-        all_srpms = re.findall(pattern, html)
+        listing = self.get_listing(first_letter)
 
-        # Filter to those matching the search term
-        exact_matches = []
-        fuzzy_matches = []
-        search_lower = search_term.lower()
+        # Exact prefix match (package name starts with search term),
+        # falling back to fuzzy (search term appears anywhere in filename)
+        filenames = listing.prefix(search_term)
+        if not filenames and fuzzy:
+            filenames = listing.contains(search_term)
 
-        for filename in all_srpms:
-            filename_lower = filename.lower()
-
-            # Exact prefix match (package name starts with search term)
-            if filename_lower.startswith(search_lower + "-") or \
-               filename_lower.startswith(search_lower + "_"):
-                info = SRPMInfo.from_filename(filename, url)
-                exact_matches.append(info)
-            # Fuzzy match (search term appears anywhere in filename)
-            elif fuzzy and search_lower in filename_lower:
-                info = SRPMInfo.from_filename(filename, url)
-                fuzzy_matches.append(info)
-
-        # Prefer exact matches, fall back to fuzzy
-        matches = exact_matches if exact_matches else fuzzy_matches
+        matches = []
+        for filename in filenames:
+            info = SRPMInfo.from_filename(filename, listing.url)
+            if filename in listing.checksums:
+                info.checksum_type, info.checksum = listing.checksums[filename]
+            matches.append(info)
 
         # Sort by name, then version
         matches.sort(key=lambda x: (x.name, x.version))
 
         return matches
 
-    def get_srpm_url(self, package_name: str) -> str | None:
-        """Get the URL for a package's SRPM (exact match).
+    def get_listing(self, first_letter: str) -> PackageListing:
+        """Get the package listing for a first-letter directory.
 
-        Args:
-            package_name: Package name (e.g., "popt", "zlib")
+        Tries, in order: the in-memory listing, the repometa source primary
+        database, a fresh on-disk listing cache, and finally the HTML
+        directory listing (which is then cached).
+        """
+        url = self._get_package_list_url(first_letter)
+        if url in self._listings:
+            return self._listings[url]
+
+        self._load_repometa_listings()
+        if url in self._listings:
+            return self._listings[url]
+
+        filenames = self._read_cached_listing(url, fresh_only=True)
+        if filenames is None:
+            try:
+                filenames = self._fetch_listing_page(url)
+            except RuntimeError:
+                # Network trouble: a stale listing beats no listing
+                filenames = self._read_cached_listing(url, fresh_only=False)
+                if filenames is None:
+                    raise
+            else:
+                self._write_cached_listing(url, filenames)
+
+        listing = PackageListing(url, filenames)
+        self._listings[url] = listing
+        return listing
+
+    def _fetch_listing_page(self, url: str) -> list[str]:
+        """Download an HTML directory listing and extract SRPM filenames."""
+        try:
+            with urllib.request.urlopen(url, timeout=15) as response:
+                html = response.read().decode("utf-8")
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch package list: {e}")
 
-        Returns:
-            URL to the SRPM or None if not found
+        return SRPM_HREF_RE.findall(html)
+
+    def _listing_cache_path(self, url: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha256(url.encode()).hexdigest()[:24]
+        return self.cache_dir / "listings" / f"{digest}.txt"
+
+    def _read_cached_listing(self, url: str, fresh_only: bool) -> list[str] | None:
+        """Read a cached listing (first line is the URL, then one filename per line)."""
+        path = self._listing_cache_path(url)
+        if path is None or not path.exists():
+            return None
+        if fresh_only and time.time() - path.stat().st_mtime > self.listing_ttl:
+            return None
+        lines = path.read_text().splitlines()
+        if not lines or lines[0] != url:
+            return None
+        return lines[1:]
+
+    def _write_cached_listing(self, url: str, filenames: list[str]):
+        path = self._listing_cache_path(url)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text("\n".join([url, *filenames]) + "\n")
+        tmp.replace(path)
+
+    def _repometa_primary_path(self) -> Path | None:
+        """Source primary database downloaded by `mogrix roadmap`, if usable.
+
+        Only the default Fedora archive layout matches the repometa
+        'releases' source tree.
+        """
+        if self.cache_dir is None or self._base_url:
+            return None
+        path = (
+            self.cache_dir / "repometa" / f"fc{self.release}"
+            / "releases-source-primary.sqlite"
+        )
+        return path if path.exists() else None
+
+    def _load_repometa_listings(self):
+        """Populate every first-letter listing from the repometa source primary."""
+        if self._repometa_loaded:
+            return
+        self._repometa_loaded = True
+
+        path = self._repometa_primary_path()
+        if path is None:
+            return
+
+        by_dir: dict[str, list[str]] = defaultdict(list)
+        checksums: dict[str, dict[str, tuple[str, str]]] = defaultdict(dict)
+        try:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                rows = conn.execute(
+                    "SELECT location_href, checksum_type, pkgId FROM packages"
+                )
+                for href, checksum_type, pkg_id in rows:
+                    directory, _, filename = href.rpartition("/")
+                    by_dir[directory].append(filename)
+                    if checksum_type and pkg_id:
+                        checksums[directory][filename] = (checksum_type, pkg_id)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return
+
+        base = f"{self._get_base_url()}/{self.release}/Everything/source/tree/"
+        for directory, filenames in by_dir.items():
+            url = f"{base}{directory}/"
+            self._listings.setdefault(
+                url, PackageListing(url, filenames, checksums[directory])
+            )
+
+    def get_srpm_info(self, package_name: str) -> SRPMInfo | None:
+        """Get the best SRPM match for a package name.
+
+        Prefers an exact name match, else the first partial match.
         """
         matches = self.search_packages(package_name)
 
@@ -173,36 +364,86 @@ class FedoraRepo:
 
         if exact:
             # Return the first exact match
-            return exact[0].url
+            return exact[0]
         elif matches:
             # Return first partial match if no exact
-            return matches[0].url
+            return matches[0]
 
         return None
 
-    def download_srpm(self, url: str, output_dir: Path) -> Path:
+    def get_srpm_url(self, package_name: str) -> str | None:
+        """Get the URL for a package's SRPM (exact match).
+
+        Args:
+            package_name: Package name (e.g., "popt", "zlib")
+
+        Returns:
+            URL to the SRPM or None if not found
+        """
+        info = self.get_srpm_info(package_name)
+        return info.url if info else None
+
+    @property
+    def downloader(self) -> SRPMDownloader:
+        """Shared downloader, so connections are reused across downloads."""
+        if self._downloader is None:
+            self._downloader = SRPMDownloader()
+        return self._downloader
+
+    def close(self):
+        """Close the downloader's kept-alive connections."""
+        if self._downloader is not None:
+            self._downloader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def download_srpm(
+        self,
+        url: str,
+        output_dir: Path,
+        checksum: str = "",
+        checksum_type: str = "sha256",
+    ) -> Path:
         """Download an SRPM to a directory.
 
         Args:
             url: URL to the SRPM
             output_dir: Directory to save the file
+            checksum: Expected hex digest (e.g. from SRPMInfo.checksum);
+                      empty skips verification
+            checksum_type: hashlib algorithm name of checksum
 
         Returns:
             Path to the downloaded file
         """
-        filename = url.split("/")[-1]
-        output_path = output_dir / filename
-
-        with urllib.request.urlopen(url, timeout=120) as response:
-            total_size = response.headers.get("Content-Length")
-            if total_size:
-                total_size = int(total_size)
-
-            # Download with progress indication
-            data = response.read()
-            output_path.write_bytes(data)
+        return self.downloader.download(
+            url, output_dir, checksum, checksum_type or "sha256"
+        )
 
-        return output_path
+    def download_srpms(
+        self,
+        srpms: list[SRPMInfo],
+        output_dir: Path,
+        jobs: int = 4,
+        on_done: Callable[[DownloadResult], None] | None = None,
+    ) -> list[DownloadResult]:
+        """Download several SRPMs concurrently, verifying known checksums.
+
+        Returns one DownloadResult per SRPM, in order; failures are reported
+        in the result rather than raised. on_done is called with each result
+        as it finishes, for progress output.
+        """
+        requests = [
+            DownloadRequest(s.url, s.checksum, s.checksum_type or "sha256")
+            for s in srpms
+        ]
+        return self.downloader.download_many(
+            requests, output_dir, jobs=jobs, on_done=on_done
+        )
 
     def find_srpms_for_deps(self, dep_names: list[str]) -> dict[str, str | None]:
         """Find SRPM URLs for a list of dependencies.
@@ -0,0 +1,283 @@
+"""Persistent cache of ELF facts shared by check-elf, bundle and rld-harness.
+
+Bundling parses every library for NEEDED and SONAME (several times per
+build), check-elf parses the same libraries for ClassRec relocations, and
+`rld-harness analyze` parses them yet again for GOT and segment checks.
+Everything those tools ask about a file is collected in one pass into an
+ElfFacts record and stored in SQLite under the file's sha256:
+
+- Files on disk are looked up by (path, dev, inode, size, mtime). An
+  unchanged file is answered without reading it at all; a changed or new
+  path is hashed, and only parsed if no file with that content has been
+  seen before (the same library in another bundle is a hit).
+- In-memory images (check-elf reading RPM payloads) are looked up by the
+  sha256 of their bytes.
+- Files mipself cannot parse (not 32-bit ELF) are cached as such.
+
+Records are filled lazily by whichever tool parses a file first. Bump
+FACTS_VERSION when the record layout or any derived value changes.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from mogrix.analyzers.elf import find_class_recs, symbols_and_relocs
+from mogrix.blobstore import file_digest
+from mogrix.mipself import EM_MIPS, EM_MIPS_RS3_LE, read_elf
+
+# Default cache location (next to the other mogrix caches)
+DEFAULT_DB_PATH = Path.home() / ".cache" / "mogrix" / "elf-facts.db"
+
+FACTS_VERSION = 1
+
+
+@dataclass
+class ElfFacts:
+    """Everything check-elf, bundle and rld-harness read from one ELF file.
+
+    Method names mirror MipsElf where the harness uses them, so a record
+    can stand in for a parsed file.
+    """
+
+    machine: int
+    elf_type: str  # EXEC, DYN or ""
+    valid: bool  # an executable or shared object
+    soname: str | None
+    needed: list[str]
+    rpaths: list[str]  # DT_RPATH and DT_RUNPATH
+    local_gotno: int
+    gotsym: int
+    symtabno: int
+    global_got_count: int
+    load_segment_count: int
+    has_textrel: bool
+    has_verneed: bool
+    has_dt_init: bool
+    init_array: bool
+    ctors: bool
+    symbol_count: int
+    undefined_symbols: int
+    rel32_total: int
+    rel32_undef: int
+    # ClassRecs with UNDEF R_MIPS_REL32 targets:
+    # [name, address, size, binding, [[offset, sym_name], ...]]
+    class_recs: list = field(default_factory=list)
+    # MipsElf.run_all_checks(): [name, passed, message]
+    rld_checks: list = field(default_factory=list)
+    # File name the record was looked up under (not cached)
+    name: str = field(default="", compare=False)
+
+    @classmethod
+    def from_elf(cls, elf) -> "ElfFacts":
+        """Collect the facts of a parsed MipsElf."""
+        symbols, relocs = symbols_and_relocs(elf)
+        undef_relocs = [r for r in relocs if r.sym_value == 0]
+        return cls(
+            machine=elf.machine,
+            elf_type=elf.elf_type,
+            valid=elf.valid,
+            soname=elf.soname(),
+            needed=elf.needed_sonames(),
+            rpaths=elf.rpaths(),
+            local_gotno=elf.local_gotno,
+            gotsym=elf.gotsym,
+            symtabno=elf.symtabno,
+            global_got_count=elf.global_got_count,
+            load_segment_count=len(elf.load_segments),
+            has_textrel=elf.has_textrel(),
+            has_verneed=elf.has_verneed(),
+            has_dt_init=elf.has_dt_init(),
+            init_array=elf.has_init_array(),
+            ctors=elf.has_ctors(),
+            symbol_count=len(symbols),
+            undefined_symbols=sum(1 for s in symbols if s.section == "UND"),
+            rel32_total=len(relocs),
+            rel32_undef=len(undef_relocs),
+            class_recs=[
+                [f.name, f.address, f.size, f.binding,
+                 [[r.offset, r.sym_name] for r in f.at_risk_relocs]]
+                for f in find_class_recs(symbols, undef_relocs)
+            ],
+            rld_checks=[list(check) for check in elf.run_all_checks()],
+            name=elf.name,
+        )
+
+    @property
+    def is_mips(self) -> bool:
+        return self.machine in (EM_MIPS, EM_MIPS_RS3_LE)
+
+    def needed_sonames(self) -> list[str]:
+        return self.needed
+
+    def has_init_array(self) -> bool:
+        return self.init_array
+
+    def has_ctors(self) -> bool:
+        return self.ctors
+
+    def run_all_checks(self) -> list:
+        return self.rld_checks
+
+
+def _to_json(facts: ElfFacts | None) -> str:
+    if facts is None:
+        return "null"
+    data = asdict(facts)
+    del data["name"]
+    return json.dumps(data)
+
+
+def _from_json(text: str, name: str) -> ElfFacts | None:
+    data = json.loads(text)
+    if data is None:
+        return None
+    return ElfFacts(**data, name=name)
+
+
+class ElfFactsCache:
+    """SQLite store of ElfFacts keyed by content sha256.
+
+    The database is opened on first use, so a cache can be handed to code
+    that may never need it. Safe to share between processes (WAL).
+    """
+
+    def __init__(self, db_path: Path | None = None):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS facts (
+                    sha256 TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    facts TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    dev INTEGER NOT NULL,
+                    ino INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL
+                );
+            """)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _load(self, digest: str, name: str) -> tuple[bool, ElfFacts | None]:
+        row = self.conn.execute(
+            "SELECT facts FROM facts WHERE sha256 = ? AND version = ?",
+            (digest, FACTS_VERSION),
+        ).fetchone()
+        if row is None:
+            return False, None
+        return True, _from_json(row[0], name)
+
+    def _store(self, digest: str, facts: ElfFacts | None) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO facts (sha256, version, facts) VALUES (?, ?, ?)",
+                (digest, FACTS_VERSION, _to_json(facts)),
+            )
+
+    def _parse(self, digest: str, path: Path, data: bytes | None) -> ElfFacts | None:
+        elf = read_elf(path, data)
+        if elf is None:
+            facts = None
+        else:
+            with elf:
+                facts = ElfFacts.from_elf(elf)
+        self._store(digest, facts)
+        return facts
+
+    def lookup(self, path: Path) -> ElfFacts | None:
+        """Facts for a file on disk (symlinks are followed), parsing it
+        only if its content has not been seen. None if it is not a 32-bit
+        ELF file."""
+        path = Path(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = str(path.resolve())
+        stamp = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+        row = self.conn.execute(
+            "SELECT dev, ino, size, mtime_ns, sha256 FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        if row is not None and tuple(row[:4]) == stamp:
+            found, facts = self._load(row[4], path.name)
+            if found:
+                return facts
+
+        digest = file_digest(path)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, dev, ino, size, mtime_ns, sha256)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, *stamp, digest),
+            )
+        found, facts = self._load(digest, path.name)
+        if found:
+            return facts
+        return self._parse(digest, path, None)
+
+    def lookup_data(self, path: Path, data: bytes) -> ElfFacts | None:
+        """Facts for an in-memory image; `path` only names it."""
+        digest = hashlib.sha256(data).hexdigest()
+        found, facts = self._load(digest, Path(path).name)
+        if found:
+            return facts
+        return self._parse(digest, Path(path), data)
+
+    def prune(self, dry_run: bool = False) -> tuple[int, int]:
+        """Drop records lookups can no longer hit.
+
+        A files row goes when its path is gone or has changed since it was
+        hashed; a facts record goes when no files row refers to it (this
+        includes in-memory images) or it is from an older FACTS_VERSION.
+        Returns (files rows, facts records) removed.
+        """
+        stale = []
+        for path, *stamp in self.conn.execute(
+            "SELECT path, dev, ino, size, mtime_ns FROM files"
+        ).fetchall():
+            try:
+                st = os.stat(path)
+            except OSError:
+                stale.append((path,))
+                continue
+            if (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns) != tuple(stamp):
+                stale.append((path,))
+
+        self.conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        facts = self.conn.execute(
+            "DELETE FROM facts WHERE version != ?"
+            " OR sha256 NOT IN (SELECT sha256 FROM files)",
+            (FACTS_VERSION,),
+        ).rowcount
+        if dry_run:
+            self.conn.rollback()
+        else:
+            self.conn.commit()
+        return len(stale), facts
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "facts": self.conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0],
+            "files": self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+        }
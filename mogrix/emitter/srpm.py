@@ -4,6 +4,8 @@ import subprocess
 import tempfile
 from pathlib import Path
 
+from mogrix.blobstore import place
+
 
 class SRPMEmitter:
     """Emits SRPM files from converted specs and sources."""
@@ -51,23 +53,12 @@ class SRPMEmitter:
         spec_path = self.rpmbuild_dir / "SPECS" / spec_name
         spec_path.write_text(spec_content)
 
-        # Copy sources to SOURCES directory
+        # Link sources into SOURCES directory (hardlink, else reflink/copy)
         sources_dir = self.rpmbuild_dir / "SOURCES"
 
-        if sources:
-            for src in sources:
-                if src.exists():
-                    shutil.copy2(src, sources_dir / src.name)
-
-        if patches:
-            for patch in patches:
-                if patch.exists():
-                    shutil.copy2(patch, sources_dir / patch.name)
-
-        if compat_sources:
-            for compat in compat_sources:
-                if compat.exists():
-                    shutil.copy2(compat, sources_dir / compat.name)
+        for src in [*(sources or []), *(patches or []), *(compat_sources or [])]:
+            if src.exists():
+                place(src, sources_dir / src.name)
 
         # Build SRPM using rpmbuild -bs
         cmd = [
@@ -0,0 +1,194 @@
+"""Persistent cache of extracted RPM payloads.
+
+Every bundle build used to run `rpm2cpio | cpio` for each included RPM,
+even though the same glib2 or ncurses RPM goes into dozens of bundles.
+Payloads are now extracted once, in-process, into a tree keyed by the
+RPM's sha256:
+
+    root/ab/abcdef.../usr/sgug/lib32/libfoo.so.1
+
+Bundles are assembled from these trees by hardlinking (see
+blobstore.place), so a file shared with the cache must be replaced,
+never modified in place.
+
+File modes are normalized at extraction the same way create_bundle
+always fixed them up (world-readable, executable for all if the owner
+may execute), so that pass never changes a cached inode.
+
+Member paths are confined to the tree: a payload with ".." components, or
+one that writes through a symlink it created earlier, fails extraction
+(cpio's own checks did this when payloads were unpacked with cpio -idm).
+
+A tree is written under a temporary name and renamed into place when
+complete, so an interrupted extraction leaves nothing behind that could
+be mistaken for a finished one.
+
+Trees are kept until `mogrix gc` evicts those of RPMs the catalog no
+longer knows (see gc()).
+"""
+
+import os
+import shutil
+import stat
+from pathlib import Path
+from typing import Callable
+
+from mogrix.rpm_payload import PayloadMember, iter_payload
+
+# Default cache location (next to the other mogrix caches)
+DEFAULT_EXTRACT_DIR = Path.home() / ".cache" / "mogrix" / "extract"
+
+
+def _file_mode(mode: int) -> int:
+    mode &= 0o7777
+    return mode | 0o444 | (0o111 if mode & 0o100 else 0)
+
+
+def _member_target(dest: Path, path: str) -> Path:
+    """Where a payload member goes under dest.
+
+    Raises RuntimeError for paths that would leave dest: ".." components
+    or a parent directory that is a symlink.
+    """
+    parts = [part for part in path.split("/") if part not in ("", ".")]
+    if ".." in parts:
+        raise RuntimeError(f"payload member outside the tree: {path}")
+    parent = dest
+    for part in parts[:-1]:
+        parent = parent / part
+        if parent.is_symlink():
+            raise RuntimeError(f"payload member below a symlink: {path}")
+    return dest.joinpath(*parts)
+
+
+def _pid_alive(pid: str) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass  # someone else's process
+    return True
+
+
+class ExtractCache:
+    """Extracted RPM payloads under root/ab/<sha256>/."""
+
+    def __init__(self, root: Path | None = None):
+        self.root = root or DEFAULT_EXTRACT_DIR
+
+    def tree_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256
+
+    def get(self, sha256: str) -> Path | None:
+        """The extracted tree for this RPM checksum, if there is one."""
+        tree = self.tree_path(sha256)
+        return tree if tree.is_dir() else None
+
+    def gc(self, keep: set[str], dry_run: bool = False) -> tuple[int, int]:
+        """Remove trees whose sha256 is not in keep, and abandoned temporaries.
+
+        A temporary tree is abandoned when the process that wrote it is
+        gone. Returns (trees removed, bytes freed); files still hardlinked
+        into bundles are counted although their data stays on disk.
+        """
+        removed = 0
+        freed = 0
+        if not self.root.exists():
+            return removed, freed
+        for tree in sorted(self.root.glob("*/*")):
+            if tree.name.startswith(".tmp-"):
+                if _pid_alive(tree.name.rsplit("-", 1)[-1]):
+                    continue
+            elif tree.name in keep:
+                continue
+            removed += 1
+            freed += sum(
+                (Path(dirpath) / name).lstat().st_size
+                for dirpath, _dirnames, filenames in os.walk(tree)
+                for name in filenames
+            )
+            if not dry_run:
+                shutil.rmtree(tree)
+        return removed, freed
+
+    def extract(
+        self,
+        rpm_path: Path,
+        sha256: str,
+        on_member: Callable[[PayloadMember], None] | None = None,
+    ) -> Path:
+        """Extract an RPM (unless already cached) and return its tree.
+
+        on_member sees every payload member as it is written, with its
+        data, so callers can inspect files without reading them back.
+
+        Raises RuntimeError if the payload cannot be read or has members
+        outside the tree.
+        """
+        tree = self.tree_path(sha256)
+        if tree.is_dir():
+            return tree
+
+        tree.parent.mkdir(parents=True, exist_ok=True)
+        tmp = tree.parent / f".tmp-{sha256}-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        try:
+            self._write_tree(rpm_path, tmp, on_member)
+            try:
+                tmp.rename(tree)
+            except OSError:
+                # Another process finished the same RPM first
+                if not tree.is_dir():
+                    raise
+                shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return tree
+
+    def _write_tree(
+        self,
+        rpm_path: Path,
+        dest: Path,
+        on_member: Callable[[PayloadMember], None] | None,
+    ) -> None:
+        dest.mkdir()
+        dir_modes: dict[Path, int] = {}
+        # Hardlink sets: earlier links carry no data, the last one does
+        pending_links: dict[int, list[Path]] = {}
+
+        for member in iter_payload(rpm_path):
+            target = _member_target(dest, member.path)
+            if target == dest:
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            if member.is_symlink:
+                if not os.path.lexists(target):
+                    os.symlink(os.fsdecode(member.data), target)
+            elif member.is_file:
+                if member.data is None and member.nlink > 1:
+                    pending_links.setdefault(member.ino, []).append(target)
+                else:
+                    target.unlink(missing_ok=True)
+                    target.write_bytes(member.data or b"")
+                    os.chmod(target, _file_mode(member.mode))
+                    for link in pending_links.pop(member.ino, []):
+                        link.unlink(missing_ok=True)
+                        os.link(target, link)
+            elif stat.S_ISDIR(member.mode):
+                if target.is_symlink():
+                    raise RuntimeError(f"payload directory is a symlink: {member.path}")
+                target.mkdir(exist_ok=True)
+                dir_modes[target] = (member.mode & 0o7777) | 0o755
+            if on_member is not None:
+                on_member(member)
+
+        # Hardlink sets whose data-bearing link never came are empty files
+        for links in pending_links.values():
+            for link in links:
+                link.write_bytes(b"")
+        # Directory modes last, so restrictive ones don't block extraction
+        for path, mode in dir_modes.items():
+            os.chmod(path, mode)
@@ -0,0 +1,641 @@
+"""Zero-copy ELF reader for MIPS n32 binaries.
+
+Promoted from tools/rld-harness.py (itself adapted from
+cross/bin/fix-got-stubs and cross/bin/fix-anon-relocs). The file is
+memory-mapped; the ELF, program and section headers are parsed up front,
+while the dynamic section, symbol tables and relocations are decoded on
+first use. A `mogrix check-elf` run over a bundle used to fork readelf
+five times per binary; this reads the same facts straight from the pages
+the kernel already has cached.
+
+Used by analyzers/elf.py (check-elf), bundle.py (NEEDED/SONAME scans),
+tools/rld-harness.py and tests/rld/verify_elf.py.
+
+Only 32-bit ELF is parsed (IRIX n32/o32); both byte orders are accepted.
+Anything else sets `error` and leaves `parsed` False so callers can fall
+back to readelf.
+"""
+
+import mmap
+import struct
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+# --- Thresholds from rld decompilation + production experience ---
+
+THRESHOLDS = {
+    "global_got_limit": 4370,       # rld can't fill GOT above this
+    "local_gotno_reencounter": 128,  # dlopen re-encounter danger zone
+    "multi_got_trigger": 16384,     # LLD default --mips-got-size split
+}
+
+ELF_MAGIC = b"\x7fELF"
+
+EM_MIPS = 8
+EM_MIPS_RS3_LE = 10
+
+# Symbol type/binding names as printed by readelf -s
+_SYM_TYPES = {
+    0: "NOTYPE", 1: "OBJECT", 2: "FUNC", 3: "SECTION",
+    4: "FILE", 5: "COMMON", 6: "TLS", 10: "IFUNC",
+}
+_SYM_BINDS = {0: "LOCAL", 1: "GLOBAL", 2: "WEAK", 10: "UNIQUE"}
+_SPECIAL_SHNDX = {
+    0: "UND", 0xFFF1: "ABS", 0xFFF2: "COM",
+    0xFF00: "ANSI_COM", 0xFF01: "MIPS_TEXT", 0xFF02: "MIPS_DATA",
+    0xFF03: "SCOM", 0xFF04: "SUND",
+}
+
+STT_SECTION = 3
+R_MIPS_REL32 = 3
+
+
+@dataclass
+class Symbol:
+    """A symbol table entry (from .dynsym or .symtab)."""
+
+    name: str
+    value: int
+    size: int
+    sym_type: str  # FUNC, OBJECT, NOTYPE, etc.
+    binding: str  # LOCAL, GLOBAL, WEAK
+    section: str  # UND, ABS, COM or section index
+    table: str  # section the entry came from
+
+
+@dataclass
+class Relocation:
+    """A REL/RELA entry with its symbol resolved."""
+
+    offset: int
+    rtype: int
+    sym_index: int
+    sym_name: str  # "" when sym_index is 0
+    sym_value: int
+    section: str  # relocation section name
+
+
+class MipsElf:
+    """Parse a MIPS n32 ELF binary for rld analysis.
+
+    Pass `data` (bytes) to parse an in-memory image instead of mapping
+    `path`; `path` is then only used for naming.
+    """
+
+    # ELF constants
+    ET_EXEC = 2
+    ET_DYN = 3
+    PT_LOAD = 1
+    PT_DYNAMIC = 2
+    SHT_SYMTAB = 2
+    SHT_RELA = 4
+    SHT_REL = 9
+    SHT_DYNSYM = 11
+    DT_NEEDED = 1
+    DT_STRTAB = 5
+    DT_INIT = 12
+    DT_SONAME = 14
+    DT_RPATH = 15
+    DT_TEXTREL = 22
+    DT_RUNPATH = 29
+    DT_FLAGS = 30
+    DF_TEXTREL = 0x4
+    DT_VERNEED = 0x6FFFFFFE
+    DT_VERSYM = 0x6FFFFFF0
+    DT_VERNEEDNUM = 0x6FFFFFFF
+    DT_MIPS_LOCAL_GOTNO = 0x7000000A
+    DT_MIPS_SYMTABNO = 0x70000011
+    DT_MIPS_GOTSYM = 0x70000013
+
+    _end = ">"  # struct byte order, from EI_DATA
+
+    def __init__(self, path, data: bytes | None = None):
+        self.path = Path(path)
+        self.name = self.path.name
+        self.parsed = False  # headers decoded (any 32-bit ELF)
+        self.valid = False  # parsed and an executable or shared object
+        self.is_shared = False
+        self.is_exec = False
+        self.machine = 0
+        self.error = None
+
+        self.got_offset = 0
+        self.got_size = 0
+        self.got_addr = 0
+        self.stubs_addr = 0
+        self.stubs_size = 0
+        self.load_segments = []
+        self.sections = {}  # name -> {addr, offset, size, type, link, entsize}
+        self.section_names = []
+        self.dynsym_offset = 0
+        self.dynsym_entsize = 16
+        self.dynsym_count = 0
+        self.strtab_offset = 0
+        self._section_list = []  # by index: (name, type, offset, size, link, entsize)
+        self._dyn_offset = 0
+        self._dyn_size = 0
+
+        self._map = None
+        if data is None:
+            try:
+                with open(self.path, "rb") as f:
+                    # mmap keeps its own reference; the fd can be closed
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                # ValueError: empty file (cannot map zero bytes)
+                self.data = b""
+                self.error = "Not an ELF file" if isinstance(e, ValueError) else str(e)
+                return
+            self.data = self._map
+        else:
+            self.data = data
+
+        self._parse()
+
+    def close(self) -> None:
+        """Unmap the file. Attributes already read stay usable."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _r32(self, off):
+        return struct.unpack_from(self._end + "I", self.data, off)[0]
+
+    def _r16(self, off):
+        return struct.unpack_from(self._end + "H", self.data, off)[0]
+
+    def _r8(self, off):
+        return self.data[off]
+
+    def _rs32(self, off):
+        return struct.unpack_from(self._end + "i", self.data, off)[0]
+
+    def _read_cstring(self, off):
+        end = self.data.find(b"\0", off)
+        if end < 0:
+            raise ValueError(f"unterminated string at 0x{off:x}")
+        return self.data[off:end].decode("ascii", errors="replace")
+
+    def _parse(self):
+        d = self.data
+        if len(d) < 52 or d[:4] != ELF_MAGIC:
+            self.error = "Not an ELF file"
+            return
+        if d[5] not in (1, 2):
+            self.error = "Unknown ELF byte order"
+            return
+        self._end = ">" if d[5] == 2 else "<"
+        # e_machine sits at the same offset in ELF32 and ELF64
+        self.machine = self._r16(18)
+        if d[4] != 1:  # ELFCLASS32
+            self.error = "Not 32-bit ELF"
+            return
+
+        e_type = self._r16(16)
+        self.is_shared = (e_type == self.ET_DYN)
+        self.is_exec = (e_type == self.ET_EXEC)
+
+        # ELF header fields
+        e_phoff = self._r32(28)
+        e_shoff = self._r32(32)
+        e_phentsize = self._r16(42)
+        e_phnum = self._r16(44)
+        e_shentsize = self._r16(46)
+        e_shnum = self._r16(48)
+        e_shstrndx = self._r16(50)
+
+        try:
+            self._parse_program_headers(e_phoff, e_phentsize, e_phnum)
+            self._parse_section_headers(e_shoff, e_shentsize, e_shnum, e_shstrndx)
+        except struct.error:
+            self.error = "Truncated ELF headers"
+            return
+
+        self.parsed = True
+        if not self.is_shared and not self.is_exec:
+            self.error = f"Unexpected ELF type {e_type}"
+            return
+        self.valid = True
+
+    def _parse_program_headers(self, e_phoff, e_phentsize, e_phnum):
+        fmt = self._end + "8I"
+        for i in range(e_phnum):
+            (p_type, p_offset, p_vaddr, _paddr, p_filesz,
+             p_memsz, p_flags, _align) = struct.unpack_from(fmt, self.data, e_phoff + i * e_phentsize)
+            if p_type == self.PT_LOAD:
+                self.load_segments.append({
+                    'vaddr': p_vaddr, 'offset': p_offset,
+                    'filesz': p_filesz, 'memsz': p_memsz,
+                    'flags': p_flags,
+                })
+            elif p_type == self.PT_DYNAMIC:
+                self._dyn_offset = p_offset
+                self._dyn_size = p_filesz
+
+    def _parse_section_headers(self, e_shoff, e_shentsize, e_shnum, e_shstrndx):
+        if e_shoff == 0 or e_shnum == 0:
+            return
+        fmt = self._end + "10I"
+        headers = [
+            struct.unpack_from(fmt, self.data, e_shoff + i * e_shentsize)
+            for i in range(e_shnum)
+        ]
+        shstr_off = headers[e_shstrndx][4] if e_shstrndx < e_shnum else 0
+
+        for i, (sh_name_off, sh_type, _flags, sh_addr, sh_offset, sh_size,
+                sh_link, _info, _align, sh_entsize) in enumerate(headers):
+            try:
+                name = self._read_cstring(shstr_off + sh_name_off)
+            except (ValueError, IndexError):
+                name = f"<section_{i}>"
+
+            self._section_list.append((name, sh_type, sh_offset, sh_size, sh_link, sh_entsize))
+            self.section_names.append(name)
+            self.sections[name] = {
+                'addr': sh_addr, 'offset': sh_offset,
+                'size': sh_size, 'type': sh_type,
+                'link': sh_link, 'entsize': sh_entsize,
+            }
+
+            if name == '.got':
+                self.got_addr = sh_addr
+                self.got_offset = sh_offset
+                self.got_size = sh_size
+            elif name == '.MIPS.stubs':
+                self.stubs_addr = sh_addr
+                self.stubs_size = sh_size
+            elif sh_type == self.SHT_DYNSYM:
+                self.dynsym_offset = sh_offset
+                self.dynsym_entsize = sh_entsize or 16
+                self.dynsym_count = sh_size // (sh_entsize or 16)
+                # .dynstr is the linked section
+                if sh_link < e_shnum:
+                    self.strtab_offset = headers[sh_link][4]
+
+    # --- Dynamic section (decoded on first use) ---
+
+    @cached_property
+    def dynamic_tag_list(self) -> list[tuple[int, int]]:
+        """(tag, value) pairs in file order, up to DT_NULL."""
+        tags = []
+        if not self.parsed or self._dyn_offset == 0:
+            return tags
+        count = (min(self._dyn_offset + self._dyn_size, len(self.data)) - self._dyn_offset) // 8
+        raw = self.data[self._dyn_offset:self._dyn_offset + max(count, 0) * 8]
+        for d_tag, d_val in struct.iter_unpack(self._end + "iI", raw):
+            if d_tag == 0:
+                break
+            tags.append((d_tag, d_val))
+        return tags
+
+    @cached_property
+    def dynamic_tags(self) -> dict[int, int]:
+        """First value of each dynamic tag (NEEDED repeats; see dynamic_tag_list)."""
+        tags = {}
+        for d_tag, d_val in self.dynamic_tag_list:
+            tags.setdefault(d_tag, d_val)
+        return tags
+
+    @property
+    def local_gotno(self):
+        return self.dynamic_tags.get(self.DT_MIPS_LOCAL_GOTNO, 0)
+
+    @property
+    def gotsym(self):
+        return self.dynamic_tags.get(self.DT_MIPS_GOTSYM, 0)
+
+    @property
+    def symtabno(self):
+        return self.dynamic_tags.get(self.DT_MIPS_SYMTABNO, 0)
+
+    @property
+    def global_got_count(self):
+        if self.gotsym and self.symtabno:
+            return self.symtabno - self.gotsym
+        return 0
+
+    @property
+    def is_mips(self) -> bool:
+        return self.machine in (EM_MIPS, EM_MIPS_RS3_LE)
+
+    @property
+    def elf_type(self) -> str:
+        """"EXEC", "DYN" or "" (as in readelf -h)."""
+        if self.is_exec:
+            return "EXEC"
+        if self.is_shared:
+            return "DYN"
+        return ""
+
+    def _dynstr(self, val):
+        if not self.strtab_offset:
+            return None
+        try:
+            return self._read_cstring(self.strtab_offset + val)
+        except (ValueError, IndexError):
+            return f"<strtab+{val}>"
+
+    def _dynstr_values(self, tag):
+        result = []
+        for t, val in self.dynamic_tag_list:
+            if t == tag:
+                name = self._dynstr(val)
+                if name is not None:
+                    result.append(name)
+        return result
+
+    def needed_sonames(self):
+        """Return list of DT_NEEDED sonames in order."""
+        return self._dynstr_values(self.DT_NEEDED)
+
+    def soname(self) -> str | None:
+        """DT_SONAME, or None if the object has none."""
+        names = self._dynstr_values(self.DT_SONAME)
+        return names[0] if names else None
+
+    def rpaths(self) -> list[str]:
+        """DT_RPATH and DT_RUNPATH strings, in file order."""
+        return [
+            self._dynstr(val) or ""
+            for tag, val in self.dynamic_tag_list
+            if tag in (self.DT_RPATH, self.DT_RUNPATH)
+        ]
+
+    def has_rpath(self):
+        return (self.DT_RPATH in self.dynamic_tags or
+                self.DT_RUNPATH in self.dynamic_tags)
+
+    def has_textrel(self):
+        return (self.DT_TEXTREL in self.dynamic_tags or
+                bool(self.dynamic_tags.get(self.DT_FLAGS, 0) & self.DF_TEXTREL))
+
+    def has_verneed(self):
+        return (self.DT_VERNEED in self.dynamic_tags or
+                self.DT_VERSYM in self.dynamic_tags or
+                self.DT_VERNEEDNUM in self.dynamic_tags)
+
+    def has_dt_init(self):
+        return self.DT_INIT in self.dynamic_tags
+
+    def has_init_array(self):
+        return '.init_array' in self.sections
+
+    def has_ctors(self):
+        return '.ctors' in self.sections
+
+    def vaddr_to_foff(self, va):
+        """Convert virtual address to file offset."""
+        for seg in self.load_segments:
+            if seg['vaddr'] <= va < seg['vaddr'] + seg['filesz']:
+                return seg['offset'] + (va - seg['vaddr'])
+        return None
+
+    # --- Symbols and relocations (decoded on first use) ---
+
+    def _symbol_table(self, index):
+        """Decode the symbol table in section `index`, in entry order."""
+        cache = self.__dict__.setdefault("_symtabs", {})
+        if index in cache:
+            return cache[index]
+
+        name, _type, offset, size, link, entsize = self._section_list[index]
+        strtab_off = self._section_list[link][2] if link < len(self._section_list) else 0
+        entsize = entsize or 16
+        end = min(offset + size, len(self.data))
+        count = max(end - offset, 0) // entsize
+        fmt = struct.Struct(self._end + "IIIBBH")
+
+        symbols = []
+        for i in range(count):
+            st_name, st_value, st_size, st_info, _other, st_shndx = fmt.unpack_from(
+                self.data, offset + i * entsize,
+            )
+            sym_type = st_info & 0xF
+            if st_name == 0 and sym_type == STT_SECTION and st_shndx < len(self._section_list):
+                sym_name = self._section_list[st_shndx][0]
+            else:
+                try:
+                    sym_name = self._read_cstring(strtab_off + st_name)
+                except (ValueError, IndexError):
+                    sym_name = f"<strtab+{st_name}>"
+            symbols.append(Symbol(
+                name=sym_name,
+                value=st_value,
+                size=st_size,
+                sym_type=_SYM_TYPES.get(sym_type, str(sym_type)),
+                binding=_SYM_BINDS.get(st_info >> 4, str(st_info >> 4)),
+                section=_SPECIAL_SHNDX.get(st_shndx, str(st_shndx)),
+                table=name,
+            ))
+        cache[index] = symbols
+        return symbols
+
+    @cached_property
+    def symbols(self) -> list[Symbol]:
+        """Entries of every .dynsym and .symtab, in section order.
+
+        Null entries and unnamed symbols are left out, as readelf -s shows
+        them without a name.
+        """
+        result = []
+        for i, (_name, sh_type, *_rest) in enumerate(self._section_list):
+            if sh_type in (self.SHT_SYMTAB, self.SHT_DYNSYM):
+                result.extend(s for s in self._symbol_table(i) if s.name and s.sym_type != "SECTION")
+        return result
+
+    @cached_property
+    def relocations(self) -> list[Relocation]:
+        """Entries of every SHT_REL and SHT_RELA section, in section order."""
+        result = []
+        for name, sh_type, offset, size, link, entsize in self._section_list:
+            if sh_type not in (self.SHT_REL, self.SHT_RELA):
+                continue
+            rela = sh_type == self.SHT_RELA
+            entsize = entsize or (12 if rela else 8)
+            symtab = []
+            if link and link < len(self._section_list) and \
+                    self._section_list[link][1] in (self.SHT_SYMTAB, self.SHT_DYNSYM):
+                symtab = self._symbol_table(link)
+            end = min(offset + size, len(self.data))
+            fmt = struct.Struct(self._end + "II")
+            for pos in range(offset, end - entsize + 1, entsize):
+                r_offset, r_info = fmt.unpack_from(self.data, pos)
+                sym_index = r_info >> 8
+                sym = symtab[sym_index] if 0 < sym_index < len(symtab) else None
+                result.append(Relocation(
+                    offset=r_offset,
+                    rtype=r_info & 0xFF,
+                    sym_index=sym_index,
+                    sym_name=sym.name if sym else "",
+                    sym_value=sym.value if sym else 0,
+                    section=name,
+                ))
+        return result
+
+    # --- Check methods (return (passed: bool, message: str)) ---
+
+    def check_load_segments(self):
+        count = len(self.load_segments)
+        if count == 2:
+            return True, f"{count} LOAD segments"
+        return False, f"{count} LOAD segments (expected 2, rld crashes on 3)"
+
+    def check_no_verneed(self):
+        if self.has_verneed():
+            tags = []
+            if self.DT_VERNEED in self.dynamic_tags:
+                tags.append("VERNEED")
+            if self.DT_VERSYM in self.dynamic_tags:
+                tags.append("VERSYM")
+            return False, f"has version tags: {', '.join(tags)}"
+        return True, "no version tags"
+
+    def check_no_init_array(self):
+        issues = []
+        if self.has_init_array():
+            issues.append("has .init_array (rld ignores)")
+        if not self.has_ctors():
+            issues.append("missing .ctors")
+        if issues:
+            return False, "; ".join(issues)
+        return True, "uses .ctors"
+
+    def check_dt_init(self):
+        if self.has_dt_init():
+            return True, "DT_INIT present"
+        return False, "no DT_INIT tag"
+
+    def check_got_thresholds(self):
+        gc = self.global_got_count
+        limit = THRESHOLDS["global_got_limit"]
+        if gc >= limit:
+            return False, f"global GOT {gc} >= {limit} threshold"
+        if gc > limit * 0.8:
+            return True, f"global GOT {gc} (WARNING: >{int(limit*0.8)}, approaching limit)"
+        return True, f"global GOT {gc}"
+
+    def check_no_rpath(self):
+        if self.has_rpath():
+            return False, "has RPATH/RUNPATH (build paths break rld)"
+        return True, "no RPATH"
+
+    def check_stub_alignment(self):
+        """Verify GOT[LOCAL_GOTNO+i] = stubs_base + i*16."""
+        if self.got_size == 0 or self.stubs_size == 0:
+            return True, "no stubs section (static or exe)"
+        if self.local_gotno == 0 or self.global_got_count == 0:
+            return True, "no global GOT entries"
+
+        first_global_off = self.got_offset + self.local_gotno * 4
+        if first_global_off + 4 > len(self.data):
+            return False, "GOT offset out of bounds"
+
+        current_first = self._r32(first_global_off)
+        expected_first = self.stubs_addr
+
+        if current_first == expected_first:
+            return True, "GOT-stub alignment correct"
+
+        # Check reversed pattern
+        num_stubs = self.stubs_size // 16
+        if num_stubs > 0:
+            expected_reversed = self.stubs_addr + (num_stubs - 1) * 16
+            if current_first == expected_reversed:
+                return False, "GOT-stub REVERSED (fix-got-stubs not applied)"
+
+        return False, f"GOT[{self.local_gotno}]=0x{current_first:08x}, expected 0x{expected_first:08x}"
+
+    def run_all_checks(self):
+        """Run all checks, return list of (name, passed, message)."""
+        checks = [
+            ("load_segments", self.check_load_segments),
+            ("no_verneed", self.check_no_verneed),
+            ("no_init_array", self.check_no_init_array),
+            ("dt_init", self.check_dt_init),
+            ("got_thresholds", self.check_got_thresholds),
+            ("no_rpath", self.check_no_rpath),
+            ("stub_alignment", self.check_stub_alignment),
+        ]
+        results = []
+        for name, fn in checks:
+            try:
+                passed, msg = fn()
+                results.append((name, passed, msg))
+            except Exception as e:
+                results.append((name, False, f"ERROR: {e}"))
+        return results
+
+    # --- GOT inspection methods ---
+
+    def read_got_entries(self):
+        """Read all GOT entries as list of 32-bit values."""
+        if self.got_size == 0:
+            return []
+        end = min(self.got_offset + (self.got_size // 4) * 4, len(self.data))
+        end -= (end - self.got_offset) % 4
+        return [v for (v,) in struct.iter_unpack(self._end + "I", self.data[self.got_offset:end])]
+
+    def read_dynsym_entries(self):
+        """Read .dynsym entries: list of (index, name, value, size, bind, type, vis, shndx)."""
+        if self.dynsym_offset == 0:
+            return []
+        entries = []
+        for i in range(self.dynsym_count):
+            off = self.dynsym_offset + i * self.dynsym_entsize
+            if off + 16 > len(self.data):
+                break
+            st_name_off = self._r32(off)
+            st_value = self._r32(off + 4)
+            st_size = self._r32(off + 8)
+            st_info = self._r8(off + 12)
+            st_other = self._r8(off + 13)
+            st_shndx = self._r16(off + 14)
+
+            bind = st_info >> 4
+            stype = st_info & 0xf
+            vis = st_other & 0x3
+
+            try:
+                name = self._read_cstring(self.strtab_offset + st_name_off) if self.strtab_offset else ""
+            except (ValueError, IndexError):
+                name = f"<strtab+{st_name_off}>"
+
+            entries.append({
+                'index': i, 'name': name, 'value': st_value,
+                'size': st_size, 'bind': bind, 'type': stype,
+                'vis': vis, 'shndx': st_shndx,
+            })
+        return entries
+
+    def read_rel_entries(self):
+        """Read .rel.dyn entries: list of (offset, sym_idx, type)."""
+        rel = self.sections.get('.rel.dyn')
+        if not rel:
+            return []
+        entries = []
+        off = rel['offset']
+        end = off + rel['size']
+        while off < end:
+            r_offset = self._r32(off)
+            r_info = self._r32(off + 4)
+            sym_idx = r_info >> 8
+            rtype = r_info & 0xFF
+            entries.append((r_offset, sym_idx, rtype))
+            off += 8
+        return entries
+
+
+def read_elf(path, data: bytes | None = None) -> MipsElf | None:
+    """Open `path` (or parse `data`) as ELF; None if it is not a parseable 32-bit ELF."""
+    elf = MipsElf(path, data)
+    if not elf.parsed:
+        elf.close()
+        return None
+    return elf
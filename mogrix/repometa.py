@@ -15,6 +15,7 @@ import sqlite3
 import tempfile
 import time
 import urllib.request
+from contextlib import contextmanager
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
@@ -34,6 +35,29 @@ DEFAULT_BASES = {
 # SRPM name extraction regex: name-version-release.src.rpm -> name
 SRPM_NAME_RE = re.compile(r"^(.+)-[^-]+-[^-]+\.src\.rpm$")
 
+# Pragmas applied while building a fresh index. The index is written to a
+# temporary file and renamed into place, so durability during the build is
+# not needed.
+BUILD_PRAGMAS = (
+    "journal_mode=OFF",
+    "synchronous=OFF",
+    "temp_store=MEMORY",
+    "cache_size=-65536",
+    "locking_mode=EXCLUSIVE",
+)
+
+# Only filelists entries under these prefixes are imported (executables,
+# libraries, pkg-config and aclocal files — things that appear as deps).
+FILELIST_PREFIXES = (
+    "/usr/bin/",
+    "/usr/sbin/",
+    "/bin/",
+    "/sbin/",
+    "/usr/lib",
+    "/usr/share/pkgconfig/",
+    "/usr/share/aclocal/",
+)
+
 
 def extract_srpm_name(sourcerpm: str) -> str:
     """Extract source package name from a sourcerpm string.
@@ -49,6 +73,87 @@ def extract_srpm_name(sourcerpm: str) -> str:
     return parts[0] if parts else sourcerpm
 
 
+# Suffixes stripped from a requirement to find a provider by base package
+# name (mirrors RoadmapResolver._find_source_package).
+PROVIDER_SUFFIXES = ("-devel", "-libs", "-static", "-doc")
+
+
+def _provider_lookup_sql(name_expr: str) -> str:
+    """Scalar subquery: source package providing `name_expr` (updates first)."""
+    return (
+        "(SELECT source_package FROM binary_provides"
+        f" WHERE provides_name = {name_expr}"
+        " ORDER BY repo = 'updates' DESC LIMIT 1)"
+    )
+
+
+def materialize_reverse_deps(conn: sqlite3.Connection):
+    """Build the reverse_deps table: provider source -> dependent sources.
+
+    Each distinct BuildRequires name is resolved once to the source package
+    that provides it (binary provides, then file provides, then the name
+    with a -devel/-libs/... suffix stripped), and every source package that
+    requires it is recorded as a dependent. Rich dependency expressions are
+    not resolved here. Mogrix rules (drops, sysroot) are applied at query
+    time, so the table only depends on the index contents.
+    """
+    fallbacks = [_provider_lookup_sql("r.requires_name")]
+    fallbacks.append(
+        "CASE WHEN substr(r.requires_name, 1, 1) = '/' THEN"
+        " (SELECT source_package FROM file_provides"
+        "  WHERE file_path = r.requires_name"
+        "  ORDER BY repo = 'updates' DESC LIMIT 1) END"
+    )
+    for suffix in PROVIDER_SUFFIXES:
+        n = len(suffix)
+        base = f"substr(r.requires_name, 1, length(r.requires_name) - {n})"
+        fallbacks.append(
+            f"CASE WHEN substr(r.requires_name, -{n}) = '{suffix}' THEN"
+            f" {_provider_lookup_sql(base)} END"
+        )
+
+    conn.executescript(f"""
+        DROP TABLE IF EXISTS reverse_deps;
+        CREATE TABLE reverse_deps (
+            provider_source TEXT NOT NULL,
+            requires_name TEXT NOT NULL,
+            dependent_source TEXT NOT NULL
+        );
+        INSERT INTO reverse_deps (provider_source, requires_name, dependent_source)
+        WITH providers AS (
+            SELECT r.requires_name, COALESCE({", ".join(fallbacks)}) AS provider_source
+            FROM (SELECT DISTINCT requires_name FROM source_buildrequires) r
+        )
+        SELECT DISTINCT p.provider_source, s.requires_name, s.source_package
+        FROM source_buildrequires s
+        JOIN providers p ON p.requires_name = s.requires_name
+        WHERE p.provider_source IS NOT NULL
+          AND p.provider_source != s.source_package;
+        CREATE INDEX idx_rd_provider ON reverse_deps(provider_source);
+        CREATE INDEX idx_rd_dependent ON reverse_deps(dependent_source);
+    """)
+    conn.commit()
+
+
+def ensure_reverse_deps(conn: sqlite3.Connection):
+    """Materialize reverse_deps if this index predates it."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reverse_deps'"
+    ).fetchone()
+    if not row:
+        materialize_reverse_deps(conn)
+
+
+def _remove_sidecars(db_path: Path) -> None:
+    """Delete the -wal, -shm and -journal files SQLite keeps next to db_path.
+
+    A leftover WAL would be replayed into whatever database is at db_path
+    next, so they must go whenever that file is replaced.
+    """
+    for suffix in ("-wal", "-shm", "-journal"):
+        db_path.with_name(db_path.name + suffix).unlink(missing_ok=True)
+
+
 class RepoMetaCache:
     """Downloads and caches Fedora repo metadata as a unified sqlite index.
 
@@ -57,6 +162,8 @@ class RepoMetaCache:
     - binary_provides: what each binary RPM provides (name -> source package)
     - source_buildrequires: what each source package needs to build
     - file_provides: which packages own which files (for /usr/bin/foo deps)
+    plus reverse_deps, derived from them after the import (see
+    materialize_reverse_deps).
     """
 
     # Repo configurations: (repo_key, arch, data_type)
@@ -76,6 +183,8 @@ class RepoMetaCache:
         self.release = release
         self._base_url = base_url
         self.cache_dir = cache_dir or Path.home() / ".cache" / "mogrix" / "repometa" / f"fc{release}"
+        # Filelists databases fetched by _download_all_metadata(), by repo key
+        self._filelists_paths: dict[str, Path] = {}
 
     def _get_base_urls(self) -> dict[str, str]:
         """Get base URLs for releases and updates repos."""
@@ -120,6 +229,7 @@ class RepoMetaCache:
 
         if refresh and index_path.exists():
             index_path.unlink()
+            _remove_sidecars(index_path)
 
         # Download all repo metadata
         downloaded = self._download_all_metadata()
@@ -229,17 +339,28 @@ class RepoMetaCache:
     ) -> sqlite3.Connection:
         """Build the unified index from downloaded repo sqlite databases.
 
-        Reads Fedora's pre-built sqlite databases and merges them into our
-        unified schema.
+        Each Fedora database is ATTACHed to the index and copied with
+        INSERT ... SELECT, so rows never round-trip through Python. The
+        index is written to a temporary file with journaling disabled,
+        secondary indexes are created after the bulk load, and the file is
+        renamed into place once complete.
         """
         console.print(f"\n[bold]Building unified index...[/bold]")
 
-        conn = sqlite3.connect(str(index_path))
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        _remove_sidecars(tmp_path)
+
+        conn = sqlite3.connect(str(tmp_path))
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA synchronous=NORMAL")
+        for pragma in BUILD_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
+        conn.create_function(
+            "extract_srpm_name", 1, extract_srpm_name, deterministic=True
+        )
 
-        self._create_schema(conn)
+        self._create_tables(conn)
 
         # Process each downloaded repo
         for key, paths in downloaded.items():
@@ -273,22 +394,48 @@ class RepoMetaCache:
             "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
             ("release", self.release),
         )
+        conn.commit()
 
+        console.print("  Creating indexes...")
+        started = time.monotonic()
+        self._create_indexes(conn)
+        conn.execute("ANALYZE")
         conn.commit()
+        console.print(f"    done in {time.monotonic() - started:.1f}s")
+
+        console.print("  Materializing reverse dependencies...")
+        started = time.monotonic()
+        materialize_reverse_deps(conn)
+        rd_count = conn.execute("SELECT COUNT(*) FROM reverse_deps").fetchone()[0]
+        self._report_import(rd_count, started, "reverse edges")
 
         # Report stats
         bp_count = conn.execute("SELECT COUNT(*) FROM binary_provides").fetchone()[0]
         sbr_count = conn.execute("SELECT COUNT(*) FROM source_buildrequires").fetchone()[0]
         fp_count = conn.execute("SELECT COUNT(*) FROM file_provides").fetchone()[0]
+
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+        _remove_sidecars(index_path)
+        tmp_path.replace(index_path)
+
         console.print(f"\n[green]✓ Index built:[/green]")
         console.print(f"  {bp_count:,} binary provides")
         console.print(f"  {sbr_count:,} source buildrequires")
         console.print(f"  {fp_count:,} file provides")
 
+        conn = sqlite3.connect(str(index_path))
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
         return conn
 
     def _create_schema(self, conn: sqlite3.Connection):
-        """Create the unified index schema."""
+        """Create the unified index schema (tables and indexes)."""
+        self._create_tables(conn)
+        self._create_indexes(conn)
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Create the unified index tables, without secondary indexes."""
         conn.executescript("""
             CREATE TABLE IF NOT EXISTS binary_provides (
                 provides_name TEXT NOT NULL,
@@ -318,7 +465,11 @@ class RepoMetaCache:
                 key TEXT PRIMARY KEY,
                 value TEXT
             );
+        """)
 
+    def _create_indexes(self, conn: sqlite3.Connection):
+        """Create secondary indexes. Called after the bulk load."""
+        conn.executescript("""
             CREATE INDEX IF NOT EXISTS idx_bp_name ON binary_provides(provides_name);
             CREATE INDEX IF NOT EXISTS idx_bp_srcpkg ON binary_provides(source_package);
             CREATE INDEX IF NOT EXISTS idx_sbr_pkg ON source_buildrequires(source_package);
@@ -326,6 +477,53 @@ class RepoMetaCache:
             CREATE INDEX IF NOT EXISTS idx_fp_path ON file_provides(file_path);
         """)
 
+    @contextmanager
+    def _attached(self, conn: sqlite3.Connection, db_path: Path, alias: str):
+        """ATTACH a Fedora database to the index connection for the block.
+
+        ATTACH/DETACH are not allowed inside a transaction, so any pending
+        work is committed first.
+        """
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS " + alias, (str(db_path),))
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            conn.execute("DETACH DATABASE " + alias)
+
+    def _load_package_names(self, conn: sqlite3.Connection, schema: str):
+        """Materialize pkgKey -> (binary_package, source_package) for a primary db.
+
+        extract_srpm_name() then runs once per package instead of once per
+        provides/file row.
+        """
+        conn.executescript(f"""
+            DROP TABLE IF EXISTS temp.pkg_names;
+            CREATE TEMP TABLE pkg_names (
+                pkgKey INTEGER PRIMARY KEY,
+                binary_package TEXT NOT NULL,
+                source_package TEXT NOT NULL
+            );
+            INSERT INTO temp.pkg_names (pkgKey, binary_package, source_package)
+            SELECT pkgKey, name,
+                   CASE WHEN rpm_sourcerpm IS NULL OR rpm_sourcerpm = ''
+                        THEN name
+                        ELSE extract_srpm_name(rpm_sourcerpm)
+                   END
+            FROM {schema}.packages;
+        """)
+
+    def _report_import(self, count: int, started: float, label: str):
+        """Print an import row count with its throughput."""
+        elapsed = time.monotonic() - started
+        rate = count / elapsed if elapsed > 0 else float(count)
+        console.print(f"    {count:,} {label} ({rate:,.0f} rows/s)")
+
     def _import_source_primary(
         self, db_path: Path, repo_key: str, conn: sqlite3.Connection
     ):
@@ -335,28 +533,21 @@ class RepoMetaCache:
         - packages: pkgKey, name, version, release, ...
         - requires: pkgKey, name, flags, version, ...
         """
-        src_conn = sqlite3.connect(str(db_path))
-        src_conn.row_factory = sqlite3.Row
-
-        # Get all source package BuildRequires
-        # In source repos, requires = BuildRequires
-        rows = src_conn.execute("""
-            SELECT p.name as source_package,
-                   r.name as requires_name,
-                   r.flags as requires_flags,
-                   r.version as requires_version
-            FROM packages p
-            JOIN requires r ON p.pkgKey = r.pkgKey
-        """).fetchall()
-
-        conn.executemany(
-            "INSERT INTO source_buildrequires (source_package, requires_name, requires_flags, requires_version, repo) VALUES (?, ?, ?, ?, ?)",
-            [(r["source_package"], r["requires_name"], r["requires_flags"], r["requires_version"], repo_key) for r in rows],
-        )
-
-        count = len(rows)
-        console.print(f"    {count:,} buildrequires entries")
-        src_conn.close()
+        started = time.monotonic()
+        with self._attached(conn, db_path, "src"):
+            # In source repos, requires = BuildRequires
+            cur = conn.execute(
+                """
+                INSERT INTO source_buildrequires
+                    (source_package, requires_name, requires_flags, requires_version, repo)
+                SELECT p.name, r.name, r.flags, r.version, ?
+                FROM src.packages p
+                JOIN src.requires r ON p.pkgKey = r.pkgKey
+                """,
+                (repo_key,),
+            )
+            count = cur.rowcount
+        self._report_import(count, started, "buildrequires entries")
 
     def _import_binary_primary(
         self, db_path: Path, repo_key: str, conn: sqlite3.Connection
@@ -367,64 +558,41 @@ class RepoMetaCache:
         - packages: pkgKey, name, rpm_sourcerpm, ...
         - provides: pkgKey, name, flags, version, ...
         """
-        src_conn = sqlite3.connect(str(db_path))
-        src_conn.row_factory = sqlite3.Row
-
-        # Get all binary package provides with their source package
-        rows = src_conn.execute("""
-            SELECT pr.name as provides_name,
-                   pr.flags as provides_flags,
-                   pr.version as provides_version,
-                   p.name as binary_package,
-                   p.rpm_sourcerpm as sourcerpm
-            FROM packages p
-            JOIN provides pr ON p.pkgKey = pr.pkgKey
-        """).fetchall()
-
-        conn.executemany(
-            "INSERT INTO binary_provides (provides_name, provides_flags, provides_version, binary_package, source_package, repo) VALUES (?, ?, ?, ?, ?, ?)",
-            [
-                (
-                    r["provides_name"],
-                    r["provides_flags"],
-                    r["provides_version"],
-                    r["binary_package"],
-                    extract_srpm_name(r["sourcerpm"]) if r["sourcerpm"] else r["binary_package"],
-                    repo_key,
-                )
-                for r in rows
-            ],
-        )
-
-        count = len(rows)
-        console.print(f"    {count:,} provides entries")
-
-        # Also import files from primary.sqlite's files table
-        # (subset of most important files — executables, etc.)
-        file_rows = src_conn.execute("""
-            SELECT f.name as file_path,
-                   p.name as binary_package,
-                   p.rpm_sourcerpm as sourcerpm
-            FROM packages p
-            JOIN files f ON p.pkgKey = f.pkgKey
-            WHERE f.type = 'file'
-        """).fetchall()
-
-        conn.executemany(
-            "INSERT INTO file_provides (file_path, binary_package, source_package, repo) VALUES (?, ?, ?, ?)",
-            [
-                (
-                    r["file_path"],
-                    r["binary_package"],
-                    extract_srpm_name(r["sourcerpm"]) if r["sourcerpm"] else r["binary_package"],
-                    repo_key,
-                )
-                for r in file_rows
-            ],
-        )
-        console.print(f"    {len(file_rows):,} primary file entries")
+        with self._attached(conn, db_path, "src"):
+            self._load_package_names(conn, "src")
+
+            started = time.monotonic()
+            cur = conn.execute(
+                """
+                INSERT INTO binary_provides
+                    (provides_name, provides_flags, provides_version,
+                     binary_package, source_package, repo)
+                SELECT pr.name, pr.flags, pr.version,
+                       n.binary_package, n.source_package, ?
+                FROM src.provides pr
+                JOIN temp.pkg_names n ON n.pkgKey = pr.pkgKey
+                """,
+                (repo_key,),
+            )
+            self._report_import(cur.rowcount, started, "provides entries")
+
+            # Also import files from primary.sqlite's files table
+            # (subset of most important files — executables, etc.)
+            started = time.monotonic()
+            cur = conn.execute(
+                """
+                INSERT INTO file_provides
+                    (file_path, binary_package, source_package, repo)
+                SELECT f.name, n.binary_package, n.source_package, ?
+                FROM src.files f
+                JOIN temp.pkg_names n ON n.pkgKey = f.pkgKey
+                WHERE f.type = 'file'
+                """,
+                (repo_key,),
+            )
+            self._report_import(cur.rowcount, started, "primary file entries")
 
-        src_conn.close()
+            conn.execute("DROP TABLE temp.pkg_names")
 
     def _import_binary_filelists(
         self, db_path: Path, repo_key: str, conn: sqlite3.Connection
@@ -434,89 +602,58 @@ class RepoMetaCache:
         Fedora's filelists.sqlite has tables:
         - packages: pkgKey, pkgId
         - filelist: pkgKey, dirname, filenames, filetypes
-        We need to join with the primary data to get source package names.
+        `filenames` packs every file in `dirname` into one '/'-separated
+        string. It is split with a recursive CTE, and package names come
+        from the same repo's primary.sqlite (the pkgKeys match).
         """
-        src_conn = sqlite3.connect(str(db_path))
-        src_conn.row_factory = sqlite3.Row
-
-        # filelists.sqlite only has pkgKey — we need to map to package names.
-        # The primary.sqlite has the mapping. We'll use a subquery against
-        # our already-imported binary_provides to get the source package.
-        #
-        # For efficiency, first build a pkgKey -> (binary_package, sourcerpm) map
-        # from the filelists db's packages table + a name lookup.
-
-        # The filelists.sqlite packages table has: pkgKey, pkgId
-        # We need binary package names. The primary.sqlite has them but we
-        # already imported. Let's read the primary for this repo to get the mapping.
-
-        # Actually, filelists.sqlite's filelist table has:
-        # pkgKey, dirname, filenames (space-separated), filetypes
-        # And packages table has: pkgKey, pkgId (checksum)
-
-        # We need to cross-reference with primary to get package names.
-        # Since we're reading from the same repo's downloaded files,
-        # let's get the primary db path and read package names from there.
-
         # Find the matching primary db
         key_prefix = f"{repo_key}-x86_64"
         primary_path = self.cache_dir / f"{key_prefix}-primary.sqlite"
         if not primary_path.exists():
             console.print(f"    [yellow]Warning: No primary for filelists mapping[/yellow]")
-            src_conn.close()
             return
 
-        primary_conn = sqlite3.connect(str(primary_path))
-        primary_conn.row_factory = sqlite3.Row
-
-        # Build pkgKey -> (binary_name, source_name) from primary
-        pkg_map = {}
-        for row in primary_conn.execute("SELECT pkgKey, name, rpm_sourcerpm FROM packages"):
-            srcname = extract_srpm_name(row["rpm_sourcerpm"]) if row["rpm_sourcerpm"] else row["name"]
-            pkg_map[row["pkgKey"]] = (row["name"], srcname)
-        primary_conn.close()
-
-        # Now read filelists and expand
-        batch = []
-        batch_size = 10000
-
-        for row in src_conn.execute("SELECT pkgKey, dirname, filenames FROM filelist"):
-            pkg_key = row["pkgKey"]
-            if pkg_key not in pkg_map:
-                continue
-
-            binary_name, source_name = pkg_map[pkg_key]
-            dirname = row["dirname"]
-            filenames = row["filenames"]
-
-            if not filenames:
-                continue
+        # dirpath is dirname with a trailing slash ('/' for the root), so the
+        # full path is dirpath || filename. Rows are pre-filtered to
+        # directories that are inside, or ancestors of, a kept prefix.
+        dirpath = "(CASE WHEN fl.dirname = '/' THEN '' ELSE fl.dirname END || '/')"
+        dir_filter = " OR ".join(
+            f"substr({dirpath}, 1, {len(p)}) = '{p}'"
+            f" OR substr('{p}', 1, length({dirpath})) = {dirpath}"
+            for p in FILELIST_PREFIXES
+        )
+        path_filter = " OR ".join(
+            f"substr(dirpath || fname, 1, {len(p)}) = '{p}'" for p in FILELIST_PREFIXES
+        )
 
-            # filenames is space-separated (or could be individual)
-            for fname in filenames.split("/"):
-                if not fname:
-                    continue
-                filepath = dirname + "/" + fname if dirname != "/" else "/" + fname
-                # Only store files that look like they could be deps
-                # (executables, libraries, pkg-config files)
-                if filepath.startswith(("/usr/bin/", "/usr/sbin/", "/bin/", "/sbin/",
-                                        "/usr/lib", "/usr/share/pkgconfig/",
-                                        "/usr/share/aclocal/")):
-                    batch.append((filepath, binary_name, source_name, repo_key))
-
-            if len(batch) >= batch_size:
-                conn.executemany(
-                    "INSERT INTO file_provides (file_path, binary_package, source_package, repo) VALUES (?, ?, ?, ?)",
-                    batch,
+        with self._attached(conn, primary_path, "prim"), \
+                self._attached(conn, db_path, "fl"):
+            self._load_package_names(conn, "prim")
+
+            started = time.monotonic()
+            cur = conn.execute(
+                f"""
+                INSERT INTO file_provides
+                    (file_path, binary_package, source_package, repo)
+                WITH RECURSIVE split(pkgKey, dirpath, fname, rest) AS (
+                    SELECT fl.pkgKey, {dirpath}, '', fl.filenames || '/'
+                    FROM fl.filelist fl
+                    WHERE fl.filenames IS NOT NULL AND fl.filenames != ''
+                      AND ({dir_filter})
+                    UNION ALL
+                    SELECT pkgKey, dirpath,
+                           substr(rest, 1, instr(rest, '/') - 1),
+                           substr(rest, instr(rest, '/') + 1)
+                    FROM split
+                    WHERE rest != ''
                 )
-                batch = []
-
-        if batch:
-            conn.executemany(
-                "INSERT INTO file_provides (file_path, binary_package, source_package, repo) VALUES (?, ?, ?, ?)",
-                batch,
+                SELECT dirpath || fname, n.binary_package, n.source_package, ?
+                FROM split
+                JOIN temp.pkg_names n ON n.pkgKey = split.pkgKey
+                WHERE fname != '' AND ({path_filter})
+                """,
+                (repo_key,),
             )
+            self._report_import(cur.rowcount, started, "file provides entries")
 
-        total = conn.execute("SELECT COUNT(*) FROM file_provides WHERE repo = ?", (repo_key,)).fetchone()[0]
-        console.print(f"    {total:,} file provides entries")
-        src_conn.close()
+            conn.execute("DROP TABLE temp.pkg_names")
@@ -10,8 +10,9 @@ Used by `mogrix roadmap <package>`.
 import json
 import re
 import sqlite3
-from collections import defaultdict
-from dataclasses import dataclass, field
+import sys
+from collections import defaultdict, deque
+from dataclasses import dataclass, field, replace
 from fnmatch import fnmatch
 from enum import Enum
 from pathlib import Path
@@ -20,7 +21,7 @@ import yaml
 from rich.console import Console
 from rich.tree import Tree
 
-from mogrix.repometa import extract_srpm_name
+from mogrix.repometa import ensure_reverse_deps, extract_srpm_name
 from mogrix.rules.loader import RuleLoader
 
 
@@ -71,8 +72,114 @@ class RoadmapResult:
         return dict(counts)
 
 
+BUILT_CLASSIFICATIONS = (
+    Classification.ALREADY_BUILT_VERIFIED,
+    Classification.ALREADY_BUILT_UNVERIFIED,
+)
+
+
+@dataclass
+class ReverseCandidate:
+    """A not-yet-built package that directly BuildRequires the queried package."""
+
+    name: str
+    classification: Classification
+    remaining: list[str] = field(default_factory=list)  # unbuilt deps other than target
+    downstream: int = 0  # source packages that BuildRequire this candidate
+
+    @property
+    def unblocked(self) -> bool:
+        """True if building the target leaves no unbuilt direct deps."""
+        return not self.remaining
+
+
+@dataclass
+class ReverseResult:
+    """Result of a reverse roadmap query: what does building `target` unblock?"""
+
+    target: str
+    candidates: list[ReverseCandidate] = field(default_factory=list)
+    already_built: list[str] = field(default_factory=list)  # built dependents
+
+
+@dataclass
+class PackageExpansion:
+    """A package's resolved BuildRequires, independent of the roadmap target."""
+
+    info: PackageInfo  # needed_by and build_order are left unset
+    deps: list[tuple[str, Classification]] = field(default_factory=list)  # excl. self
+    dropped: list[tuple[str, str]] = field(default_factory=list)  # (req, reason)
+    sysroot: list[str] = field(default_factory=list)
+    unresolvable: list[tuple[str, str]] = field(default_factory=list)  # (req, context)
+
+    def new_info(self) -> PackageInfo:
+        """Fresh PackageInfo for one result (needed_by/build_order are per-target)."""
+        return replace(
+            self.info,
+            buildrequires=list(self.info.buildrequires),
+            needed_by=[],
+        )
+
+
+@dataclass
+class ProviderIndex:
+    """In-memory copy of the repometa lookups used during resolution.
+
+    Built once by `ProviderIndex.load()` so that graph resolution does no
+    per-requirement SQL. Source package names are interned, so the many
+    provides that map to the same source share one string.
+    """
+
+    provides: dict[str, str] = field(default_factory=dict)  # provides -> source
+    files: dict[str, str] = field(default_factory=dict)  # file path -> source
+    buildrequires: dict[str, list[str]] = field(default_factory=dict)  # source -> reqs
+
+    @classmethod
+    def load(cls, db: sqlite3.Connection) -> "ProviderIndex":
+        """Load provides, file and BuildRequires maps from the index.
+
+        Matches the SQL lookups: 'updates' rows win over 'releases', and
+        within a repo the first row wins. Only files that some source
+        package actually BuildRequires are loaded.
+        """
+        index = cls()
+        intern = sys.intern
+
+        for where in ("repo = 'updates'", "repo != 'updates'"):
+            for name, src in db.execute(
+                f"SELECT provides_name, source_package FROM binary_provides WHERE {where}"
+            ):
+                if name not in index.provides:
+                    index.provides[name] = intern(src)
+
+            for path, src in db.execute(
+                f"""SELECT file_path, source_package FROM file_provides
+                    WHERE {where} AND file_path IN (
+                        SELECT requires_name FROM source_buildrequires
+                        WHERE requires_name LIKE '/%'
+                    )"""
+            ):
+                if path not in index.files:
+                    index.files[path] = intern(src)
+
+        reqs: dict[str, set[str]] = defaultdict(set)
+        for src, req in db.execute(
+            "SELECT source_package, requires_name FROM source_buildrequires"
+        ):
+            reqs[intern(src)].add(intern(req))
+        index.buildrequires = {src: sorted(names) for src, names in reqs.items()}
+
+        return index
+
+
 class RoadmapResolver:
-    """Resolves build dependency graphs against mogrix state."""
+    """Resolves build dependency graphs against mogrix state.
+
+    With preload=True, the provides/file/BuildRequires tables are loaded
+    into a `ProviderIndex` up front and resolution runs entirely in memory.
+    This costs a second or two at startup but makes large targets (GTK3,
+    Qt5) resolve without tens of thousands of sqlite round trips.
+    """
 
     def __init__(
         self,
@@ -82,6 +189,7 @@ class RoadmapResolver:
         rpms_dir: Path,
         stop_at_rules: bool = False,
         max_depth: int = 0,
+        preload: bool = False,
     ):
         self.db = db
         self.rule_loader = rule_loader
@@ -90,6 +198,9 @@ class RoadmapResolver:
         self.stop_at_rules = stop_at_rules
         self.max_depth = max_depth
 
+        # Optional in-memory copy of the index lookups
+        self._index: ProviderIndex | None = ProviderIndex.load(db) if preload else None
+
         # Pre-load static data
         self._sysroot = self._load_sysroot_provides()
         self._non_fedora = self._load_non_fedora_packages()
@@ -103,6 +214,9 @@ class RoadmapResolver:
         # Cache for provider resolution
         self._provider_cache: dict[str, tuple[str, Classification]] = {}
 
+        # Cache for per-package BuildRequires expansion
+        self._expansion_cache: dict[str, PackageExpansion] = {}
+
     def _load_sysroot_provides(self) -> dict[str, set[str]]:
         """Load sysroot_provides.yaml."""
         path = self.rules_dir / "sysroot_provides.yaml"
@@ -116,6 +230,24 @@ class RoadmapResolver:
             "capabilities": set(data.get("capabilities", [])),
         }
 
+    def _match_sysroot_library(self, req_name: str) -> str | None:
+        """Find the sysroot library a requirement refers to.
+
+        A library entry matches the requirement exactly or as a prefix
+        followed by '(' (e.g. "libc.so.6()(64bit)" matches "libc.so.6"), so
+        the only candidates are the requirement itself and its prefixes
+        ending before each '('. Each is a set lookup.
+        """
+        libraries = self._sysroot["libraries"]
+        if req_name in libraries:
+            return req_name
+        pos = req_name.find("(")
+        while pos != -1:
+            if req_name[:pos] in libraries:
+                return req_name[:pos]
+            pos = req_name.find("(", pos + 1)
+        return None
+
     def _load_non_fedora_packages(self) -> dict[str, str]:
         """Load non_fedora_packages.yaml. Returns pkg_name -> source."""
         path = self.rules_dir / "non_fedora_packages.yaml"
@@ -323,9 +455,9 @@ class RoadmapResolver:
         if req_name in self._sysroot["files"]:
             return None, Classification.SYSROOT, "file"
         # Check library provides (e.g., "libc.so()(64bit)" matches "libc.so")
-        for lib in self._sysroot["libraries"]:
-            if req_name == lib or req_name.startswith(lib + "("):
-                return None, Classification.SYSROOT, f"library ({lib})"
+        lib = self._match_sysroot_library(req_name)
+        if lib is not None:
+            return None, Classification.SYSROOT, f"library ({lib})"
 
         # 4. Already built — check by provides name from sqlite
         src_pkg = self._find_source_package(req_name)
@@ -395,46 +527,55 @@ class RoadmapResolver:
         Checks binary_provides table, then file_provides for file-based deps.
         """
         # Check binary provides (prefer updates over releases)
-        row = self.db.execute(
-            """SELECT source_package FROM binary_provides
-               WHERE provides_name = ?
-               ORDER BY repo = 'updates' DESC
-               LIMIT 1""",
-            (req_name,),
-        ).fetchone()
-        if row:
-            return row[0]
+        src = self._lookup_provides(req_name)
+        if src:
+            return src
 
         # Check file provides for file-based deps (e.g., /usr/bin/perl)
         if req_name.startswith("/"):
-            row = self.db.execute(
-                """SELECT source_package FROM file_provides
-                   WHERE file_path = ?
-                   ORDER BY repo = 'updates' DESC
-                   LIMIT 1""",
-                (req_name,),
-            ).fetchone()
-            if row:
-                return row[0]
+            src = self._lookup_file(req_name)
+            if src:
+                return src
 
         # Try stripping common suffixes and checking as a direct package name
         for suffix in ("-devel", "-libs", "-static", "-doc"):
             if req_name.endswith(suffix):
-                base = req_name[: -len(suffix)]
-                row = self.db.execute(
-                    """SELECT source_package FROM binary_provides
-                       WHERE provides_name = ?
-                       ORDER BY repo = 'updates' DESC
-                       LIMIT 1""",
-                    (base,),
-                ).fetchone()
-                if row:
-                    return row[0]
+                src = self._lookup_provides(req_name[: -len(suffix)])
+                if src:
+                    return src
 
         return None
 
+    def _lookup_provides(self, name: str) -> str | None:
+        """Source package of the first provider of `name` (updates first)."""
+        if self._index is not None:
+            return self._index.provides.get(name)
+        row = self.db.execute(
+            """SELECT source_package FROM binary_provides
+               WHERE provides_name = ?
+               ORDER BY repo = 'updates' DESC
+               LIMIT 1""",
+            (name,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _lookup_file(self, path: str) -> str | None:
+        """Source package owning file `path` (updates first)."""
+        if self._index is not None:
+            return self._index.files.get(path)
+        row = self.db.execute(
+            """SELECT source_package FROM file_provides
+               WHERE file_path = ?
+               ORDER BY repo = 'updates' DESC
+               LIMIT 1""",
+            (path,),
+        ).fetchone()
+        return row[0] if row else None
+
     def _get_buildrequires(self, pkg: str) -> list[str]:
         """Get BuildRequires for a source package from the index."""
+        if self._index is not None:
+            return list(self._index.buildrequires.get(pkg, ()))
         rows = self.db.execute(
             """SELECT DISTINCT requires_name FROM source_buildrequires
                WHERE source_package = ?
@@ -443,6 +584,77 @@ class RoadmapResolver:
         ).fetchall()
         return [r[0] for r in rows]
 
+    def _expand_package(self, pkg: str) -> PackageExpansion:
+        """Resolve every BuildRequires of one package.
+
+        The outcome depends only on the package (its drops and the mogrix
+        state), not on which target reached it, so expansions are cached
+        and shared by every resolve() on this resolver.
+        """
+        cached = self._expansion_cache.get(pkg)
+        if cached is not None:
+            return cached
+
+        buildrequires = self._get_buildrequires(pkg)
+        drops = self._compute_effective_drops(pkg)
+
+        exp = PackageExpansion(
+            info=PackageInfo(name=pkg, classification=Classification.NEED_RULES)
+        )
+        self.reclassify(exp.info, buildrequires)
+
+        for req in buildrequires:
+            src_pkg, cls, detail = self._resolve_provider(req, drops, pkg)
+
+            if cls == Classification.DROPPED:
+                exp.dropped.append((req, detail))
+                continue
+
+            if cls == Classification.SYSROOT:
+                exp.sysroot.append(req)
+                continue
+
+            if cls == Classification.UNRESOLVABLE:
+                exp.unresolvable.append((req, detail))
+                continue
+
+            if src_pkg is None:
+                continue
+
+            # Track the dependency
+            exp.info.buildrequires.append(src_pkg)
+            if src_pkg != pkg:  # Skip self-deps
+                exp.deps.append((src_pkg, cls))
+
+        # Deduplicate buildrequires
+        exp.info.buildrequires = sorted(set(exp.info.buildrequires))
+
+        self._expansion_cache[pkg] = exp
+        return exp
+
+    @property
+    def built_packages(self) -> dict[str, bool]:
+        """Built source packages, mapped to whether they passed smoke tests."""
+        return self._built_packages
+
+    def reclassify(self, info: PackageInfo, buildrequires: list[str] | None = None):
+        """Set info's classification, complexity and non-Fedora source from
+        the current mogrix state.
+
+        buildrequires are the package's raw BuildRequires, looked up only
+        when needed and not given.
+        """
+        pkg = info.name
+        info.classification = self._classify_package(pkg)
+        info.complexity = ""
+        info.non_fedora_source = ""
+        if info.classification == Classification.NEED_RULES:
+            if buildrequires is None:
+                buildrequires = self._get_buildrequires(pkg)
+            info.complexity = self._estimate_complexity(pkg, buildrequires)
+        elif info.classification == Classification.NON_FEDORA:
+            info.non_fedora_source = self._non_fedora.get(pkg, "")
+
     def resolve(self, target: str) -> RoadmapResult:
         """Resolve the full transitive build dependency graph for a target package.
 
@@ -453,12 +665,12 @@ class RoadmapResolver:
         result = RoadmapResult(target=target)
 
         # BFS queue: (package_name, depth)
-        queue: list[tuple[str, int]] = [(target, 0)]
+        queue: deque[tuple[str, int]] = deque([(target, 0)])
         visited: set[str] = set()
         edges: list[tuple[str, str]] = []  # (dep, dependent)
 
         while queue:
-            pkg, depth = queue.pop(0)
+            pkg, depth = queue.popleft()
             if pkg in visited:
                 continue
             visited.add(pkg)
@@ -466,50 +678,23 @@ class RoadmapResolver:
             if self.max_depth > 0 and depth > self.max_depth:
                 continue
 
-            # Get BuildRequires from index
-            buildrequires = self._get_buildrequires(pkg)
-            drops = self._compute_effective_drops(pkg)
-
-            pkg_info = PackageInfo(
-                name=pkg,
-                classification=self._classify_package(pkg),
-                buildrequires=[],
-            )
-
-            for req in buildrequires:
-                src_pkg, cls, detail = self._resolve_provider(req, drops, pkg)
+            exp = self._expand_package(pkg)
+            result.dropped_deps.update(exp.dropped)
+            result.sysroot_deps.update(exp.sysroot)
+            result.unresolvable_deps.update(exp.unresolvable)
 
-                if cls == Classification.DROPPED:
-                    result.dropped_deps[req] = detail
-                    continue
+            for src_pkg, cls in exp.deps:
+                edges.append((src_pkg, pkg))
 
-                if cls == Classification.SYSROOT:
-                    result.sysroot_deps.add(req)
-                    continue
+                # Always recurse into the full graph
+                should_recurse = True
+                if self.stop_at_rules and cls == Classification.HAS_RULES:
+                    should_recurse = False
 
-                if cls == Classification.UNRESOLVABLE:
-                    result.unresolvable_deps[req] = detail
-                    continue
+                if should_recurse and src_pkg not in visited:
+                    queue.append((src_pkg, depth + 1))
 
-                if src_pkg is None:
-                    continue
-
-                # Track the dependency
-                pkg_info.buildrequires.append(src_pkg)
-                if src_pkg != pkg:  # Skip self-deps
-                    edges.append((src_pkg, pkg))
-
-                    # Always recurse into the full graph
-                    should_recurse = True
-                    if self.stop_at_rules and cls == Classification.HAS_RULES:
-                        should_recurse = False
-
-                    if should_recurse and src_pkg not in visited:
-                        queue.append((src_pkg, depth + 1))
-
-            # Deduplicate buildrequires
-            pkg_info.buildrequires = sorted(set(pkg_info.buildrequires))
-            result.packages[pkg] = pkg_info
+            result.packages[pkg] = exp.new_info()
 
         # Topological sort
         result.build_order, result.cycles = self._topological_sort(edges, visited)
@@ -524,17 +709,83 @@ class RoadmapResolver:
                 if dependent not in result.packages[dep].needed_by:
                     result.packages[dep].needed_by.append(dependent)
 
-        # Compute complexity for NEED_RULES packages
-        for pkg, info in result.packages.items():
-            if info.classification == Classification.NEED_RULES:
-                br = self._get_buildrequires(pkg)
-                info.complexity = self._estimate_complexity(pkg, br)
+        return result
 
-        # Set non_fedora_source
-        for pkg, info in result.packages.items():
-            if info.classification == Classification.NON_FEDORA:
-                info.non_fedora_source = self._non_fedora.get(pkg, "")
+    def resolve_graph(self, targets: list[str]) -> "RoadmapGraph":
+        """Resolve the union dependency graph of many targets at once.
+
+        Per-target results are then derived from the returned RoadmapGraph
+        without walking the shared subgraph again. Only valid for unlimited
+        depth without --stop-at-rules, where a target's roadmap is exactly
+        its transitive closure.
+        """
+        if self.max_depth > 0 or self.stop_at_rules:
+            raise ValueError("resolve_graph() requires max_depth=0 and stop_at_rules=False")
+        return RoadmapGraph(self, targets)
+
+    def resolve_reverse(self, target: str) -> ReverseResult:
+        """Find which unbuilt packages become buildable (or closer) once target is built.
+
+        Candidate dependents come from the reverse_deps table in the index;
+        each candidate's BuildRequires are then expanded with the normal
+        mogrix rules so that drops and sysroot provides are honoured.
+        Candidates are ranked unblocked-first, then by how many packages
+        depend on them in turn.
+        """
+        ensure_reverse_deps(self.db)
+        result = ReverseResult(target=target)
+
+        dependents = [
+            r[0]
+            for r in self.db.execute(
+                """SELECT DISTINCT dependent_source FROM reverse_deps
+                   WHERE provider_source = ?""",
+                (target,),
+            )
+        ]
+
+        for pkg in dependents:
+            exp = self._expand_package(pkg)
+            dep_names = {src for src, _cls in exp.deps}
+            if target not in dep_names:
+                continue  # dropped or satisfied by the sysroot for this package
+            if exp.info.classification in BUILT_CLASSIFICATIONS:
+                result.already_built.append(pkg)
+                continue
+            remaining = sorted(
+                {
+                    src
+                    for src, cls in exp.deps
+                    if src != target and cls not in BUILT_CLASSIFICATIONS
+                }
+            )
+            result.candidates.append(
+                ReverseCandidate(
+                    name=pkg,
+                    classification=exp.info.classification,
+                    remaining=remaining,
+                )
+            )
+
+        if result.candidates:
+            names = [c.name for c in result.candidates]
+            placeholders = ",".join("?" * len(names))
+            counts = dict(
+                self.db.execute(
+                    f"""SELECT provider_source, COUNT(DISTINCT dependent_source)
+                        FROM reverse_deps
+                        WHERE provider_source IN ({placeholders})
+                        GROUP BY provider_source""",
+                    names,
+                ).fetchall()
+            )
+            for c in result.candidates:
+                c.downstream = counts.get(c.name, 0)
 
+        result.candidates.sort(
+            key=lambda c: (not c.unblocked, -c.downstream, len(c.remaining), c.name)
+        )
+        result.already_built.sort()
         return result
 
     def _classify_package(self, pkg: str) -> Classification:
@@ -758,6 +1009,101 @@ class RoadmapResolver:
             return "HIGH"
 
 
+class RoadmapGraph:
+    """Union build dependency graph of many targets, with memoized closures.
+
+    The union graph is resolved once and condensed into strongly connected
+    components. Each SCC's transitive closure is computed once, dependencies
+    first, as a bitset (an int over build-order positions) that ORs in the
+    closures of the SCCs it depends on. A target's roadmap — packages, build
+    order, cycles — is then read straight off its SCC's closure.
+
+    Build order within a target follows the union graph's topological order,
+    which is a valid order for the target's subgraph but may break ties
+    differently from RoadmapResolver.resolve().
+    """
+
+    def __init__(self, resolver: RoadmapResolver, targets: list[str]):
+        self.resolver = resolver
+        self.targets = list(targets)
+        self.expansions: dict[str, PackageExpansion] = {}
+        self.edges: list[tuple[str, str]] = []  # (dep, dependent)
+
+        queue: deque[str] = deque(self.targets)
+        while queue:
+            pkg = queue.popleft()
+            if pkg in self.expansions:
+                continue
+            exp = resolver._expand_package(pkg)
+            self.expansions[pkg] = exp
+            for src_pkg, _cls in exp.deps:
+                self.edges.append((src_pkg, pkg))
+                if src_pkg not in self.expansions:
+                    queue.append(src_pkg)
+
+        nodes = set(self.expansions)
+        self.build_order, _ = resolver._topological_sort(self.edges, nodes)
+        position = {pkg: i for i, pkg in enumerate(self.build_order)}
+
+        deps_adj: dict[str, list[str]] = defaultdict(list)
+        self._dependents: dict[str, list[str]] = defaultdict(list)
+        for dep, dependent in self.edges:
+            deps_adj[dependent].append(dep)
+            if dependent not in self._dependents[dep]:
+                self._dependents[dep].append(dependent)
+
+        # Tarjan over dependency edges emits an SCC only after every SCC it
+        # depends on, so closures can be filled in emission order.
+        self._sccs = resolver._find_all_sccs(nodes, deps_adj)
+        self._scc_of: dict[str, int] = {}
+        for i, scc in enumerate(self._sccs):
+            for node in scc:
+                self._scc_of[node] = i
+
+        self._closures: list[int] = []
+        for i, scc in enumerate(self._sccs):
+            mask = 0
+            for node in scc:
+                mask |= 1 << position[node]
+                for dep in deps_adj.get(node, ()):
+                    j = self._scc_of[dep]
+                    if j != i:
+                        mask |= self._closures[j]
+            self._closures.append(mask)
+
+    def closure(self, target: str) -> list[str]:
+        """Packages in target's roadmap (target included), in build order."""
+        mask = self._closures[self._scc_of[target]]
+        order: list[str] = []
+        while mask:
+            low = mask & -mask
+            order.append(self.build_order[low.bit_length() - 1])
+            mask ^= low
+        return order
+
+    def result_for(self, target: str) -> RoadmapResult:
+        """Build the RoadmapResult for one target from the shared graph."""
+        order = self.closure(target)
+        members = set(order)
+        result = RoadmapResult(target=target, build_order=order)
+
+        for i, pkg in enumerate(order):
+            exp = self.expansions[pkg]
+            result.dropped_deps.update(exp.dropped)
+            result.sysroot_deps.update(exp.sysroot)
+            result.unresolvable_deps.update(exp.unresolvable)
+
+            info = exp.new_info()
+            info.build_order = i + 1
+            info.needed_by = [d for d in self._dependents.get(pkg, ()) if d in members]
+            result.packages[pkg] = info
+
+        result.cycles = [
+            scc for scc in self._sccs if len(scc) > 1 and scc[0] in members
+        ]
+        return result
+
+
 # --- Output formatters ---
 
 
@@ -917,6 +1263,63 @@ def format_json(result: RoadmapResult) -> str:
     return json.dumps(data, indent=2)
 
 
+def format_reverse_text(result: ReverseResult) -> str:
+    """Format a reverse roadmap query as text."""
+    unblocked = [c for c in result.candidates if c.unblocked]
+    closer = [c for c in result.candidates if not c.unblocked]
+
+    lines = [
+        f"Reverse roadmap: what does building {result.target} unblock?",
+        f"  Unblocked: {len(unblocked)}  Closer: {len(closer)}  "
+        f"Already built: {len(result.already_built)}",
+        "",
+    ]
+
+    if unblocked:
+        lines.append("Become buildable:")
+        for c in unblocked:
+            lines.append(
+                f"  {c.name:<35s} {c.classification.value:<12s} "
+                f"needed by {c.downstream}"
+            )
+        lines.append("")
+
+    if closer:
+        lines.append("Move closer (remaining unbuilt deps):")
+        for c in closer:
+            shown = ", ".join(c.remaining[:5])
+            extra = f" ...+{len(c.remaining) - 5}" if len(c.remaining) > 5 else ""
+            lines.append(
+                f"  {c.name:<35s} needed by {c.downstream:<4d} "
+                f"{len(c.remaining)} left: {shown}{extra}"
+            )
+        lines.append("")
+
+    if not result.candidates:
+        lines.append("No unbuilt packages depend on this package.")
+
+    return "\n".join(lines)
+
+
+def format_reverse_json(result: ReverseResult) -> str:
+    """Format a reverse roadmap query as JSON."""
+    data = {
+        "target": result.target,
+        "candidates": [
+            {
+                "name": c.name,
+                "status": c.classification.value,
+                "unblocked": c.unblocked,
+                "remaining": c.remaining,
+                "downstream": c.downstream,
+            }
+            for c in result.candidates
+        ],
+        "already_built": result.already_built,
+    }
+    return json.dumps(data, indent=2)
+
+
 def format_tree(result: RoadmapResult, console: Console):
     """Render dependency tree using Rich Tree widget."""
     cls_icons = {
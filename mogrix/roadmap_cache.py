@@ -0,0 +1,223 @@
+"""Persistent on-disk cache of roadmap results.
+
+`mogrix roadmap` is run for the same targets many times a day. A resolved
+RoadmapResult only depends on the repo metadata index, the rules tree, the
+set of built RPMs and the resolver options, so it is cached on disk under a
+key derived from those:
+
+- graph key: index build_time + release, a stat fingerprint of the rules
+  tree and the resolver options. Anything that can change the graph shape.
+- RPMS key: the sorted listing of the RPMS directory. Built RPMs only change
+  node classification, so when just this differs the cached graph is kept
+  and only the packages whose built state changed are reclassified.
+
+Used by `mogrix roadmap` (disable with --no-cache).
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+
+from mogrix.roadmap import Classification, PackageInfo, RoadmapResolver, RoadmapResult
+
+# Bump when resolution semantics change so stale entries are ignored.
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "mogrix" / "roadmap"
+
+
+def _rules_fingerprint(rules_dir: Path) -> str:
+    """Fingerprint every file under the rules tree by path, size and mtime."""
+    h = hashlib.sha256()
+    if rules_dir.exists():
+        for path in sorted(rules_dir.rglob("*")):
+            if path.is_file():
+                st = path.stat()
+                rel = path.relative_to(rules_dir)
+                h.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def _rpms_fingerprint(rpms_dir: Path) -> str:
+    """Fingerprint the RPMS directory listing (file names only)."""
+    h = hashlib.sha256()
+    if rpms_dir.exists():
+        for name in sorted(p.name for p in rpms_dir.glob("*.rpm")):
+            h.update(name.encode() + b"\n")
+    return h.hexdigest()
+
+
+def result_to_dict(result: RoadmapResult) -> dict:
+    """Serialize a RoadmapResult losslessly (unlike format_json)."""
+    return {
+        "target": result.target,
+        "packages": {
+            name: {
+                "classification": info.classification.value,
+                "complexity": info.complexity,
+                "build_order": info.build_order,
+                "buildrequires": info.buildrequires,
+                "needed_by": info.needed_by,
+                "drop_reason": info.drop_reason,
+                "non_fedora_source": info.non_fedora_source,
+            }
+            for name, info in result.packages.items()
+        },
+        "build_order": result.build_order,
+        "cycles": result.cycles,
+        "dropped_deps": result.dropped_deps,
+        "unresolvable_deps": result.unresolvable_deps,
+        "sysroot_deps": sorted(result.sysroot_deps),
+    }
+
+
+def result_from_dict(data: dict) -> RoadmapResult:
+    """Inverse of result_to_dict()."""
+    packages = {}
+    for name, info in data["packages"].items():
+        packages[name] = PackageInfo(
+            name=name,
+            classification=Classification(info["classification"]),
+            complexity=info["complexity"],
+            build_order=info["build_order"],
+            buildrequires=info["buildrequires"],
+            needed_by=info["needed_by"],
+            drop_reason=info["drop_reason"],
+            non_fedora_source=info["non_fedora_source"],
+        )
+    return RoadmapResult(
+        target=data["target"],
+        packages=packages,
+        build_order=data["build_order"],
+        cycles=data["cycles"],
+        dropped_deps=data["dropped_deps"],
+        unresolvable_deps=data["unresolvable_deps"],
+        sysroot_deps=set(data["sysroot_deps"]),
+    )
+
+
+class RoadmapCache:
+    """Caches RoadmapResult objects on disk, keyed by index and rules state.
+
+    Call `resolve(target, make_resolver)`; `make_resolver` is only invoked
+    when the cached entry is missing or stale, so a hit never scans RPMS or
+    loads rules. `last_status` records "hit", "partial" or "miss".
+    """
+
+    def __init__(
+        self,
+        db,
+        rules_dir: Path,
+        rpms_dir: Path,
+        stop_at_rules: bool = False,
+        max_depth: int = 0,
+        cache_dir: Path | None = None,
+    ):
+        self.rpms_dir = rpms_dir
+        self.stop_at_rules = stop_at_rules
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.last_status = ""
+
+        meta = {}
+        try:
+            meta = dict(db.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.Error:
+            pass
+
+        graph_parts = [
+            f"v{CACHE_VERSION}",
+            meta.get("release", ""),
+            meta.get("build_time", ""),
+            _rules_fingerprint(rules_dir),
+            f"stop_at_rules={stop_at_rules}",
+            f"max_depth={max_depth}",
+        ]
+        self.graph_key = hashlib.sha256("\n".join(graph_parts).encode()).hexdigest()[:24]
+        self.rpms_key = _rpms_fingerprint(rpms_dir)
+
+    def _entry_path(self, target: str) -> Path:
+        safe = re.sub(r"[^\w.+-]", "_", target)
+        return self.cache_dir / self.graph_key / f"{safe}.json"
+
+    def _load(self, target: str) -> dict | None:
+        path = self._entry_path(target)
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if entry.get("result", {}).get("target") != target:
+            return None
+        return entry
+
+    def _store(self, target: str, result: RoadmapResult, built: dict[str, bool]):
+        path = self._entry_path(target)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "rpms_key": self.rpms_key,
+            "built": built,
+            "result": result_to_dict(result),
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry))
+        tmp.replace(path)
+
+    def resolve(
+        self, target: str, make_resolver: Callable[[], RoadmapResolver]
+    ) -> RoadmapResult:
+        """Return the roadmap for target, from cache where possible."""
+        entry = self._load(target)
+        if entry and entry["rpms_key"] == self.rpms_key:
+            self.last_status = "hit"
+            return result_from_dict(entry["result"])
+
+        resolver = make_resolver()
+        built = resolver.built_packages
+
+        if entry:
+            result = result_from_dict(entry["result"])
+            if self._reclassify(result, entry["built"], resolver):
+                self.last_status = "partial"
+                self._store(target, result, built)
+                return result
+
+        self.last_status = "miss"
+        result = resolver.resolve(target)
+        self._store(target, result, built)
+        return result
+
+    def _reclassify(
+        self,
+        result: RoadmapResult,
+        old_built: dict[str, bool],
+        resolver: RoadmapResolver,
+    ) -> bool:
+        """Update a cached result for a changed set of built packages.
+
+        Only packages whose built/verified state changed are reclassified.
+        Returns False when the graph itself may have changed (with
+        --stop-at-rules a newly built package can change where recursion
+        stops), in which case the caller re-resolves.
+        """
+        new_built = resolver.built_packages
+        changed = {
+            name
+            for name in set(old_built) | set(new_built)
+            if old_built.get(name) != new_built.get(name)
+        }
+        mentioned = set(result.packages)
+        for info in result.packages.values():
+            mentioned.update(info.buildrequires)
+        affected = changed & mentioned
+        if not affected:
+            return True
+        if self.stop_at_rules:
+            return False
+
+        for name in affected & set(result.packages):
+            resolver.reclassify(result.packages[name])
+        return True
@@ -162,11 +162,13 @@ class RoadmapChecker:
         rule_loader: RuleLoader,
         rules_dir: Path,
         rpms_dir: Path,
+        preload: bool = False,
     ):
         self.db = db
         self.rule_loader = rule_loader
         self.rules_dir = rules_dir
         self.rpms_dir = rpms_dir
+        self.preload = preload
 
     def check_package(self, target: str) -> CheckResult:
         """Validate roadmap for a single built package.
@@ -181,6 +183,7 @@ class RoadmapChecker:
             rule_loader=self.rule_loader,
             rules_dir=self.rules_dir,
             rpms_dir=self.rpms_dir,
+            preload=self.preload,
         )
         # Clear roadmap drops to get unfiltered predictions
         resolver._roadmap_drops = {}
@@ -188,10 +191,13 @@ class RoadmapChecker:
         result = resolver.resolve(target)
         return self._analyze_result(target, result)
 
-    def check_all_built(self) -> list[CheckResult]:
+    def check_all_built(self, whole_graph: bool = False) -> list[CheckResult]:
         """Run roadmap-check for all packages with built RPMs.
 
-        Uses a single RoadmapResolver instance for shared caches.
+        Uses a single RoadmapResolver instance for shared caches. With
+        whole_graph=True the union graph of all built packages is resolved
+        once and each package's roadmap is derived from memoized per-SCC
+        closures instead of a separate resolve() per package.
         """
         # Construct a single resolver (caches accumulate across calls)
         resolver = RoadmapResolver(
@@ -199,13 +205,20 @@ class RoadmapChecker:
             rule_loader=self.rule_loader,
             rules_dir=self.rules_dir,
             rpms_dir=self.rpms_dir,
+            preload=self.preload,
         )
         # Clear roadmap drops to get unfiltered predictions
         resolver._roadmap_drops = {}
 
+        targets = sorted(resolver._built_packages.keys())
+        graph = resolver.resolve_graph(targets) if whole_graph else None
+
         results = []
-        for pkg_name in sorted(resolver._built_packages.keys()):
-            roadmap = resolver.resolve(pkg_name)
+        for pkg_name in targets:
+            if graph is not None:
+                roadmap = graph.result_for(pkg_name)
+            else:
+                roadmap = resolver.resolve(pkg_name)
             check = self._analyze_result(pkg_name, roadmap)
             results.append(check)
         return results
@@ -0,0 +1,254 @@
+"""Persistent catalog of binary RPM metadata.
+
+BundleBuilder needs the name, version, source RPM and file list of every
+RPM in ~/mogrix_outputs/RPMS before it can resolve a single dependency.
+Querying them with `rpm -qp` took three process spawns per RPM on every
+`mogrix bundle` run. The catalog keeps that metadata in SQLite:
+
+- `update()` stats the RPMs of a directory and queries only those that
+  are new or whose size/mtime changed, with a single `rpm -qp` each (run
+  in parallel). RPMs that disappeared are dropped.
+- `load()` returns everything for a directory in one query.
+
+Provided sonames are derived from the file list (lib32 .so entries), the
+same rule BundleBuilder has always used.
+
+Each RPM's sha256 is recorded too. The NEEDED/SONAME sets of the ELF
+files in its payload are stored under that checksum, so an identical RPM
+(same file in another directory, or unchanged after a touch) is never
+read again to resolve bundle dependencies.
+"""
+
+import os
+import sqlite3
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from mogrix.blobstore import file_digest
+
+# Default catalog location (next to the other mogrix caches)
+DEFAULT_CATALOG_PATH = Path.home() / ".cache" / "mogrix" / "rpm-catalog.db"
+
+# Bump when the schema changes; older catalogs are rebuilt
+CATALOG_VERSION = 2
+
+# One rpm -qp call per RPM: header fields, then one line per file
+QUERY_FORMAT = "%{NAME}\\n%{VERSION}\\n%{RELEASE}\\n%{SOURCERPM}\\n[%{FILENAMES}\\n]"
+
+
+@dataclass
+class RpmElfDeps:
+    """What the ELF files in one RPM's payload need and provide."""
+
+    needed: set[str] = field(default_factory=set)  # DT_NEEDED
+    sonames: set[str] = field(default_factory=set)  # DT_SONAME
+
+
+@dataclass
+class RpmInfo:
+    """Catalogued metadata of one binary RPM."""
+
+    path: Path
+    name: str
+    version: str
+    release: str
+    sourcerpm: str  # "" when the RPM has none
+    files: list[str] = field(default_factory=list)
+    sha256: str = ""
+
+    @property
+    def sonames(self) -> list[str]:
+        """Shared libraries the RPM ships under a lib32 directory."""
+        return [
+            os.path.basename(f) for f in self.files
+            if "/lib32/" in f and ".so" in f
+        ]
+
+    def tags(self) -> dict[str, str]:
+        """Header tags as rpm --queryformat names them."""
+        return {
+            "NAME": self.name,
+            "VERSION": self.version,
+            "RELEASE": self.release,
+            "SOURCERPM": self.sourcerpm or "(none)",
+        }
+
+
+def query_rpm(rpm_path: Path) -> RpmInfo | None:
+    """Read an RPM's metadata with one rpm -qp call (None if rpm fails)."""
+    try:
+        result = subprocess.run(
+            ["rpm", "-qp", "--queryformat", QUERY_FORMAT, str(rpm_path)],
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+    lines = result.stdout.splitlines()
+    if result.returncode != 0 or len(lines) < 4 or not lines[0]:
+        return None
+    name, version, release, sourcerpm = lines[:4]
+    return RpmInfo(
+        path=rpm_path,
+        name=name,
+        version=version,
+        release=release,
+        sourcerpm="" if sourcerpm == "(none)" else sourcerpm,
+        files=[line for line in lines[4:] if line],
+        sha256=file_digest(rpm_path),
+    )
+
+
+class RpmCatalog:
+    """SQLite catalog of RPM metadata, keyed by directory and file name.
+
+    The database is opened on first use.
+    """
+
+    def __init__(self, db_path: Path | None = None, jobs: int | None = None):
+        self.db_path = db_path or DEFAULT_CATALOG_PATH
+        self.jobs = jobs or min(8, os.cpu_count() or 1)
+        self._conn: sqlite3.Connection | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != CATALOG_VERSION:
+                self._conn.executescript(f"""
+                    DROP TABLE IF EXISTS rpms;
+                    DROP TABLE IF EXISTS elf_deps;
+                    PRAGMA user_version = {CATALOG_VERSION};
+                """)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS rpms (
+                    dir TEXT NOT NULL,
+                    file TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    release TEXT NOT NULL,
+                    sourcerpm TEXT NOT NULL,
+                    files TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    PRIMARY KEY (dir, file)
+                );
+                CREATE TABLE IF NOT EXISTS elf_deps (
+                    sha256 TEXT PRIMARY KEY,
+                    needed TEXT NOT NULL,
+                    sonames TEXT NOT NULL
+                );
+            """)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def update(self, rpms_dir: Path) -> dict[str, int]:
+        """Bring the catalog in line with the RPMs in rpms_dir.
+
+        Returns:
+            Counts of "added", "updated", "removed", "unchanged" and
+            "failed" (rpm could not read the file) RPMs.
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0}
+        dir_key = str(rpms_dir.resolve())
+        known = {
+            file: (size, mtime_ns)
+            for file, size, mtime_ns in self.conn.execute(
+                "SELECT file, size, mtime_ns FROM rpms WHERE dir = ?", (dir_key,)
+            )
+        }
+
+        stale = []
+        current = set()
+        for path in sorted(rpms_dir.glob("*.rpm")):
+            st = path.stat()
+            current.add(path.name)
+            stamp = (st.st_size, st.st_mtime_ns)
+            if known.get(path.name) == stamp:
+                counts["unchanged"] += 1
+            else:
+                stale.append((path, stamp))
+
+        gone = sorted(set(known) - current)
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM rpms WHERE dir = ? AND file = ?",
+                [(dir_key, file) for file in gone],
+            )
+        counts["removed"] = len(gone)
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            infos = list(pool.map(query_rpm, [path for path, _ in stale]))
+
+        with self.conn:
+            for (path, (size, mtime_ns)), info in zip(stale, infos):
+                if info is None:
+                    counts["failed"] += 1
+                    # Forget the old entry; the file is retried next time
+                    self.conn.execute(
+                        "DELETE FROM rpms WHERE dir = ? AND file = ?", (dir_key, path.name)
+                    )
+                    continue
+                counts["updated" if path.name in known else "added"] += 1
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO rpms"
+                    " (dir, file, size, mtime_ns, name, version, release, sourcerpm,"
+                    " files, sha256) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (dir_key, path.name, size, mtime_ns, info.name, info.version,
+                     info.release, info.sourcerpm, "\n".join(info.files), info.sha256),
+                )
+        return counts
+
+    def load(self, rpms_dir: Path) -> list[RpmInfo]:
+        """All catalogued RPMs of rpms_dir, sorted by file name."""
+        rows = self.conn.execute(
+            "SELECT file, name, version, release, sourcerpm, files, sha256 FROM rpms"
+            " WHERE dir = ? ORDER BY file",
+            (str(rpms_dir.resolve()),),
+        )
+        return [
+            RpmInfo(
+                path=rpms_dir / file,
+                name=name,
+                version=version,
+                release=release,
+                sourcerpm=sourcerpm,
+                files=files.split("\n") if files else [],
+                sha256=sha256,
+            )
+            for file, name, version, release, sourcerpm, files, sha256 in rows
+        ]
+
+    def known_sha256s(self) -> set[str]:
+        """Checksums of every catalogued RPM, in any directory."""
+        return {row[0] for row in self.conn.execute("SELECT sha256 FROM rpms")}
+
+    def get_elf_deps(self, sha256: str) -> RpmElfDeps | None:
+        """Stored NEEDED/SONAME sets of the RPM with this checksum."""
+        row = self.conn.execute(
+            "SELECT needed, sonames FROM elf_deps WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        if row is None:
+            return None
+        return RpmElfDeps(
+            needed=set(row[0].split()),
+            sonames=set(row[1].split()),
+        )
+
+    def put_elf_deps(self, sha256: str, deps: RpmElfDeps) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO elf_deps (sha256, needed, sonames) VALUES (?, ?, ?)",
+                (sha256, " ".join(sorted(deps.needed)), " ".join(sorted(deps.sonames))),
+            )
@@ -0,0 +1,148 @@
+"""Streaming access to RPM payloads without extracting them to disk.
+
+`rpm2cpio` decompresses the payload (gzip, xz or zstd, whatever the RPM
+was built with) and this module parses the resulting cpio "newc" stream
+in-process. Callers choose which members they want from the first bytes
+of each file, so e.g. check-elf reads only the members that start with
+the ELF magic and never touches the rest beyond skipping over it.
+
+Hardlinked files carry their data on the last link of the set only; the
+earlier links come through with no data.
+"""
+
+import stat
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator
+
+CPIO_MAGICS = (b"070701", b"070702")  # newc, newc with CRC
+CPIO_TRAILER = "TRAILER!!!"
+_HEADER_LEN = 110
+_SKIP_CHUNK = 1 << 20
+
+# select(path, mode, head) -> bool: whether to read a regular file's data.
+# `head` holds up to PEEK_BYTES of the file.
+PEEK_BYTES = 4
+Selector = Callable[[str, int, bytes], bool]
+
+
+@dataclass
+class PayloadMember:
+    """One cpio entry. `data` is the file content for selected regular
+    files, the link target for symlinks and None otherwise."""
+
+    path: str  # absolute, e.g. /usr/lib32/libfoo.so.1
+    mode: int
+    size: int
+    ino: int
+    nlink: int
+    data: bytes | None = None
+
+    @property
+    def is_file(self) -> bool:
+        return stat.S_ISREG(self.mode)
+
+    @property
+    def is_symlink(self) -> bool:
+        return stat.S_ISLNK(self.mode)
+
+
+def _read_exact(stream: BinaryIO, n: int) -> bytes:
+    chunks = []
+    while n > 0:
+        chunk = stream.read(n)
+        if not chunk:
+            raise EOFError("truncated cpio archive")
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def _skip(stream: BinaryIO, n: int) -> None:
+    while n > 0:
+        chunk = stream.read(min(n, _SKIP_CHUNK))
+        if not chunk:
+            raise EOFError("truncated cpio archive")
+        n -= len(chunk)
+
+
+def _pad(n: int) -> int:
+    return -n % 4
+
+
+def iter_cpio(stream: BinaryIO, select: Selector | None = None) -> Iterator[PayloadMember]:
+    """Yield the members of a newc cpio stream, reading it front to back.
+
+    Regular files get their data only if `select` accepts them (all of
+    them when `select` is None).
+    """
+    while True:
+        header = _read_exact(stream, _HEADER_LEN)
+        if header[:6] not in CPIO_MAGICS:
+            raise ValueError(f"not a newc cpio stream (magic {header[:6]!r})")
+        fields = [int(header[6 + i * 8:14 + i * 8], 16) for i in range(13)]
+        ino, mode, nlink, size, namesize = fields[0], fields[1], fields[4], fields[6], fields[11]
+
+        raw_name = _read_exact(stream, namesize)
+        _skip(stream, _pad(_HEADER_LEN + namesize))
+        name = raw_name.rstrip(b"\0").decode("utf-8", errors="surrogateescape")
+        if name == CPIO_TRAILER:
+            return
+        if name.startswith("./"):
+            name = name[2:]
+
+        member = PayloadMember(
+            path="/" + name.lstrip("/"),
+            mode=mode,
+            size=size,
+            ino=ino,
+            nlink=nlink,
+        )
+        if stat.S_ISLNK(mode):
+            member.data = _read_exact(stream, size)
+        elif stat.S_ISREG(mode) and size:
+            head = _read_exact(stream, min(size, PEEK_BYTES))
+            if select is None or select(member.path, mode, head):
+                member.data = head + _read_exact(stream, size - len(head))
+            else:
+                _skip(stream, size - len(head))
+        else:
+            _skip(stream, size)
+        _skip(stream, _pad(size))
+        yield member
+
+
+def iter_payload(rpm_path: Path, select: Selector | None = None) -> Iterator[PayloadMember]:
+    """Yield the payload members of an RPM (see iter_cpio).
+
+    Raises RuntimeError if rpm2cpio is missing or cannot read the RPM.
+    """
+    try:
+        proc = subprocess.Popen(
+            ["rpm2cpio", str(rpm_path)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except FileNotFoundError as e:
+        raise RuntimeError("rpm2cpio not found. Install rpm-tools or equivalent.") from e
+
+    try:
+        try:
+            yield from iter_cpio(proc.stdout, select)
+        except (EOFError, ValueError) as e:
+            # Close our end first so a still-writing rpm2cpio exits
+            proc.stdout.close()
+            err = proc.stderr.read().decode(errors="replace").strip()
+            raise RuntimeError(f"rpm2cpio failed for {rpm_path.name}: {err or e}") from e
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        proc.stderr.close()
+
+
+def select_magic(magic: bytes) -> Selector:
+    """Selector for regular files whose content starts with `magic`."""
+    return lambda _path, _mode, head: head.startswith(magic)
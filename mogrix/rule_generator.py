@@ -3,17 +3,29 @@
 Analyzes source tarballs and spec files to generate candidate YAML rule files
 with >90% confidence. Generated files go to rules/candidates/ for human review
 before promotion to rules/packages/.
+
+Used by batch-build for packages without rules, and by `mogrix
+generate-rules`, which runs generate_candidates() over many SRPMs in
+parallel worker processes.
 """
 
-import subprocess
-import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
 import yaml
 
-from mogrix.analyzers.source import SourceAnalyzer, SourceAnalysisResult
+from mogrix.analyzers.scan_cache import ScanCache
+from mogrix.analyzers.source import (
+    ScanPattern,
+    SourceAnalyzer,
+    SourceAnalysisResult,
+    find_tarballs,
+)
+from mogrix.analyzers.source_index import SourceIndex
 from mogrix.parser.spec import SpecFile, SpecParser
 from mogrix.parser.srpm import SRPMExtractor
 
@@ -49,6 +61,13 @@ KNOWN_LINUX_PATTERNS = [
     "selinux*",
 ]
 
+# Detector patterns evaluated in the same pass as the source checks:
+# GNU gettext in configure scripts (NLS class candidate), and MIPS assembly
+# directives the LLVM integrated assembler mishandles
+NLS_PATTERN = ScanPattern("AM_GNU_GETTEXT", "configure.*,*.ac,*.in")
+MIPS_ASM_PATTERN = ScanPattern(r"\.(cpsetup|gpword|gpdword|set\s+mips)", "*.S,*.s")
+DETECTOR_PATTERNS = [NLS_PATTERN, MIPS_ASM_PATTERN]
+
 
 @dataclass
 class CandidateRule:
@@ -76,6 +95,18 @@ class CandidateRules:
         return bool(self.rules) or bool(self.classes)
 
 
+@dataclass
+class GenerationResult:
+    """Outcome of generating candidate rules for one SRPM."""
+
+    package: str
+    srpm_path: Path
+    candidate: CandidateRules | None = None
+    output_path: Path | None = None
+    error: str = ""
+    seconds: float = 0.0
+
+
 class RuleGenerator:
     """Generates candidate YAML rule files from source analysis."""
 
@@ -83,6 +114,8 @@ class RuleGenerator:
         self,
         rules_dir: Path,
         compat_dir: Path | None = None,
+        cache: ScanCache | None = None,
+        index: SourceIndex | None = None,
     ):
         project_root = Path(__file__).parent.parent
         self.rules_dir = rules_dir
@@ -90,6 +123,8 @@ class RuleGenerator:
         self.analyzer = SourceAnalyzer(
             source_checks_path=rules_dir / "source_checks.yaml",
             catalog_path=self.compat_dir / "catalog.yaml",
+            cache=cache,
+            index=index,
         )
 
     def generate_from_srpm(
@@ -111,39 +146,39 @@ class RuleGenerator:
         """
         candidate = CandidateRules(package=package)
 
-        with tempfile.TemporaryDirectory(prefix="mogrix-rulegen-") as tmpdir:
-            tmpdir_path = Path(tmpdir)
-
-            # Extract SRPM
-            try:
-                extractor = SRPMExtractor(srpm_path)
-                extracted_dir, spec_path = extractor.extract_spec()
-            except Exception:
-                candidate.todos.append("SRPM extraction failed — manual review needed")
-                return candidate
+        # Extract SRPM
+        try:
+            extractor = SRPMExtractor(srpm_path)
+            extracted_dir, spec_path = extractor.extract_spec()
+        except Exception:
+            candidate.todos.append("SRPM extraction failed — manual review needed")
+            return candidate
 
-            try:
-                # Parse spec for BuildRequires analysis
-                parser = SpecParser()
-                spec = parser.parse(spec_path)
+        try:
+            # Parse spec for BuildRequires analysis
+            parser = SpecParser()
+            spec = parser.parse(spec_path)
 
-                # Detect droppable BuildRequires
-                self._detect_droppable_buildrequires(spec, candidate)
+            # Detect droppable BuildRequires
+            self._detect_droppable_buildrequires(spec, candidate)
 
-                # Find source tarballs and scan them
-                self._scan_sources(extracted_dir, tmpdir_path, candidate)
+            # One streamed pass over the source tarballs feeds every
+            # detector: source checks plus the NLS and assembly patterns
+            nls_matches, asm_matches = self._scan_sources(
+                find_tarballs(extracted_dir), candidate
+            )
 
-                # Detect NLS class candidate
-                self._detect_nls_class(extracted_dir, tmpdir_path, candidate)
+            # Detect NLS class candidate
+            self._detect_nls_class(nls_matches, candidate)
 
-                # Detect MIPS assembly files that might need -fno-integrated-as
-                self._detect_mips_assembly(extracted_dir, tmpdir_path, candidate)
+            # Detect MIPS assembly files that might need -fno-integrated-as
+            self._detect_mips_assembly(asm_matches, candidate)
 
-            finally:
-                # Clean up extracted SRPM
-                import shutil
-                if extracted_dir.exists():
-                    shutil.rmtree(extracted_dir)
+        finally:
+            # Clean up extracted SRPM
+            import shutil
+            if extracted_dir.exists():
+                shutil.rmtree(extracted_dir)
 
         return candidate
 
@@ -175,26 +210,17 @@ class RuleGenerator:
 
     def _scan_sources(
         self,
-        extracted_dir: Path,
-        workdir: Path,
+        tarballs: list[Path],
         candidate: CandidateRules,
-    ):
-        """Scan source tarballs for compat function needs."""
-        # Find source tarballs in extracted SRPM
-        tarball_exts = {".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz"}
-        tarballs = [
-            f for f in extracted_dir.iterdir()
-            if f.is_file() and any(f.name.endswith(ext) for ext in tarball_exts)
-        ]
+    ) -> list[list[tuple[str, int, str]]]:
+        """Scan source tarballs for compat function needs.
 
+        Returns the matches of DETECTOR_PATTERNS, found in the same pass.
+        """
         if not tarballs:
-            # Try scanning the extracted directory directly (no tarball)
-            return
+            return [[] for _ in DETECTOR_PATTERNS]
 
-        # Scan the first/main tarball
-        tarball = tarballs[0]
-        scan_dir = workdir / "scan"
-        result = self.analyzer.scan_tarball(tarball, scan_dir)
+        result = self.analyzer.scan_tarballs(tarballs, extra_patterns=DETECTOR_PATTERNS)
 
         candidate.files_scanned = result.files_scanned
         candidate.findings_count = len(result.findings)
@@ -221,73 +247,35 @@ class RuleGenerator:
                     f"{finding.check_id}: {finding.message} ({finding.file}:{finding.line})"
                 )
 
+        return result.extra_matches
+
     def _detect_nls_class(
         self,
-        extracted_dir: Path,
-        workdir: Path,
+        nls_matches: list[tuple[str, int, str]],
         candidate: CandidateRules,
     ):
         """Detect if the package uses GNU gettext (NLS class candidate)."""
-        # Find source tarballs
-        tarball_exts = {".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz"}
-        tarballs = [
-            f for f in extracted_dir.iterdir()
-            if f.is_file() and any(f.name.endswith(ext) for ext in tarball_exts)
-        ]
-
-        if not tarballs:
-            return
-
-        # Check if configure.ac/configure.in contains AM_GNU_GETTEXT
-        scan_dir = workdir / "scan"
-        if not scan_dir.exists():
-            # Extract if not already done
-            tarball = tarballs[0]
-            self.analyzer.scan_tarball(tarball, scan_dir)
-
-        # Look for AM_GNU_GETTEXT in configure.ac or configure.in
-        try:
-            result = subprocess.run(
-                ["rg", "-l", "AM_GNU_GETTEXT", "--glob", "configure.*",
-                 "--glob", "*.ac", "--glob", "*.in", str(scan_dir)],
-                capture_output=True, text=True, timeout=10,
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                candidate.classes.append("nls-disabled")
-                candidate.rules.append(CandidateRule(
-                    confidence=92,
-                    reason="configure.ac contains AM_GNU_GETTEXT",
-                    yaml_key="_class_nls",
-                    value="nls-disabled",
-                ))
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
+        # AM_GNU_GETTEXT in configure.ac or configure.in
+        if nls_matches:
+            candidate.classes.append("nls-disabled")
+            candidate.rules.append(CandidateRule(
+                confidence=92,
+                reason="configure.ac contains AM_GNU_GETTEXT",
+                yaml_key="_class_nls",
+                value="nls-disabled",
+            ))
 
     def _detect_mips_assembly(
         self,
-        extracted_dir: Path,
-        workdir: Path,
+        asm_matches: list[tuple[str, int, str]],
         candidate: CandidateRules,
     ):
         """Detect MIPS assembly files that may need special handling."""
-        scan_dir = workdir / "scan"
-        if not scan_dir.exists():
-            return
-
-        try:
-            result = subprocess.run(
-                ["rg", "-l", r"\.(cpsetup|gpword|gpdword|set\s+mips)",
-                 "--glob", "*.S", "--glob", "*.s", str(scan_dir)],
-                capture_output=True, text=True, timeout=10,
+        if asm_matches:
+            candidate.todos.append(
+                f"MIPS assembly detected in {len(asm_matches)} file(s) — "
+                "may need -fno-integrated-as (LLVM integrated assembler bug)"
             )
-            if result.returncode == 0 and result.stdout.strip():
-                asm_files = result.stdout.strip().splitlines()
-                candidate.todos.append(
-                    f"MIPS assembly detected in {len(asm_files)} file(s) — "
-                    "may need -fno-integrated-as (LLVM integrated assembler bug)"
-                )
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
 
     def write_candidate(
         self,
@@ -362,3 +350,86 @@ class RuleGenerator:
 
         output_path.write_text("\n".join(lines) + "\n")
         return output_path
+
+
+# Per-process generator for generate_candidates' worker pool
+_worker_generator: RuleGenerator | None = None
+
+
+def _init_generate_worker(
+    rules_dir: Path,
+    compat_dir: Path | None,
+    cache: ScanCache | None,
+    index_path: Path | None,
+) -> None:
+    global _worker_generator
+    index = SourceIndex.open_existing(index_path) if index_path else None
+    _worker_generator = RuleGenerator(rules_dir, compat_dir, cache=cache, index=index)
+
+
+def _generate_one(
+    generator: RuleGenerator, package: str, srpm_path: Path, output_dir: Path
+) -> GenerationResult:
+    result = GenerationResult(package=package, srpm_path=srpm_path)
+    started = time.monotonic()
+    try:
+        result.candidate = generator.generate_from_srpm(package, srpm_path)
+        result.output_path = generator.write_candidate(result.candidate, output_dir)
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    result.seconds = time.monotonic() - started
+    return result
+
+
+def _generate_in_worker(
+    package: str, srpm_path: Path, output_dir: Path
+) -> GenerationResult:
+    return _generate_one(_worker_generator, package, srpm_path, output_dir)
+
+
+def generate_candidates(
+    rules_dir: Path,
+    srpms: list[tuple[str, Path]],
+    output_dir: Path,
+    compat_dir: Path | None = None,
+    jobs: int = 1,
+    cache: ScanCache | None = None,
+    index_path: Path | None = None,
+) -> Iterator[GenerationResult]:
+    """Generate and write candidate rules for many SRPMs.
+
+    Args:
+        rules_dir: Rules directory (source_checks.yaml lives here).
+        srpms: (package name, SRPM path) pairs.
+        output_dir: Directory candidate YAML files are written to.
+        compat_dir: Compat directory (catalog.yaml), default <repo>/compat.
+        jobs: Worker processes; each generates one package at a time.
+        cache: Scan cache shared by all workers, or None for none.
+        index_path: Source index database, opened read-only by each
+            worker if it exists; None for no index.
+
+    Yields:
+        GenerationResult per SRPM, in completion order.
+    """
+    if jobs <= 1 or len(srpms) <= 1:
+        index = SourceIndex.open_existing(index_path) if index_path else None
+        generator = RuleGenerator(rules_dir, compat_dir, cache=cache, index=index)
+        try:
+            for package, srpm_path in srpms:
+                yield _generate_one(generator, package, srpm_path, output_dir)
+        finally:
+            if index:
+                index.close()
+        return
+
+    with ProcessPoolExecutor(
+        jobs,
+        initializer=_init_generate_worker,
+        initargs=(rules_dir, compat_dir, cache, index_path),
+    ) as pool:
+        futures = [
+            pool.submit(_generate_in_worker, package, srpm_path, output_dir)
+            for package, srpm_path in srpms
+        ]
+        for future in as_completed(futures):
+            yield future.result()
@@ -3,8 +3,15 @@
 Handles packages sourced from git repos or tarball URLs rather than
 Fedora SRPMs. Generates spec files from templates and creates SRPMs
 that enter the normal mogrix convert → build pipeline.
+
+Git upstreams are kept as persistent bare mirrors (one per URL) under the
+cache directory and updated with incremental fetches. Tarballs are made
+with `git archive` straight from the mirror and cached by (URL, commit),
+so re-converting an unchanged package needs no clone and, for commit and
+tag refs, no network at all.
 """
 
+import hashlib
 import subprocess
 import tempfile
 import urllib.request
@@ -13,6 +20,8 @@ from string import Template
 
 from rich.console import Console
 
+from mogrix.blobstore import place
+
 console = Console()
 
 # Project root (parent of mogrix/ package dir)
@@ -21,12 +30,16 @@ SPECS_DIR = MOGRIX_ROOT / "specs"
 TEMPLATES_DIR = SPECS_DIR / "templates"
 PACKAGES_DIR = SPECS_DIR / "packages"
 
+# Bare mirrors and archived tarballs of git upstreams
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "mogrix" / "upstream"
+
 
 class UpstreamSource:
     """Fetch upstream sources and generate spec files."""
 
-    def __init__(self, rules_dir: Path | None = None):
+    def __init__(self, rules_dir: Path | None = None, cache_dir: Path | None = None):
         self.rules_dir = rules_dir or MOGRIX_ROOT / "rules"
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
 
     def load_upstream_config(self, package_name: str) -> dict:
         """Load upstream: block from a package's rules YAML.
@@ -128,64 +141,107 @@ class UpstreamSource:
     def _fetch_git(
         self, url: str, ref: str, name: str, version: str, dest: Path
     ) -> None:
-        """Clone a git repo and create a tarball."""
-        with tempfile.TemporaryDirectory(prefix="mogrix-git-") as tmpdir:
-            clone_dir = Path(tmpdir) / name
-
-            console.print(f"  [dim]Cloning:[/dim] {url} (ref: {ref})")
-
-            if self._is_commit_sha(ref):
-                # Full SHA: clone then checkout (--branch doesn't work with SHAs)
-                result = subprocess.run(
-                    ["git", "clone", url, str(clone_dir)],
-                    capture_output=True,
-                    text=True,
-                )
-                if result.returncode != 0:
-                    raise RuntimeError(
-                        f"git clone failed: {result.stderr.strip()}"
-                    )
-                result = subprocess.run(
-                    ["git", "-C", str(clone_dir), "checkout", ref],
-                    capture_output=True,
-                    text=True,
-                )
-                if result.returncode != 0:
-                    raise RuntimeError(
-                        f"git checkout failed: {result.stderr.strip()}"
-                    )
-            else:
-                # Branch/tag: shallow clone
-                result = subprocess.run(
-                    [
-                        "git", "clone", "--depth", "1",
-                        "--branch", ref, url, str(clone_dir),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-                if result.returncode != 0:
-                    raise RuntimeError(
-                        f"git clone failed: {result.stderr.strip()}"
-                    )
-
-            # Create tarball with proper prefix
-            prefix = f"{name}-{version}/"
-            console.print(f"  [dim]Creating tarball:[/dim] {dest.name}")
-            result = subprocess.run(
+        """Create a tarball of ref from the cached bare mirror of url."""
+        mirror = self._ensure_mirror(url)
+        commit = self._resolve_commit(mirror, url, ref)
+
+        # Create tarball with proper prefix, cached by (URL, commit, prefix)
+        prefix = f"{name}-{version}/"
+        key = hashlib.sha256(f"{url}\0{commit}\0{prefix}".encode()).hexdigest()[:24]
+        cached = self.cache_dir / "tarballs" / f"{key}.tar.gz"
+
+        if cached.exists():
+            console.print(f"  [dim]Using cached tarball:[/dim] {commit[:12]}")
+        else:
+            console.print(f"  [dim]Creating tarball:[/dim] {dest.name} ({commit[:12]})")
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_name(cached.name + ".tmp")
+            self._git(
                 [
-                    "git", "-C", str(clone_dir),
+                    "-C", str(mirror),
                     "archive", "--format=tar.gz",
                     f"--prefix={prefix}",
-                    "-o", str(dest),
-                    "HEAD",
+                    "-o", str(tmp),
+                    commit,
                 ],
-                capture_output=True,
-                text=True,
+                "archive",
             )
-            if result.returncode != 0:
-                raise RuntimeError(
-                    f"git archive failed: {result.stderr.strip()}"
-                )
-
-            console.print(f"  [green]Created:[/green] {dest.name}")
+            tmp.replace(cached)
+
+        place(cached, dest)
+        console.print(f"  [green]Created:[/green] {dest.name}")
+
+    def _mirror_path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode()).hexdigest()[:24]
+        return self.cache_dir / "git" / f"{digest}.git"
+
+    def _ensure_mirror(self, url: str) -> Path:
+        """Return the bare mirror for url, cloning it on first use."""
+        mirror = self._mirror_path(url)
+        if mirror.exists():
+            return mirror
+
+        console.print(f"  [dim]Mirroring:[/dim] {url}")
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(
+            prefix="mogrix-git-", dir=mirror.parent
+        ) as tmpdir:
+            tmp_mirror = Path(tmpdir) / "mirror.git"
+            self._git(["clone", "--mirror", url, str(tmp_mirror)], "clone")
+            tmp_mirror.rename(mirror)
+        return mirror
+
+    def _resolve_commit(self, mirror: Path, url: str, ref: str) -> str:
+        """Resolve ref to a commit, fetching into the mirror only if needed.
+
+        Commit SHAs and tags already in the mirror resolve locally. Branches
+        can move, so their tip is checked with `git ls-remote` and the
+        mirror is only fetched when that commit is missing. Offline, the
+        mirror's last known branch tip is used.
+        """
+        if self._is_commit_sha(ref):
+            commit = self._local_commit(mirror, ref)
+        else:
+            commit = self._local_commit(mirror, f"refs/tags/{ref}")
+            if commit is None:
+                remote = self._remote_branch_commit(url, ref)
+                if remote is not None:
+                    commit = self._local_commit(mirror, remote)
+                else:
+                    commit = self._local_commit(mirror, ref)
+        if commit is not None:
+            return commit
+
+        console.print(f"  [dim]Fetching:[/dim] {url} (ref: {ref})")
+        self._git(["-C", str(mirror), "fetch", "--prune", "origin"], "fetch")
+        commit = self._local_commit(mirror, ref)
+        if commit is None:
+            raise RuntimeError(f"ref '{ref}' not found in {url}")
+        return commit
+
+    def _local_commit(self, mirror: Path, ref: str) -> str | None:
+        """Commit SHA for ref in the mirror, or None if it is not there."""
+        result = subprocess.run(
+            ["git", "-C", str(mirror), "rev-parse", "--verify", "-q", f"{ref}^{{commit}}"],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            return None
+        return result.stdout.strip()
+
+    def _remote_branch_commit(self, url: str, ref: str) -> str | None:
+        """Current tip of branch ref on the remote, or None if unavailable."""
+        result = subprocess.run(
+            ["git", "ls-remote", url, f"refs/heads/{ref}"],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0 or not result.stdout.strip():
+            return None
+        return result.stdout.split()[0]
+
+    def _git(self, args: list[str], what: str) -> None:
+        result = subprocess.run(["git", *args], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"git {what} failed: {result.stderr.strip()}")
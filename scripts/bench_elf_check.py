@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Benchmark check-elf: in-process mipself reader vs readelf subprocesses.
+
+Runs analyzers.elf.check_binary (mmap + lazy parsing) and the readelf-based
+check_binary_readelf over the same binaries, checks the results agree and
+prints wall time per pass.
+
+Usage:
+    scripts/bench_elf_check.py                      # repo fixture binaries
+    scripts/bench_elf_check.py ~/bundles/gtk3/_lib32 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from mogrix.analyzers.elf import check_binary, check_binary_readelf  # noqa: E402
+from mogrix.mipself import ELF_MAGIC  # noqa: E402
+
+DEFAULT_PATHS = [ROOT / "tests" / "fixtures" / "elf", ROOT / "tests" / "rld" / "out" / "bin"]
+
+
+def _find_elfs(paths: list[Path]) -> list[Path]:
+    found = []
+    for path in paths:
+        files = [path] if path.is_file() else sorted(
+            Path(root) / name for root, _dirs, names in os.walk(path) for name in names
+        )
+        for f in files:
+            if f.is_symlink() or not f.is_file():
+                continue
+            with open(f, "rb") as fh:
+                if fh.read(4) == ELF_MAGIC:
+                    found.append(f)
+    return found
+
+
+def _time(fn, binaries, repeat) -> tuple[float, list]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [fn(b) for b in binaries]
+    return (time.perf_counter() - start) / repeat, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path, default=DEFAULT_PATHS)
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per method (default: 3)")
+    args = parser.parse_args()
+
+    binaries = _find_elfs(args.paths)
+    if not binaries:
+        sys.exit("no ELF files found")
+    total = sum(b.stat().st_size for b in binaries)
+    print(f"{len(binaries)} ELF files, {total / 1e6:.1f} MB")
+
+    native, native_results = _time(check_binary, binaries, args.repeat)
+    readelf, readelf_results = _time(check_binary_readelf, binaries, args.repeat)
+
+    mismatches = [b for b, n, r in zip(binaries, native_results, readelf_results) if n != r]
+    print(f"  readelf  {readelf:8.3f}s")
+    print(f"  mipself  {native:8.3f}s   ({readelf / native:.1f}x)")
+    if mismatches:
+        print(f"  {len(mismatches)} results differ:")
+        for b in mismatches:
+            print(f"    {b}")
+        sys.exit(1)
+    print("  results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Benchmark the source scanner on a real source tree.
+
+Compares the single-pass MultiPatternScanner against one tree walk per
+pattern (the old rg-per-check approach, when rg is installed), and shows
+how scan time scales as the number of checks grows.
+
+Usage:
+    scripts/bench_source_scan.py ~/src/glib-2.80.0
+    scripts/bench_source_scan.py ~/src/qtbase --scale 1,2,4,8
+"""
+
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mogrix.analyzers.source import SourceAnalyzer  # noqa: E402
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source_dir", type=Path)
+    parser.add_argument(
+        "--scale",
+        default="1,2,4",
+        help="Comma-separated multipliers for the number of checks (default: 1,2,4)",
+    )
+    args = parser.parse_args()
+
+    analyzer = SourceAnalyzer()
+    base_checks = list(analyzer.checks)
+    base_catalog = list(analyzer.catalog_patterns)
+    n_patterns = len(base_checks) + len(base_catalog)
+    print(f"Tree: {args.source_dir}")
+    print(f"Patterns: {n_patterns}")
+
+    result = analyzer.scan_directory(args.source_dir)
+    print(f"Files scanned: {result.files_scanned}, findings: {len(result.findings)}")
+
+    for factor in (int(x) for x in args.scale.split(",")):
+        analyzer.checks = base_checks * factor
+        analyzer.catalog_patterns = base_catalog * factor
+        elapsed = _time(lambda: analyzer.scan_directory(args.source_dir))
+        print(f"  single pass, {n_patterns * factor:4d} patterns: {elapsed:7.2f}s")
+
+    if shutil.which("rg"):
+        analyzer.checks = base_checks
+        analyzer.catalog_patterns = base_catalog
+
+        def per_pattern():
+            for sp in analyzer._scan_patterns():
+                analyzer._run_rg(args.source_dir, sp.pattern, sp.glob)
+
+        elapsed = _time(per_pattern)
+        print(f"  rg per pattern, {n_patterns:4d} patterns: {elapsed:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Shared pytest fixtures and helpers."""
+
+import io
+import stat
+from pathlib import Path
+
+import pytest
+
+ELF_FIXTURES = Path(__file__).parent / "fixtures" / "elf"
+
+# Module-level default locations of the on-disk caches under ~/.cache/mogrix
+CACHE_DEFAULTS = {
+    "mogrix.blobstore.DEFAULT_STORE_DIR": "blobs",
+    "mogrix.elf_facts.DEFAULT_DB_PATH": "elf-facts.db",
+    "mogrix.rpm_catalog.DEFAULT_CATALOG_PATH": "rpm-catalog.db",
+    "mogrix.extract_cache.DEFAULT_EXTRACT_DIR": "extract",
+    "mogrix.analyzers.source_index.DEFAULT_INDEX_PATH": "source-index.db",
+    "mogrix.analyzers.scan_cache.DEFAULT_CACHE_DIR": "source-scan",
+    "mogrix.roadmap_cache.DEFAULT_CACHE_DIR": "roadmap",
+    "mogrix.upstream.DEFAULT_CACHE_DIR": "upstream",
+}
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Point every default cache at tmp_path/.cache/mogrix, never ~/.cache."""
+    root = tmp_path / ".cache" / "mogrix"
+    for target, name in CACHE_DEFAULTS.items():
+        monkeypatch.setattr(target, root / name)
+    return root
+
+
+def cpio_archive(entries) -> bytes:
+    """newc archive from (name, mode, data) entries, as rpm2cpio writes it."""
+    out = io.BytesIO()
+    for ino, (name, mode, data) in enumerate(entries + [("TRAILER!!!", 0, b"")], 1):
+        raw = name.encode() + b"\0"
+        fields = [ino, mode, 0, 0, 1, 0, len(data), 0, 0, 0, 0, len(raw), 0]
+        header = b"070701" + b"".join(b"%08X" % f for f in fields)
+        out.write(header + raw + b"\0" * (-(len(header) + len(raw)) % 4))
+        out.write(data + b"\0" * (-len(data) % 4))
+    return out.getvalue()
+
+
+def payload_entries():
+    """Payload members of the fixture RPMs: libfoo (file + symlink), libbar, a doc."""
+    foo = (ELF_FIXTURES / "libfoo.so.1.0").read_bytes()
+    bar = (ELF_FIXTURES / "libbar.so.1").read_bytes()
+    return [
+        ("./usr/sgug/lib32", stat.S_IFDIR | 0o755, b""),
+        ("./usr/sgug/lib32/libfoo.so.1.0", stat.S_IFREG | 0o755, foo),
+        ("./usr/sgug/lib32/libfoo.so.1", stat.S_IFLNK | 0o777, b"libfoo.so.1.0"),
+        ("./usr/sgug/lib32/libbar.so.1", stat.S_IFREG | 0o755, bar),
+        ("./usr/sgug/share/doc/README", stat.S_IFREG | 0o644, b"hello\n"),
+    ]
+
+
+# Fake rpm: logs each call and prints the prepared "<rpm>.qf" output
+FAKE_RPM = """#!/bin/sh
+for last; do :; done
+echo "$last" >> "$RPM_LOG"
+[ -f "$last.qf" ] || exit 1
+exec cat "$last.qf"
+"""
+
+# Fake rpm2cpio: logs each call and prints the prepared "<rpm>.cpio" payload
+FAKE_RPM2CPIO = """#!/bin/sh
+echo "$1" >> "$RPM2CPIO_LOG"
+exec cat "$1.cpio"
+"""
+
+
+def _write_rpm(rpms_dir: Path, name: str, sourcerpm: str, files: list[str]) -> Path:
+    rpm = rpms_dir / f"{name}-1.0-1.mips.rpm"
+    rpm.write_bytes(name.encode())
+    lines = [name, "1.0", "1", sourcerpm, *files]
+    Path(f"{rpm}.qf").write_text("\n".join(lines) + "\n")
+    return rpm
+
+
+@pytest.fixture
+def rpms_dir(tmp_path, monkeypatch):
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    (bindir / "rpm").write_text(FAKE_RPM)
+    (bindir / "rpm").chmod(0o755)
+    (bindir / "rpm2cpio").write_text(FAKE_RPM2CPIO)
+    (bindir / "rpm2cpio").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bindir}:/usr/bin:/bin")
+    monkeypatch.setenv("RPM_LOG", str(tmp_path / "rpm.log"))
+    monkeypatch.setenv("RPM2CPIO_LOG", str(tmp_path / "rpm2cpio.log"))
+
+    rpms = tmp_path / "RPMS"
+    rpms.mkdir()
+    foo = _write_rpm(rpms, "foo", "foo-1.0-1.src.rpm",
+                     ["/usr/sgug/bin/foo", "/usr/sgug/lib32/libfoo.so.1"])
+    _write_rpm(rpms, "foo-devel", "foo-1.0-1.src.rpm", ["/usr/sgug/lib32/libfoo.so"])
+    bar = _write_rpm(rpms, "bar", "(none)", ["/usr/sgug/lib32/libbar.so.1"])
+
+    entries = payload_entries()
+    Path(f"{foo}.cpio").write_bytes(cpio_archive(entries[:3]))
+    Path(f"{bar}.cpio").write_bytes(cpio_archive(entries[3:4]))
+    return rpms
+
+
+def queried(rpms_dir: Path, tool: str = "rpm") -> list[str]:
+    """RPM file names the fake rpm (or rpm2cpio) of rpms_dir was run on, in order."""
+    log = rpms_dir.parent / f"{tool}.log"
+    if not log.exists():
+        return []
+    return [Path(line).name for line in log.read_text().splitlines()]
@@ -0,0 +1,20 @@
+#!/bin/sh
+# Rebuild the MIPS n32 ELF fixtures used by tests/test_mipself.py.
+# Needs llvm-mc and ld.lld (any LLVM >= 14).
+set -e
+cd "$(dirname "$0")"
+MC=${MC:-llvm-mc}
+LLD=${LLD:-ld.lld}
+
+$MC -triple=mips64-linux-gnuabin32 -filetype=obj bar.s -o bar.o
+$MC -triple=mips64-linux-gnuabin32 -filetype=obj foo.s -o foo.o
+
+# Clean library: 2 LOAD segments, SONAME only
+$LLD -m elf32btsmipn32 -shared -soname libbar.so.1 --no-rosegment \
+    bar.o -o libbar.so.1
+# ClassRec with undefined REL32 targets, TEXTREL, RUNPATH, NEEDED,
+# 3 LOAD segments
+$LLD -m elf32btsmipn32 -shared -soname libfoo.so.1 -rpath /build/lib \
+    -z notext --no-rosegment foo.o libbar.so.1 -o libfoo.so.1.0
+
+rm -f bar.o foo.o
@@ -0,0 +1,28 @@
+	.text
+	.globl	helper
+	.type	helper,@function
+	.ent helper
+helper:
+	jr	$ra
+	nop
+	.end helper
+	.size helper, .-helper
+
+	.data
+	.globl	fooClassRec
+	.type	fooClassRec,@object
+	.p2align 2
+fooClassRec:
+	.word	xmPrimitiveClassRec
+	.word	0
+	.word	_XtInherit
+	.word	helper
+	.word	_XtInherit
+	.size	fooClassRec, 20
+	.type	localClassRec,@object
+localClassRec:
+	.word	objectClassRec
+	.word	_XtInherit
+	.size	localClassRec, 8
+	.section .ctors,"aw"
+	.word	helper
@@ -2,8 +2,9 @@
 """
 Static ELF verification for IRIX rld test suite.
 
-Runs on the build host (Linux) using readelf. Checks structural properties
-of cross-compiled binaries without needing IRIX access.
+Runs on the build host (Linux), reading ELF files with mogrix.mipself.
+Checks structural properties of cross-compiled binaries without needing
+IRIX access.
 
 Usage:
     python3 tests/rld/verify_elf.py              # check all
@@ -11,8 +12,6 @@ Usage:
 """
 
 import json
-import re
-import subprocess
 import sys
 from pathlib import Path
 
@@ -21,21 +20,16 @@ OUT_DIR = SCRIPT_DIR / "out"
 BIN_DIR = OUT_DIR / "bin"
 LIB_DIR = OUT_DIR / "lib"
 
-READELF = "readelf"
+sys.path.insert(0, str(SCRIPT_DIR.parent.parent))
+from mogrix.mipself import MipsElf  # noqa: E402
 
-
-def run_readelf(path, flags):
-    """Run readelf with given flags, return stdout."""
-    cmd = [READELF] + flags + [str(path)]
-    r = subprocess.run(cmd, capture_output=True, text=True)
-    return r.stdout
+DT_INIT_ARRAY = 25
 
 
 def check_load_segments(so_path):
     """Verify .so has exactly 2 LOAD segments (RE text + RW data)."""
-    out = run_readelf(so_path, ["-l"])
-    loads = [line for line in out.splitlines() if line.strip().startswith("LOAD")]
-    count = len(loads)
+    with MipsElf(so_path) as elf:
+        count = len(elf.load_segments)
     if count == 2:
         return True, f"OK: {count} LOAD segments"
     return False, f"FAIL: {count} LOAD segments (expected 2)"
@@ -43,28 +37,28 @@ def check_load_segments(so_path):
 
 def check_no_verneed(so_path):
     """Verify no VERNEED/VERSYM dynamic tags."""
-    out = run_readelf(so_path, ["-d"])
-    for tag in ["VERNEED", "VERSYM", "VERNEEDNUM"]:
-        if tag in out:
-            return False, f"FAIL: found {tag} tag (should be stripped)"
+    with MipsElf(so_path) as elf:
+        tags = elf.dynamic_tags
+    for name, tag in [("VERNEED", MipsElf.DT_VERNEED), ("VERSYM", MipsElf.DT_VERSYM),
+                      ("VERNEEDNUM", MipsElf.DT_VERNEEDNUM)]:
+        if tag in tags:
+            return False, f"FAIL: found {name} tag (should be stripped)"
     return True, "OK: no version tags"
 
 
 def check_no_init_array(so_path):
     """Verify .init_array is absent, .ctors is present."""
-    sections_out = run_readelf(so_path, ["-S"])
-    has_init_array = ".init_array" in sections_out
-    has_ctors = ".ctors" in sections_out
-
-    dyn_out = run_readelf(so_path, ["-d"])
-    has_dt_init = "INIT" in dyn_out and "INIT_ARRAY" not in dyn_out
+    with MipsElf(so_path) as elf:
+        has_init_array = elf.has_init_array()
+        has_ctors = elf.has_ctors()
+        has_dt_init_array = DT_INIT_ARRAY in elf.dynamic_tags
 
     issues = []
     if has_init_array:
         issues.append("has .init_array (rld ignores this)")
     if not has_ctors:
         issues.append("missing .ctors section")
-    if "INIT_ARRAY" in dyn_out:
+    if has_dt_init_array:
         issues.append("has DT_INIT_ARRAY tag")
 
     if issues:
@@ -74,25 +68,18 @@ def check_no_init_array(so_path):
 
 def check_dt_init(so_path):
     """Verify DT_INIT tag is present."""
-    out = run_readelf(so_path, ["-d"])
-    if re.search(r'\(INIT\)', out):
-        return True, "OK: DT_INIT present"
+    with MipsElf(so_path) as elf:
+        if elf.has_dt_init():
+            return True, "OK: DT_INIT present"
     return False, "FAIL: no DT_INIT tag"
 
 
 def check_got_global_count(so_path):
     """Check global GOT entry count: SYMTABNO - GOTSYM < 4370."""
-    out = run_readelf(so_path, ["-d"])
-
-    symtabno = None
-    gotsym = None
-    for line in out.splitlines():
-        m = re.search(r'MIPS_SYMTABNO\)?\s+(\d+)', line)
-        if m:
-            symtabno = int(m.group(1))
-        m = re.search(r'MIPS_GOTSYM\)?\s+(\d+)', line)
-        if m:
-            gotsym = int(m.group(1))
+    with MipsElf(so_path) as elf:
+        tags = elf.dynamic_tags
+    symtabno = tags.get(MipsElf.DT_MIPS_SYMTABNO)
+    gotsym = tags.get(MipsElf.DT_MIPS_GOTSYM)
 
     if symtabno is None or gotsym is None:
         return None, "SKIP: no MIPS GOT tags (not a MIPS .so?)"
@@ -105,8 +92,9 @@ def check_got_global_count(so_path):
 
 def check_rld_obj_head(exe_path):
     """Check __rld_obj_head is in .dynsym."""
-    out = run_readelf(exe_path, ["--dyn-syms"])
-    if "__rld_obj_head" in out:
+    with MipsElf(exe_path) as elf:
+        found = any(s.name == "__rld_obj_head" for s in elf.symbols if s.table == ".dynsym")
+    if found:
         return True, "OK: __rld_obj_head in .dynsym"
     return False, "FAIL: __rld_obj_head not in .dynsym"
 
@@ -0,0 +1,60 @@
+"""Tests for mogrix.blobstore."""
+
+import os
+
+from mogrix.blobstore import BlobStore, copy_replace, place
+
+
+def test_link_into_dedupes(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    a = tmp_path / "a" / "foo-1.0.tar.gz"
+    b = tmp_path / "b" / "foo-1.0.tar.gz"
+    for src in (a, b):
+        src.parent.mkdir()
+        src.write_bytes(b"tarball" * 1000)
+
+    out1 = tmp_path / "out1"
+    out2 = tmp_path / "out2"
+    out1.mkdir()
+    out2.mkdir()
+    store.link_into(a, out1 / a.name)
+    store.link_into(b, out2 / b.name)
+
+    blobs = list(store.objects.glob("*/*"))
+    assert len(blobs) == 1
+    assert os.path.samefile(out1 / a.name, blobs[0])
+    assert os.path.samefile(out2 / b.name, blobs[0])
+
+
+def test_place_replaces_instead_of_writing_through(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    src = tmp_path / "src.tar.gz"
+    src.write_bytes(b"original")
+    dest = tmp_path / "dest.tar.gz"
+    store.link_into(src, dest)
+    blob = store.add(dest)
+
+    other = tmp_path / "other"
+    other.write_bytes(b"changed")
+    place(other, dest)
+    assert blob.read_bytes() == b"original"
+
+    copy_replace(src, dest)
+    assert not os.path.samefile(src, dest)
+    assert blob.read_bytes() == b"original"
+
+
+def test_gc(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    kept = tmp_path / "kept"
+    dropped = tmp_path / "dropped"
+    kept.write_bytes(b"kept")
+    dropped.write_bytes(b"dropped!")
+    store.add(kept)
+    store.add(dropped)
+    dropped.unlink()
+
+    assert store.gc(dry_run=True) == (1, 8)
+    assert len(list(store.objects.glob("*/*"))) == 2
+    assert store.gc() == (1, 8)
+    assert [p.read_bytes() for p in store.objects.glob("*/*")] == [b"kept"]
@@ -0,0 +1,93 @@
+"""Tests for deterministic ustar + parallel gzip bundle packaging."""
+
+import gzip
+import io
+import os
+import tarfile
+
+import pytest
+
+from mogrix.bundle import BundleBuilder
+from mogrix.bundle_archive import ParallelGzipWriter, write_bundle_tar_gz
+
+
+@pytest.fixture
+def bundle_dir(tmp_path):
+    root = tmp_path / "app-1.0-irix-bundle.0101260000"
+    (root / "_bin").mkdir(parents=True)
+    (root / "_lib32").mkdir()
+    (root / "_bin" / "app").write_bytes(os.urandom(300_000))
+    (root / "_bin" / "app").chmod(0o755)
+    (root / "_lib32" / "libz.so.1.3").write_bytes(b"z" * 100_000)
+    (root / "_lib32" / "libz.so.1").symlink_to("libz.so.1.3")
+    (root / "README").write_text("hello\n")
+    return root
+
+
+def _pack(root, arcname=None, jobs=None):
+    out = io.BytesIO()
+    digest = write_bundle_tar_gz(root, arcname or root.name, out, level=1, jobs=jobs)
+    return out.getvalue(), digest
+
+
+def test_parallel_gzip_members(monkeypatch):
+    monkeypatch.setattr("mogrix.bundle_archive.BLOCK_SIZE", 1000)
+    data = os.urandom(2500) + b"x" * 5000
+    outputs = []
+    for jobs in (1, 4):
+        out = io.BytesIO()
+        with ParallelGzipWriter(out, level=9, jobs=jobs) as gz:
+            for i in range(0, len(data), 777):
+                gz.write(data[i:i + 777])
+        outputs.append(out.getvalue())
+
+    assert outputs[0] == outputs[1]
+    assert gzip.decompress(outputs[0]) == data
+    assert outputs[0].count(b"\x1f\x8b\x08") >= 8  # one member per block
+
+    empty = io.BytesIO()
+    ParallelGzipWriter(empty).close()
+    assert gzip.decompress(empty.getvalue()) == b""
+
+    with pytest.raises(ValueError):
+        ParallelGzipWriter(io.BytesIO(), level=0)
+
+
+def test_archive_is_deterministic_ustar(bundle_dir):
+    first, digest = _pack(bundle_dir, jobs=1)
+    os.utime(bundle_dir / "README", (0, 1_000_000))
+    second, digest2 = _pack(bundle_dir, jobs=4)
+    assert first == second and digest == digest2
+
+    raw = gzip.decompress(first)
+    assert raw[257:265] == b"ustar\x0000"  # POSIX ustar, not GNU or pax
+    with tarfile.open(fileobj=io.BytesIO(raw)) as tar:
+        members = tar.getmembers()
+    names = [m.name for m in members]
+    assert names[0] == bundle_dir.name
+    assert f"{bundle_dir.name}/_lib32/libz.so.1" in names
+    assert all(m.uid == 0 and m.gid == 0 and m.mtime == 0 for m in members)
+    link = next(m for m in members if m.issym())
+    assert link.linkname == "libz.so.1.3"
+
+    # The digest ignores the top-level name but not the content
+    _, renamed = _pack(bundle_dir, arcname="app-1.0-irix-bundle.0202260000")
+    assert renamed == digest
+    (bundle_dir / "README").write_text("changed\n")
+    assert _pack(bundle_dir)[1] != digest
+
+
+def test_self_extracting_payload(tmp_path, bundle_dir):
+    builder = BundleBuilder(tmp_path / "no-rpms")
+    run_path = tmp_path / "app.run"
+    digest = builder._create_self_extracting(run_path, bundle_dir, bundle_dir.name, "app 1.0")
+
+    data = run_path.read_bytes()
+    header_end = data.index(b"\x1f\x8b\x08")
+    header = data[:header_end].decode("ascii")
+    # The header's tail +N points at the first payload line
+    assert f"SKIP={header.count(chr(10)) + 1}\n" in header
+    with tarfile.open(fileobj=io.BytesIO(data[header_end:]), mode="r:gz") as tar:
+        assert f"{bundle_dir.name}/_bin/app" in tar.getnames()
+    assert digest == _pack(bundle_dir)[1]
+    assert os.access(run_path, os.X_OK)
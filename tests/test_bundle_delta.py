@@ -0,0 +1,121 @@
+"""Tests for bundle file manifests and delta .run updates."""
+
+import io
+import os
+import stat
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from mogrix.bundle import BundleBuilder
+from mogrix.bundle_delta import (
+    MANIFEST_NAME,
+    diff_manifests,
+    format_manifest,
+    load_base_manifest,
+    parse_manifest,
+    scan_tree,
+    write_manifest,
+)
+from tests.conftest import cpio_archive, payload_entries, queried
+
+
+@pytest.fixture
+def bundle_dir(tmp_path):
+    root = tmp_path / "app-1.0-irix-bundle.0101260000"
+    (root / "_bin").mkdir(parents=True)
+    (root / "_lib32" / "old").mkdir(parents=True)
+    (root / "_bin" / "app").write_bytes(b"app v1")
+    (root / "_bin" / "app").chmod(0o755)
+    (root / "_lib32" / "libz.so.1.3").write_bytes(os.urandom(50_000))
+    (root / "_lib32" / "libz.so.1").symlink_to("libz.so.1.3")
+    (root / "_lib32" / "old" / "gone.so").write_bytes(b"gone")
+    return root
+
+
+def _payload_names(run_path: Path) -> list[str]:
+    data = run_path.read_bytes()
+    payload = data[data.index(b"\x1f\x8b\x08"):]
+    with tarfile.open(fileobj=io.BytesIO(payload), mode="r:gz") as tar:
+        return tar.getnames()
+
+
+def test_manifest_round_trip(bundle_dir):
+    entries = write_manifest(bundle_dir)
+    assert MANIFEST_NAME not in entries
+    assert entries["_lib32/libz.so.1"].kind == "l"
+    assert entries["_lib32/libz.so.1"].digest == "libz.so.1.3"
+    assert entries["_bin/app"].mode == 0o755 and entries["_bin/app"].size == 6
+    assert entries["_lib32"].kind == "d"
+
+    text = (bundle_dir / MANIFEST_NAME).read_text()
+    assert parse_manifest(text) == entries == scan_tree(bundle_dir)
+    assert format_manifest(entries) == text
+    assert load_base_manifest(bundle_dir) == (bundle_dir.name, entries)
+    with pytest.raises(ValueError):
+        parse_manifest("not a manifest\n")
+
+
+def test_diff_manifests(bundle_dir):
+    old = scan_tree(bundle_dir)
+    (bundle_dir / "_bin" / "app").write_bytes(b"app v2")
+    (bundle_dir / "_lib32" / "old" / "gone.so").unlink()
+    (bundle_dir / "_lib32" / "old").rmdir()
+    (bundle_dir / "_lib32" / "libz.so.1").unlink()
+    (bundle_dir / "_lib32" / "libz.so.1").write_bytes(b"now a file")
+    (bundle_dir / "_bin" / "new").write_text("new\n")
+
+    delta = diff_manifests(old, scan_tree(bundle_dir))
+    assert delta.changed == ["_bin/app", "_bin/new", "_lib32/libz.so.1"]
+    assert delta.deleted == ["_lib32/old", "_lib32/old/gone.so"]
+    # Files before directories, so every directory is empty when removed
+    assert delta.remove == [
+        "_bin/app", "_lib32/libz.so.1", "_lib32/old/gone.so", "_lib32/old",
+    ]
+    assert diff_manifests(old, old).changed == []
+
+
+def test_delta_run_ships_only_changes(tmp_path, bundle_dir):
+    builder = BundleBuilder(tmp_path / "no-rpms")
+    write_manifest(bundle_dir)
+    base_run = tmp_path / "base.run"
+    builder._create_self_extracting(base_run, bundle_dir, bundle_dir.name, "app 1.0")
+    base_name, base_files = load_base_manifest(base_run)
+    assert base_name == bundle_dir.name
+
+    new_dir = bundle_dir.rename(tmp_path / "app-1.0-irix-bundle.0201260000")
+    (new_dir / "_bin" / "app").write_bytes(b"app v2")
+    (new_dir / "_lib32" / "old" / "gone.so").unlink()
+    delta = diff_manifests(base_files, write_manifest(new_dir))
+
+    delta_run = tmp_path / "delta.run"
+    builder._create_delta(delta_run, new_dir, new_dir.name, base_name, delta, "app 1.0")
+    assert sorted(_payload_names(delta_run)) == [
+        new_dir.name, f"{new_dir.name}/{MANIFEST_NAME}", f"{new_dir.name}/_bin/app",
+    ]
+    header = delta_run.read_bytes().split(b"\x1f\x8b\x08")[0].decode()
+    assert f'BASE="{base_name}"' in header
+    assert f"SKIP={header.count(chr(10)) + 1}\n" in header
+    assert "_lib32/old/gone.so\nMOGRIX_REMOVE" in header
+    assert delta_run.stat().st_size < base_run.stat().st_size / 4
+
+
+def test_create_bundle_with_delta(tmp_path, rpms_dir):
+    foo_rpm = rpms_dir / "foo-1.0-1.mips.rpm"
+    entries = payload_entries()
+    binary = ("./usr/sgug/bin/foo", stat.S_IFREG | 0o755, entries[1][2])
+    Path(f"{foo_rpm}.cpio").write_bytes(cpio_archive(entries[:3] + [binary]))
+
+    out = tmp_path / "bundles"
+    first = BundleBuilder(rpms_dir).create_bundle("foo", out)
+    base_run = tmp_path / "base.run"
+    first.run_path.rename(base_run)
+    assert first.delta_path is None
+
+    second = BundleBuilder(rpms_dir).create_bundle("foo", out, delta_from=base_run)
+    names = _payload_names(second.delta_path)
+    # Libraries did not change, so they are not shipped again
+    assert not any("_lib32/" in name for name in names)
+    assert f"{second.bundle_name}/{MANIFEST_NAME}" in names
+    assert len(queried(rpms_dir, "rpm2cpio")) == 2
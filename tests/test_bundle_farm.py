@@ -0,0 +1,98 @@
+"""Tests for batch bundling (mogrix bundle --all / --from-list)."""
+
+import json
+from pathlib import Path
+
+from mogrix.bundle import BundleBuilder
+from mogrix.bundle_farm import (
+    BundleTask,
+    discover_bundle_packages,
+    run_bundle_farm,
+    write_farm_report,
+)
+from tests.conftest import _write_rpm, cpio_archive, payload_entries
+
+
+class FlakyBuilder(BundleBuilder):
+    def create_bundle(self, target_package, *args, **kwargs):
+        if target_package == "bar":
+            raise RuntimeError("bar is broken")
+        return super().create_bundle(target_package, *args, **kwargs)
+
+
+def test_discover_bundle_packages(tmp_path):
+    packages = tmp_path / "packages"
+    packages.mkdir()
+    (packages / "nano.yaml").write_text("package: nano\nsmoke_test:\n  - command: nano -V\n")
+    (packages / "htop.yaml").write_text("package: htop\nbundle_trampoline_exclude: [x]\n")
+    (packages / "zlib.yaml").write_text("package: zlib\nrules: {}\n")
+
+    assert discover_bundle_packages(tmp_path) == ["htop", "nano"]
+
+
+def test_farm_builds_in_parallel_and_reports(tmp_path, rpms_dir):
+    out = tmp_path / "bundles"
+    tasks = [BundleTask("foo"), BundleTask("bar"), BundleTask("missing")]
+    report = run_bundle_farm(FlakyBuilder(rpms_dir), tasks, out, "directory", jobs=2)
+
+    foo, bar, missing = report.results
+    assert foo.status == "success"
+    assert foo.included_rpms == 2
+    assert (out / foo.bundle_name).is_dir()
+    assert "Linking" in (out / "logs" / "foo.log").read_text()
+    assert bar.status == "failed" and bar.error == "RuntimeError: bar is broken"
+    assert missing.status == "skipped"
+    assert report.summary == {"success": 1, "failed": 1, "skipped": 1}
+
+    write_farm_report(report, out / "bundle-farm.json")
+    data = json.loads((out / "bundle-farm.json").read_text())
+    assert [p["name"] for p in data["packages"]] == ["foo", "bar", "missing"]
+    assert data["jobs"] == 2
+    # CPU time, not the sum of per-bundle wall times
+    assert data["cpu_seconds"] == round(foo.cpu_seconds + bar.cpu_seconds, 1)
+    assert data["packages"][0]["cpu_seconds"] == round(foo.cpu_seconds, 1)
+
+
+def test_farm_keeps_bundles_of_prefix_sharing_packages(tmp_path, rpms_dir):
+    # Bundles of "foo-1.0-1-compat" start with foo's bundle base name, foo-1.0-1
+    compat = _write_rpm(rpms_dir, "foo-1.0-1-compat", "(none)", ["/usr/sgug/lib32/libbar.so.1"])
+    Path(f"{compat}.cpio").write_bytes(cpio_archive(payload_entries()[3:4]))
+    out = tmp_path / "bundles"
+    stale = out / "foo-1.0-1-irix-bundle.0101250000"
+    stale.mkdir(parents=True)
+
+    tasks = [BundleTask("foo-1.0-1-compat"), BundleTask("foo")]
+    report = run_bundle_farm(BundleBuilder(rpms_dir), tasks, out, "directory")
+
+    compat_result, foo_result = report.results
+    assert compat_result.bundle_name.startswith("foo-1.0-1-compat-1.0-1-irix-bundle.")
+    # foo's cleanup removed its own old bundle, not foo-1.0-1-compat's
+    assert (out / compat_result.bundle_name).is_dir()
+    assert (out / foo_result.bundle_name).is_dir()
+    assert not stale.exists()
+
+
+def test_farm_passes_compress_jobs(tmp_path, rpms_dir):
+    seen = []
+
+    class RecordingBuilder(BundleBuilder):
+        def create_bundle(self, target_package, *args, **kwargs):
+            seen.append(kwargs["compress_jobs"])
+            return super().create_bundle(target_package, *args, **kwargs)
+
+    out = tmp_path / "bundles"
+    run_bundle_farm(RecordingBuilder(rpms_dir), [BundleTask("foo")], out, compress_jobs=3)
+    run_bundle_farm(RecordingBuilder(rpms_dir), [BundleTask("foo")], out)
+    assert seen == [3, None]
+
+
+def test_cli_bundle_needs_packages_or_batch():
+    from click.testing import CliRunner
+
+    from mogrix.cli import main
+
+    result = CliRunner().invoke(main, ["bundle", "--sysroot", "/"])
+    assert result.exit_code == 1
+    result = CliRunner().invoke(main, ["bundle", "--sysroot", "/", "--all", "nano"])
+    assert result.exit_code == 1
+    assert "take no PACKAGES" in result.output
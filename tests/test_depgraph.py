@@ -0,0 +1,88 @@
+"""Tests for the dependency graph engine."""
+
+import random
+import shutil
+from pathlib import Path
+
+from mogrix.bundle import BundleBuilder
+from mogrix.depgraph import DepGraph, soname_aliases
+from mogrix.elf_facts import ElfFactsCache
+
+FIXTURES = Path(__file__).parent / "fixtures" / "elf"
+
+
+def _reach(edges, start):
+    seen, stack = set(), [start]
+    while stack:
+        v = stack.pop()
+        if v not in seen:
+            seen.add(v)
+            stack.extend(edges.get(v, ()))
+    return seen
+
+
+def test_cycles_closures_and_depth():
+    graph = DepGraph({
+        "app": ["libgtk", "libc"],
+        "libgtk": ["libgdk", "libglib"],
+        "libgdk": ["libgtk", "libglib"],  # cycle with libgtk
+        "libglib": ["libc"],
+    })
+
+    assert graph.cycles() == [["libgdk", "libgtk"]]
+    assert graph.closure("libgdk") == {"libgdk", "libgtk", "libglib", "libc"}
+    assert graph.transitive_count("app") == 4
+    assert graph.transitive_count("libc") == 0
+    # Longest path: app -> {libgtk, libgdk} -> libglib -> libc
+    assert [graph.depth(n) for n in ("app", "libgtk", "libgdk", "libglib", "libc")] == [0, 1, 1, 2, 3]
+    assert graph.max_depth == 3
+    assert graph.closure_totals({"app": 1, "libgtk": 10, "libgdk": 20, "libglib": 5})["libgtk"] == 35
+    assert graph.reachable_from(["libglib", "libX11.so"]) == {"libglib", "libc", "libX11.so"}
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    names = [f"lib{i}.so" for i in range(60)]
+    edges = {n: rng.sample(names, rng.randint(0, 4)) for n in names}
+    graph = DepGraph(edges)
+
+    for name in names:
+        reach = _reach(edges, name)
+        assert graph.closure(name) == reach
+        assert graph.transitive_count(name) == len(reach - {name})
+
+
+def test_deep_chain():
+    edges = {f"lib{i}": [f"lib{i + 1}"] for i in range(20000)}
+    graph = DepGraph(edges)
+    assert graph.depth("lib20000") == 20000
+    assert graph.transitive_count("lib0") == 20000
+
+
+def test_soname_aliases():
+    assert soname_aliases("libfoo.so.1.2.3") == ["libfoo.so.1.2", "libfoo.so.1", "libfoo.so"]
+    assert soname_aliases("libfoo-1.0.so.2") == ["libfoo-1.0.so"]
+    assert soname_aliases("libfoo.so") == []
+    assert soname_aliases("README") == []
+
+
+def test_prune_unused_libs(tmp_path):
+    bundle = tmp_path / "bundle"
+    (bundle / "_bin").mkdir(parents=True)
+    lib32 = bundle / "_lib32"
+    lib32.mkdir()
+    # app needs libbar.so.1, which is a symlink to the real library
+    shutil.copy(FIXTURES / "libfoo.so.1.0", bundle / "_bin" / "app")
+    shutil.copy(FIXTURES / "libbar.so.1", lib32 / "libbar.so.1.0")
+    (lib32 / "libbar.so.1").symlink_to("libbar.so.1.0")
+    shutil.copy(FIXTURES / "libfoo.so.1.0", lib32 / "libfoo.so.1.0")
+    (lib32 / "libmogrix_compat.so").write_bytes(b"")
+
+    rpms = tmp_path / "RPMS"
+    rpms.mkdir()
+    builder = BundleBuilder(rpms, elf_facts=ElfFactsCache(tmp_path / "elf-facts.db"))
+    builder._prune_unused_libs(bundle)
+
+    assert sorted(p.name for p in lib32.iterdir()) == [
+        "libbar.so.1", "libbar.so.1.0", "libmogrix_compat.so",
+    ]
@@ -1,5 +1,6 @@
 """Tests for dependency resolution."""
 
+import sqlite3
 import tempfile
 from pathlib import Path
 from unittest.mock import patch, MagicMock
@@ -7,7 +8,7 @@ from unittest.mock import patch, MagicMock
 import pytest
 
 from mogrix.deps.resolver import DependencyResolver, MissingDep
-from mogrix.deps.fedora import FedoraRepo, SRPMInfo
+from mogrix.deps.fedora import FedoraRepo, PackageListing, SRPMInfo
 
 
 @pytest.fixture
@@ -285,3 +286,88 @@ def test_fedora_repo_exact_matches_preferred_over_fuzzy():
         # Should only find the exact match "popt", not the fuzzy ones
         assert len(matches) == 1
         assert matches[0].name == "popt"
+
+
+def _mock_listing(mock_urlopen, html_content):
+    mock_response = MagicMock()
+    mock_response.read.return_value = html_content.encode("utf-8")
+    mock_response.__enter__ = MagicMock(return_value=mock_response)
+    mock_response.__exit__ = MagicMock(return_value=False)
+    mock_urlopen.return_value = mock_response
+
+
+def test_fedora_repo_listing_fetched_once():
+    """Repeated lookups in the same letter reuse one listing request."""
+    html_content = """
+    <a href="popt-1.19-6.fc40.src.rpm">popt-1.19-6.fc40.src.rpm</a>
+    <a href="poppler-24.02.0-1.fc40.src.rpm">poppler-24.02.0-1.fc40.src.rpm</a>
+    <a href="pcre2-10.42-2.fc40.src.rpm">pcre2-10.42-2.fc40.src.rpm</a>
+    """
+    repo = FedoraRepo(release="40")
+
+    with patch("urllib.request.urlopen") as mock_urlopen:
+        _mock_listing(mock_urlopen, html_content)
+        results = repo.find_srpms_for_deps(["popt-devel", "poppler", "pcre2-devel"])
+
+        assert mock_urlopen.call_count == 1
+        assert results["popt-devel"].endswith("popt-1.19-6.fc40.src.rpm")
+        assert results["pcre2-devel"].endswith("pcre2-10.42-2.fc40.src.rpm")
+
+
+def test_fedora_repo_listing_disk_cache(tmp_path):
+    """Listings are cached on disk and reused within the TTL."""
+    html_content = '<a href="popt-1.19-6.fc40.src.rpm">popt</a>'
+
+    with patch("urllib.request.urlopen") as mock_urlopen:
+        _mock_listing(mock_urlopen, html_content)
+        FedoraRepo(release="40", cache_dir=tmp_path).search_packages("popt")
+        matches = FedoraRepo(release="40", cache_dir=tmp_path).search_packages("popt")
+        assert mock_urlopen.call_count == 1
+        assert [m.name for m in matches] == ["popt"]
+
+        # Expired: fetched again
+        FedoraRepo(release="40", cache_dir=tmp_path, listing_ttl=-1).search_packages("popt")
+        assert mock_urlopen.call_count == 2
+
+        # Network failure falls back to the stale listing
+        mock_urlopen.side_effect = OSError("offline")
+        repo = FedoraRepo(release="40", cache_dir=tmp_path, listing_ttl=-1)
+        assert [m.name for m in repo.search_packages("popt")] == ["popt"]
+
+
+def test_fedora_repo_listing_from_repometa(tmp_path):
+    """The repometa source primary database replaces listing downloads."""
+    db_dir = tmp_path / "repometa" / "fc40"
+    db_dir.mkdir(parents=True)
+    conn = sqlite3.connect(str(db_dir / "releases-source-primary.sqlite"))
+    conn.executescript("""
+        CREATE TABLE packages (pkgKey INTEGER PRIMARY KEY, pkgId TEXT, name TEXT,
+            checksum_type TEXT, location_href TEXT);
+        INSERT INTO packages VALUES
+            (1, 'abc123', 'popt', 'sha256', 'Packages/p/popt-1.19-6.fc40.src.rpm'),
+            (2, 'def456', 'libpopt', 'sha256', 'Packages/l/libpopt-1.0-1.fc40.src.rpm'),
+            (3, 'fed789', 'pypopt', 'sha256', 'Packages/p/pypopt-2.0-1.fc40.src.rpm');
+    """)
+    conn.commit()
+    conn.close()
+
+    repo = FedoraRepo(release="40", cache_dir=tmp_path)
+    with patch("urllib.request.urlopen") as mock_urlopen:
+        exact = repo.search_packages("popt")
+        fuzzy = repo.search_packages("pop", fuzzy=True)
+        assert mock_urlopen.call_count == 0
+
+    assert [m.name for m in exact] == ["popt"]
+    assert exact[0].url == (
+        f"{FedoraRepo.ARCHIVE_BASE}/40/Everything/source/tree/Packages/p/popt-1.19-6.fc40.src.rpm"
+    )
+    assert (exact[0].checksum_type, exact[0].checksum) == ("sha256", "abc123")
+    # Fuzzy search stays within the first-letter directory, like the HTML listing
+    assert [m.name for m in fuzzy] == ["popt", "pypopt"]
+
+
+def test_package_listing_contains():
+    listing = PackageListing("http://x/", ["libpopt-1.0-1.src.rpm", "pypopt-2-1.src.rpm", "zz-1-1.src.rpm"])
+    assert listing.contains("popt") == ["libpopt-1.0-1.src.rpm", "pypopt-2-1.src.rpm"]
+    assert listing.contains("zz") == ["zz-1-1.src.rpm"]
+    assert listing.contains("nothing") == []
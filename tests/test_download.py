@@ -0,0 +1,173 @@
+"""Tests for mogrix.deps.download against a local HTTP server."""
+
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mogrix.deps.download import DownloadError, DownloadRequest, SRPMDownloader
+
+FILES = {
+    "/Packages/p/popt-1.19-6.fc40.src.rpm": bytes(range(256)) * 4000,
+    "/Packages/z/zlib-1.3-1.fc40.src.rpm": b"zlib" * 50000,
+    "/Packages/e/expat-2.6-1.fc40.src.rpm": b"expat" * 30000,
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get("Range"), self.client_address))
+        if self.path == "/moved.src.rpm":
+            self.send_response(302)
+            self.send_header("Location", "/Packages/z/zlib-1.3-1.fc40.src.rpm")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = FILES.get(self.path)
+        if data is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            start = int(range_header.split("=")[1].split("-")[0])
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        body = data[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if server.disconnects.get(self.path, 0) > 0:
+            # Send part of the body, then drop the connection
+            server.disconnects[self.path] -= 1
+            self.wfile.write(body[: len(body) // 3])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests = []
+    httpd.disconnects = {}
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    httpd.base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_download_verifies_checksum(server, tmp_path):
+    path = "/Packages/p/popt-1.19-6.fc40.src.rpm"
+    downloader = SRPMDownloader(retry_delay=0)
+    out = downloader.download(server.base + path, tmp_path, _sha256(FILES[path]))
+    assert out == tmp_path / "popt-1.19-6.fc40.src.rpm"
+    assert out.read_bytes() == FILES[path]
+    assert not (tmp_path / "popt-1.19-6.fc40.src.rpm.part").exists()
+
+
+def test_resume_after_disconnect(server, tmp_path):
+    path = "/Packages/p/popt-1.19-6.fc40.src.rpm"
+    server.disconnects[path] = 2
+    downloader = SRPMDownloader(retry_delay=0)
+    out = downloader.download(server.base + path, tmp_path, _sha256(FILES[path]))
+    assert out.read_bytes() == FILES[path]
+
+    ranges = [r for p, r, _ in server.requests if p == path]
+    assert ranges[0] is None
+    assert ranges[1] is not None and ranges[2] is not None
+    assert int(ranges[1][6:-1]) > 0
+    assert int(ranges[2][6:-1]) > int(ranges[1][6:-1])
+
+
+def test_checksum_mismatch(server, tmp_path):
+    path = "/Packages/z/zlib-1.3-1.fc40.src.rpm"
+    downloader = SRPMDownloader(retry_delay=0)
+    with pytest.raises(DownloadError, match="Checksum mismatch"):
+        downloader.download(server.base + path, tmp_path, "0" * 64)
+    assert not (tmp_path / "zlib-1.3-1.fc40.src.rpm").exists()
+    assert not (tmp_path / "zlib-1.3-1.fc40.src.rpm.part").exists()
+
+
+def test_existing_verified_file_is_reused(server, tmp_path):
+    path = "/Packages/z/zlib-1.3-1.fc40.src.rpm"
+    (tmp_path / "zlib-1.3-1.fc40.src.rpm").write_bytes(FILES[path])
+    downloader = SRPMDownloader(retry_delay=0)
+    downloader.download(server.base + path, tmp_path, _sha256(FILES[path]))
+    assert server.requests == []
+
+
+def test_http_error_not_retried(server, tmp_path):
+    downloader = SRPMDownloader(retry_delay=0)
+    with pytest.raises(DownloadError, match="404"):
+        downloader.download(server.base + "/missing.src.rpm", tmp_path)
+    assert len(server.requests) == 1
+
+
+def test_redirect(server, tmp_path):
+    downloader = SRPMDownloader(retry_delay=0)
+    out = downloader.download(server.base + "/moved.src.rpm", tmp_path)
+    assert out.name == "moved.src.rpm"
+    assert out.read_bytes() == FILES["/Packages/z/zlib-1.3-1.fc40.src.rpm"]
+
+
+def test_connection_reuse(server, tmp_path):
+    downloader = SRPMDownloader(retry_delay=0)
+    for path in FILES:
+        downloader.download(server.base + path, tmp_path)
+    clients = {addr for _, _, addr in server.requests}
+    assert len(clients) == 1
+
+
+def test_download_many(server, tmp_path):
+    server.disconnects["/Packages/e/expat-2.6-1.fc40.src.rpm"] = 1
+    requests = [DownloadRequest(server.base + p, _sha256(d)) for p, d in FILES.items()]
+    requests.append(DownloadRequest(server.base + "/missing.src.rpm"))
+
+    done = []
+    results = SRPMDownloader(retry_delay=0).download_many(
+        requests, tmp_path, jobs=3, on_done=done.append
+    )
+
+    assert [r.url for r in results] == [r.url for r in requests]
+    assert sorted(done, key=results.index) == results
+    for (path, data), result in zip(FILES.items(), results):
+        assert result.error == ""
+        assert result.path.read_bytes() == data
+    assert results[-1].path is None
+    assert "404" in results[-1].error
+
+
+def test_same_destination_downloads_once(server, tmp_path):
+    path = "/Packages/p/popt-1.19-6.fc40.src.rpm"
+    request = DownloadRequest(server.base + path, _sha256(FILES[path]))
+
+    with SRPMDownloader(retry_delay=0) as downloader:
+        results = downloader.download_many([request] * 4, tmp_path, jobs=4)
+        assert downloader.pool._idle
+
+    assert downloader.pool._idle == {}
+    assert not any(r.error for r in results)
+    assert {r.path for r in results} == {tmp_path / "popt-1.19-6.fc40.src.rpm"}
+    assert (tmp_path / "popt-1.19-6.fc40.src.rpm").read_bytes() == FILES[path]
+    # The first download completes; the others find the verified file
+    assert [p for p, _, _ in server.requests] == [path]
@@ -0,0 +1,117 @@
+"""Tests for the shared ELF facts cache."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mogrix import elf_facts
+from mogrix.analyzers.elf import check_binary
+from mogrix.elf_facts import ElfFactsCache
+
+FIXTURES = Path(__file__).parent / "fixtures" / "elf"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ElfFactsCache(tmp_path / "elf-facts.db")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def no_parse(monkeypatch):
+    """Fail if the cache has to parse a file."""
+    def fail(*args, **kwargs):
+        raise AssertionError("parsed an ELF file")
+
+    return lambda: monkeypatch.setattr(elf_facts, "read_elf", fail)
+
+
+def test_lookup_caches_facts(tmp_path, cache, no_parse):
+    lib = tmp_path / "libfoo.so.1.0"
+    shutil.copy(FIXTURES / "libfoo.so.1.0", lib)
+
+    facts = cache.lookup(lib)
+    assert facts.name == "libfoo.so.1.0"
+    assert (facts.soname, facts.needed, facts.rpaths) == ("libfoo.so.1", ["libbar.so.1"], ["/build/lib"])
+    assert (facts.global_got_count, facts.load_segment_count, facts.has_textrel) == (4, 3, True)
+    assert [c[0] for c in facts.class_recs] == ["fooClassRec", "localClassRec"]
+
+    no_parse()
+    assert cache.lookup(lib) == facts
+    # Same content under another name is found by sha256
+    copy = tmp_path / "copy.so"
+    shutil.copy(lib, copy)
+    assert cache.lookup(copy).soname == "libfoo.so.1"
+    assert cache.lookup_data(lib, lib.read_bytes()) == facts
+    assert cache.stats() == {"facts": 1, "files": 2}
+
+
+def test_changed_file_is_parsed_again(tmp_path, cache):
+    lib = tmp_path / "lib.so"
+    shutil.copy(FIXTURES / "libfoo.so.1.0", lib)
+    assert cache.lookup(lib).soname == "libfoo.so.1"
+
+    shutil.copy(FIXTURES / "libbar.so.1", lib)
+    os.utime(lib, ns=(0, 0))
+    assert cache.lookup(lib).soname == "libbar.so.1"
+
+
+def test_not_elf_is_cached(tmp_path, cache, no_parse):
+    text = tmp_path / "README"
+    text.write_text("hello\n")
+    assert cache.lookup(text) is None
+    no_parse()
+    assert cache.lookup(text) is None
+
+
+@pytest.mark.parametrize("name", ["libfoo.so.1.0", "libbar.so.1"])
+def test_check_binary_from_cache(cache, name):
+    path = FIXTURES / name
+    expected = check_binary(path)
+    assert check_binary(path, cache=cache) == expected  # parsed
+    assert check_binary(path, cache=cache) == expected  # cached
+
+
+def test_prune_drops_stale_records(tmp_path, cache):
+    foo = tmp_path / "libfoo.so.1.0"
+    bar = tmp_path / "libbar.so.1"
+    rebuilt = tmp_path / "rebuilt.so"
+    for lib in (foo, bar):
+        shutil.copy(FIXTURES / lib.name, lib)
+    shutil.copy(FIXTURES / "libfoo.so.1.0", rebuilt)
+    for lib in (foo, bar, rebuilt):
+        cache.lookup(lib)
+    cache.lookup_data(Path("member.so"), b"\x7fELF not really")
+    assert cache.stats() == {"facts": 3, "files": 3}
+
+    bar.unlink()
+    shutil.copy(FIXTURES / "libbar.so.1", rebuilt)
+    os.utime(rebuilt, ns=(0, 0))
+
+    assert cache.prune(dry_run=True) == (2, 2)
+    assert cache.stats() == {"facts": 3, "files": 3}
+    # libfoo's facts stay: foo still refers to them
+    assert cache.prune() == (2, 2)
+    assert cache.stats() == {"facts": 1, "files": 1}
+    assert cache.lookup(foo).soname == "libfoo.so.1"
+
+
+def test_gc_prunes_elf_facts(tmp_path):
+    from click.testing import CliRunner
+
+    from mogrix.cli import main
+
+    lib = tmp_path / "libfoo.so.1.0"
+    shutil.copy(FIXTURES / lib.name, lib)
+    cache = ElfFactsCache()
+    cache.lookup(lib)
+    cache.close()
+    lib.unlink()
+
+    result = CliRunner().invoke(main, ["gc"])
+    assert result.exit_code == 0, result.output
+    assert "Removed 1 stale file entries and 1 ELF facts" in result.output
+    assert ElfFactsCache().stats() == {"facts": 0, "files": 0}
@@ -0,0 +1,143 @@
+"""Tests for the RPM extraction cache and hardlinked bundle assembly."""
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from mogrix.bundle import BundleBuilder, _link_tree
+from mogrix.extract_cache import ExtractCache
+from mogrix.mipself import read_elf
+from tests.conftest import cpio_archive, payload_entries, queried
+
+
+def test_extract_writes_tree_once(tmp_path, rpms_dir):
+    rpm = tmp_path / "links-1.0-1.mips.rpm"
+    rpm.write_bytes(b"links")
+    Path(f"{rpm}.cpio").write_bytes(cpio_archive([
+        ("./usr/sgug/bin", stat.S_IFDIR | 0o700, b""),
+        ("./usr/sgug/bin/tool", stat.S_IFREG | 0o700, b"#!/bin/sh\n"),
+        ("./usr/sgug/bin/tool-link", stat.S_IFLNK | 0o777, b"tool"),
+        ("./usr/sgug/share/data", stat.S_IFREG | 0o600, b"data"),
+    ]))
+    cache = ExtractCache(tmp_path / "cache")
+
+    seen = []
+    tree = cache.extract(rpm, "ab" * 32, on_member=lambda m: seen.append(m.path))
+    assert tree == cache.get("ab" * 32)
+    assert "/usr/sgug/bin/tool" in seen
+    assert os.readlink(tree / "usr/sgug/bin/tool-link") == "tool"
+    # Modes are normalized the way bundles need them
+    assert stat.S_IMODE((tree / "usr/sgug/bin/tool").stat().st_mode) == 0o755
+    assert stat.S_IMODE((tree / "usr/sgug/share/data").stat().st_mode) == 0o644
+    assert stat.S_IMODE((tree / "usr/sgug/bin").stat().st_mode) == 0o755
+
+    assert cache.extract(rpm, "ab" * 32) == tree
+    assert queried(rpms_dir, "rpm2cpio") == [rpm.name]
+
+    # A failed extraction leaves nothing behind
+    broken = tmp_path / "broken.rpm"
+    Path(f"{broken}.cpio").write_bytes(b"garbage")
+    with pytest.raises(RuntimeError):
+        cache.extract(broken, "cd" * 32)
+    assert cache.get("cd" * 32) is None
+    assert list((cache.root / "cd").iterdir()) == []
+
+
+def test_bundle_links_from_cache(tmp_path, cache_dir, rpms_dir):
+    # Give foo a binary that needs libbar.so.1
+    foo_rpm = rpms_dir / "foo-1.0-1.mips.rpm"
+    entries = payload_entries()
+    binary = ("./usr/sgug/bin/foo", stat.S_IFREG | 0o755, entries[1][2])
+    Path(f"{foo_rpm}.cpio").write_bytes(cpio_archive(entries[:3] + [binary]))
+
+    out = tmp_path / "bundles"
+    builder = BundleBuilder(rpms_dir)
+    manifest = builder.create_bundle("foo", out, output_format="directory")
+    lib = manifest.bundle_dir / "_lib32" / "libbar.so.1"
+
+    # One payload read per RPM covers both dependency scanning and layout
+    assert sorted(queried(rpms_dir, "rpm2cpio")) == [
+        "bar-1.0-1.mips.rpm", "foo-1.0-1.mips.rpm",
+    ]
+    cached = list((cache_dir / "extract").rglob("libbar.so.1"))
+    assert len(cached) == 1 and os.path.samefile(lib, cached[0])
+
+    BundleBuilder(rpms_dir).create_bundle("foo", out, output_format="directory")
+    assert len(queried(rpms_dir, "rpm2cpio")) == 2
+
+    # RPATH stripping replaces linked files instead of writing into the cache
+    cached_lib32 = next((cache_dir / "extract").rglob("libfoo.so.1.0")).parent
+    linked = tmp_path / "linked"
+    linked.mkdir()
+    _link_tree(cached_lib32, linked / "_lib32")
+    builder._strip_rpaths(linked)
+    assert not os.path.samefile(linked / "_lib32" / "libfoo.so.1.0", cached_lib32 / "libfoo.so.1.0")
+    with read_elf(cached_lib32 / "libfoo.so.1.0") as elf:
+        assert elf.rpaths() == ["/build/lib"]
+    with read_elf(linked / "_lib32" / "libfoo.so.1.0") as elf:
+        assert elf.rpaths() == []
+
+
+def test_link_tree_last_rpm_wins(tmp_path):
+    first, second, dest = tmp_path / "first", tmp_path / "second", tmp_path / "dest"
+    for tree, data in ((first, b"first"), (second, b"second")):
+        (tree / "lib").mkdir(parents=True)
+        (tree / "lib" / "libz.so.1").write_bytes(data)
+        (tree / "lib" / "libz.so").symlink_to(f"libz.so.1-{data.decode()}")
+    (first / "lib" / "only-first").write_bytes(b"kept")
+
+    _link_tree(first, dest)
+    _link_tree(second, dest)
+
+    # Overlapping paths take the later RPM's copy; the rest is merged
+    assert (dest / "lib" / "libz.so.1").read_bytes() == b"second"
+    assert os.readlink(dest / "lib" / "libz.so") == "libz.so.1-second"
+    assert (dest / "lib" / "only-first").read_bytes() == b"kept"
+
+
+@pytest.mark.parametrize("members", [
+    [("./../../../../escaped.txt", stat.S_IFREG | 0o644, b"out")],
+    [
+        ("./usr/link", stat.S_IFLNK | 0o777, b"OUTSIDE"),
+        ("./usr/link/x", stat.S_IFREG | 0o644, b"out"),
+    ],
+    [
+        ("./usr/link", stat.S_IFLNK | 0o777, b"OUTSIDE"),
+        ("./usr/link", stat.S_IFDIR | 0o755, b""),
+    ],
+])
+def test_extract_stays_inside_tree(tmp_path, rpms_dir, members):
+    outside = tmp_path / "cache" / "outside"
+    outside.mkdir(parents=True)
+    rpm = tmp_path / "evil-1.0-1.mips.rpm"
+    rpm.write_bytes(b"evil")
+    members = [
+        (path, mode, bytes(outside) if data == b"OUTSIDE" else data)
+        for path, mode, data in members
+    ]
+    Path(f"{rpm}.cpio").write_bytes(cpio_archive(members))
+    cache = ExtractCache(tmp_path / "cache" / "a" / "b")
+
+    with pytest.raises(RuntimeError, match="payload"):
+        cache.extract(rpm, "ef" * 32)
+    assert cache.get("ef" * 32) is None
+    assert list(outside.iterdir()) == []
+    assert not list(tmp_path.rglob("escaped.txt"))
+
+
+def test_gc_evicts_uncatalogued_trees(tmp_path):
+    cache = ExtractCache(tmp_path / "cache")
+    running = f".tmp-{'ef' * 32}-{os.getpid()}"
+    for name in ("ab" * 32, "cd" * 32, f".tmp-{'ef' * 32}-999999999", running):
+        tree = cache.root / name.removeprefix(".tmp-")[:2] / name
+        (tree / "usr").mkdir(parents=True)
+        (tree / "usr" / "data").write_bytes(b"1234")
+
+    assert cache.gc({"ab" * 32}, dry_run=True) == (2, 8)
+    assert cache.gc({"ab" * 32}) == (2, 8)
+    assert cache.get("ab" * 32) is not None
+    assert cache.get("cd" * 32) is None
+    # A running extraction is left alone
+    assert [p.name for p in (cache.root / "ef").iterdir()] == [running]
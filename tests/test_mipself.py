@@ -0,0 +1,71 @@
+"""Tests for the in-process MIPS ELF reader."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mogrix.analyzers import elf as elf_analyzer
+from mogrix.analyzers.elf import check_binary, check_binary_readelf
+from mogrix.mipself import MipsElf, read_elf
+
+FIXTURES = Path(__file__).parent / "fixtures" / "elf"
+RLD_BINS = Path(__file__).parent / "rld" / "out" / "bin"
+
+BINARIES = sorted(FIXTURES.glob("lib*")) + sorted(RLD_BINS.glob("test_*"))
+
+needs_readelf = pytest.mark.skipif(shutil.which("readelf") is None, reason="readelf not installed")
+
+
+@needs_readelf
+@pytest.mark.parametrize("path", BINARIES, ids=lambda p: p.name)
+def test_matches_readelf(path):
+    with MipsElf(path) as elf:
+        symbols, relocs = elf_analyzer.symbols_and_relocs(elf)
+
+    assert symbols == elf_analyzer._parse_symbols(path)
+    assert relocs == elf_analyzer._parse_relocations(path)
+    assert check_binary(path) == check_binary_readelf(path)
+
+
+def test_dynamic_section():
+    with MipsElf(FIXTURES / "libfoo.so.1.0") as elf:
+        assert elf.valid and elf.is_mips and elf.elf_type == "DYN"
+        assert elf.needed_sonames() == ["libbar.so.1"]
+        assert elf.soname() == "libfoo.so.1"
+        assert elf.rpaths() == ["/build/lib"]
+        assert elf.has_textrel()
+        assert len(elf.load_segments) == 3
+        assert (elf.local_gotno, elf.global_got_count) == (2, 4)
+
+    with MipsElf(FIXTURES / "libbar.so.1") as elf:
+        assert elf.needed_sonames() == []
+        assert not elf.has_rpath() and not elf.has_textrel()
+
+
+def test_check_binary_finds_class_recs():
+    result = check_binary(FIXTURES / "libfoo.so.1.0")
+
+    assert [(f.name, f.binding, len(f.at_risk_relocs)) for f in result.class_rec_findings] == [
+        ("fooClassRec", "GLOBAL", 3),
+        ("localClassRec", "LOCAL", 2),
+    ]
+    assert (result.rel32_total, result.rel32_undef) == (7, 5)
+    assert len(result.warnings) == 2
+
+
+def test_parse_from_bytes():
+    path = FIXTURES / "libfoo.so.1.0"
+    assert check_binary(path, data=path.read_bytes()) == check_binary(path)
+
+
+def test_not_elf(tmp_path):
+    empty = tmp_path / "empty"
+    empty.touch()
+    text = tmp_path / "script.sh"
+    text.write_text("#!/bin/sh\n")
+
+    assert read_elf(empty) is None
+    assert read_elf(text) is None
+    assert read_elf(text, data=b"\x7fELF") is None
+    assert not check_binary(text).is_mips_elf
@@ -0,0 +1,167 @@
+"""Tests for mogrix.repometa — unified index construction."""
+
+import sqlite3
+
+import pytest
+
+from mogrix.repometa import RepoMetaCache
+
+
+def _make_source_primary(path):
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        CREATE TABLE packages (pkgKey INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE requires (pkgKey INTEGER, name TEXT, flags TEXT, version TEXT);
+        INSERT INTO packages VALUES (1, 'popt'), (2, 'glib2');
+        INSERT INTO requires VALUES
+            (1, 'gcc', NULL, NULL),
+            (1, 'gettext', NULL, NULL),
+            (2, 'pkgconfig(libffi)', 'GE', '3.0');
+    """)
+    conn.commit()
+    conn.close()
+
+
+def _make_binary_primary(path):
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        CREATE TABLE packages (pkgKey INTEGER PRIMARY KEY, name TEXT, rpm_sourcerpm TEXT);
+        CREATE TABLE provides (pkgKey INTEGER, name TEXT, flags TEXT, version TEXT);
+        CREATE TABLE files (pkgKey INTEGER, name TEXT, type TEXT);
+        INSERT INTO packages VALUES
+            (1, 'libffi-devel', 'libffi-3.4.4-7.fc40.src.rpm'),
+            (2, 'xorg-x11-server-Xorg', 'xorg-x11-server-21.1.11-1.fc40.src.rpm'),
+            (3, 'orphan', NULL);
+        INSERT INTO provides VALUES
+            (1, 'pkgconfig(libffi)', 'EQ', '3.4.4'),
+            (1, 'libffi-devel', 'EQ', '3.4.4'),
+            (2, 'Xorg', NULL, NULL),
+            (3, 'orphan', NULL, NULL);
+        INSERT INTO files VALUES
+            (2, '/usr/bin/Xorg', 'file'),
+            (2, '/usr/lib64/xorg', 'dir');
+    """)
+    conn.commit()
+    conn.close()
+
+
+def _make_filelists(path):
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        CREATE TABLE packages (pkgKey INTEGER PRIMARY KEY, pkgId TEXT);
+        CREATE TABLE filelist (pkgKey INTEGER, dirname TEXT, filenames TEXT, filetypes TEXT);
+        INSERT INTO filelist VALUES
+            (1, '/usr/lib64/pkgconfig', 'libffi.pc', 'f'),
+            (1, '/usr/include', 'ffi.h/ffitarget.h', 'ff'),
+            (2, '/usr/bin', 'Xorg/gtf', 'ff'),
+            (2, '/usr', 'lib-orphan/share', 'fd'),
+            (2, '/', 'bin', 'd'),
+            (3, '/usr/share/doc', 'README', 'f'),
+            (3, '/usr/bin', '', ''),
+            (99, '/usr/bin', 'unmapped', 'f');
+    """)
+    conn.commit()
+    conn.close()
+
+
+def _build_fixture_index(tmp_path):
+    cache = RepoMetaCache(cache_dir=tmp_path)
+    _make_source_primary(tmp_path / "releases-source-primary.sqlite")
+    _make_binary_primary(tmp_path / "releases-x86_64-primary.sqlite")
+    _make_filelists(tmp_path / "releases-x86_64-filelists.sqlite")
+    cache._filelists_paths = {
+        "releases-x86_64": tmp_path / "releases-x86_64-filelists.sqlite",
+    }
+    downloaded = {
+        "releases-source": {"primary_db": tmp_path / "releases-source-primary.sqlite"},
+        "releases-x86_64": {"primary_db": tmp_path / "releases-x86_64-primary.sqlite"},
+    }
+    return cache._build_index(tmp_path / "index.sqlite", downloaded)
+
+
+class TestBuildIndex:
+    @pytest.fixture
+    def index(self, tmp_path):
+        conn = _build_fixture_index(tmp_path)
+        yield conn
+        conn.close()
+
+    def test_source_buildrequires(self, index):
+        rows = index.execute(
+            "SELECT source_package, requires_name, requires_flags, repo "
+            "FROM source_buildrequires ORDER BY source_package, requires_name"
+        ).fetchall()
+        assert [tuple(r) for r in rows] == [
+            ("glib2", "pkgconfig(libffi)", "GE", "releases"),
+            ("popt", "gcc", None, "releases"),
+            ("popt", "gettext", None, "releases"),
+        ]
+
+    def test_binary_provides_source_names(self, index):
+        rows = dict(
+            index.execute(
+                "SELECT provides_name, source_package FROM binary_provides"
+            ).fetchall()
+        )
+        assert rows["pkgconfig(libffi)"] == "libffi"
+        assert rows["Xorg"] == "xorg-x11-server"
+        # No sourcerpm: falls back to the binary package name
+        assert rows["orphan"] == "orphan"
+
+    def test_file_provides(self, index):
+        paths = {
+            r[0]: r[1]
+            for r in index.execute("SELECT file_path, source_package FROM file_provides")
+        }
+        assert paths == {
+            # From primary files table (type='file' only)
+            "/usr/bin/Xorg": "xorg-x11-server",
+            # From filelists, split and prefix-filtered
+            "/usr/lib64/pkgconfig/libffi.pc": "libffi",
+            "/usr/bin/gtf": "xorg-x11-server",
+            "/usr/lib-orphan": "xorg-x11-server",
+        }
+        count = index.execute(
+            "SELECT COUNT(*) FROM file_provides WHERE file_path = '/usr/bin/Xorg'"
+        ).fetchone()[0]
+        assert count == 2
+
+    def test_indexes_and_meta(self, index, tmp_path):
+        names = {
+            r[0]
+            for r in index.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        assert {"idx_bp_name", "idx_sbr_pkg", "idx_sbr_req", "idx_fp_path", "idx_rd_provider"} <= names
+        assert index.execute(
+            "SELECT value FROM meta WHERE key = 'release'"
+        ).fetchone()[0] == "40"
+        assert index.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert not (tmp_path / "index.sqlite.tmp").exists()
+
+    def test_reverse_deps(self, index):
+        rows = index.execute(
+            "SELECT provider_source, requires_name, dependent_source FROM reverse_deps"
+        ).fetchall()
+        assert [tuple(r) for r in rows] == [("libffi", "pkgconfig(libffi)", "glib2")]
+
+    def test_old_wal_is_not_replayed(self, tmp_path):
+        # An old index whose uncheckpointed WAL was left behind
+        old = tmp_path / "index.sqlite"
+        conn = sqlite3.connect(old)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+        conn.execute("CREATE TABLE stale (x)")
+        conn.commit()
+        sidecars = {
+            suffix: old.with_name(old.name + suffix).read_bytes()
+            for suffix in ("-wal", "-shm")
+        }
+        conn.close()
+        for suffix, data in sidecars.items():
+            old.with_name(old.name + suffix).write_bytes(data)
+
+        conn = _build_fixture_index(tmp_path)
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        assert "stale" not in tables
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        conn.close()
@@ -623,3 +623,215 @@ class TestRoadmapConfigDrops:
         result = resolver.resolve("testpkg")
         text = format_text(result, list_drops=True)
         assert "roadmap config" in text.lower() or "DROPPED" in text
+
+
+# --- Preloaded provider index ---
+
+
+class TestPreloadedIndex:
+    @pytest.fixture
+    def setup(self, tmp_path):
+        generic = {"generic": {"drop_buildrequires": ["systemd"]}}
+        (tmp_path / "generic.yaml").write_text(yaml.dump(generic))
+        (tmp_path / "classes").mkdir()
+        (tmp_path / "packages").mkdir()
+        (tmp_path / "packages" / "expat.yaml").write_text(yaml.dump({"package": "expat"}))
+        sysroot = {
+            "libraries": ["libc.so.6", "libm.so.6()"],
+            "files": ["/bin/sh"],
+            "capabilities": ["gcc"],
+        }
+        (tmp_path / "sysroot_provides.yaml").write_text(yaml.dump(sysroot))
+        (tmp_path / "non_fedora_packages.yaml").write_text(yaml.dump({"packages": {}}))
+
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            CREATE TABLE binary_provides (provides_name TEXT, provides_flags TEXT,
+                provides_version TEXT, binary_package TEXT, source_package TEXT, repo TEXT);
+            CREATE TABLE source_buildrequires (source_package TEXT, requires_name TEXT,
+                requires_flags TEXT, requires_version TEXT, repo TEXT);
+            CREATE TABLE file_provides (file_path TEXT, binary_package TEXT,
+                source_package TEXT, repo TEXT);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        conn.executemany(
+            "INSERT INTO binary_provides VALUES (?,?,?,?,?,?)",
+            [
+                ("zlib-devel", "", "", "zlib-devel", "zlib", "releases"),
+                ("zlib-devel", "", "", "zlib-ng-compat-devel", "zlib-ng", "updates"),
+                ("expat-devel", "", "", "expat-devel", "expat", "releases"),
+                ("glib2", "", "", "glib2", "glib2", "releases"),
+                ("pcre2-devel", "", "", "pcre2-devel", "pcre2", "releases"),
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO file_provides VALUES (?,?,?,?)",
+            [
+                ("/usr/bin/perl", "perl-interpreter", "perl", "releases"),
+                ("/usr/bin/unused", "unused", "unused", "releases"),
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO source_buildrequires VALUES (?,?,?,?,?)",
+            [
+                ("app", "gcc", "", "", "releases"),
+                ("app", "glib2-devel", "", "", "releases"),
+                ("app", "expat-devel", "", "", "releases"),
+                ("app", "libc.so.6()(64bit)", "", "", "releases"),
+                ("app", "libm.so.6()(64bit)", "", "", "releases"),
+                ("app", "systemd", "", "", "releases"),
+                ("app", "nonexistent", "", "", "releases"),
+                ("glib2", "pcre2-devel", "", "", "releases"),
+                ("glib2", "/usr/bin/perl", "", "", "releases"),
+                ("pcre2", "glib2", "", "", "releases"),
+                ("expat", "zlib-devel", "", "", "releases"),
+                ("expat", "zlib-devel", "", "", "updates"),
+            ],
+        )
+        conn.commit()
+
+        def make(preload):
+            return RoadmapResolver(
+                db=conn,
+                rule_loader=RuleLoader(tmp_path),
+                rules_dir=tmp_path,
+                rpms_dir=Path("/nonexistent"),
+                preload=preload,
+            )
+
+        return make
+
+    def test_index_contents(self, setup):
+        index = setup(True)._index
+        assert index.provides["zlib-devel"] == "zlib-ng"  # updates wins
+        assert index.files == {"/usr/bin/perl": "perl"}  # only required paths
+        assert index.buildrequires["expat"] == ["zlib-devel"]
+
+    def test_matches_sql_resolution(self, setup):
+        sql = setup(False).resolve("app")
+        mem = setup(True).resolve("app")
+        assert json.loads(format_json(mem)) == json.loads(format_json(sql))
+        assert mem.build_order == sql.build_order
+        assert mem.cycles == sql.cycles == [["glib2", "pcre2"]]
+        assert "perl" in mem.packages
+        assert mem.packages["expat"].buildrequires == ["zlib-ng"]
+
+    def test_sysroot_library_prefix(self, setup):
+        resolver = setup(True)
+        assert resolver._match_sysroot_library("libc.so.6") == "libc.so.6"
+        assert resolver._match_sysroot_library("libc.so.6()(64bit)") == "libc.so.6"
+        assert resolver._match_sysroot_library("libm.so.6()(64bit)") == "libm.so.6()"
+        assert resolver._match_sysroot_library("libc.so.60()(64bit)") is None
+
+    def test_graph_results_match_resolve(self, setup):
+        resolver = setup(True)
+        targets = ["app", "expat", "glib2", "pcre2"]
+        graph = resolver.resolve_graph(targets)
+        for target in targets:
+            expected = setup(False).resolve(target)
+            got = graph.result_for(target)
+            assert set(got.packages) == set(expected.packages)
+            assert sorted(got.cycles) == sorted(expected.cycles)
+            assert got.dropped_deps == expected.dropped_deps
+            assert got.sysroot_deps == expected.sysroot_deps
+            assert got.unresolvable_deps == expected.unresolvable_deps
+            for name, info in got.packages.items():
+                want = expected.packages[name]
+                assert info.classification == want.classification
+                assert info.buildrequires == want.buildrequires
+                assert sorted(info.needed_by) == sorted(want.needed_by)
+            # Every non-cyclic dependency is built before its dependents
+            pos = {pkg: i for i, pkg in enumerate(got.build_order)}
+            cyclic = {p for scc in got.cycles for p in scc}
+            for name, info in got.packages.items():
+                for dep in info.buildrequires:
+                    if dep != name and not {dep, name} <= cyclic:
+                        assert pos[dep] < pos[name]
+
+    def test_graph_requires_unlimited_depth(self, setup):
+        resolver = setup(False)
+        resolver.max_depth = 2
+        with pytest.raises(ValueError):
+            resolver.resolve_graph(["app"])
+
+
+# --- Reverse queries ---
+
+
+class TestReverseRoadmap:
+    @pytest.fixture
+    def resolver(self, tmp_path):
+        (tmp_path / "generic.yaml").write_text(yaml.dump({"generic": {"drop_buildrequires": []}}))
+        (tmp_path / "classes").mkdir()
+        (tmp_path / "packages").mkdir()
+        (tmp_path / "packages" / "dropper.yaml").write_text(
+            yaml.dump({"package": "dropper", "rules": {"drop_buildrequires": ["zlib-devel"]}})
+        )
+        (tmp_path / "sysroot_provides.yaml").write_text(
+            yaml.dump({"libraries": [], "files": [], "capabilities": ["gcc"]})
+        )
+        rpms_dir = tmp_path / "rpms"
+        rpms_dir.mkdir()
+        (rpms_dir / "builtpkg-1.0-1.mips.rpm").touch()
+
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            CREATE TABLE binary_provides (provides_name TEXT, provides_flags TEXT,
+                provides_version TEXT, binary_package TEXT, source_package TEXT, repo TEXT);
+            CREATE TABLE source_buildrequires (source_package TEXT, requires_name TEXT,
+                requires_flags TEXT, requires_version TEXT, repo TEXT);
+            CREATE TABLE file_provides (file_path TEXT, binary_package TEXT,
+                source_package TEXT, repo TEXT);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            INSERT INTO binary_provides VALUES
+                ('zlib', '', '', 'zlib', 'zlib', 'releases'),
+                ('xz-devel', '', '', 'xz-devel', 'xz', 'releases'),
+                ('expat-devel', '', '', 'expat-devel', 'expat', 'releases'),
+                ('libxml2-devel', '', '', 'libxml2-devel', 'libxml2', 'releases'),
+                ('builtpkg', '', '', 'builtpkg', 'builtpkg', 'releases');
+            INSERT INTO source_buildrequires VALUES
+                ('expat', 'gcc', '', '', 'releases'),
+                ('expat', 'zlib-devel', '', '', 'releases'),
+                ('libxml2', 'zlib-devel', '', '', 'releases'),
+                ('libxml2', 'xz-devel', '', '', 'releases'),
+                ('builtpkg', 'zlib-devel', '', '', 'releases'),
+                ('dropper', 'zlib-devel', '', '', 'releases'),
+                ('app', 'libxml2-devel', '', '', 'releases'),
+                ('app', 'expat-devel', '', '', 'releases'),
+                ('app2', 'libxml2-devel', '', '', 'releases');
+        """)
+        return RoadmapResolver(
+            db=conn,
+            rule_loader=RuleLoader(tmp_path),
+            rules_dir=tmp_path,
+            rpms_dir=rpms_dir,
+        )
+
+    def test_reverse_table_materialized(self, resolver):
+        resolver.resolve_reverse("zlib")
+        rows = resolver.db.execute(
+            "SELECT dependent_source FROM reverse_deps WHERE provider_source = 'zlib'"
+        ).fetchall()
+        # zlib-devel resolves to zlib via suffix stripping
+        assert {r[0] for r in rows} == {"expat", "libxml2", "builtpkg", "dropper"}
+
+    def test_reverse_candidates(self, resolver):
+        result = resolver.resolve_reverse("zlib")
+        by_name = {c.name: c for c in result.candidates}
+        assert set(by_name) == {"expat", "libxml2"}
+        assert by_name["expat"].unblocked
+        assert by_name["libxml2"].remaining == ["xz"]
+        assert by_name["libxml2"].downstream == 2
+        assert result.already_built == ["builtpkg"]
+        # Unblocked candidates rank first
+        assert [c.name for c in result.candidates] == ["expat", "libxml2"]
+
+    def test_reverse_formatting(self, resolver):
+        from mogrix.roadmap import format_reverse_json, format_reverse_text
+
+        result = resolver.resolve_reverse("zlib")
+        assert "Become buildable" in format_reverse_text(result)
+        data = json.loads(format_reverse_json(result))
+        assert data["candidates"][0]["name"] == "expat"
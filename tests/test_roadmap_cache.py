@@ -0,0 +1,138 @@
+"""Tests for mogrix.roadmap_cache — persistent roadmap result cache."""
+
+import sqlite3
+
+import pytest
+import yaml
+
+from mogrix.roadmap import Classification, RoadmapResolver
+from mogrix.roadmap_cache import RoadmapCache, result_from_dict, result_to_dict
+from mogrix.rules.loader import RuleLoader
+
+
+@pytest.fixture
+def env(tmp_path):
+    rules_dir = tmp_path / "rules"
+    rules_dir.mkdir()
+    (rules_dir / "generic.yaml").write_text(yaml.dump({"generic": {"drop_buildrequires": []}}))
+    (rules_dir / "classes").mkdir()
+    (rules_dir / "packages").mkdir()
+    (rules_dir / "packages" / "zlib.yaml").write_text(
+        yaml.dump({"package": "zlib", "smoke_test": ["true"]})
+    )
+    (rules_dir / "sysroot_provides.yaml").write_text(
+        yaml.dump({"libraries": [], "files": [], "capabilities": ["gcc"]})
+    )
+    rpms_dir = tmp_path / "rpms"
+    rpms_dir.mkdir()
+
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE binary_provides (provides_name TEXT, provides_flags TEXT,
+            provides_version TEXT, binary_package TEXT, source_package TEXT, repo TEXT);
+        CREATE TABLE source_buildrequires (source_package TEXT, requires_name TEXT,
+            requires_flags TEXT, requires_version TEXT, repo TEXT);
+        CREATE TABLE file_provides (file_path TEXT, binary_package TEXT,
+            source_package TEXT, repo TEXT);
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        INSERT INTO meta VALUES ('build_time', '1700000000'), ('release', '40');
+        INSERT INTO binary_provides VALUES
+            ('zlib-devel', '', '', 'zlib-devel', 'zlib', 'releases'),
+            ('expat-devel', '', '', 'expat-devel', 'expat', 'releases');
+        INSERT INTO source_buildrequires VALUES
+            ('app', 'gcc', '', '', 'releases'),
+            ('app', 'expat-devel', '', '', 'releases'),
+            ('expat', 'zlib-devel', '', '', 'releases');
+    """)
+
+    calls = []
+
+    def make_resolver():
+        calls.append(1)
+        return RoadmapResolver(
+            db=conn,
+            rule_loader=RuleLoader(rules_dir),
+            rules_dir=rules_dir,
+            rpms_dir=rpms_dir,
+        )
+
+    def make_cache():
+        return RoadmapCache(
+            db=conn,
+            rules_dir=rules_dir,
+            rpms_dir=rpms_dir,
+            cache_dir=tmp_path / "cache",
+        )
+
+    return {
+        "rules_dir": rules_dir,
+        "rpms_dir": rpms_dir,
+        "make_resolver": make_resolver,
+        "make_cache": make_cache,
+        "calls": calls,
+    }
+
+
+def test_roundtrip():
+    from mogrix.roadmap import PackageInfo, RoadmapResult
+
+    result = RoadmapResult(
+        target="app",
+        packages={"app": PackageInfo(name="app", classification=Classification.NEED_RULES,
+                                     complexity="LOW", build_order=1)},
+        build_order=["app"],
+        dropped_deps={"systemd": "rule"},
+        sysroot_deps={"gcc"},
+    )
+    assert result_from_dict(result_to_dict(result)) == result
+
+
+def test_hit_skips_resolver(env):
+    cache = env["make_cache"]()
+    first = cache.resolve("app", env["make_resolver"])
+    assert cache.last_status == "miss"
+
+    cache = env["make_cache"]()
+    second = cache.resolve("app", env["make_resolver"])
+    assert cache.last_status == "hit"
+    assert len(env["calls"]) == 1
+    assert second == first
+
+
+def test_new_rpm_reclassifies(env):
+    cache = env["make_cache"]()
+    result = cache.resolve("app", env["make_resolver"])
+    assert result.packages["zlib"].classification == Classification.HAS_RULES
+
+    (env["rpms_dir"] / "zlib-devel-1.3-1.mips.rpm").touch()
+    cache = env["make_cache"]()
+    result = cache.resolve("app", env["make_resolver"])
+    assert cache.last_status == "partial"
+    assert result.packages["zlib"].classification == Classification.ALREADY_BUILT_VERIFIED
+    assert result.packages["expat"].classification == Classification.NEED_RULES
+    assert result == env["make_resolver"]().resolve("app")
+
+
+def test_rules_change_invalidates(env):
+    cache = env["make_cache"]()
+    cache.resolve("app", env["make_resolver"])
+
+    path = env["rules_dir"] / "packages" / "expat.yaml"
+    path.write_text(yaml.dump({"package": "expat"}))
+    cache = env["make_cache"]()
+    result = cache.resolve("app", env["make_resolver"])
+    assert cache.last_status == "miss"
+    assert result.packages["expat"].classification == Classification.HAS_RULES
+
+
+def test_options_in_key(env, tmp_path):
+    a = env["make_cache"]()
+    b = RoadmapCache(
+        db=sqlite3.connect(":memory:"),
+        rules_dir=env["rules_dir"],
+        rpms_dir=env["rpms_dir"],
+        stop_at_rules=True,
+        cache_dir=tmp_path / "cache",
+    )
+    assert a.graph_key != b.graph_key
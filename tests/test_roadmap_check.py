@@ -254,3 +254,18 @@ class TestFormatting:
         assert data["packages_checked"] == 1
         assert data["unique_false_positives"] == 1
         assert "build_infra" in data["by_category"]
+
+
+class TestWholeGraph:
+    def test_whole_graph_matches_per_package(self, checker_setup):
+        """--whole-graph derives the same false positives as per-package resolve."""
+        checker = checker_setup
+        (checker.rpms_dir / "real-lib-2.0-1.mips.rpm").touch()
+        expected = checker.check_all_built()
+        got = checker.check_all_built(whole_graph=True)
+        assert [r.target for r in got] == [r.target for r in expected]
+        for g, e in zip(got, expected):
+            assert g.total_need_rules == e.total_need_rules
+            assert sorted(fp.name for fp in g.false_positives) == sorted(
+                fp.name for fp in e.false_positives
+            )
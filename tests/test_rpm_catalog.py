@@ -0,0 +1,95 @@
+"""Tests for the persistent RPM metadata catalog and dependency resolution."""
+
+import io
+
+import pytest
+
+import mogrix.bundle
+from mogrix.bundle import BundleBuilder
+from mogrix.rpm_catalog import RpmCatalog
+from tests.conftest import queried
+def test_update_is_incremental(rpms_dir):
+    catalog = RpmCatalog()
+    assert catalog.update(rpms_dir) == {
+        "added": 3, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0,
+    }
+    assert len(queried(rpms_dir)) == 3
+
+    infos = {info.name: info for info in catalog.load(rpms_dir)}
+    assert infos["foo"].sourcerpm == "foo-1.0-1.src.rpm"
+    assert infos["foo"].sonames == ["libfoo.so.1"]
+    assert infos["bar"].sourcerpm == ""
+    assert infos["bar"].path == rpms_dir / "bar-1.0-1.mips.rpm"
+
+    # Only the rebuilt RPM is queried again; a deleted one is dropped
+    foo = rpms_dir / "foo-1.0-1.mips.rpm"
+    foo.write_bytes(b"rebuilt foo")
+    (rpms_dir / "bar-1.0-1.mips.rpm").unlink()
+    assert RpmCatalog().update(rpms_dir) == {
+        "added": 0, "updated": 1, "removed": 1, "unchanged": 1, "failed": 0,
+    }
+    assert queried(rpms_dir)[3:] == [foo.name]
+    assert [info.name for info in RpmCatalog().load(rpms_dir)] == ["foo", "foo-devel"]
+
+
+def test_unreadable_rpm_is_retried(rpms_dir):
+    broken = rpms_dir / "broken-1.0-1.mips.rpm"
+    broken.write_bytes(b"")
+    catalog = RpmCatalog()
+
+    assert catalog.update(rpms_dir)["failed"] == 1
+    assert catalog.update(rpms_dir)["failed"] == 1
+    assert queried(rpms_dir).count(broken.name) == 2
+
+
+def test_bundle_builder_reports_unreadable_rpms(rpms_dir, monkeypatch):
+    out = io.StringIO()
+    monkeypatch.setattr(mogrix.bundle.console, "file", out)
+    (rpms_dir / "broken-1.0-1.mips.rpm").write_bytes(b"")
+    BundleBuilder(rpms_dir)
+    assert "could not read 1 RPMs" in out.getvalue()
+
+    # No usable rpm at all: every RPM fails
+    monkeypatch.setenv("PATH", "/nonexistent")
+    monkeypatch.setattr("mogrix.rpm_catalog.DEFAULT_CATALOG_PATH", rpms_dir / "fresh.db")
+    with pytest.raises(SystemExit):
+        BundleBuilder(rpms_dir)
+
+
+def test_bundle_builder_uses_catalog(rpms_dir):
+    BundleBuilder(rpms_dir)
+    calls = len(queried(rpms_dir))
+
+    builder = BundleBuilder(rpms_dir)
+    foo = rpms_dir / "foo-1.0-1.mips.rpm"
+    assert builder._soname_to_rpm == {
+        "libfoo.so.1": foo,
+        "libfoo.so": rpms_dir / "foo-devel-1.0-1.mips.rpm",
+        "libbar.so.1": rpms_dir / "bar-1.0-1.mips.rpm",
+    }
+    assert builder._get_sibling_rpms(foo) == [foo]
+    assert builder._rpm_query(foo, "%{NAME}-%{VERSION}-%{RELEASE}") == "foo-1.0-1"
+    assert builder._rpm_filelist(foo)[0] == "/usr/sgug/bin/foo"
+    # The second builder never ran rpm
+    assert len(queried(rpms_dir)) == calls
+
+
+def test_resolve_deps_reads_payloads_once(rpms_dir):
+    foo = rpms_dir / "foo-1.0-1.mips.rpm"
+    bar = rpms_dir / "bar-1.0-1.mips.rpm"
+
+    manifest = BundleBuilder(rpms_dir).resolve_deps("foo")
+    assert manifest.included_rpms == [bar, foo]
+    assert manifest.target_version == "1.0-1"
+    assert not manifest.unresolved_sonames
+    assert sorted(queried(rpms_dir, "rpm2cpio")) == [bar.name, foo.name]
+
+    # NEEDED/SONAME sets are cached by RPM checksum
+    catalog = RpmCatalog()
+    catalog.update(rpms_dir)
+    deps = catalog.get_elf_deps(next(i.sha256 for i in catalog.load(rpms_dir) if i.name == "foo"))
+    assert deps.needed == {"libbar.so.1"}
+    assert deps.sonames == {"libfoo.so.1"}
+
+    assert BundleBuilder(rpms_dir).resolve_deps("foo").included_rpms == [bar, foo]
+    assert len(queried(rpms_dir, "rpm2cpio")) == 2
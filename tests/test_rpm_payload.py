@@ -0,0 +1,95 @@
+"""Tests for streaming RPM payload reads and check-elf over RPMs."""
+
+import io
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from mogrix.analyzers import elf
+from mogrix.analyzers.elf import check_path, iter_check_paths
+from mogrix.cli import main
+from mogrix.mipself import ELF_MAGIC
+from mogrix.rpm_payload import iter_cpio, iter_payload, select_magic
+from tests.conftest import cpio_archive, payload_entries
+
+@pytest.fixture
+def rpms(tmp_path, monkeypatch):
+    """Two RPMs and an rpm2cpio on PATH that prints their prepared payloads."""
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    (bindir / "rpm2cpio").write_text('#!/bin/sh\nexec cat "$1.cpio"\n')
+    (bindir / "rpm2cpio").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bindir}:/usr/bin:/bin")
+
+    foo = tmp_path / "foo-1.0-1.mips.rpm"
+    bar = tmp_path / "bar-1.0-1.mips.rpm"
+    entries = payload_entries()
+    for rpm, members in ((foo, entries[:3] + entries[4:]), (bar, entries[3:4])):
+        rpm.write_bytes(b"")
+        Path(f"{rpm}.cpio").write_bytes(cpio_archive(members))
+    return foo, bar
+
+
+def test_iter_cpio_selects_members():
+    archive = cpio_archive(payload_entries())
+    members = list(iter_cpio(io.BytesIO(archive), select_magic(ELF_MAGIC)))
+
+    assert [m.path for m in members] == [
+        "/usr/sgug/lib32",
+        "/usr/sgug/lib32/libfoo.so.1.0",
+        "/usr/sgug/lib32/libfoo.so.1",
+        "/usr/sgug/lib32/libbar.so.1",
+        "/usr/sgug/share/doc/README",
+    ]
+    assert members[1].data.startswith(ELF_MAGIC)
+    assert members[2].is_symlink and members[2].data == b"libfoo.so.1.0"
+    assert members[4].data is None  # not ELF, skipped
+
+    with pytest.raises(EOFError):
+        list(iter_cpio(io.BytesIO(archive[:200])))
+
+
+def test_check_rpm_reads_payload(rpms):
+    foo, bar = rpms
+    results = check_path(foo)
+
+    assert [str(r.binary_path) for r in results] == ["/usr/sgug/lib32/libfoo.so.1.0"]
+    assert [f.name for f in results[0].class_rec_findings] == ["fooClassRec", "localClassRec"]
+
+    unreadable = foo.with_name("broken.rpm")
+    unreadable.write_bytes(b"")
+    Path(f"{unreadable}.cpio").write_bytes(b"garbage")
+    with pytest.raises(RuntimeError):
+        list(iter_payload(unreadable))
+
+
+@pytest.mark.skipif(shutil.which("readelf") is None, reason="readelf not installed")
+def test_check_rpm_falls_back_to_readelf(rpms, monkeypatch):
+    foo, _bar = rpms
+    expected = check_path(foo)
+    # Members the in-process parser rejects are still analysed, via readelf
+    monkeypatch.setattr(elf, "read_elf", lambda path, data=None: None)
+
+    assert check_path(foo) == expected
+
+
+def test_parallel_matches_serial(rpms):
+    serial = [(p, [r.binary_path for r in rs], e) for p, rs, e in iter_check_paths(list(rpms))]
+    parallel = [(p, [r.binary_path for r in rs], e) for p, rs, e in iter_check_paths(list(rpms), jobs=2)]
+
+    assert sorted(parallel) == sorted(serial)
+    assert len(serial) == 2
+
+
+def test_cli_json_lines(rpms):
+    result = CliRunner().invoke(main, ["check-elf", "-j", "2", "--json-lines", *map(str, rpms)])
+
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert sorted(entry["binary"] for entry in lines) == [
+        "/usr/sgug/lib32/libbar.so.1",
+        "/usr/sgug/lib32/libfoo.so.1.0",
+    ]
+    assert result.exit_code == 1  # fooClassRec has at-risk relocations
@@ -0,0 +1,99 @@
+"""Tests for candidate rule generation."""
+
+import io
+import shutil
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from mogrix import rule_generator
+from mogrix.analyzers import source
+from mogrix.analyzers.scan_cache import ScanCache
+from mogrix.parser.srpm import SRPMExtractor
+from mogrix.rule_generator import generate_candidates
+
+RULES_DIR = Path(__file__).parent.parent / "rules"
+FIXTURES = Path(__file__).parent / "fixtures"
+
+SOURCES = {
+    "popt": {
+        "popt-1.19/configure.ac": "AM_GNU_GETTEXT([external])\n",
+        "popt-1.19/src/popt.c": "char *s = strdup(x);\n",
+        "popt-1.19/src/asm.S": ".set mips3\n",
+    },
+    "zlib": {
+        "zlib-1.3/zutil.c": "int z;\n",
+    },
+}
+
+
+def _write_tarball(path, files):
+    with tarfile.open(path, "w:gz") as tf:
+        for name, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture
+def srpms(tmp_path, monkeypatch):
+    """SRPMs whose extraction yields a fixture spec and SOURCES tarball."""
+    srpms_dir = tmp_path / "SRPMS"
+    srpms_dir.mkdir()
+    pairs = []
+    for name in SOURCES:
+        path = srpms_dir / f"{name}-1.0-1.fc40.src.rpm"
+        path.write_text(name)
+        pairs.append((name, path))
+
+    def extract(self, dest_dir=None):
+        name = self.srpm_path.read_text()
+        dest_dir = tmp_path / "extract" / name
+        dest_dir.mkdir(parents=True)
+        shutil.copy(FIXTURES / f"{name}.spec", dest_dir)
+        _write_tarball(dest_dir / f"{name}.tar.gz", SOURCES[name])
+        return dest_dir
+
+    monkeypatch.setattr(SRPMExtractor, "extract", extract)
+    return pairs
+
+
+def test_single_pass_feeds_all_detectors(tmp_path, srpms, monkeypatch):
+    streamed = []
+    real_scan = source.MultiPatternScanner.scan_tarball
+
+    def spy(self, tarball, jobs=1):
+        streamed.append(tarball.name)
+        return real_scan(self, tarball, jobs)
+
+    monkeypatch.setattr(source.MultiPatternScanner, "scan_tarball", spy)
+    results = list(generate_candidates(RULES_DIR, srpms[:1], tmp_path / "out"))
+
+    assert streamed == ["popt.tar.gz"]
+    candidate = results[0].candidate
+    assert candidate.classes == ["nls-disabled"]
+    assert any(r.yaml_key == "inject_compat_functions" for r in candidate.rules)
+    assert any("MIPS assembly detected in 1 file" in t for t in candidate.todos)
+    assert results[0].output_path == tmp_path / "out" / "popt.yaml"
+
+
+def test_generate_in_parallel(tmp_path, srpms):
+    results = list(generate_candidates(RULES_DIR, srpms, tmp_path / "out", jobs=2))
+
+    assert sorted(r.package for r in results) == ["popt", "zlib"]
+    assert not any(r.error for r in results)
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["popt.yaml", "zlib.yaml"]
+
+
+def test_generate_uses_given_cache(tmp_path, srpms):
+    list(generate_candidates(RULES_DIR, srpms[:1], tmp_path / "out"))
+    assert not (tmp_path / "cache").exists()
+
+    cache = ScanCache(tmp_path / "cache")
+    results = list(generate_candidates(RULES_DIR, srpms[:1], tmp_path / "out", cache=cache))
+    assert not results[0].error
+    assert list((tmp_path / "cache").rglob("*.json"))
+    # The serial path leaves the worker pool's generator alone
+    assert rule_generator._worker_generator is None
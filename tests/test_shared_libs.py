@@ -0,0 +1,78 @@
+"""Tests for the shared library store used by shared_libs bundles."""
+
+import os
+import subprocess
+
+from mogrix.bundle import BundleBuilder
+from mogrix.bundle_farm import BundleFarmReport, BundleFarmResult
+
+
+def _make_bundle(builder, dest, name, libs):
+    bundle_dir = dest / name
+    (bundle_dir / "_lib32").mkdir(parents=True)
+    for lib, data in libs.items():
+        (bundle_dir / "_lib32" / lib).write_bytes(data)
+    (bundle_dir / "_lib32" / "libz.so.1").symlink_to("libz.so.1.3")
+    shared = builder._collect_shared_libs(bundle_dir)
+    builder._generate_install_scripts(name, name, [], bundle_dir, shared)
+    return bundle_dir, shared
+
+
+def _run(script):
+    subprocess.run(["sh", str(script)], check=True, capture_output=True)
+
+
+def test_install_links_through_store(tmp_path):
+    builder = BundleBuilder(tmp_path / "no-rpms")
+    zlib = os.urandom(4096)
+    a, shared_a = _make_bundle(
+        builder, tmp_path, "a-irix-bundle", {"libz.so.1.3": zlib, "liba.so": b"a"}
+    )
+    b, shared_b = _make_bundle(
+        builder, tmp_path, "b-irix-bundle", {"libz.so.1.3": zlib, "libb.so": b"b"}
+    )
+    assert [path for _key, path, _size in shared_a] == ["_lib32/liba.so", "_lib32/libz.so.1.3"]
+    zkey = shared_a[1][0]
+    assert zkey == shared_b[1][0] and zkey.startswith(zkey[3:5] + "/")
+
+    _run(a / "install")
+    _run(b / "install")
+    store = tmp_path / ".mogrix-store"
+    assert os.path.samefile(a / "_lib32/libz.so.1.3", b / "_lib32/libz.so.1.3")
+    assert os.path.samefile(a / "_lib32/libz.so.1.3", store / zkey)
+    assert (a / "_lib32/libz.so.1").is_symlink()
+    refs = (store / ".bundle-refs").read_text().splitlines()
+    assert sorted(refs) == sorted(
+        f"{key}={bundle}"
+        for bundle, shared in (("a-irix-bundle", shared_a), ("b-irix-bundle", shared_b))
+        for key, _path, _size in shared
+    )
+
+    # Installing again does not duplicate references
+    _run(b / "install")
+    assert len((store / ".bundle-refs").read_text().splitlines()) == 4
+
+    # Store files go away with their last reference
+    _run(a / "uninstall")
+    assert not (store / shared_a[0][0]).exists()
+    assert (store / zkey).exists()
+    _run(b / "uninstall")
+    assert not (store / zkey).exists()
+    assert (store / ".bundle-refs").read_text() == ""
+    # The bundles keep working copies
+    assert (b / "_lib32/libz.so.1.3").read_bytes() == zlib
+
+
+def test_farm_report_counts_deduplicated_bytes():
+    report = BundleFarmReport(jobs=1, results=[
+        BundleFarmResult("a", "success", shared_libs={"ab/ab1": 100, "cd/cd1": 10}),
+        BundleFarmResult("b", "success", shared_libs={"ab/ab1": 100}),
+        BundleFarmResult("c", "failed"),
+    ])
+    assert report.shared_store == {
+        "libraries": 2, "bytes": 110, "deduplicated_bytes": 100,
+    }
+    data = report.to_dict()
+    assert data["shared_store"]["deduplicated_bytes"] == 100
+    assert data["packages"][0]["shared_lib_bytes"] == 110
+    assert "shared_store" not in BundleFarmReport(jobs=1).to_dict()
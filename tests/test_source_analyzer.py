@@ -1,5 +1,6 @@
 """Tests for source-level static analysis."""
 
+import json
 import subprocess
 import textwrap
 from pathlib import Path
@@ -9,9 +10,12 @@ import pytest
 
 from mogrix.analyzers.source import (
     CatalogPattern,
+    MultiPatternScanner,
+    ScanPattern,
     SourceAnalyzer,
     SourceCheck,
     SourceFinding,
+    _required_literals,
 )
 
 
@@ -135,19 +139,6 @@ def catalog_yaml(tmp_path):
     return catalog
 
 
-def _has_rg():
-    """Check if ripgrep is available."""
-    try:
-        subprocess.run(["rg", "--version"], capture_output=True, check=True)
-        return True
-    except (FileNotFoundError, subprocess.CalledProcessError):
-        return False
-
-
-requires_rg = pytest.mark.skipif(not _has_rg(), reason="ripgrep not installed")
-
-
-@requires_rg
 def test_scan_finds_zu(tmp_source, source_checks_yaml, catalog_yaml):
     """Scanner should find %zu in printf calls."""
     analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
@@ -158,7 +149,6 @@ def test_scan_finds_zu(tmp_source, source_checks_yaml, catalog_yaml):
     assert any("format.c" in f.file for f in zu_findings)
 
 
-@requires_rg
 def test_scan_finds_thread(tmp_source, source_checks_yaml, catalog_yaml):
     """Scanner should find __thread usage."""
     analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
@@ -169,7 +159,6 @@ def test_scan_finds_thread(tmp_source, source_checks_yaml, catalog_yaml):
     assert any("tls.c" in f.file for f in tls_findings)
 
 
-@requires_rg
 def test_scan_finds_epoll(tmp_source, source_checks_yaml, catalog_yaml):
     """Scanner should find epoll usage in .h files."""
     analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
@@ -180,7 +169,6 @@ def test_scan_finds_epoll(tmp_source, source_checks_yaml, catalog_yaml):
     assert any("poller.h" in f.file for f in epoll_findings)
 
 
-@requires_rg
 def test_scan_finds_catalog_patterns(tmp_source, source_checks_yaml, catalog_yaml):
     """Scanner should find compat function usage from catalog.yaml."""
     analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
@@ -191,7 +179,6 @@ def test_scan_finds_catalog_patterns(tmp_source, source_checks_yaml, catalog_yam
     assert any("util.c" in f.file for f in strdup_findings)
 
 
-@requires_rg
 def test_handled_compat_functions(tmp_source, source_checks_yaml, catalog_yaml):
     """Findings for already-injected compat functions should be marked handled."""
     analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
@@ -208,7 +195,6 @@ def test_handled_compat_functions(tmp_source, source_checks_yaml, catalog_yaml):
     assert all(f.handled for f in fopen_findings)
 
 
-@requires_rg
 def test_unhandled_compat_functions(tmp_source, source_checks_yaml, catalog_yaml):
     """Findings without matching compat functions should be unhandled."""
     analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
@@ -221,7 +207,6 @@ def test_unhandled_compat_functions(tmp_source, source_checks_yaml, catalog_yaml
     assert all(not f.handled for f in strdup_findings)
 
 
-@requires_rg
 def test_result_properties(tmp_source, source_checks_yaml, catalog_yaml):
     """Test SourceAnalysisResult property accessors."""
     analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
@@ -238,7 +223,6 @@ def test_result_properties(tmp_source, source_checks_yaml, catalog_yaml):
     assert len(result.unhandled) == len(result.findings)
 
 
-@requires_rg
 def test_deduplication(tmp_source, source_checks_yaml, catalog_yaml):
     """Same check_id + file should be deduplicated to one finding."""
     # Add another strdup call to util.c
@@ -259,7 +243,6 @@ def test_deduplication(tmp_source, source_checks_yaml, catalog_yaml):
     assert len(strdup_util) == 1
 
 
-@requires_rg
 def test_empty_source_tree(tmp_path, source_checks_yaml, catalog_yaml):
     """Empty directory should produce no findings."""
     empty = tmp_path / "empty"
@@ -281,23 +264,213 @@ def test_missing_checks_file(tmp_path):
     assert len(analyzer.catalog_patterns) == 0
 
 
-@requires_rg
 def test_scan_tarball(tmp_path, source_checks_yaml, catalog_yaml):
-    """Scanner should be able to extract and scan a tarball."""
+    """Scanner should be able to scan a tarball without extracting it."""
     # Create a small tarball
     src = tmp_path / "pkg-1.0"
     src.mkdir()
     (src / "main.c").write_text('printf("size: %zu\\n", n);')
 
-    import subprocess
     subprocess.run(
         ["tar", "czf", str(tmp_path / "pkg-1.0.tar.gz"), "-C", str(tmp_path), "pkg-1.0"],
         check=True,
     )
 
-    workdir = tmp_path / "scan"
     analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
-    result = analyzer.scan_tarball(tmp_path / "pkg-1.0.tar.gz", workdir)
+    result = analyzer.scan_tarball(tmp_path / "pkg-1.0.tar.gz")
 
     zu_findings = [f for f in result.findings if f.check_id == "printf-zu"]
     assert len(zu_findings) >= 1
+    assert zu_findings[0].file == "main.c"
+    assert not (tmp_path / "scan").exists()
+
+
+def _make_tarball(path, files, mode="w:gz"):
+    import io
+    import tarfile
+
+    with tarfile.open(path, mode) as tf:
+        for name, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return path
+
+
+def test_scan_tarballs_streams_members(tmp_path, source_checks_yaml, catalog_yaml):
+    """Only members matching a check glob are read; hidden paths are skipped."""
+    main = _make_tarball(tmp_path / "pkg-1.0.tar.xz", {
+        "pkg-1.0/src/main.c": 'printf("%zu", n);\n',
+        "pkg-1.0/src/util.c": "char *s = strdup(x);\n",
+        "pkg-1.0/.git/hook.c": 'printf("%zu", n);\n',
+        "pkg-1.0/README": 'printf("%zu", n);\n',
+    }, mode="w:xz")
+    extra = _make_tarball(tmp_path / "extra.tar.bz2", {
+        "main.c": 'printf("%zu", n);\n',
+        "doc/x.c": "int x;\n",
+    }, mode="w:bz2")
+    broken = tmp_path / "broken.tar.gz"
+    broken.write_bytes(b"not a tarball")
+
+    analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
+    result = analyzer.scan_tarballs([main, broken, extra])
+
+    assert result.files_scanned == 4
+    zu = sorted(f.file for f in result.findings if f.check_id == "printf-zu")
+    # main.c appears in both tarballs and is reported for each; the second
+    # tarball has no single top-level directory, so nothing is stripped
+    assert zu == ["main.c", "src/main.c"]
+    assert [f.file for f in result.findings if f.check_id == "compat:strdup"] == ["src/util.c"]
+
+
+def test_scan_tarball_worker_pool(tmp_path, source_checks_yaml, catalog_yaml):
+    """Fanning members out to worker processes gives the same findings."""
+    files = {f"pkg/src/f{i}.c": ("int x;\n" * i) + 'printf("%zu", n);\n' for i in range(50)}
+    tarball = _make_tarball(tmp_path / "pkg.tar.gz", files)
+
+    analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml)
+    serial = analyzer.scan_tarball(tarball)
+    parallel = analyzer.scan_tarball(tarball, jobs=2)
+    assert serial.files_scanned == parallel.files_scanned == 50
+    assert [(f.file, f.line) for f in serial.findings] == [
+        (f.file, f.line) for f in parallel.findings
+    ]
+
+
+def test_scanner_reports_first_matching_line():
+    """Only single-line matches count, and the first matching line wins."""
+    scanner = MultiPatternScanner([
+        ScanPattern(r'"[^"]*%z[udx]'),
+        ScanPattern(r"\bstrdup\s*\("),
+    ])
+    data = b'x = "a\nb %zu";\nchar *xstrdup(s);\nprintf("%zd", n); strdup (s);\n'
+    assert scanner.scan_text("a.c", data) == [
+        (0, 4, 'printf("%zd", n); strdup (s);'),
+        (1, 4, 'printf("%zd", n); strdup (s);'),
+    ]
+
+
+def test_scanner_globs_and_skips(tmp_path):
+    """Globs select files; hidden paths and binary files are skipped."""
+    (tmp_path / "a.c").write_text("strdup(x);\n")
+    (tmp_path / "a.py").write_text("strdup(x)\n")
+    (tmp_path / "bin.c").write_bytes(b"strdup(x);\0\n")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "b.c").write_text("strdup(x);\n")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "c.h").write_text("\n#define D strdup(x)\n")
+
+    scanner = MultiPatternScanner([ScanPattern(r"\bstrdup\s*\(", "*.c,*.h")])
+    hits = list(scanner.scan_directory(tmp_path))
+    assert hits == [
+        ("a.c", 0, 1, "strdup(x);"),
+        ("sub/c.h", 0, 2, "#define D strdup(x)"),
+    ]
+    assert scanner.files_scanned == 3
+
+
+def test_required_literals():
+    assert _required_literals(r"\bstrdup\s*\(") == (("strdup", b"strdup", True),)
+    assert _required_literals(r"\berr[x]?\s*\(\d") == (("err", b"err", False),)
+    assert _required_literals(r"\bfoo|#include\s*<sys/random\.h>") == (
+        ("foo", b"foo", False),
+        ("<sys/random.h>", b"<sys/random.h>", False),
+    )
+    assert _required_literals(r"(foo|bar)") is None
+    assert _required_literals(r"\w+\s*x") is None
+
+
+def test_unsupported_pattern_falls_back_to_rg(tmp_source, tmp_path):
+    """Patterns Python's re cannot compile are run through ripgrep."""
+    checks = tmp_path / "checks.yaml"
+    checks.write_text(textwrap.dedent("""\
+        checks:
+          - id: posix-class
+            severity: info
+            pattern: '\\p{Greek}+'
+            message: "m"
+    """))
+    analyzer = SourceAnalyzer(checks, tmp_path / "none.yaml")
+    with patch.object(analyzer, "_run_rg", return_value=[("x.c", 3, "match")]) as run_rg:
+        result = analyzer.scan_directory(tmp_source)
+    run_rg.assert_called_once()
+    assert [(f.check_id, f.file, f.line) for f in result.findings] == [("posix-class", "x.c", 3)]
+
+
+def test_scan_cache_reuses_matches(tmp_path, source_checks_yaml, catalog_yaml):
+    """A cached tarball is not rescanned; handled flags follow each call's rules."""
+    from mogrix.analyzers.scan_cache import ScanCache
+
+    tarball = _make_tarball(tmp_path / "pkg-1.0.tar.gz", {
+        "pkg-1.0/main.c": 'char *s = strdup(x);\nprintf("%zu", n);\n',
+    })
+    cache = ScanCache(tmp_path / "cache")
+    analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml, cache=cache)
+    first = analyzer.scan_tarball(tarball)
+    assert not first.handled
+
+    with patch.object(MultiPatternScanner, "scan_tarball", side_effect=AssertionError):
+        second = analyzer.scan_tarball(tarball, handled_compat_functions=["strdup"])
+    assert [(f.check_id, f.file, f.line) for f in second.findings] == [
+        (f.check_id, f.file, f.line) for f in first.findings
+    ]
+    assert second.files_scanned == first.files_scanned == 1
+    assert [f.check_id for f in second.handled] == ["compat:strdup"]
+
+
+def test_scan_cache_runs_only_new_checks(tmp_path, source_checks_yaml, catalog_yaml):
+    """Adding a check scans cached tarballs for that pattern alone."""
+    from mogrix.analyzers.scan_cache import ScanCache
+
+    tarball = _make_tarball(tmp_path / "pkg-1.0.tar.gz", {
+        "pkg-1.0/main.c": "static __thread int x;\nvoid *p = alloca(4);\n",
+    })
+    cache = ScanCache(tmp_path / "cache")
+    SourceAnalyzer(source_checks_yaml, catalog_yaml, cache=cache).scan_tarball(tarball)
+
+    source_checks_yaml.write_text(source_checks_yaml.read_text() + (
+        "  - id: alloca-usage\n"
+        "    severity: warning\n"
+        "    pattern: '\\balloca\\s*\\('\n"
+        "    message: alloca\n"
+    ))
+    scanned = []
+    real_init = MultiPatternScanner.__init__
+
+    def spy(self, patterns):
+        scanned.append([sp.pattern for sp in patterns])
+        real_init(self, patterns)
+
+    with patch.object(MultiPatternScanner, "__init__", spy):
+        result = SourceAnalyzer(source_checks_yaml, catalog_yaml, cache=cache).scan_tarball(tarball)
+
+    assert scanned == [[r"\balloca\s*\("]]
+    assert sorted(f.check_id for f in result.findings) == [
+        "alloca-usage", "thread-local-storage",
+    ]
+
+
+def test_scan_cache_gc_drops_old_patterns(tmp_path, source_checks_yaml, catalog_yaml):
+    """gc keeps only the matches of patterns still in use."""
+    from mogrix.analyzers.scan_cache import ScanCache, pattern_key
+
+    tarball = _make_tarball(tmp_path / "pkg-1.0.tar.gz", {
+        "pkg-1.0/main.c": "static __thread int x;\n",
+    })
+    cache = ScanCache(tmp_path / "cache")
+    analyzer = SourceAnalyzer(source_checks_yaml, catalog_yaml, cache=cache)
+    analyzer.scan_tarball(tarball)
+    keys = sorted({pattern_key(sp.pattern, sp.glob) for sp in analyzer.scan_patterns()})
+    [entry_path] = (tmp_path / "cache").rglob("*.json")
+    keep = set(keys[1:])
+
+    assert cache.gc(keep, dry_run=True)[0] == 1
+    assert sorted(json.loads(entry_path.read_text())["matches"]) == keys
+    assert cache.gc(keep)[0] == 1
+    assert sorted(json.loads(entry_path.read_text())["matches"]) == keys[1:]
+    assert cache.gc(keep) == (0, 0)
+
+    size = entry_path.stat().st_size
+    assert cache.gc(set()) == (1, size)
+    assert not entry_path.exists()
@@ -0,0 +1,153 @@
+"""Tests for the cross-package source index."""
+
+import io
+import os
+import shutil
+import sqlite3
+import tarfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from mogrix.analyzers.source import MultiPatternScanner, ScanPattern, SourceAnalyzer
+from mogrix.analyzers.source_index import SourceIndex
+from mogrix.parser.srpm import SRPMExtractor
+
+SOURCES = {
+    "foo": {
+        "foo-1.0/src/a.c": "char *s = strdup(x);\n",
+        "foo-1.0/src/b.cpp": 'printf("%zu", n);\n',
+        "foo-1.0/doc/x.txt": "strdup(\n",
+    },
+    "bar": {
+        "bar-2.0/main.c": "int main(void) {\n  return strdup(p) != 0;\n}\n",
+    },
+    "baz": {
+        "baz-3.0/main.c": "int main(void) { return 0; }\n",
+    },
+}
+
+
+def _write_tarball(path, files):
+    with tarfile.open(path, "w:gz") as tf:
+        for name, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture
+def tarballs(tmp_path):
+    tarball_dir = tmp_path / "tarballs"
+    tarball_dir.mkdir()
+    paths = {}
+    for name, files in SOURCES.items():
+        paths[name] = tarball_dir / f"{name}.tar.gz"
+        _write_tarball(paths[name], files)
+    return paths
+
+
+@pytest.fixture
+def srpms_dir(tmp_path, tarballs, monkeypatch):
+    """SRPMs whose extraction yields the tarballs in SOURCES (no rpm2cpio needed)."""
+    srpms = tmp_path / "SRPMS"
+    srpms.mkdir()
+    for name in SOURCES:
+        (srpms / f"{name}-1.0-1.fc40.src.rpm").write_text(name)
+
+    def extract(self, dest_dir=None):
+        name = self.srpm_path.read_text()
+        shutil.copy(tarballs[name], dest_dir)
+        (dest_dir / f"{name}.spec").write_text("Name: x\n")
+        return dest_dir
+
+    monkeypatch.setattr(SRPMExtractor, "extract", extract)
+    return srpms
+
+
+@pytest.fixture
+def source_checks(tmp_path):
+    """The repo's C checks, without those on unindexed file types."""
+    repo_checks = Path(__file__).parent.parent / "rules" / "source_checks.yaml"
+    data = yaml.safe_load(repo_checks.read_text())
+    data["checks"] = [c for c in data["checks"] if c.get("glob", "*.c,*.h") == "*.c,*.h"]
+    path = tmp_path / "source_checks.yaml"
+    path.write_text(yaml.safe_dump(data))
+    return path
+
+
+def test_search(tmp_path, srpms_dir):
+    index = SourceIndex(tmp_path / "index.db")
+    assert index.update(srpms_dir)["added"] == 3
+
+    matches = index.search(r"\bstrdup\s*\(")
+    assert [(m.package, m.file, m.line) for m in matches] == [
+        ("bar", "main.c", 2),
+        ("foo", "src/a.c", 1),
+    ]
+    # No literal of three characters: every indexed file is checked
+    zu = index.search(r'"[^"]*%z[udx]', "*.c,*.h,*.cpp")
+    assert [(m.package, m.file) for m in zu] == [("foo", "src/b.cpp")]
+
+    with pytest.raises(ValueError):
+        index.search("strdup", "*.txt")
+
+
+def test_update_is_incremental(tmp_path, srpms_dir):
+    index = SourceIndex(tmp_path / "index.db")
+    index.update(srpms_dir)
+    assert index.update(srpms_dir) == {
+        "added": 0, "updated": 0, "removed": 0, "unchanged": 3,
+    }
+
+    (srpms_dir / "bar-1.0-1.fc40.src.rpm").unlink()
+    baz = srpms_dir / "baz-1.0-1.fc40.src.rpm"
+    os.utime(baz, ns=(0, 0))
+    counts = index.update(srpms_dir)
+    assert counts == {"added": 0, "updated": 1, "removed": 1, "unchanged": 1}
+    assert index.stats() == {"srpms": 2, "tarballs": 2, "files": 3}
+    assert [m.package for m in index.search(r"\bstrdup\s*\(")] == ["foo"]
+
+
+def test_backs_source_analyzer(tmp_path, srpms_dir, tarballs, source_checks):
+    """Indexed tarballs are answered without streaming the archive."""
+    index = SourceIndex(tmp_path / "index.db")
+    index.update(srpms_dir)
+    tarball = tarballs["bar"]
+
+    streamed = SourceAnalyzer(source_checks).scan_tarball(tarball)
+    with patch.object(MultiPatternScanner, "scan_tarball", side_effect=AssertionError):
+        indexed = SourceAnalyzer(source_checks, index=index).scan_tarball(tarball)
+
+    assert indexed.files_scanned == streamed.files_scanned == 1
+    assert [(f.check_id, f.file, f.line) for f in indexed.findings] == [
+        (f.check_id, f.file, f.line) for f in streamed.findings
+    ]
+    assert any(f.check_id == "compat:strdup" for f in indexed.findings)
+
+
+def test_unreadable_tarball_is_not_reported_clean(tmp_path):
+    index = SourceIndex(tmp_path / "index.db")
+    broken = tmp_path / "broken.tar.gz"
+    broken.write_bytes(b"\x1f\x8b\x08 not really gzip")
+    index.index_tarball(broken)
+    digest = index.conn.execute("SELECT sha256 FROM tarballs").fetchone()[0]
+
+    # Left to the streamed scan instead of answering "no matches"
+    assert index.scan_tarball(digest, [ScanPattern(r"\bstrdup\s*\(", "*.c,*.h")]) is None
+
+
+def test_open_existing_does_not_write(tmp_path):
+    path = tmp_path / "index.db"
+    assert SourceIndex.open_existing(path) is None
+
+    sqlite3.connect(str(path)).close()  # an empty or older database
+    assert SourceIndex.open_existing(path) is None
+    assert sqlite3.connect(str(path)).execute("SELECT name FROM sqlite_master").fetchall() == []
+
+    SourceIndex(path).close()
+    index = SourceIndex.open_existing(path)
+    assert index is not None and index.stats()["tarballs"] == 0
@@ -0,0 +1,98 @@
+"""Tests for mogrix.upstream git mirror cache."""
+
+import shutil
+import subprocess
+import tarfile
+
+import pytest
+
+from mogrix.upstream import UpstreamSource
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def _git(repo, *args):
+    result = subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        capture_output=True, text=True, check=True,
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def upstream_repo(tmp_path):
+    repo = tmp_path / "hello"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    (repo / "hello.c").write_text("int main(void) { return 0; }\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "initial")
+    _git(repo, "tag", "v1.0")
+    return repo
+
+
+@pytest.fixture
+def source(tmp_path):
+    upstream = UpstreamSource(cache_dir=tmp_path / "cache")
+    upstream.git_calls = []
+    real_git = upstream._git
+
+    def spy(args, what):
+        upstream.git_calls.append(what)
+        real_git(args, what)
+
+    upstream._git = spy
+    return upstream
+
+
+def _members(tarball):
+    with tarfile.open(tarball) as tf:
+        return sorted(tf.getnames())
+
+
+def test_tag_cached_without_network(source, upstream_repo, tmp_path):
+    url = str(upstream_repo)
+    first = tmp_path / "a.tar.gz"
+    source._fetch_git(url, "v1.0", "hello", "1.0", first)
+    assert source.git_calls == ["clone", "archive"]
+    assert _members(first) == ["hello-1.0", "hello-1.0/hello.c"]
+
+    # Upstream disappears: a tag already in the mirror still resolves
+    shutil.rmtree(upstream_repo)
+    second = tmp_path / "b.tar.gz"
+    source._fetch_git(url, "v1.0", "hello", "1.0", second)
+    assert source.git_calls == ["clone", "archive"]
+    assert second.read_bytes() == first.read_bytes()
+
+
+def test_branch_fetches_incrementally(source, upstream_repo, tmp_path):
+    url = str(upstream_repo)
+    source._fetch_git(url, "main", "hello", "1.0", tmp_path / "a.tar.gz")
+    source._fetch_git(url, "main", "hello", "1.0", tmp_path / "b.tar.gz")
+    assert source.git_calls == ["clone", "archive"]
+
+    (upstream_repo / "NEWS").write_text("news\n")
+    _git(upstream_repo, "add", ".")
+    _git(upstream_repo, "commit", "-q", "-m", "news")
+
+    out = tmp_path / "c.tar.gz"
+    source._fetch_git(url, "main", "hello", "1.0", out)
+    assert source.git_calls == ["clone", "archive", "fetch", "archive"]
+    assert "hello-1.0/NEWS" in _members(out)
+
+
+def test_commit_sha(source, upstream_repo, tmp_path):
+    url = str(upstream_repo)
+    sha = _git(upstream_repo, "rev-parse", "HEAD")
+    source._fetch_git(url, "v1.0", "hello", "1.0", tmp_path / "a.tar.gz")
+
+    out = tmp_path / "b.tar.gz"
+    source._fetch_git(url, sha, "hello", "1.0", out)
+    # Same commit, same prefix: served from the tarball cache
+    assert source.git_calls == ["clone", "archive"]
+    assert out.exists()
+
+
+def test_unknown_ref(source, upstream_repo, tmp_path):
+    with pytest.raises(RuntimeError, match="not found"):
+        source._fetch_git(str(upstream_repo), "nope", "hello", "1.0", tmp_path / "a.tar.gz")
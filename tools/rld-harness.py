@@ -18,25 +18,23 @@ Usage:
 import argparse
 import json
 import os
-import struct
 import subprocess
 import sys
 import tempfile
 from collections import defaultdict
 from pathlib import Path
 
-# --- Thresholds from rld decompilation + production experience ---
-
-THRESHOLDS = {
-    "global_got_limit": 4370,       # rld can't fill GOT above this
-    "local_gotno_reencounter": 128,  # dlopen re-encounter danger zone
-    "multi_got_trigger": 16384,     # LLD default --mips-got-size split
-}
-
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 RESULTS_DIR = PROJECT_ROOT / "test-results"
 HARNESS_SRC = PROJECT_ROOT / "tests" / "rld" / "src" / "harness_dlopen.c"
 
+# MipsElf (mmap-based MIPS n32 ELF parser) lives in mogrix.mipself;
+# analyze reads its per-library facts through the shared ELF facts cache.
+sys.path.insert(0, str(PROJECT_ROOT))
+from mogrix.depgraph import DepGraph, soname_aliases  # noqa: E402
+from mogrix.elf_facts import ElfFactsCache  # noqa: E402
+from mogrix.mipself import THRESHOLDS, MipsElf  # noqa: E402
+
 # IRIX system libraries — always available, never bundled
 IRIX_SYSTEM_LIBS = {
     "libc.so.1", "libm.so", "libpthread.so", "libdl.so",
@@ -47,392 +45,6 @@ IRIX_SYSTEM_LIBS = {
 }
 
 
-# ============================================================
-# MipsElf — struct-based binary ELF parser for MIPS n32
-# ============================================================
-
-class MipsElf:
-    """Parse MIPS n32 ELF binary for rld analysis.
-
-    Adapted from cross/bin/fix-got-stubs and cross/bin/fix-anon-relocs.
-    Direct binary parsing — no readelf subprocess needed.
-    """
-
-    # ELF constants
-    PT_LOAD = 1
-    PT_DYNAMIC = 2
-    SHT_REL = 9
-    SHT_DYNSYM = 11
-    DT_NEEDED = 1
-    DT_INIT = 12
-    DT_RPATH = 15
-    DT_RUNPATH = 29
-    DT_VERNEED = 0x6FFFFFFE
-    DT_VERSYM = 0x6FFFFFF0
-    DT_VERNEEDNUM = 0x6FFFFFFF
-    DT_MIPS_LOCAL_GOTNO = 0x7000000A
-    DT_MIPS_SYMTABNO = 0x70000011
-    DT_MIPS_GOTSYM = 0x70000013
-
-    def __init__(self, path):
-        self.path = Path(path)
-        self.data = self.path.read_bytes()
-        self.name = self.path.name
-        self.valid = False
-        self.is_shared = False
-        self.is_exec = False
-        self.error = None
-
-        # Parsed fields
-        self.local_gotno = 0
-        self.gotsym = 0
-        self.symtabno = 0
-        self.got_offset = 0
-        self.got_size = 0
-        self.got_addr = 0
-        self.stubs_addr = 0
-        self.stubs_size = 0
-        self.load_segments = []
-        self.dynamic_tags = {}
-        self.dynamic_tag_list = []  # preserve order for NEEDED
-        self.sections = {}  # name -> {addr, offset, size, type}
-        self.section_names = []
-        self.dynsym_offset = 0
-        self.dynsym_entsize = 16
-        self.dynsym_count = 0
-        self.strtab_offset = 0
-
-        self._parse()
-
-    def _r32(self, off):
-        return struct.unpack_from('>I', self.data, off)[0]
-
-    def _r16(self, off):
-        return struct.unpack_from('>H', self.data, off)[0]
-
-    def _r8(self, off):
-        return self.data[off]
-
-    def _rs32(self, off):
-        return struct.unpack_from('>i', self.data, off)[0]
-
-    def _read_cstring(self, off):
-        end = self.data.index(0, off)
-        return self.data[off:end].decode('ascii', errors='replace')
-
-    def _parse(self):
-        d = self.data
-        if len(d) < 52 or d[:4] != b'\x7fELF':
-            self.error = "Not an ELF file"
-            return
-        if d[4] != 1:  # ELFCLASS32
-            self.error = "Not 32-bit ELF"
-            return
-        if d[5] != 2:  # ELFDATA2MSB
-            self.error = "Not big-endian"
-            return
-
-        ei_type = self._r16(16)
-        self.is_shared = (ei_type == 3)  # ET_DYN
-        self.is_exec = (ei_type == 2)    # ET_EXEC
-        if not self.is_shared and not self.is_exec:
-            self.error = f"Unexpected ELF type {ei_type}"
-            return
-
-        self.valid = True
-
-        # ELF header fields
-        e_phoff = self._r32(28)
-        e_shoff = self._r32(32)
-        e_phentsize = self._r16(42)
-        e_phnum = self._r16(44)
-        e_shentsize = self._r16(46)
-        e_shnum = self._r16(48)
-        e_shstrndx = self._r16(50)
-
-        # --- Program headers ---
-        dyn_offset = 0
-        dyn_size = 0
-        for i in range(e_phnum):
-            ph = e_phoff + i * e_phentsize
-            p_type = self._r32(ph)
-            p_offset = self._r32(ph + 4)
-            p_vaddr = self._r32(ph + 8)
-            p_filesz = self._r32(ph + 16)
-            p_memsz = self._r32(ph + 20)
-            p_flags = self._r32(ph + 24)
-
-            if p_type == self.PT_LOAD:
-                self.load_segments.append({
-                    'vaddr': p_vaddr, 'offset': p_offset,
-                    'filesz': p_filesz, 'memsz': p_memsz,
-                    'flags': p_flags,
-                })
-            elif p_type == self.PT_DYNAMIC:
-                dyn_offset = p_offset
-                dyn_size = p_filesz
-
-        # --- Section headers ---
-        if e_shoff > 0 and e_shnum > 0:
-            shstr_sh = e_shoff + e_shstrndx * e_shentsize
-            shstr_off = self._r32(shstr_sh + 16)
-
-            for i in range(e_shnum):
-                sh = e_shoff + i * e_shentsize
-                sh_name_off = self._r32(sh)
-                sh_type = self._r32(sh + 4)
-                sh_addr = self._r32(sh + 12)
-                sh_offset = self._r32(sh + 16)
-                sh_size = self._r32(sh + 20)
-                sh_link = self._r32(sh + 24)
-                sh_entsize = self._r32(sh + 36)
-
-                try:
-                    name = self._read_cstring(shstr_off + sh_name_off)
-                except (ValueError, IndexError):
-                    name = f"<section_{i}>"
-
-                self.section_names.append(name)
-                self.sections[name] = {
-                    'addr': sh_addr, 'offset': sh_offset,
-                    'size': sh_size, 'type': sh_type,
-                    'link': sh_link, 'entsize': sh_entsize,
-                }
-
-                if name == '.got':
-                    self.got_addr = sh_addr
-                    self.got_offset = sh_offset
-                    self.got_size = sh_size
-                elif name == '.MIPS.stubs':
-                    self.stubs_addr = sh_addr
-                    self.stubs_size = sh_size
-                elif sh_type == self.SHT_DYNSYM:
-                    self.dynsym_offset = sh_offset
-                    self.dynsym_entsize = sh_entsize or 16
-                    self.dynsym_count = sh_size // (sh_entsize or 16)
-                    # .dynstr is the linked section
-                    strtab_sh = e_shoff + sh_link * e_shentsize
-                    self.strtab_offset = self._r32(strtab_sh + 16)
-
-        # --- Dynamic tags ---
-        if dyn_offset > 0:
-            pos = dyn_offset
-            while pos < dyn_offset + dyn_size:
-                d_tag = self._rs32(pos)
-                d_val = self._r32(pos + 4)
-                if d_tag == 0:
-                    break
-                self.dynamic_tag_list.append((d_tag, d_val))
-                # Store last value for each tag (some may repeat, e.g. NEEDED)
-                if d_tag not in self.dynamic_tags:
-                    self.dynamic_tags[d_tag] = d_val
-                pos += 8
-
-            self.local_gotno = self.dynamic_tags.get(self.DT_MIPS_LOCAL_GOTNO, 0)
-            self.gotsym = self.dynamic_tags.get(self.DT_MIPS_GOTSYM, 0)
-            self.symtabno = self.dynamic_tags.get(self.DT_MIPS_SYMTABNO, 0)
-
-    @property
-    def global_got_count(self):
-        if self.gotsym and self.symtabno:
-            return self.symtabno - self.gotsym
-        return 0
-
-    def needed_sonames(self):
-        """Return list of DT_NEEDED sonames in order."""
-        result = []
-        for tag, val in self.dynamic_tag_list:
-            if tag == self.DT_NEEDED and self.strtab_offset:
-                try:
-                    name = self._read_cstring(self.strtab_offset + val)
-                    result.append(name)
-                except (ValueError, IndexError):
-                    result.append(f"<strtab+{val}>")
-        return result
-
-    def has_rpath(self):
-        return (self.DT_RPATH in self.dynamic_tags or
-                self.DT_RUNPATH in self.dynamic_tags)
-
-    def has_verneed(self):
-        return (self.DT_VERNEED in self.dynamic_tags or
-                self.DT_VERSYM in self.dynamic_tags or
-                self.DT_VERNEEDNUM in self.dynamic_tags)
-
-    def has_dt_init(self):
-        return self.DT_INIT in self.dynamic_tags
-
-    def has_init_array(self):
-        return '.init_array' in self.sections
-
-    def has_ctors(self):
-        return '.ctors' in self.sections
-
-    def vaddr_to_foff(self, va):
-        """Convert virtual address to file offset."""
-        for seg in self.load_segments:
-            if seg['vaddr'] <= va < seg['vaddr'] + seg['filesz']:
-                return seg['offset'] + (va - seg['vaddr'])
-        return None
-
-    # --- Check methods (return (passed: bool, message: str)) ---
-
-    def check_load_segments(self):
-        count = len(self.load_segments)
-        if count == 2:
-            return True, f"{count} LOAD segments"
-        return False, f"{count} LOAD segments (expected 2, rld crashes on 3)"
-
-    def check_no_verneed(self):
-        if self.has_verneed():
-            tags = []
-            if self.DT_VERNEED in self.dynamic_tags:
-                tags.append("VERNEED")
-            if self.DT_VERSYM in self.dynamic_tags:
-                tags.append("VERSYM")
-            return False, f"has version tags: {', '.join(tags)}"
-        return True, "no version tags"
-
-    def check_no_init_array(self):
-        issues = []
-        if self.has_init_array():
-            issues.append("has .init_array (rld ignores)")
-        if not self.has_ctors():
-            issues.append("missing .ctors")
-        if issues:
-            return False, "; ".join(issues)
-        return True, "uses .ctors"
-
-    def check_dt_init(self):
-        if self.has_dt_init():
-            return True, "DT_INIT present"
-        return False, "no DT_INIT tag"
-
-    def check_got_thresholds(self):
-        gc = self.global_got_count
-        limit = THRESHOLDS["global_got_limit"]
-        if gc >= limit:
-            return False, f"global GOT {gc} >= {limit} threshold"
-        if gc > limit * 0.8:
-            return True, f"global GOT {gc} (WARNING: >{int(limit*0.8)}, approaching limit)"
-        return True, f"global GOT {gc}"
-
-    def check_no_rpath(self):
-        if self.has_rpath():
-            return False, "has RPATH/RUNPATH (build paths break rld)"
-        return True, "no RPATH"
-
-    def check_stub_alignment(self):
-        """Verify GOT[LOCAL_GOTNO+i] = stubs_base + i*16."""
-        if self.got_size == 0 or self.stubs_size == 0:
-            return True, "no stubs section (static or exe)"
-        if self.local_gotno == 0 or self.global_got_count == 0:
-            return True, "no global GOT entries"
-
-        first_global_off = self.got_offset + self.local_gotno * 4
-        if first_global_off + 4 > len(self.data):
-            return False, "GOT offset out of bounds"
-
-        current_first = self._r32(first_global_off)
-        expected_first = self.stubs_addr
-
-        if current_first == expected_first:
-            return True, "GOT-stub alignment correct"
-
-        # Check reversed pattern
-        num_stubs = self.stubs_size // 16
-        if num_stubs > 0:
-            expected_reversed = self.stubs_addr + (num_stubs - 1) * 16
-            if current_first == expected_reversed:
-                return False, "GOT-stub REVERSED (fix-got-stubs not applied)"
-
-        return False, f"GOT[{self.local_gotno}]=0x{current_first:08x}, expected 0x{expected_first:08x}"
-
-    def run_all_checks(self):
-        """Run all checks, return list of (name, passed, message)."""
-        checks = [
-            ("load_segments", self.check_load_segments),
-            ("no_verneed", self.check_no_verneed),
-            ("no_init_array", self.check_no_init_array),
-            ("dt_init", self.check_dt_init),
-            ("got_thresholds", self.check_got_thresholds),
-            ("no_rpath", self.check_no_rpath),
-            ("stub_alignment", self.check_stub_alignment),
-        ]
-        results = []
-        for name, fn in checks:
-            try:
-                passed, msg = fn()
-                results.append((name, passed, msg))
-            except Exception as e:
-                results.append((name, False, f"ERROR: {e}"))
-        return results
-
-    # --- GOT inspection methods ---
-
-    def read_got_entries(self):
-        """Read all GOT entries as list of 32-bit values."""
-        if self.got_size == 0:
-            return []
-        count = self.got_size // 4
-        entries = []
-        for i in range(count):
-            off = self.got_offset + i * 4
-            if off + 4 > len(self.data):
-                break
-            entries.append(self._r32(off))
-        return entries
-
-    def read_dynsym_entries(self):
-        """Read .dynsym entries: list of (index, name, value, size, bind, type, vis, shndx)."""
-        if self.dynsym_offset == 0:
-            return []
-        entries = []
-        for i in range(self.dynsym_count):
-            off = self.dynsym_offset + i * self.dynsym_entsize
-            if off + 16 > len(self.data):
-                break
-            st_name_off = self._r32(off)
-            st_value = self._r32(off + 4)
-            st_size = self._r32(off + 8)
-            st_info = self._r8(off + 12)
-            st_other = self._r8(off + 13)
-            st_shndx = self._r16(off + 14)
-
-            bind = st_info >> 4
-            stype = st_info & 0xf
-            vis = st_other & 0x3
-
-            try:
-                name = self._read_cstring(self.strtab_offset + st_name_off) if self.strtab_offset else ""
-            except (ValueError, IndexError):
-                name = f"<strtab+{st_name_off}>"
-
-            entries.append({
-                'index': i, 'name': name, 'value': st_value,
-                'size': st_size, 'bind': bind, 'type': stype,
-                'vis': vis, 'shndx': st_shndx,
-            })
-        return entries
-
-    def read_rel_entries(self):
-        """Read .rel.dyn entries: list of (offset, sym_idx, type)."""
-        rel = self.sections.get('.rel.dyn')
-        if not rel:
-            return []
-        entries = []
-        off = rel['offset']
-        end = off + rel['size']
-        while off < end:
-            r_offset = self._r32(off)
-            r_info = self._r32(off + 4)
-            sym_idx = r_info >> 8
-            rtype = r_info & 0xFF
-            entries.append((r_offset, sym_idx, rtype))
-            off += 8
-        return entries
-
-
 # ============================================================
 # analyze — Static bundle analysis
 # ============================================================
@@ -464,50 +76,32 @@ def find_bundle_libs(bundle_path):
 def build_dep_graph(elfs):
     """Build transitive NEEDED dependency graph.
 
-    Returns dict: soname -> {depth, needed, needed_by, transitive_deps}
+    Returns (graph, engine): graph is a dict soname -> {needed,
+    resolved_needed, needed_by, depth, transitive_count, chain_global_got},
+    engine the mogrix.depgraph.DepGraph over the bundle libraries.
     """
-    by_name = {}
+    # Index by soname prefix patterns for version matching:
+    #   libfoo.so.1.2.3 should be findable as libfoo.so.1, libfoo.so
+    by_name = {elf.name: elf for elf in elfs}
     for elf in elfs:
-        by_name[elf.name] = elf
-        # Index by soname prefix patterns for version matching:
-        #   libfoo.so.1.2.3 should be findable as libfoo.so.1, libfoo.so
-        name = elf.name
-        while '.so' in name:
-            # Strip last .N component
-            dot_pos = name.rfind('.')
-            if dot_pos <= 0:
-                break
-            prefix = name[:dot_pos]
-            # Only register if the prefix still contains .so
-            if '.so' in prefix or prefix.endswith('.so'):
-                if prefix not in by_name:
-                    by_name[prefix] = elf
-            name = prefix
-
-    def resolve_dep(soname):
-        """Resolve a NEEDED soname to a graph key (filename) via by_name."""
-        if soname in by_name:
-            return by_name[soname].name
-        return None
+        for alias in soname_aliases(elf.name):
+            by_name.setdefault(alias, elf)
 
     graph = {}
     for elf in elfs:
         # Resolve NEEDED sonames to actual filenames in the bundle
         raw_needed = elf.needed_sonames()
-        resolved_needed = []
-        for dep in raw_needed:
-            real = resolve_dep(dep)
-            if real:
-                resolved_needed.append(real)
-            else:
-                resolved_needed.append(dep)  # keep for unresolved tracking
-
+        resolved_needed = [
+            by_name[dep].name if dep in by_name else dep  # keep for unresolved tracking
+            for dep in raw_needed
+        ]
         graph[elf.name] = {
             'needed': raw_needed,
             'resolved_needed': resolved_needed,
             'needed_by': [],
             'depth': 0,
             'transitive_count': 0,
+            'chain_global_got': 0,
         }
 
     # Build reverse edges using resolved names
@@ -516,41 +110,17 @@ def build_dep_graph(elfs):
             if dep in graph:
                 graph[dep]['needed_by'].append(name)
 
-    # BFS from roots (libraries not needed by anyone in the bundle) to compute depths
-    roots = [n for n, info in graph.items() if not info['needed_by']]
-    if not roots:
-        # Circular — just pick all as roots
-        roots = list(graph.keys())
-
-    visited = set()
-    queue = [(r, 0) for r in roots]
-    while queue:
-        name, depth = queue.pop(0)
-        if name in visited:
-            continue
-        visited.add(name)
-        graph[name]['depth'] = max(graph[name]['depth'], depth)
-        for dep in graph[name]['resolved_needed']:
-            if dep in graph:
-                queue.append((dep, depth + 1))
-
-    # Count transitive deps
-    def count_transitive(name, seen=None):
-        if seen is None:
-            seen = set()
-        if name in seen or name not in graph:
-            return 0
-        seen.add(name)
-        total = 0
-        for dep in graph[name]['resolved_needed']:
-            if dep in graph and dep not in seen:
-                total += 1 + count_transitive(dep, seen)
-        return total
-
-    for name in graph:
-        graph[name]['transitive_count'] = count_transitive(name)
+    engine = DepGraph({
+        name: [dep for dep in info['resolved_needed'] if dep in graph]
+        for name, info in graph.items()
+    })
+    chain_got = engine.closure_totals({elf.name: elf.global_got_count for elf in elfs})
+    for name, info in graph.items():
+        info['depth'] = engine.depth(name)
+        info['transitive_count'] = engine.transitive_count(name)
+        info['chain_global_got'] = chain_got[name]
 
-    return graph
+    return graph, engine
 
 
 def cmd_analyze(args):
@@ -575,14 +145,16 @@ def cmd_analyze(args):
     print(f"Analyzing {len(libs)} libraries in {bundle_path}")
     print(f"{'='*70}")
 
-    # Parse all ELFs
+    # Parse all ELFs (unchanged libraries come from the facts cache)
+    facts_cache = ElfFactsCache()
     elfs = []
     for lib_path in libs:
-        elf = MipsElf(lib_path)
-        if elf.valid:
+        elf = facts_cache.lookup(lib_path)
+        if elf is not None and elf.valid:
             elfs.append(elf)
         else:
-            print(f"  SKIP: {lib_path.name}: {elf.error}")
+            with MipsElf(lib_path) as elf:
+                print(f"  SKIP: {lib_path.name}: {elf.error}")
 
     # Run checks on each
     report = {
@@ -607,7 +179,7 @@ def cmd_analyze(args):
             'local_gotno': elf.local_gotno,
             'symtabno': elf.symtabno,
             'gotsym': elf.gotsym,
-            'load_segments': len(elf.load_segments),
+            'load_segments': elf.load_segment_count,
             'needed': elf.needed_sonames(),
             'has_ctors': elf.has_ctors(),
             'has_init_array': elf.has_init_array(),
@@ -639,8 +211,9 @@ def cmd_analyze(args):
     # Dependency graph
     print(f"\n{'='*70}")
     print("Dependency Graph:")
-    dep_graph = build_dep_graph(elfs)
+    dep_graph, engine = build_dep_graph(elfs)
     report['dependency_graph'] = dep_graph
+    report['cycles'] = engine.cycles()
 
     # Find unresolved — check both raw NEEDED and resolved names
     for name, info in dep_graph.items():
@@ -655,7 +228,7 @@ def cmd_analyze(args):
 
     # Print dep graph sorted by depth
     by_depth = sorted(dep_graph.items(), key=lambda x: (-x[1]['depth'], x[0]))
-    max_depth = max((info['depth'] for _, info in by_depth), default=0)
+    max_depth = engine.max_depth
     for name, info in by_depth:
         indent = "  " * info['depth']
         needed_str = f" -> {', '.join(info['needed'][:5])}" if info['needed'] else ""
@@ -664,6 +237,11 @@ def cmd_analyze(args):
         print(f"  depth={info['depth']:2d} {indent}{name}{needed_str}")
     print(f"  Max depth: {max_depth}")
 
+    if report['cycles']:
+        print(f"\nCircular dependencies:")
+        for cycle in report['cycles']:
+            print(f"  {' <-> '.join(cycle)}")
+
     if report['unresolved_deps']:
         print(f"\nUnresolved dependencies:")
         for ud in report['unresolved_deps']:
@@ -684,6 +262,13 @@ def cmd_analyze(args):
             'over_limit': gc >= limit,
         })
 
+    # Load chains: a library plus everything it pulls in share one rld pass
+    print(f"\nLoad-chain GOT pressure (library + transitive deps):")
+    chains = sorted(dep_graph.items(), key=lambda x: (-x[1]['chain_global_got'], x[0]))
+    for name, info in chains[:10]:
+        print(f"  {name:50s}  chain_global_got={info['chain_global_got']:7d}"
+              f"  deps={info['transitive_count']}")
+
     # Summary
     report['summary'] = {
         'pass': total_pass,
@@ -691,6 +276,8 @@ def cmd_analyze(args):
         'total_checks': total_pass + total_fail,
         'libraries_analyzed': len(elfs),
         'max_depth': max_depth,
+        'max_chain_global_got': max((i['chain_global_got'] for i in dep_graph.values()), default=0),
+        'cycles': len(report['cycles']),
         'unresolved_count': len(report['unresolved_deps']),
         'over_got_limit': sum(1 for e in elfs if e.global_got_count >= THRESHOLDS['global_got_limit']),
     }
@@ -998,7 +585,7 @@ def cmd_test_loading(args):
     print(f"  {len(alpha_order)} libraries")
 
     print(f"\n--- Load Order: By Dependency Depth (leaves first) ---")
-    dep_graph = build_dep_graph(elfs)
+    dep_graph, _engine = build_dep_graph(elfs)
     depth_order = sorted(sonames, key=lambda n: dep_graph.get(n, {}).get('depth', 0))
     print(f"  {len(depth_order)} libraries")
 